@@ -5,11 +5,33 @@ from datetime import datetime, timedelta, timedelta, date
 import os
 from functools import wraps
 from dotenv import load_dotenv
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl.utils import get_column_letter
 import io
+import click
+import hmac
 from config import config
+from backup import build_backup_archive, write_backup_archive, restore_backup_archive, open_database_snapshot, BackupError
+from changefeed import DEFAULT_PAGE_SIZE, TRACKED_TABLES, ChangeTokenError, iter_ndjson, read_changes, record_deletions
+from report_writer import ReportWriter, XLSX_MIMETYPE
+from versioning import (apply_pending_versions, bump_all_versions, collect_flush_changes, discard_pending_versions,
+                        get_versions, mark_changed, last_modified, versions_etag, VERSIONED_TABLES)
+from caching import ArtifactCache
+from conditional import conditional_response
+import assets
+import compression
+import fragments
+import health
+import metrics
+import migrations
+import pool_sizing
+import profiler
+import querywatch
+import seed_data
+import money
+from money import Money, ZERO, parse_money, split_money, to_money
+import replica
+from replica import RoutingSession, read_replica
+import sqlite_tuning
+import threading
 import time
 
 # Load environment variables
@@ -29,13 +51,50 @@ if 'sqlite' in app.config.get('SQLALCHEMY_DATABASE_URI', ''):
     if db_dir and not os.path.exists(db_dir):
         os.makedirs(db_dir, exist_ok=True)
 
+# Pool size per worker from the deployment profile and workers x threads; SQLite
+# then drops the server-only pool options and gets per-connection pragmas (WAL, busy_timeout)
+pool_sizing.apply(app.config)
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = sqlite_tuning.engine_options(app.config)
+
+# Optional read-only bind for reports and exports (@read_replica)
+if app.config.get('READ_REPLICA_URL'):
+    replica.configure(app.config, sqlite_tuning.engine_options(app.config, app.config['READ_REPLICA_URL']))
+
 # Initialize SQLAlchemy
-db = SQLAlchemy(app)
+db = SQLAlchemy(app, session_options={'class_': RoutingSession})
+sqlite_tuning.init_app(app, db)
+
+# Fingerprinted, precompressed static files (asset_url() in templates)
+assets.init_app(app)
+
+# Per-route latency, SQL and template timings for /metrics (before compression,
+# so response sizes are counted as sent)
+metrics.init_app(app, db)
+
+# Slow statements and repeated query shapes per request (/query_report)
+querywatch.init_app(app, db)
+
+# ?_profile=1 from an admin: sampling profile, allocations and SQL timeline (/profiles)
+profiler.init_app(app, db)
+
+# gzip/brotli for HTML, JSON and other text responses
+compression.init_app(app)
+
+# |money template filter and numeric JSON for Decimal amounts
+money.init_app(app)
+
+# {% cache %} tag for template sections keyed by data versions
+fragments.init_app(app, db)
+
+# /health/live without the database, /health/ready with a cached database check
+health.init_app(app, db)
 
 # Association table for many-to-many relationship between students and groups
 student_groups = db.Table('student_groups',
     db.Column('student_id', db.Integer, db.ForeignKey('student.id'), primary_key=True),
-    db.Column('group_id', db.Integer, db.ForeignKey('group.id'), primary_key=True)
+    db.Column('group_id', db.Integer, db.ForeignKey('group.id'), primary_key=True),
+    # The primary key covers student -> groups; this covers group -> students
+    db.Index('ix_student_groups_group_id', 'group_id')
 )
 
 # Database Models
@@ -63,6 +122,9 @@ class User(db.Model):
     
     def update_activity(self):
         """Update last activity and set user as online"""
+        # Called on every request; a write per minute is plenty for the 5 minute online window
+        if self.is_online and self.last_activity and (datetime.utcnow() - self.last_activity).total_seconds() < 60:
+            return
         self.last_activity = datetime.utcnow()
         self.is_online = True
         db.session.commit()
@@ -78,21 +140,23 @@ class Instructor(db.Model):
     name = db.Column(db.String(100), nullable=False)
     phone = db.Column(db.String(20))
     specialization = db.Column(db.String(100))
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     students = db.relationship('Student', backref='instructor_ref', lazy=True)
     groups = db.relationship('Group', backref='instructor_ref', lazy=True)
 
 class Student(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
-    phone = db.Column(db.String(20))
-    age = db.Column(db.Integer)
-    location = db.Column(db.String(50))  # Changed from level to location
+    name = db.Column(db.String(100), nullable=False, index=True)
+    phone = db.Column(db.String(20), index=True)
+    age = db.Column(db.Integer, index=True)
+    location = db.Column(db.String(50), index=True)  # Changed from level to location
     instructor_id = db.Column(db.Integer, db.ForeignKey('instructor.id'))
     # Removed group_id - now using many-to-many relationship
-    total_paid = db.Column(db.Float, default=0.0)
-    discount = db.Column(db.Float, default=0.0)  # Discount amount in currency
+    total_paid = db.Column(Money, default=ZERO)
+    discount = db.Column(Money, default=ZERO)  # Discount amount in currency
     # Removed course_price - now price is per group
     registration_date = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     # Many-to-many relationship with groups
     groups = db.relationship('Group', secondary=student_groups, backref=db.backref('students', lazy='dynamic'))
     
@@ -120,13 +184,21 @@ class Group(db.Model):
     level = db.Column(db.String(50))
     instructor_id = db.Column(db.Integer, db.ForeignKey('instructor.id'))
     max_students = db.Column(db.Integer, default=15)
-    price = db.Column(db.Float, default=0.0)  # Price for this group
+    price = db.Column(Money, default=ZERO)  # Price for this group
     # Course completion fields
     status = db.Column(db.String(20), default='active')  # active, completed
     completion_date = db.Column(db.Date, nullable=True)
     completion_notes = db.Column(db.Text, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     # Students relationship is now defined in Student model with secondary table
     schedules = db.relationship('Schedule', backref='group_ref', lazy=True)
+    # Enrolled students, counted in the same SELECT that loads the group
+    student_count = db.column_property(
+        db.select(db.func.count(student_groups.c.student_id))
+        .where(student_groups.c.group_id == id)
+        .correlate_except(student_groups)
+        .scalar_subquery()
+    )
     
     @property
     def is_completed(self):
@@ -139,34 +211,45 @@ class Group(db.Model):
         return self.students.count()
 
 class Schedule(db.Model):
+    __table_args__ = (db.Index('ix_schedule_day_group', 'day_of_week', 'group_id'),)
     id = db.Column(db.Integer, primary_key=True)
-    group_id = db.Column(db.Integer, db.ForeignKey('group.id'))
+    group_id = db.Column(db.Integer, db.ForeignKey('group.id'), index=True)
     day_of_week = db.Column(db.String(20))  # السبت، الأحد، الاثنين، etc.
     start_time = db.Column(db.String(10))
     end_time = db.Column(db.String(10))
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
 class Attendance(db.Model):
+    __table_args__ = (
+        db.Index('ix_attendance_student_date', 'student_id', 'date'),
+        db.Index('ix_attendance_group_date', 'group_id', 'date'),
+        db.Index('ix_attendance_date_status', 'date', 'status'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('student.id'))
     date = db.Column(db.Date)
     status = db.Column(db.String(20))  # حاضر، غائب، متأخر
     group_id = db.Column(db.Integer, db.ForeignKey('group.id'))
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
 class Payment(db.Model):
+    __table_args__ = (db.Index('ix_payment_student_date', 'student_id', 'date'),)
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('student.id'))
-    amount = db.Column(db.Float)
-    date = db.Column(db.DateTime, default=datetime.utcnow)
-    month = db.Column(db.String(20))
+    amount = db.Column(Money)
+    date = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    month = db.Column(db.String(20), index=True)
     notes = db.Column(db.Text)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
 class Expense(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     description = db.Column(db.String(200), nullable=False)
-    amount = db.Column(db.Float, nullable=False)
-    category = db.Column(db.String(100))  # رواتب، إيجار، مرافق، مستلزمات، أخرى
-    date = db.Column(db.DateTime, default=datetime.utcnow)
+    amount = db.Column(Money, nullable=False)
+    category = db.Column(db.String(100), index=True)  # رواتب، إيجار، مرافق، مستلزمات، أخرى
+    date = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     notes = db.Column(db.Text)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
 class Task(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -179,6 +262,7 @@ class Task(db.Model):
     completed_at = db.Column(db.DateTime)
     created_by = db.Column(db.Integer, db.ForeignKey('user.id'))
     assigned_to = db.Column(db.Integer, db.ForeignKey('user.id'))
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     # Relationships
     creator = db.relationship('User', foreign_keys=[created_by], backref='created_tasks')
@@ -207,7 +291,7 @@ class Note(db.Model):
     color = db.Column(db.String(20), default='yellow')  # yellow, blue, green, red, purple
     is_pinned = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     created_by = db.Column(db.Integer, db.ForeignKey('user.id'))
     
     # Relationship
@@ -228,18 +312,20 @@ class Note(db.Model):
 
 class InstructorNote(db.Model):
     """Notes created by instructors - automatically sent to admins"""
+    __table_args__ = (db.Index('ix_instructor_note_creator_status', 'created_by', 'status'),)
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     content = db.Column(db.Text, nullable=False)
     student_id = db.Column(db.Integer, db.ForeignKey('student.id'), nullable=True)  # Optional: specific student
     group_id = db.Column(db.Integer, db.ForeignKey('group.id'), nullable=True)  # Optional: specific group
     priority = db.Column(db.String(20), default='متوسط')  # عالي، متوسط، منخفض
-    status = db.Column(db.String(20), default='جديد')  # جديد، قيد المراجعة، مكتمل
+    status = db.Column(db.String(20), default='جديد', index=True)  # جديد، قيد المراجعة، مكتمل
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     created_by = db.Column(db.Integer, db.ForeignKey('user.id'))  # Instructor user
     reviewed_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)  # Admin who reviewed
     reviewed_at = db.Column(db.DateTime, nullable=True)
     admin_response = db.Column(db.Text, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     # Relationships
     creator = db.relationship('User', foreign_keys=[created_by], backref='instructor_notes')
@@ -262,6 +348,7 @@ class InstructorNote(db.Model):
 
 class InstructorTodo(db.Model):
     """Todo list for instructors - personal task management"""
+    __table_args__ = (db.Index('ix_instructor_todo_creator_status', 'created_by', 'status'),)
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
@@ -273,7 +360,7 @@ class InstructorTodo(db.Model):
     due_date = db.Column(db.Date, nullable=True)  # Optional: due date
     reminder_date = db.Column(db.DateTime, nullable=True)  # Optional: reminder date
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     completed_at = db.Column(db.DateTime, nullable=True)
     created_by = db.Column(db.Integer, db.ForeignKey('user.id'))  # Instructor user
     
@@ -310,9 +397,81 @@ class InstructorTodo(db.Model):
         else:
             return 'منذ لحظات'
 
+class DeletedRecord(db.Model):
+    """Tombstone left behind when a row of a change-tracked table is deleted"""
+    id = db.Column(db.Integer, primary_key=True)
+    table_name = db.Column(db.String(50), nullable=False)
+    record_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+# Change tracking: tombstones for ORM deletes and bulk Query.delete() calls
+@db.event.listens_for(db.session, 'before_flush')
+def record_deleted_objects(session, flush_context, instances):
+    deleted = {}
+    for obj in session.deleted:
+        table_name = getattr(obj, '__tablename__', None)
+        if table_name:
+            deleted.setdefault(table_name, []).append(obj.id)
+    for table_name, record_ids in deleted.items():
+        record_deletions(session, table_name, record_ids, DeletedRecord)
+
+@db.event.listens_for(db.session, 'do_orm_execute')
+def record_bulk_deletes(orm_execute_state):
+    if not orm_execute_state.is_delete:
+        return
+    mapper = orm_execute_state.bind_arguments.get('mapper')
+    if mapper is None or mapper.local_table.name not in TRACKED_TABLES:
+        return
+    table = mapper.local_table
+    statement = orm_execute_state.statement
+    id_query = db.select(table.c.id)
+    if statement.whereclause is not None:
+        id_query = id_query.where(statement.whereclause)
+    record_ids = orm_execute_state.session.execute(id_query).scalars().all()
+    record_deletions(orm_execute_state.session, table.name, record_ids, DeletedRecord)
+
+# Data version counters for caches (see versioning.py)
+@db.event.listens_for(db.session, 'before_flush')
+def collect_version_changes(session, flush_context, instances):
+    collect_flush_changes(session)
+
+@db.event.listens_for(db.session, 'before_commit')
+def bump_changed_versions(session):
+    apply_pending_versions(session)
+
+@db.event.listens_for(db.session, 'after_rollback')
+def forget_changed_versions(session):
+    discard_pending_versions(session)
+
+@db.event.listens_for(db.session, 'do_orm_execute')
+def bump_bulk_write_versions(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_arguments.get('mapper')
+    if mapper is not None and mapper.local_table.name in VERSIONED_TABLES:
+        mark_changed(orm_execute_state.session, [mapper.local_table.name])
+
+# Changing a student's groups does not touch the student row, so bump it explicitly
+@db.event.listens_for(Student.groups, 'append')
+@db.event.listens_for(Student.groups, 'remove')
+def touch_student_on_group_change(student, group, initiator):
+    student.updated_at = datetime.utcnow()
+
+# Money attributes hold Decimal in Python as well, whatever the view assigns
+@db.event.listens_for(Student.total_paid, 'set', retval=True)
+@db.event.listens_for(Student.discount, 'set', retval=True)
+@db.event.listens_for(Group.price, 'set', retval=True)
+@db.event.listens_for(Payment.amount, 'set', retval=True)
+@db.event.listens_for(Expense.amount, 'set', retval=True)
+def coerce_money_attribute(target, value, oldvalue, initiator):
+    return to_money(value)
+
 # Update user activity before each request
 @app.before_request
 def update_user_activity():
+    # Static files and health probes must not touch the session or the database
+    if request.endpoint in ('static', 'dist_asset') or request.blueprint == 'health':
+        return
     if 'user_id' in session:
         user = User.query.get(session['user_id'])
         if user:
@@ -466,12 +625,14 @@ def get_today_schedule():
     today = datetime.now()
     today_arabic = get_arabic_day_name(today)
     
-    # Get all schedules for today
-    today_schedules = Schedule.query.filter_by(day_of_week=today_arabic).all()
+    # Get all schedules for today, with their groups and instructors
+    today_schedules = Schedule.query.options(
+        db.joinedload(Schedule.group_ref).joinedload(Group.instructor_ref)
+    ).filter_by(day_of_week=today_arabic).all()
     
     schedule_data = []
     for schedule in today_schedules:
-        group = Group.query.get(schedule.group_id)
+        group = schedule.group_ref
         if group and group.instructor_ref:
             schedule_data.append({
                 'group_name': group.name,
@@ -479,7 +640,7 @@ def get_today_schedule():
                 'start_time': schedule.start_time,
                 'end_time': schedule.end_time,
                 'level': group.level,
-                'student_count': group.students.count(),  # Use count() for dynamic relationship
+                'student_count': group.student_count,
                 'max_students': group.max_students  # Add max_students field
             })
     
@@ -495,11 +656,13 @@ def get_weekly_schedule():
     
     for day in arabic_days:
         # Get schedules for this day
-        day_schedules = Schedule.query.filter_by(day_of_week=day).all()
+        day_schedules = Schedule.query.options(
+            db.joinedload(Schedule.group_ref).joinedload(Group.instructor_ref)
+        ).filter_by(day_of_week=day).all()
         schedule_data = []
         
         for schedule in day_schedules:
-            group = Group.query.get(schedule.group_id)
+            group = schedule.group_ref
             # Include schedules even if group doesn't have instructor (with default values)
             if group:
                 instructor_name = group.instructor_ref.name if group.instructor_ref else 'غير محدد'
@@ -509,7 +672,7 @@ def get_weekly_schedule():
                     'start_time': schedule.start_time,
                     'end_time': schedule.end_time,
                     'level': group.level or 'عام',
-                    'student_count': group.students.count(),  # Use count() for dynamic relationship
+                    'student_count': group.student_count,
                     'max_students': group.max_students or 15,  # Default to 15 if not set
                     'group_id': group.id
                 })
@@ -553,10 +716,9 @@ def login():
             session['user_role'] = user.role
             session['user_name'] = user.full_name
             
-            # Set session as permanent if remember me is checked
-            if remember_me:
-                session.permanent = True
-                app.permanent_session_lifetime = timedelta(days=30)  # Remember for 30 days
+            # Remembered for PERMANENT_SESSION_LIFETIME (30 days); app settings are
+            # shared by every thread, so the lifetime is not changed per login
+            session.permanent = remember_me
             
             # Update last login and activity
             user.last_login = datetime.utcnow()
@@ -674,20 +836,13 @@ def index():
         return redirect(url_for('instructor_dashboard'))
     
     # Original admin/user dashboard code
-    students = Student.query.all()
-    instructors = Instructor.query.all() 
-    groups = Group.query.all()
-    
-    total_students = len(students)
-    total_groups = len(groups)
-    total_instructors = len(instructors)
+    total_students = Student.query.count()
+    total_groups = Group.query.count()
+    total_instructors = Instructor.query.count()
     
     # Get today's schedule
     today_schedule = get_today_schedule()
     
-    # Get weekly schedule  
-    weekly_schedule = get_weekly_schedule()
-    
     # Get today's Arabic day name
     today_arabic = get_arabic_day_name(datetime.now())
     
@@ -696,7 +851,8 @@ def index():
                          total_groups=total_groups, 
                          total_instructors=total_instructors,
                          today_schedule=today_schedule,
-                         weekly_schedule=weekly_schedule,
+                         # Called inside the cached weekly grid fragment, only on a miss
+                         get_weekly_schedule=get_weekly_schedule,
                          today_date=datetime.now(),
                          today_arabic=today_arabic)
 
@@ -712,7 +868,8 @@ def instructor_dashboard():
     instructor = current_user.linked_instructor
     
     # Get instructor's groups and students
-    instructor_groups = instructor.groups
+    instructor_groups = Group.query.options(db.selectinload(Group.schedules)) \
+        .filter_by(instructor_id=instructor.id).all()
     instructor_students = get_instructor_students(current_user)
     
     # Get today's schedule for this instructor
@@ -782,7 +939,7 @@ def students():
     if location_filter:
         query = query.filter(Student.location.ilike(f'%{location_filter}%'))
     
-    students = query.all()
+    students = query.options(db.selectinload(Student.groups)).all()
     instructors = Instructor.query.all()
     groups = Group.query.all()
     
@@ -815,7 +972,7 @@ def add_student():
         location = request.form.get('location', '')  # Use get() for optional fields
         instructor_id = None  # Make instructor optional - can be set later if needed
         registration_date = parse_date_from_input(request.form['registration_date'])
-        discount = float(request.form.get('discount', 0))  # Get discount amount, default to 0
+        discount = parse_money(request.form.get('discount', 0))  # Get discount amount, default to 0
         
         if not registration_date:
             flash('يرجى اختيار تاريخ التسجيل من منتقي التاريخ', 'error')
@@ -888,13 +1045,12 @@ def groups():
     if instructor_filter:
         groups_query = groups_query.filter(Group.instructor_id == instructor_filter)
     
-    groups = groups_query.all()
+    groups = groups_query.options(db.selectinload(Group.schedules)).all()
     instructors = Instructor.query.all()
     
     # Calculate total students across filtered groups
-    total_students = 0
-    for group in groups:
-        total_students += group.students.count()
+    total_students = db.session.query(db.func.count()).select_from(student_groups) \
+        .filter(student_groups.c.group_id.in_([group.id for group in groups])).scalar()
     
     return render_template('groups.html', 
                          groups=groups, 
@@ -949,7 +1105,7 @@ def add_group():
     level = request.form['level']
     instructor_id = int(request.form['instructor_id'])
     max_students = int(request.form['max_students'])
-    price = float(request.form['price'])
+    price = parse_money(request.form['price'])
     force_save = request.form.get('force_save', 'false') == 'true'
     
     # Collect schedule data for conflict checking
@@ -1066,16 +1222,18 @@ def mark_attendance():
     date = datetime.strptime(data['date'], '%Y-%m-%d').date()
     group_id = data['group_id']
     
+    # Existing records of the day in one query; a lookup per student would also
+    # autoflush (and bump the cache versions) once per student
+    existing_records = {
+        record.student_id: record
+        for record in Attendance.query.filter_by(date=date, group_id=group_id)
+    }
+    
     for student_data in data['students']:
         student_id = student_data['student_id']
         status = student_data['status']
         
-        # Check if attendance already exists
-        existing = Attendance.query.filter_by(
-            student_id=student_id,
-            date=date,
-            group_id=group_id
-        ).first()
+        existing = existing_records.get(int(student_id))
         
         if existing:
             existing.status = status
@@ -1115,7 +1273,8 @@ def payments():
     search_expense_date_from = request.args.get('search_expense_date_from', '')
     search_expense_date_to = request.args.get('search_expense_date_to', '')
     
-    students = Student.query.all()
+    # Groups are loaded up front for the per-group revenue split below
+    students = Student.query.options(db.selectinload(Student.groups)).all()
     
     # Build payment query with filters
     payment_query = Payment.query
@@ -1133,13 +1292,13 @@ def payments():
     
     if search_amount_min:
         try:
-            payment_query = payment_query.filter(Payment.amount >= float(search_amount_min))
+            payment_query = payment_query.filter(Payment.amount >= parse_money(search_amount_min))
         except ValueError:
             pass
     
     if search_amount_max:
         try:
-            payment_query = payment_query.filter(Payment.amount <= float(search_amount_max))
+            payment_query = payment_query.filter(Payment.amount <= parse_money(search_amount_max))
         except ValueError:
             pass
     
@@ -1171,13 +1330,13 @@ def payments():
     
     if search_expense_amount_min:
         try:
-            expense_query = expense_query.filter(Expense.amount >= float(search_expense_amount_min))
+            expense_query = expense_query.filter(Expense.amount >= parse_money(search_expense_amount_min))
         except ValueError:
             pass
     
     if search_expense_amount_max:
         try:
-            expense_query = expense_query.filter(Expense.amount <= float(search_expense_amount_max))
+            expense_query = expense_query.filter(Expense.amount <= parse_money(search_expense_amount_max))
         except ValueError:
             pass
     
@@ -1210,35 +1369,22 @@ def payments():
         error_out=False
     )
     
-    # All payments and expenses for calculations (without filters for totals)
-    all_payments = Payment.query.all()
-    all_expenses = Expense.query.all()
-    
-    # Calculate comprehensive statistics
-    total_income = sum(payment.amount for payment in all_payments) if all_payments else 0
-    total_expenses = sum(expense.amount for expense in all_expenses) if all_expenses else 0
+    # Totals are summed in SQL over integer piastres (without the search filters)
+    total_income = db.session.query(db.func.coalesce(db.func.sum(Payment.amount), 0)).scalar()
+    total_expenses = db.session.query(db.func.coalesce(db.func.sum(Expense.amount), 0)).scalar()
     net_balance = total_income - total_expenses
     
-    students_with_dues = sum(1 for student in students if student.remaining_balance > 0)
-    recent_payments = len([p for p in all_payments if (datetime.now() - p.date).days <= 30]) if all_payments else 0
-    recent_expenses = len([e for e in all_expenses if (datetime.now() - e.date).days <= 30]) if all_expenses else 0
+    students_with_dues = sum(1 for student in get_students_with_balances() if student['remaining_balance'] > 0)
+    recent_since = datetime.now() - timedelta(days=31)
+    recent_payments = Payment.query.filter(Payment.date > recent_since).count()
+    recent_expenses = Expense.query.filter(Expense.date > recent_since).count()
     
     # Monthly breakdown for current year
     current_year = datetime.now().year
-    monthly_income = {}
-    monthly_expenses = {}
-    
-    # Get monthly income
-    for payment in all_payments:
-        if payment.date.year == current_year:
-            month = payment.date.month
-            monthly_income[month] = monthly_income.get(month, 0) + payment.amount
-    
-    # Get monthly expenses  
-    for expense in all_expenses:
-        if expense.date.year == current_year:
-            month = expense.date.month
-            monthly_expenses[month] = monthly_expenses.get(month, 0) + expense.amount
+    year_start = datetime(current_year, 1, 1)
+    next_year_start = datetime(current_year + 1, 1, 1)
+    monthly_income = monthly_totals(Payment.amount, Payment.date, year_start, next_year_start)
+    monthly_expenses = monthly_totals(Expense.amount, Expense.date, year_start, next_year_start)
     
     # Monthly and group breakdown for revenue
     monthly_group_income = {}
@@ -1248,21 +1394,24 @@ def payments():
     groups = Group.query.all()
     
     # Create monthly breakdown by groups
-    for payment in all_payments:
-        student = Student.query.get(payment.student_id)
-        if student and payment.date.year == current_year:
+    year_payments = Payment.query.filter(
+        Payment.date >= year_start, Payment.date < next_year_start
+    ).all()
+    students_by_id = {student.id: student for student in students}
+    for payment in year_payments:
+        student = students_by_id.get(payment.student_id)
+        if student:
             month = payment.date.month
             month_name = get_arabic_month_name(month)
             
             if month_name not in monthly_group_income:
                 monthly_group_income[month_name] = {}
             
-            # Add payment to each group the student belongs to
-            for group in student.groups:
+            # Distribute the payment evenly among the student's groups, to the piastre
+            shares = split_money(payment.amount, len(student.groups)) if student.groups else []
+            for group, amount_per_group in zip(student.groups, shares):
                 if group.name not in monthly_group_income[month_name]:
                     monthly_group_income[month_name][group.name] = 0
-                # Distribute payment amount evenly among student's groups
-                amount_per_group = payment.amount / len(student.groups)
                 monthly_group_income[month_name][group.name] += amount_per_group
                 
                 # Also create group-based monthly breakdown
@@ -1310,7 +1459,7 @@ def payments():
 @app.route('/add_payment', methods=['POST'])
 def add_payment():
     student_id = int(request.form['student_id'])
-    amount = float(request.form['amount'])
+    amount = parse_money(request.form['amount'])
     month = request.form['month']
     notes = request.form['notes']
     
@@ -1339,7 +1488,7 @@ def edit_payment(payment_id):
     
     # Get new values
     new_student_id = int(request.form['student_id'])
-    new_amount = float(request.form['amount'])
+    new_amount = parse_money(request.form['amount'])
     new_month = request.form['month']
     new_notes = request.form['notes']
     
@@ -1384,6 +1533,7 @@ def delete_payment(payment_id):
 
 @app.route('/reports')
 @login_required
+@read_replica
 def reports():
     # Attendance statistics
     total_students = Student.query.count()
@@ -1392,49 +1542,32 @@ def reports():
     absent_today = Attendance.query.filter_by(date=today, status='غائب').count()
     
     # Payment statistics
-    total_revenue = db.session.query(db.func.sum(Payment.amount)).scalar() or 0
+    total_revenue = db.session.query(db.func.coalesce(db.func.sum(Payment.amount), 0)).scalar()
     
-    # Calculate pending payments based on group-based pricing after discounts
-    pending_payments = 0
-    students = Student.query.all()
-    for student in students:
-        if student.remaining_balance > 0:
-            pending_payments += student.remaining_balance
+    # Pending payments and expected revenue after discounts, from the grouped balances query
+    balances = get_students_with_balances()
+    pending_payments = sum(student['remaining_balance'] for student in balances)
+    total_groups_revenue = sum(student['price_after_discount'] for student in balances)
     
     # Other statistics
     groups_count = Group.query.count()
     instructors_count = Instructor.query.count()
     today_date = datetime.now().strftime('%Y-%m-%d')
     
-    # Additional useful statistics - calculate expected revenue after discounts
-    total_groups_revenue = sum(student.total_course_price_after_discount for student in Student.query.all())
     late_today = Attendance.query.filter_by(date=today, status='متأخر').count()
     
     # Monthly statistics for the current year
     current_year = datetime.now().year
-    monthly_payments = {}
-    monthly_expenses = {}
-    
-    # Get monthly payment data
-    payments = Payment.query.filter(
-        db.extract('year', Payment.date) == current_year
-    ).all()
-    
-    for payment in payments:
-        month = payment.date.month
-        monthly_payments[month] = monthly_payments.get(month, 0) + payment.amount
-    
-    # Get monthly expense data
-    expenses = Expense.query.filter(
-        db.extract('year', Expense.date) == current_year
-    ).all()
+    # A date range rather than extract('year', ...) so the date indexes are used
+    year_start = datetime(current_year, 1, 1)
+    next_year_start = datetime(current_year + 1, 1, 1)
     
-    for expense in expenses:
-        month = expense.date.month
-        monthly_expenses[month] = monthly_expenses.get(month, 0) + expense.amount
+    # Monthly sums come straight from SQL
+    monthly_payments = monthly_totals(Payment.amount, Payment.date, year_start, next_year_start)
+    monthly_expenses = monthly_totals(Expense.amount, Expense.date, year_start, next_year_start)
     
     # Get groups data for health check
-    groups_count_list = Group.query.all()
+    groups_count_list = Group.query.options(db.selectinload(Group.schedules)).all()
     
     return render_template('reports.html',
                          total_students=total_students,
@@ -1451,221 +1584,200 @@ def reports():
                          monthly_expenses=monthly_expenses,
                          groups_count_list=groups_count_list)
 
+def aggregate_names(column, separator=', '):
+    """Comma separated list of names per group-by row (string_agg on Postgres)"""
+    if db.engine.dialect.name == 'postgresql':
+        return db.func.string_agg(column, separator)
+    return db.func.group_concat(column, separator)
+
+def monthly_totals(amount_column, date_column, start, end):
+    """{month number: sum of amount_column} for rows dated in [start, end), summed in SQL"""
+    month = db.extract('month', date_column)
+    rows = db.session.query(month, db.func.sum(amount_column)) \
+        .filter(date_column >= start, date_column < end) \
+        .group_by(month) \
+        .all()
+    return {int(month_number): total for month_number, total in rows}
+
+def get_students_with_balances():
+    """One query: every student with group names, course price and remaining balance"""
+    course_price = db.func.coalesce(db.func.sum(Group.price), 0)
+    rows = db.session.query(
+        Student.id,
+        Student.name,
+        Student.age,
+        Student.location,
+        Student.total_paid,
+        Student.discount,
+        Student.registration_date,
+        aggregate_names(Group.name).label('group_names'),
+        course_price.label('course_price')
+    ).outerjoin(student_groups, student_groups.c.student_id == Student.id) \
+     .outerjoin(Group, Group.id == student_groups.c.group_id) \
+     .group_by(Student.id) \
+     .order_by(Student.id) \
+     .all()
+    
+    students = []
+    for row in rows:
+        # Same rules as Student.remaining_balance
+        price_after_discount = max(0, row.course_price - (row.discount or 0))
+        students.append({
+            'id': row.id,
+            'name': row.name,
+            'age': row.age,
+            'location': row.location,
+            'total_paid': row.total_paid or 0,
+            'registration_date': row.registration_date,
+            'group_names': row.group_names,
+            'price_after_discount': price_after_discount,
+            'remaining_balance': max(0, price_after_discount - (row.total_paid or 0))
+        })
+    return students
+
+# Tables the comprehensive report is built from (memberships bump 'student')
+REPORT_TABLES = ['student', 'instructor', 'group', 'attendance', 'payment', 'expense']
+
+report_cache = ArtifactCache(app.config['REPORT_CACHE_DIR'], app.config['REPORT_CACHE_MAX_BYTES'])
+
 @app.route('/export_reports')
 @login_required
+@read_replica
 def export_reports():
-    """Export comprehensive reports to Excel file"""
+    """Export comprehensive reports to Excel file, reusing the cached file while data is unchanged"""
     try:
-        # Create workbook and worksheet
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "تقرير شامل"
-        
-        # Set RTL direction for Arabic support
-        ws.sheet_view.rightToLeft = True
+        versions = get_versions(db, REPORT_TABLES)
+        # The report shows today's date and attendance, so it also changes daily
+        etag = versions_etag('export_reports', versions, datetime.now().date())
         
-        # Define styles
-        header_font = Font(size=14, bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        sub_header_font = Font(size=12, bold=True, color="2F5F8F")
-        border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        center_alignment = Alignment(horizontal='center', vertical='center')
+        path = report_cache.get(etag, '.xlsx')
+        if path is None and not request.if_none_match.contains_weak(etag):
+            path = report_cache.put(etag, build_comprehensive_report(), '.xlsx')
         
-        current_row = 1
-        
-        # Title
-        ws.merge_cells(f'A{current_row}:F{current_row}')
-        title_cell = ws[f'A{current_row}']
-        title_cell.value = f"تقرير شامل - مركز تفرا التعليمي - {format_arabic_date(datetime.now())}"
-        title_cell.font = Font(size=16, bold=True, color="2F5F8F")
-        title_cell.alignment = center_alignment
-        current_row += 2
-        
-        # Basic Statistics Section
-        ws[f'A{current_row}'] = "الإحصائيات الأساسية"
-        ws[f'A{current_row}'].font = sub_header_font
-        current_row += 1
-        
-        # Get statistics data
-        total_students = Student.query.count()
-        instructors_count = Instructor.query.count()
-        groups_count = Group.query.count()
-        today = datetime.now().date()
-        present_today = Attendance.query.filter_by(date=today, status='حاضر').count()
-        absent_today = Attendance.query.filter_by(date=today, status='غائب').count()
-        late_today = Attendance.query.filter_by(date=today, status='متأخر').count()
-        
-        # Add basic statistics
-        stats_data = [
-            ['البيان', 'القيمة'],
-            ['إجمالي الطلاب', total_students],
-            ['عدد المدرسين', instructors_count],
-            ['عدد المجموعات', groups_count],
-            ['حاضر اليوم', present_today],
-            ['غائب اليوم', absent_today],
-            ['متأخر اليوم', late_today],
-        ]
-        
-        for row_data in stats_data:
-            for col, value in enumerate(row_data, 1):
-                cell = ws.cell(row=current_row, column=col)
-                cell.value = value
-                cell.border = border
-                cell.alignment = center_alignment
-                if current_row == len(stats_data) + current_row - len(stats_data):  # Header row
-                    cell.font = header_font
-                    cell.fill = header_fill
-            current_row += 1
-        
-        current_row += 2
-        
-        # Financial Statistics Section
-        ws[f'A{current_row}'] = "الإحصائيات المالية"
-        ws[f'A{current_row}'].font = sub_header_font
-        current_row += 1
-        
-        # Get financial data
-        total_revenue = db.session.query(db.func.sum(Payment.amount)).scalar() or 0
-        total_expenses = db.session.query(db.func.sum(Expense.amount)).scalar() or 0
-        pending_payments = sum(student.remaining_balance for student in Student.query.all() if student.remaining_balance > 0)
-        
-        financial_data = [
-            ['البيان المالي', 'المبلغ (ريال)'],
-            ['إجمالي الإيرادات', f"{total_revenue:,.0f}"],
-            ['إجمالي المصروفات', f"{total_expenses:,.0f}"],
-            ['صافي الربح', f"{total_revenue - total_expenses:,.0f}"],
-            ['مدفوعات معلقة', f"{pending_payments:,.0f}"],
-        ]
-        
-        for row_data in financial_data:
-            for col, value in enumerate(row_data, 1):
-                cell = ws.cell(row=current_row, column=col)
-                cell.value = value
-                cell.border = border
-                cell.alignment = center_alignment
-                if current_row == len(financial_data) + current_row - len(financial_data):  # Header row
-                    cell.font = header_font
-                    cell.fill = header_fill
-            current_row += 1
-        
-        current_row += 2
-        
-        # Students Data Section
-        ws[f'A{current_row}'] = "بيانات الطلاب"
-        ws[f'A{current_row}'].font = sub_header_font
-        current_row += 1
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f"تقرير_شامل_{timestamp}.xlsx"
         
-        # Students headers
-        student_headers = ['#', 'اسم الطالب', 'العمر', 'الموقع', 'المجموعات', 'المدفوع', 'المتبقي', 'تاريخ التسجيل']
-        for col, header in enumerate(student_headers, 1):
-            cell = ws.cell(row=current_row, column=col)
-            cell.value = header
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.border = border
-            cell.alignment = center_alignment
-        current_row += 1
+        if path is None:
+            # Client already has this version and the cached file was evicted
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+        else:
+            response = send_file(
+                path,
+                as_attachment=True,
+                download_name=filename,
+                mimetype=XLSX_MIMETYPE,
+                etag=etag,
+                last_modified=last_modified(versions),
+                conditional=True
+            )
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
         
-        # Students data
-        students = Student.query.all()
-        for idx, student in enumerate(students, 1):
-            groups_names = ', '.join([group.name for group in student.groups])
-            student_data = [
+    except Exception as e:
+        flash(f'حدث خطأ أثناء تصدير التقرير: {str(e)}', 'error')
+        return redirect(url_for('reports'))
+
+def build_comprehensive_report():
+    """Build the comprehensive Excel report; returns a BytesIO buffer"""
+    report = ReportWriter()
+    ws = report.add_sheet("تقرير شامل")
+    
+    # Title
+    ws.add_title(f"تقرير شامل - مركز تفرا التعليمي - {format_arabic_date(datetime.now())}", span=6)
+    ws.add_blank()
+    
+    # Get statistics data
+    total_students = Student.query.count()
+    instructors_count = Instructor.query.count()
+    groups_count = Group.query.count()
+    today = datetime.now().date()
+    attendance_counts = dict(
+        db.session.query(Attendance.status, db.func.count(Attendance.id))
+        .filter(Attendance.date == today)
+        .group_by(Attendance.status)
+        .all()
+    )
+    
+    # Basic Statistics Section
+    ws.add_section("الإحصائيات الأساسية")
+    ws.add_table(['البيان', 'القيمة'], [
+        ['إجمالي الطلاب', total_students],
+        ['عدد المدرسين', instructors_count],
+        ['عدد المجموعات', groups_count],
+        ['حاضر اليوم', attendance_counts.get('حاضر', 0)],
+        ['غائب اليوم', attendance_counts.get('غائب', 0)],
+        ['متأخر اليوم', attendance_counts.get('متأخر', 0)],
+    ])
+    ws.add_blank(2)
+    
+    # Get financial data
+    students = get_students_with_balances()
+    total_revenue = db.session.query(db.func.sum(Payment.amount)).scalar() or 0
+    total_expenses = db.session.query(db.func.sum(Expense.amount)).scalar() or 0
+    pending_payments = sum(student['remaining_balance'] for student in students)
+    
+    # Financial Statistics Section
+    ws.add_section("الإحصائيات المالية")
+    ws.add_table(['البيان المالي', 'المبلغ (ريال)'], [
+        ['إجمالي الإيرادات', f"{total_revenue:,.0f}"],
+        ['إجمالي المصروفات', f"{total_expenses:,.0f}"],
+        ['صافي الربح', f"{total_revenue - total_expenses:,.0f}"],
+        ['مدفوعات معلقة', f"{pending_payments:,.0f}"],
+    ])
+    ws.add_blank(2)
+    
+    # Students Data Section
+    ws.add_section("بيانات الطلاب")
+    ws.add_table(
+        ['#', 'اسم الطالب', 'العمر', 'الموقع', 'المجموعات', 'المدفوع', 'المتبقي', 'تاريخ التسجيل'],
+        (
+            [
                 idx,
-                student.name,
-                student.age or 'غير محدد',
-                student.location or 'غير محدد',
-                groups_names or 'لا توجد مجموعات',
-                f"{student.total_paid:,.0f}",
-                f"{student.remaining_balance:,.0f}",
-                student.registration_date.strftime('%Y-%m-%d') if student.registration_date else 'غير محدد'
+                student['name'],
+                student['age'] or 'غير محدد',
+                student['location'] or 'غير محدد',
+                student['group_names'] or 'لا توجد مجموعات',
+                f"{student['total_paid']:,.0f}",
+                f"{student['remaining_balance']:,.0f}",
+                student['registration_date'].strftime('%Y-%m-%d') if student['registration_date'] else 'غير محدد'
             ]
-            
-            for col, value in enumerate(student_data, 1):
-                cell = ws.cell(row=current_row, column=col)
-                cell.value = value
-                cell.border = border
-                cell.alignment = center_alignment
-            current_row += 1
-        
-        current_row += 2
-        
-        # Groups Data Section
-        ws[f'A{current_row}'] = "بيانات المجموعات"
-        ws[f'A{current_row}'].font = sub_header_font
-        current_row += 1
-        
-        # Groups headers
-        group_headers = ['#', 'اسم المجموعة', 'المستوى', 'المدرس', 'عدد الطلاب', 'الحد الأقصى', 'السعر']
-        for col, header in enumerate(group_headers, 1):
-            cell = ws.cell(row=current_row, column=col)
-            cell.value = header
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.border = border
-            cell.alignment = center_alignment
-        current_row += 1
-        
-        # Groups data
-        groups = Group.query.all()
-        for idx, group in enumerate(groups, 1):
-            instructor_name = group.instructor_ref.name if group.instructor_ref else 'غير محدد'
-            group_data = [
+            for idx, student in enumerate(students, 1)
+        )
+    )
+    ws.add_blank(2)
+    
+    # Groups Data Section: instructor names and student counts in one query
+    student_count = db.func.count(student_groups.c.student_id)
+    groups = db.session.query(Group, Instructor.name, student_count) \
+        .outerjoin(Instructor, Instructor.id == Group.instructor_id) \
+        .outerjoin(student_groups, student_groups.c.group_id == Group.id) \
+        .group_by(Group.id, Instructor.name) \
+        .order_by(Group.id) \
+        .all()
+    
+    ws.add_section("بيانات المجموعات")
+    ws.add_table(
+        ['#', 'اسم المجموعة', 'المستوى', 'المدرس', 'عدد الطلاب', 'الحد الأقصى', 'السعر'],
+        (
+            [
                 idx,
                 group.name,
                 group.level or 'غير محدد',
-                instructor_name,
-                group.students.count(),
+                instructor_name or 'غير محدد',
+                students_count,
                 group.max_students,
                 f"{group.price:,.0f}"
             ]
-            
-            for col, value in enumerate(group_data, 1):
-                cell = ws.cell(row=current_row, column=col)
-                cell.value = value
-                cell.border = border
-                cell.alignment = center_alignment
-            current_row += 1
-        
-        # Auto-adjust column widths
-        for column in ws.columns:
-            max_length = 0
-            column_letter = get_column_letter(column[0].column)
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-        
-        # Save to memory buffer
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
-        
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"تقرير_شامل_{timestamp}.xlsx"
-        
-        return send_file(
-            output,
-            as_attachment=True,
-            download_name=filename,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            for idx, (group, instructor_name, students_count) in enumerate(groups, 1)
         )
-        
-    except Exception as e:
-        flash(f'حدث خطأ أثناء تصدير التقرير: {str(e)}', 'error')
-        return redirect(url_for('reports'))
+    )
+    
+    return report.to_bytes()
 
 @app.route('/get_group_students/<int:group_id>')
+@conditional_response(db, ['group', 'student'])
 def get_group_students(group_id):
     group = Group.query.get_or_404(group_id)
     student_list = []
@@ -1686,7 +1798,7 @@ def edit_student(student_id):
         student.location = request.form.get('location', '')
         student.instructor_id = None  # Keep instructor optional
         registration_date = parse_date_from_input(request.form['registration_date'])
-        student.discount = float(request.form.get('discount', 0))  # Get discount amount, default to 0
+        student.discount = parse_money(request.form.get('discount', 0))  # Get discount amount, default to 0
         
         if not registration_date:
             flash('يرجى اختيار تاريخ التسجيل من منتقي التاريخ', 'error')
@@ -1863,7 +1975,7 @@ def edit_group(group_id):
     group.name = request.form['name']
     group.level = request.form['level']
     new_instructor_id = int(request.form['instructor_id'])
-    group.price = float(request.form['price'])
+    group.price = parse_money(request.form['price'])
     group.max_students = int(request.form['max_students'])
     
     # Collect schedule data for conflict checking
@@ -1983,6 +2095,7 @@ def delete_group(group_id):
     return redirect(url_for('groups'))
 
 @app.route('/get_group_details/<int:group_id>')
+@conditional_response(db, ['group', 'schedule'])
 def get_group_details(group_id):
     group = Group.query.get_or_404(group_id)
     schedules = []
@@ -2086,7 +2199,7 @@ def update_group_completion(group_id):
 @app.route('/add_expense', methods=['POST'])
 def add_expense():
     description = request.form['description']
-    amount = float(request.form['amount'])
+    amount = parse_money(request.form['amount'])
     category = request.form['category']
     notes = request.form.get('notes', '')
     
@@ -2109,7 +2222,7 @@ def edit_expense(expense_id):
     
     # Update expense details
     expense.description = request.form['description']
-    expense.amount = float(request.form['amount'])
+    expense.amount = parse_money(request.form['amount'])
     expense.category = request.form['category']
     expense.notes = request.form.get('notes', '')
     
@@ -2215,8 +2328,8 @@ def bulk_delete_expenses():
 def group_details(group_id):
     group = Group.query.get_or_404(group_id)
     
-    # Get all students in this group
-    students = group.students.all()
+    # Get all students in this group, with their groups for the course prices
+    students = group.students.options(db.selectinload(Student.groups)).all()
     
     # Get all attendance records for this group
     attendance_records = Attendance.query.filter_by(group_id=group_id).all()
@@ -2295,18 +2408,21 @@ def group_details(group_id):
 def add_sample_attendance():
     """Add sample attendance data for testing - Admin only"""
     from datetime import date, timedelta
+    import random
     
-    # Get all groups and their students
-    groups = Group.query.all()
+    # Get all enrollments as (group_id, student_id)
+    enrollments = db.session.query(student_groups.c.group_id, student_groups.c.student_id) \
+        .order_by(student_groups.c.group_id, student_groups.c.student_id).all()
     
     # Generate attendance for the last 30 days
     start_date = date.today() - timedelta(days=30)
     
-    for group in groups:
-        students = group.students.all()
-        if not students:
-            continue
-            
+    # Records that already exist in the range, loaded once instead of per student per day
+    existing = set(db.session.query(Attendance.group_id, Attendance.student_id, Attendance.date)
+                   .filter(Attendance.date >= start_date, Attendance.date < start_date + timedelta(days=30)))
+    
+    new_records = []
+    for group_id, student_id in enrollments:
         # Generate attendance for each day in the last 30 days
         for i in range(30):
             current_date = start_date + timedelta(days=i)
@@ -2315,33 +2431,28 @@ def add_sample_attendance():
             if current_date.weekday() in [4, 5]:  # Friday and Saturday
                 continue
                 
-            for student in students:
-                # Check if attendance already exists
-                existing = Attendance.query.filter_by(
-                    student_id=student.id,
-                    date=current_date,
-                    group_id=group.id
-                ).first()
+            if (group_id, student_id, current_date) not in existing:
+                # Generate random attendance status
+                # 70% present, 20% absent, 10% late
+                rand = random.random()
+                if rand < 0.7:
+                    status = 'حاضر'
+                elif rand < 0.9:
+                    status = 'غائب'
+                else:
+                    status = 'متأخر'
                 
-                if not existing:
-                    # Generate random attendance status
-                    # 70% present, 20% absent, 10% late
-                    rand = random.random()
-                    if rand < 0.7:
-                        status = 'حاضر'
-                    elif rand < 0.9:
-                        status = 'غائب'
-                    else:
-                        status = 'متأخر'
-                    
-                    attendance = Attendance(
-                        student_id=student.id,
-                        date=current_date,
-                        status=status,
-                        group_id=group.id
-                    )
-                    db.session.add(attendance)
+                new_records.append({
+                    'student_id': student_id,
+                    'date': current_date,
+                    'status': status,
+                    'group_id': group_id
+                })
     
+    if new_records:
+        db.session.execute(db.insert(Attendance), new_records)
+        # A bulk insert skips the flush hooks that bump the cache versions
+        mark_changed(db.session, ['attendance'])
     db.session.commit()
     flash('تم إضافة بيانات الحضور التجريبية بنجاح!', 'success')
     return redirect(url_for('groups'))
@@ -2402,8 +2513,166 @@ def init_db():
     """Initialize database and create default admin"""
     with app.app_context():
         db.create_all()
+        migrations.upgrade(db)
         create_default_admin()
 
+@app.cli.command('init-db')
+def init_db_command():
+    """Create tables, apply migrations and create the default admin"""
+    init_db()
+    print(f"✅ Database initialized (schema version {migrations.latest_version()})")
+
+@app.cli.command('upgrade-db')
+def upgrade_db_command():
+    """Apply pending schema migrations"""
+    applied = migrations.upgrade(db)
+    if not applied:
+        print(f"✅ Database schema is up to date (version {migrations.latest_version()})")
+
+def changefeed_settle_delay():
+    return timedelta(seconds=app.config['CHANGEFEED_SETTLE_SECONDS'])
+
+@app.cli.command('changes')
+@click.option('--since', default='', help='Watermark token from a previous run')
+@click.option('--limit', default=DEFAULT_PAGE_SIZE, show_default=True, help='Maximum events per page')
+@click.option('--output', type=click.File('w', encoding='utf-8'), default='-', help='NDJSON output file')
+@click.option('--all', 'follow', is_flag=True, help='Keep reading pages until caught up')
+def changes_command(since, limit, output, follow):
+    """Write changes since a watermark token as NDJSON.
+
+    Rows of the last CHANGEFEED_SETTLE_SECONDS are held back, and a write
+    that took longer than that to commit can be missed (see changefeed.py).
+    """
+    token = since
+    total = 0
+    while True:
+        try:
+            events, token, has_more = read_changes(db, token, limit, settle_delay=changefeed_settle_delay())
+        except ChangeTokenError as e:
+            raise click.ClickException(str(e))
+        for line in iter_ndjson(events, token, has_more):
+            output.write(line)
+        total += len(events)
+        if not (follow and has_more):
+            break
+    click.echo(f"✅ {total} changes, next token: {token}", err=True)
+
+@app.cli.command('export-backup')
+@click.argument('path')
+def export_backup_command(path):
+    """Write a ZIP backup archive of the whole database to PATH"""
+    started = time.perf_counter()
+    with open(path, 'wb') as output:
+        manifest = write_backup_archive(db, output)
+    total_rows = sum(table['rows'] for table in manifest['tables'])
+    print(f"✅ Backup written to {path}: {len(manifest['tables'])} tables, {total_rows} rows in {time.perf_counter() - started:.2f}s")
+
+@app.cli.command('snapshot-db')
+@click.argument('directory', default='.')
+def snapshot_db_command(directory):
+    """Write a compressed hot snapshot of the database into DIRECTORY"""
+    started = time.perf_counter()
+    try:
+        chunks, filename = open_database_snapshot(db)
+        path = os.path.join(directory, filename)
+        with open(path, 'wb') as output:
+            for chunk in chunks:
+                output.write(chunk)
+    except BackupError as e:
+        raise click.ClickException(str(e))
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    print(f"✅ Snapshot written to {path} ({size_mb:.2f} MB) in {time.perf_counter() - started:.2f}s")
+
+@app.cli.command('restore-backup')
+@click.argument('path')
+@click.option('--replace', is_flag=True, help='Delete existing data before restoring')
+def restore_backup_command(path, replace):
+    """Restore a ZIP backup archive from PATH"""
+    started = time.perf_counter()
+    try:
+        with open(path, 'rb') as archive:
+            restored = restore_backup_archive(db, archive, replace=replace)
+    except BackupError as e:
+        raise click.ClickException(str(e))
+    bump_all_versions(db)
+    print(f"✅ Restored {sum(restored.values())} rows into {len(restored)} tables in {time.perf_counter() - started:.2f}s")
+
+@app.cli.command('seed-data')
+@click.option('--profile', type=click.Choice(sorted(seed_data.PROFILES)), default='center', show_default=True,
+              help='Dataset size')
+@click.option('--seed', 'seed_value', default=1, show_default=True, help='Same seed, same data')
+@click.option('--append', is_flag=True, help='Add to a database that already has students')
+def seed_data_command(profile, seed_value, append):
+    """Fill the database with deterministic demo data for benchmarks"""
+    if Student.query.first() is not None and not append:
+        raise click.ClickException('Database already has students; use --append to add demo data anyway')
+    started = time.perf_counter()
+    counts = seed_data.seed(db, seed=seed_value, **seed_data.PROFILES[profile])
+    print(f"✅ Seeded profile '{profile}': {sum(counts.values())} rows in {time.perf_counter() - started:.2f}s")
+    for table, count in counts.items():
+        print(f"   {table}: {count}")
+
+@app.cli.command('pool-plan')
+def pool_plan_command():
+    """Show the connection pool of each worker and the connections of all workers"""
+    plan = pool_sizing.pool_plan(app.config)
+    print(f"🗄️ Pool profile '{plan['profile']}': {plan['workers']} {plan['worker_class']} workers "
+          f"x {plan['threads']} threads")
+    print(f"   per worker: pool_size {plan['pool_size']} + max_overflow {plan['max_overflow']}, "
+          f"pool_timeout {plan['pool_timeout']}s")
+    limit = f" of {plan['connection_limit']} allowed" if plan['connection_limit'] is not None else ''
+    print(f"   all workers: up to {plan['total_connections']} connections{limit}")
+    for warning in plan['warnings']:
+        print(f"⚠️ {warning}")
+    if not plan['warnings']:
+        print("✅ Pool fits the workers and threads")
+
+@app.cli.command('check-threads')
+@click.option('--threads', 'thread_count', type=int, default=None,
+              help='Concurrent app contexts (default: GUNICORN_THREADS, at least 2)')
+def check_threads_command(thread_count):
+    """Check that concurrent threads each get their own session and connection"""
+    thread_count = thread_count or max(2, app.config['GUNICORN_THREADS'])
+    pool_timeout = app.config['SQLALCHEMY_ENGINE_OPTIONS'].get('pool_timeout', 30)
+    barrier = threading.Barrier(thread_count, timeout=pool_timeout + 5)
+    lock = threading.Lock()
+    sessions, connections, errors = set(), set(), []
+
+    def use_database():
+        try:
+            # What a gthread worker does per request: its own app context, so its own scoped session
+            with app.app_context():
+                session = db.session()
+                connection = session.connection()
+                connection.execute(db.text('SELECT 1'))
+                # Everyone holds a connection at the same time, as under full load
+                barrier.wait()
+                with lock:
+                    sessions.add(id(session))
+                    connections.add(id(connection.connection.dbapi_connection))
+        except Exception as e:
+            barrier.abort()
+            with lock:
+                errors.append(f'{e.__class__.__name__}: {e}')
+
+    workers = [threading.Thread(target=use_database) for _ in range(thread_count)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    pool = db.engine.pool
+    in_use = pool.checkedout() if hasattr(pool, 'checkedout') else 0
+    print(f"🧵 {thread_count} threads: {len(sessions)} sessions, {len(connections)} connections, "
+          f"{in_use} still checked out after the app contexts ended")
+    for error in sorted(set(errors)):
+        print(f"❌ {error}")
+    if errors or len(sessions) != thread_count or in_use:
+        raise click.ClickException('Threads could not each use their own session and connection; see above')
+    if len(connections) != thread_count:
+        print(f"⚠️ Threads share {type(pool).__name__} connections (in-memory SQLite)")
+    print("✅ Every thread had its own session and connection")
+
 @app.route('/debug')
 @login_required
 def debug_prices():
@@ -2453,7 +2722,8 @@ def tasks():
         if filter_priority != 'all':
             instructor_notes_query = instructor_notes_query.filter_by(priority=filter_priority)
         
-        instructor_notes = instructor_notes_query.order_by(InstructorNote.created_at.desc()).all()
+        instructor_notes = instructor_notes_query.options(db.joinedload(InstructorNote.student)) \
+            .order_by(InstructorNote.created_at.desc()).all()
     
     # Get statistics
     total_tasks = Task.query.count()
@@ -2706,58 +2976,51 @@ def toggle_pin_note(note_id):
         flash(f'حدث خطأ أثناء تحديث الملاحظة: {str(e)}', 'error')
         return redirect(url_for('tasks') + '#notes')
 
-# Health check endpoints for monitoring
-@app.route('/health')
-def health_check():
-    """Basic health check endpoint"""
-    try:
-        # Test database connection
-        db.session.execute('SELECT 1')
-        db_status = 'healthy'
-    except Exception:
-        db_status = 'unhealthy'
-    
-    return jsonify({
-        'status': 'healthy' if db_status == 'healthy' else 'unhealthy',
-        'database': db_status,
-        'timestamp': datetime.utcnow().isoformat(),
-        'version': '1.0.0'
-    }), 200 if db_status == 'healthy' else 503
-
-@app.route('/ping')
-def ping():
-    """Simple ping endpoint"""
-    return 'pong', 200
-
-@app.route('/status')
-def status():
-    """Detailed status information"""
-    try:
-        # Check database
-        db.session.execute('SELECT 1')
-        db_status = 'connected'
-        
-        # Count records
-        users_count = User.query.count()
-        students_count = Student.query.count()
-        
-    except Exception as e:
-        db_status = f'error: {str(e)}'
-        users_count = -1
-        students_count = -1
-    
-    return jsonify({
-        'app_name': 'Tafra Student Management System',
-        'version': '1.0.0',
-        'status': 'running',
-        'environment': os.environ.get('FLASK_ENV', 'development'),
-        'database': {
-            'status': db_status,
-            'users_count': users_count,
-            'students_count': students_count
-        },
-        'timestamp': datetime.utcnow().isoformat()
-    }), 200
+def prometheus_response():
+    return app.response_class(metrics.metrics_text(app), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus metrics of all workers, for admins or a scraper sending METRICS_TOKEN"""
+    token = app.config.get('METRICS_TOKEN')
+    authorization = request.headers.get('Authorization', '')
+    if token and hmac.compare_digest(authorization.encode(), f'Bearer {token}'.encode()):
+        return prometheus_response()
+    return admin_required(prometheus_response)()
+
+@app.route('/query_report')
+@admin_required
+def query_report():
+    """Slow queries and N+1 patterns seen by all workers, newest first"""
+    findings = querywatch.report(app.config['METRICS_DIR'])
+    kind = request.args.get('kind')
+    if kind in ('slow', 'n+1'):
+        findings = [finding for finding in findings if finding['kind'] == kind]
+    for finding in findings:
+        finding['last_seen_at'] = datetime.fromtimestamp(finding['last_seen'])
+    return render_template('query_report.html', findings=findings, kind=kind,
+                           slow_query_ms=app.config['SLOW_QUERY_MS'],
+                           n_plus_one_threshold=app.config['N_PLUS_ONE_THRESHOLD'])
+
+@app.route('/profiles')
+@admin_required
+def profiles():
+    """Stored single-request profiles, newest first"""
+    artifacts = profiler.list_artifacts(app.config['PROFILE_DIR'])
+    return render_template('profiles.html', artifacts=artifacts,
+                           max_artifacts=app.config['PROFILE_MAX_ARTIFACTS'])
+
+@app.route('/profiles/<name>')
+@admin_required
+def profile_detail(name):
+    path = profiler.artifact_path(app.config['PROFILE_DIR'], name)
+    profile = metrics.read_json(path) if path else None
+    if profile is None:
+        flash('الملف غير موجود أو تم حذفه', 'error')
+        return redirect(url_for('profiles'))
+    if request.args.get('download') == '1':
+        return send_file(path, mimetype='application/json', as_attachment=True, download_name=f'profile-{name}.json')
+    return render_template('profile_detail.html', profile=profile)
 
 def get_instructor_groups(user):
     """Get groups assigned to a specific instructor user"""
@@ -2772,12 +3035,11 @@ def get_instructor_students(user):
     if user.role == 'admin':
         return Student.query.all()
     elif user.role == 'instructor' and user.linked_instructor:
-        # Get all students in instructor's groups
-        instructor_groups = user.linked_instructor.groups
-        students = set()
-        for group in instructor_groups:
-            students.update(group.students)
-        return list(students)
+        # Get all students in instructor's groups, with their groups
+        return Student.query.join(Student.groups) \
+            .filter(Group.instructor_id == user.linked_instructor.id) \
+            .options(db.selectinload(Student.groups)) \
+            .distinct().all()
     return []
 
 @app.route('/instructor_attendance')
@@ -2788,14 +3050,10 @@ def instructor_attendance():
     
     # Get attendance for instructor's groups only
     today = datetime.now().date()
-    attendance_records = []
-    
-    for group in instructor_groups:
-        group_attendance = Attendance.query.filter_by(
-            group_id=group.id,
-            date=today
-        ).all()
-        attendance_records.extend(group_attendance)
+    attendance_records = Attendance.query.filter(
+        Attendance.group_id.in_([group.id for group in instructor_groups]),
+        Attendance.date == today
+    ).all()
     
     return render_template('instructor_attendance.html',
                          groups=instructor_groups,
@@ -2820,19 +3078,21 @@ def instructor_mark_attendance():
     date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
     
     group = Group.query.get(group_id)
-    students = group.students
+    students = group.students.all()
+    
+    # Existing records of the day in one query; a lookup per student would also
+    # autoflush (and bump the cache versions) once per student
+    existing_records = {
+        record.student_id: record
+        for record in Attendance.query.filter_by(date=date_obj, group_id=group_id)
+    }
     
     for student in students:
         student_id = str(student.id)
         status = request.form.get(f'attendance_{student_id}')
         
         if status:
-            # Check if attendance already exists
-            existing = Attendance.query.filter_by(
-                student_id=student.id,
-                date=date_obj,
-                group_id=group_id
-            ).first()
+            existing = existing_records.get(student.id)
             
             if existing:
                 existing.status = status
@@ -3125,6 +3385,7 @@ def delete_instructor_todo(todo_id):
 
 @app.route('/get_instructor_todo/<int:todo_id>')
 @instructor_required
+@conditional_response(db, ['instructor_todo'])
 def get_instructor_todo(todo_id):
     """Get todo details for editing"""
     try:
@@ -3148,8 +3409,14 @@ def get_instructor_todo(todo_id):
 
 @app.route('/export_full_backup')
 @admin_required
+@read_replica
 def export_full_backup():
     """Export complete system backup with all data"""
+    # Only needed here and for Excel imports, so workers don't pay for it at boot
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+    from openpyxl.utils import get_column_letter
+    
     try:
         # Create workbook
         wb = Workbook()
@@ -3262,7 +3529,9 @@ def export_full_backup():
             cell.border = border
             cell.alignment = center_alignment
         
-        students = Student.query.all()
+        students = Student.query.options(
+            db.joinedload(Student.instructor_ref), db.selectinload(Student.groups)
+        ).all()
         for idx, student in enumerate(students, 1):
             instructor_name = student.instructor_ref.name if student.instructor_ref else 'غير محدد'
             groups_names = ', '.join([group.name for group in student.groups])
@@ -3335,7 +3604,12 @@ def export_full_backup():
             cell.border = border
             cell.alignment = center_alignment
         
-        groups = Group.query.all()
+        groups = Group.query.options(
+            db.joinedload(Group.instructor_ref), db.selectinload(Group.schedules)
+        ).all()
+        # Lookups for the payment, schedule and attendance sheets below
+        groups_by_id = {group.id: group for group in groups}
+        students_by_id = {student.id: student for student in students}
         for idx, group in enumerate(groups, 1):
             instructor_name = group.instructor_ref.name if group.instructor_ref else 'غير محدد'
             
@@ -3354,7 +3628,7 @@ def export_full_backup():
                 group.name,
                 group.level or 'غير محدد',
                 instructor_name,
-                group.students.count(),
+                group.student_count,
                 group.max_students,
                 f"{group.price:,.0f}",
                 days or 'غير محدد',
@@ -3382,7 +3656,7 @@ def export_full_backup():
         
         schedules = Schedule.query.all()
         for idx, schedule in enumerate(schedules, 1):
-            group = Group.query.get(schedule.group_id)
+            group = groups_by_id.get(schedule.group_id)
             instructor_name = group.instructor_ref.name if group and group.instructor_ref else 'غير محدد'
             group_name = group.name if group else 'مجموعة محذوفة'
             
@@ -3428,7 +3702,7 @@ def export_full_backup():
         
         payments = Payment.query.order_by(Payment.date.desc()).all()
         for idx, payment in enumerate(payments, 1):
-            student = Student.query.get(payment.student_id)
+            student = students_by_id.get(payment.student_id)
             student_name = student.name if student else 'طالب محذوف'
             
             payment_data = [
@@ -3494,8 +3768,8 @@ def export_full_backup():
         attendance_records = Attendance.query.filter(Attendance.date >= thirty_days_ago).order_by(Attendance.date.desc()).all()
         
         for idx, record in enumerate(attendance_records, 1):
-            student = Student.query.get(record.student_id)
-            group = Group.query.get(record.group_id)
+            student = students_by_id.get(record.student_id)
+            group = groups_by_id.get(record.group_id)
             student_name = student.name if student else 'طالب محذوف'
             group_name = group.name if group else 'مجموعة محذوفة'
             
@@ -3701,10 +3975,84 @@ def export_full_backup():
         flash(f'حدث خطأ أثناء إنشاء النسخة الاحتياطية: {str(e)}', 'error')
         return redirect(url_for('reports'))
 
+@app.route('/export_backup_archive')
+@admin_required
+@read_replica
+def export_backup_archive():
+    """Export a lossless machine backup (ZIP of per-table NDJSON files)"""
+    try:
+        output, manifest = build_backup_archive(db)
+        
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f"tafra_backup_{timestamp}.zip"
+        
+        return send_file(
+            output,
+            as_attachment=True,
+            download_name=filename,
+            mimetype='application/zip'
+        )
+        
+    except Exception as e:
+        flash(f'حدث خطأ أثناء إنشاء النسخة الاحتياطية: {str(e)}', 'error')
+        return redirect(url_for('reports'))
+
+@app.route('/export_database_snapshot')
+@admin_required
+def export_database_snapshot():
+    """Stream a compressed byte-exact hot copy of the database file"""
+    try:
+        chunks, filename = open_database_snapshot(db)
+    except BackupError as e:
+        flash(str(e), 'error')
+        return redirect(url_for('reports'))
+    
+    response = app.response_class(chunks, mimetype='application/octet-stream')
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
+@app.route('/changes')
+@admin_required
+def changes_feed():
+    """Incremental change feed: NDJSON upserts/deletes since a watermark token.
+
+    Rows of the last CHANGEFEED_SETTLE_SECONDS are held back, and a write
+    that took longer than that to commit can be missed (see changefeed.py).
+    """
+    try:
+        events, next_token, has_more = read_changes(
+            db, request.args.get('since', ''), request.args.get('limit', DEFAULT_PAGE_SIZE, type=int),
+            settle_delay=changefeed_settle_delay()
+        )
+    except ChangeTokenError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    response = app.response_class(iter_ndjson(events, next_token, has_more), mimetype='application/x-ndjson')
+    response.headers['X-Next-Token'] = next_token
+    response.headers['X-Has-More'] = 'true' if has_more else 'false'
+    return response
+
+def restore_system_backup(file):
+    """Restore an uploaded ZIP backup archive created by export_backup_archive"""
+    replace = request.form.get('clear_existing') == 'yes'
+    try:
+        restored = restore_backup_archive(db, file.stream, replace=replace)
+    except BackupError as e:
+        flash(str(e), 'error')
+        return redirect(url_for('import_system_data'))
+    # Restored rows bypass the ORM, so cached reports must be invalidated explicitly
+    bump_all_versions(db)
+    
+    total_rows = sum(restored.values())
+    # User ids now come from the archive, so the current session is no longer valid
+    session.clear()
+    flash(f'تمت استعادة النسخة الاحتياطية بنجاح! ({len(restored)} جدول، {total_rows} سجل). يرجى تسجيل الدخول من جديد', 'success')
+    return redirect(url_for('login'))
+
 @app.route('/import_system_data', methods=['GET', 'POST'])
 @admin_required
 def import_system_data():
-    """Import complete system data from Excel file"""
+    """Import complete system data from Excel file or ZIP backup archive"""
     if request.method == 'GET':
         return render_template('import_data.html')
     
@@ -3718,6 +4066,10 @@ def import_system_data():
             flash('يرجى اختيار ملف Excel للاستيراد', 'error')
             return redirect(url_for('import_system_data'))
         
+        # ZIP archives use the lossless restore path
+        if file.filename.endswith('.zip'):
+            return restore_system_backup(file)
+        
         # Check if file is Excel
         if not (file.filename.endswith('.xlsx') or file.filename.endswith('.xls')):
             flash('يرجى رفع ملف Excel صحيح (.xlsx أو .xls)', 'error')
@@ -4412,6 +4764,8 @@ def admin_update_instructor_note_status(note_id):
 
 @app.route('/diagnose_import_data', methods=['GET'])
 @admin_required
+@read_replica
+@conditional_response(db, ['student', 'group', 'payment', 'expense'])
 def diagnose_import_data():
     """Diagnose and show details about imported data"""
     try:
@@ -4640,6 +4994,8 @@ def fix_import_data():
 
 @app.route('/diagnose_financial_calculations', methods=['GET'])
 @admin_required
+@read_replica
+@conditional_response(db, ['student', 'group', 'payment'])
 def diagnose_financial_calculations():
     """Diagnose financial calculations to check for logical errors"""
     try:
@@ -4648,7 +5004,7 @@ def diagnose_financial_calculations():
         
         # Calculate pending payments manually with detailed logging
         pending_payments = 0
-        students = Student.query.all()
+        students = Student.query.options(db.selectinload(Student.groups)).all()
         student_details = []
         
         for student in students:
@@ -4687,8 +5043,8 @@ def diagnose_financial_calculations():
             'total_groups_revenue': total_groups_revenue,
             'manual_expected_revenue': manual_expected_revenue,
             'calculated_total_should_equal_expected': calculated_total,
-            'logical_consistency_check': abs(calculated_total - total_groups_revenue) < 0.01,
-            'manual_vs_property_consistency': abs(manual_expected_revenue - total_groups_revenue) < 0.01,
+            'logical_consistency_check': calculated_total == total_groups_revenue,
+            'manual_vs_property_consistency': manual_expected_revenue == total_groups_revenue,
             'difference': calculated_total - total_groups_revenue,
             'students_count': len(students),
             'student_details': student_details[:10],  # First 10 students for detailed view
@@ -4697,7 +5053,7 @@ def diagnose_financial_calculations():
             'students_with_negative_balance': [s.name for s in students if s.remaining_balance < 0],
             'students_with_issues': [
                 s.name for s in students 
-                if abs(s.remaining_balance - max(0, (sum(g.price for g in s.groups) - s.discount) - s.total_paid)) > 0.01
+                if s.remaining_balance != max(0, (sum(g.price for g in s.groups) - s.discount) - s.total_paid)
             ]
         }
         
@@ -4712,12 +5068,16 @@ def diagnose_financial_calculations():
             'message': f'خطأ في التشخيص المالي: {str(e)}'
         })
 
+# Re-run write requests that lost the SQLite write lock (after all routes are registered)
+sqlite_tuning.retry_writes(app, db)
+
 if __name__ == '__main__':
     init_db()
     port = int(os.environ.get('PORT', 5000))
     # Enable debug mode for development by default
     debug = os.environ.get('FLASK_ENV') != 'production'
     app.run(host='0.0.0.0', port=port, debug=True)
-else:
-    # Production mode: Initialize database when imported
-    init_db() 
\ No newline at end of file
+elif app.config['AUTO_INIT_DB']:
+    # Initialize database when imported. Deployments that run `flask init-db`
+    # as a release step set AUTO_INIT_DB=false so worker boots skip this
+    init_db()
@@ -0,0 +1,260 @@
+"""
+Static asset pipeline.
+
+Files under ``static/`` are copied to ``static/dist/`` with a content hash
+in their name (``css/pages/students.css`` -> ``css/pages/students.3f2a9c1b.css``)
+plus gzip and, when the ``brotli`` package is installed, brotli variants
+of text files. ``static/dist/manifest.json`` maps source names to built
+names. Templates refer to assets through ``asset_url('css/pages/students.css')``
+and to vendored third-party files through ``vendor_url('bootstrap.js')``.
+
+Built files never change under the same name, so they are served with a
+one-year immutable ``Cache-Control`` and the precompressed variant that
+matches the request's ``Accept-Encoding``. Repeat page loads only fetch
+the HTML.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+
+import click
+from flask import abort, current_app, request, send_file, url_for
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # Optional: only gzip variants are built without it
+    brotli = None
+
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+HASH_LENGTH = 8
+ASSET_MAX_AGE = 365 * 24 * 60 * 60
+
+# Extensions worth precompressing; images and fonts are already compressed
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.svg', '.json', '.txt', '.map'}
+MIN_COMPRESS_SIZE = 512
+
+# Variant suffix per content coding, in order of preference
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+# Third-party frontend files: name -> (CDN URL, path of the vendored copy under static/).
+# vendor_assets.py downloads them at build time; templates use vendor_url(name).
+VENDOR_ASSETS = {
+    'bootstrap-rtl.css': (
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.rtl.min.css',
+        'vendor/bootstrap/bootstrap.rtl.min.css'
+    ),
+    'bootstrap.css': (
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css',
+        'vendor/bootstrap/bootstrap.min.css'
+    ),
+    'bootstrap.js': (
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js',
+        'vendor/bootstrap/bootstrap.bundle.min.js'
+    ),
+    'fontawesome.css': (
+        'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css',
+        'vendor/fontawesome/css/all.min.css'
+    ),
+    'cairo.css': (
+        'https://fonts.googleapis.com/css2?family=Cairo:wght@300;400;500;600;700;800&display=swap',
+        'vendor/cairo/cairo.css'
+    ),
+    'sweetalert2.css': (
+        'https://cdn.jsdelivr.net/npm/sweetalert2@11/dist/sweetalert2.min.css',
+        'vendor/sweetalert2/sweetalert2.min.css'
+    ),
+    'sweetalert2.js': (
+        'https://cdn.jsdelivr.net/npm/sweetalert2@11/dist/sweetalert2.all.min.js',
+        'vendor/sweetalert2/sweetalert2.all.min.js'
+    ),
+    'jquery.js': (
+        'https://code.jquery.com/jquery-3.6.0.min.js',
+        'vendor/jquery/jquery-3.6.0.min.js'
+    ),
+}
+
+
+def _fingerprinted_name(name, digest):
+    root, ext = os.path.splitext(name)
+    return f'{root}.{digest[:HASH_LENGTH]}{ext}'
+
+
+def _write_if_missing(path, produce):
+    """Write ``produce()`` to ``path`` unless it exists; compression only runs for new files"""
+    if os.path.exists(path):
+        return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as output:
+        output.write(produce())
+    os.replace(temp_path, path)
+    return True
+
+
+def _source_files(static_folder):
+    dist = os.path.join(static_folder, DIST_DIR)
+    for root, dirs, files in os.walk(static_folder):
+        if os.path.abspath(root).startswith(os.path.abspath(dist)):
+            continue
+        for filename in files:
+            path = os.path.join(root, filename)
+            yield os.path.relpath(path, static_folder).replace(os.sep, '/'), path
+
+
+_CSS_URL = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+
+
+def _rewrite_css_urls(name, data, manifest):
+    """Point relative url() references of a stylesheet at the fingerprinted files"""
+    css_dir = posixpath.dirname(name)
+    built_dir = posixpath.dirname(manifest.get(name, name))
+
+    def replace(match):
+        quote, ref = match.groups()
+        if ref.startswith(('data:', 'http:', 'https:', '//', '/', '#')):
+            return match.group(0)
+        # Keep ?v=... and #iefix style suffixes
+        split = re.search(r'[?#]', ref)
+        path, suffix = (ref[:split.start()], ref[split.start():]) if split else (ref, '')
+        target = posixpath.normpath(posixpath.join(css_dir, path))
+        if target not in manifest:
+            return match.group(0)
+        new_ref = posixpath.relpath(manifest[target], built_dir or '.')
+        return f'url({quote}{new_ref}{suffix}{quote})'
+
+    return _CSS_URL.sub(replace, data.decode('utf-8')).encode('utf-8')
+
+
+def _build_file(dist, name, data, manifest):
+    built_name = _fingerprinted_name(name, hashlib.sha256(data).hexdigest())
+    built_path = os.path.join(dist, built_name)
+    manifest[name] = built_name
+
+    written = _write_if_missing(built_path, lambda: data)
+    if os.path.splitext(name)[1] in COMPRESSIBLE_EXTENSIONS and len(data) >= MIN_COMPRESS_SIZE:
+        written += _write_if_missing(built_path + '.gz', lambda: gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli is not None:
+            written += _write_if_missing(built_path + '.br', lambda: brotli.compress(data, quality=11))
+    return written
+
+
+def build_assets(static_folder):
+    """Fingerprint and precompress every static file. Returns (manifest, files written)"""
+    dist = os.path.join(static_folder, DIST_DIR)
+    manifest = {}
+    written = 0
+
+    sources = sorted(_source_files(static_folder))
+    # Stylesheets go last so their url() references can use the final names
+    for name, path in sorted(sources, key=lambda item: item[0].endswith('.css')):
+        with open(path, 'rb') as source:
+            data = source.read()
+        if name.endswith('.css'):
+            data = _rewrite_css_urls(name, data, manifest)
+        written += _build_file(dist, name, data, manifest)
+
+    manifest_path = os.path.join(dist, MANIFEST_NAME)
+    os.makedirs(dist, exist_ok=True)
+    temp_path = f'{manifest_path}.{os.getpid()}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as output:
+        json.dump(manifest, output, indent=2, sort_keys=True)
+    os.replace(temp_path, manifest_path)
+    return manifest, written
+
+
+def prune_assets(static_folder, manifest):
+    """Delete built files no longer referenced by ``manifest``. Returns the count removed"""
+    dist = os.path.join(static_folder, DIST_DIR)
+    keep = {MANIFEST_NAME}
+    for built_name in manifest.values():
+        keep.update(built_name + suffix for suffix in ('', '.gz', '.br'))
+
+    removed = 0
+    for name, path in [(os.path.relpath(os.path.join(root, f), dist).replace(os.sep, '/'), os.path.join(root, f))
+                       for root, dirs, files in os.walk(dist) for f in files]:
+        if name not in keep:
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+# vendor_url() logs the first fallback to a CDN in each process
+_cdn_fallback_logged = False
+
+
+def asset_url(filename):
+    """URL of the fingerprinted build of a static file, falling back to the plain file"""
+    built_name = current_app.extensions['assets'].get(filename)
+    if built_name is None:
+        return url_for('static', filename=filename)
+    return url_for('dist_asset', filename=built_name)
+
+
+def vendor_url(name):
+    """Vendored copy of a third-party file, or its CDN URL if opted in or not vendored yet"""
+    global _cdn_fallback_logged
+    cdn_url, local_path = VENDOR_ASSETS[name]
+    if current_app.config.get('USE_CDN_ASSETS'):
+        return cdn_url
+    if local_path not in current_app.extensions['assets']:
+        if not _cdn_fallback_logged:
+            _cdn_fallback_logged = True
+            current_app.logger.warning('static/%s is missing; serving third-party files from their CDNs. '
+                                       'Run python vendor_assets.py to vendor them', local_path)
+        return cdn_url
+    return asset_url(local_path)
+
+
+def send_asset(filename):
+    """Serve a built asset, preferring a precompressed variant the client accepts"""
+    dist = os.path.join(current_app.static_folder, DIST_DIR)
+    path = safe_join(dist, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    encoding = None
+    for coding, suffix in ENCODINGS:
+        if coding in request.accept_encodings and os.path.isfile(path + suffix):
+            path, encoding = path + suffix, coding
+            break
+
+    response = send_file(path, mimetype=mimetype, max_age=ASSET_MAX_AGE, conditional=True)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+def init_app(app):
+    """Build the asset manifest and register asset_url() and the dist route"""
+    try:
+        manifest, written = build_assets(app.static_folder)
+        if written:
+            print(f"✅ Built {written} static asset files")
+    except OSError as e:
+        # Read-only deployments still work, just without fingerprinted URLs
+        print(f"⚠️ Static assets not built: {e}")
+        manifest = {}
+
+    app.extensions['assets'] = manifest
+    app.add_url_rule(f'{app.static_url_path}/{DIST_DIR}/<path:filename>', 'dist_asset', send_asset)
+    app.add_template_global(asset_url)
+    app.add_template_global(vendor_url)
+
+    @app.cli.command('build-assets')
+    @click.option('--prune', is_flag=True, help='Delete builds of old file versions')
+    def build_assets_command(prune):
+        """Fingerprint and precompress static files into static/dist"""
+        manifest, written = build_assets(app.static_folder)
+        print(f"✅ {len(manifest)} assets in manifest, {written} files written")
+        if prune:
+            print(f"🗑️ Removed {prune_assets(app.static_folder, manifest)} stale files")
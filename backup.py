@@ -0,0 +1,334 @@
+"""
+Machine backup format for the Tafra system.
+
+A backup archive is a ZIP file holding one NDJSON file per table and a
+``manifest.json`` describing the archive (format, schema version, row
+counts and column lists). Unlike the styled Excel backup it is lossless:
+every column of every table is written, including password hashes and the
+full attendance history, and it can be restored as-is.
+
+A database snapshot is a byte-exact copy of the database file itself,
+taken with the SQLite online backup API (or ``pg_dump`` on PostgreSQL)
+and streamed out compressed.
+"""
+import io
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import zipfile
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import Date, DateTime, func, select, text
+
+BACKUP_FORMAT = 'tafra-backup'
+BACKUP_SCHEMA_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+
+# Rows inserted per executemany() call during restore
+RESTORE_BATCH_SIZE = 1000
+# Rows fetched and written at a time while exporting a table
+STREAM_BATCH_SIZE = 1000
+# Archives larger than this are spooled to disk instead of memory
+SPOOL_MAX_SIZE = 32 * 1024 * 1024
+
+# SQLite pages copied per backup step; the source is only locked during a step
+SNAPSHOT_PAGES_PER_STEP = 1024
+# Pause between steps (seconds) so writers can get in
+SNAPSHOT_STEP_SLEEP = 0.005
+SNAPSHOT_CHUNK_SIZE = 256 * 1024
+
+
+class BackupError(Exception):
+    """Raised when an archive cannot be written or restored"""
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f'Cannot serialize {type(value).__name__}')
+
+
+def _encode_table(columns, rows):
+    """Serialize rows of a single table as NDJSON bytes"""
+    lines = [
+        json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=_json_default)
+        for row in rows
+    ]
+    if not lines:
+        return b''
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def _backup_tables(db):
+    """Tables included in a backup, in foreign key dependency order"""
+    return list(db.metadata.sorted_tables)
+
+
+def _snapshot_connection(engine):
+    """A connection whose reads all see the same state of the database"""
+    connection = engine.connect()
+    if engine.dialect.name == 'postgresql':
+        connection.execution_options(isolation_level='REPEATABLE READ', postgresql_readonly=True)
+    elif engine.dialect.name == 'sqlite' and not connection.connection.driver_connection.in_transaction:
+        # pysqlite opens no transaction for SELECT, so each table would be read at a different moment
+        connection.exec_driver_sql('BEGIN')
+    return connection
+
+
+def write_backup_archive(db, fileobj):
+    """Write a full backup archive of the database to ``fileobj``.
+
+    All tables are read in one snapshot transaction (REPEATABLE READ, read
+    only, on Postgres; BEGIN on SQLite), so the archive is consistent. Rows
+    are fetched ``STREAM_BATCH_SIZE`` at a time and written as NDJSON
+    straight into the table's ZIP member. Returns the manifest dictionary.
+    """
+    manifest = {
+        'format': BACKUP_FORMAT,
+        'schema_version': BACKUP_SCHEMA_VERSION,
+        'created_at': datetime.utcnow().isoformat(),
+        'database': db.engine.dialect.name,
+        'tables': []
+    }
+
+    # get_bind() follows @read_replica, like the session queries of the view
+    with _snapshot_connection(db.session.get_bind()) as connection, \
+            zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=6) as archive:
+        for table in _backup_tables(db):
+            columns = [column.name for column in table.columns]
+            member = f'{table.name}.ndjson'
+            result = connection.execute(select(table).execution_options(yield_per=STREAM_BATCH_SIZE))
+            count = 0
+            with archive.open(member, 'w', force_zip64=True) as output:
+                for rows in result.partitions():
+                    output.write(_encode_table(columns, rows))
+                    count += len(rows)
+            manifest['tables'].append({
+                'name': table.name,
+                'file': member,
+                'rows': count,
+                'columns': columns
+            })
+        connection.rollback()
+        archive.writestr(MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, indent=2))
+
+    return manifest
+
+
+def build_backup_archive(db):
+    """Build a backup archive in a spooled temporary file, rewound for reading"""
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    manifest = write_backup_archive(db, output)
+    output.seek(0)
+    return output, manifest
+
+
+def read_manifest(archive):
+    """Read and validate the manifest of an open archive"""
+    try:
+        manifest = json.loads(archive.read(MANIFEST_NAME).decode('utf-8'))
+    except KeyError:
+        raise BackupError('الملف لا يحتوي على manifest.json - ليس نسخة احتياطية صالحة')
+
+    if manifest.get('format') != BACKUP_FORMAT:
+        raise BackupError('صيغة النسخة الاحتياطية غير معروفة')
+    if manifest.get('schema_version', 0) > BACKUP_SCHEMA_VERSION:
+        raise BackupError('النسخة الاحتياطية من إصدار أحدث من النظام الحالي')
+    return manifest
+
+
+def _column_parsers(table):
+    """Map column name -> function restoring a JSON value to its Python type"""
+    parsers = {}
+    for column in table.columns:
+        if isinstance(column.type, DateTime):
+            parsers[column.name] = datetime.fromisoformat
+        elif isinstance(column.type, Date):
+            parsers[column.name] = lambda value: date.fromisoformat(value[:10])
+    return parsers
+
+
+def _iter_rows(archive, member, table):
+    parsers = _column_parsers(table)
+    known = set(table.columns.keys())
+    with archive.open(member) as raw:
+        for line in io.TextIOWrapper(raw, encoding='utf-8'):
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            # Columns dropped from the schema since the backup are ignored
+            record = {key: value for key, value in row.items() if key in known}
+            for name, parse in parsers.items():
+                if record.get(name) is not None:
+                    record[name] = parse(record[name])
+            yield record
+
+
+def _defer_constraints(connection):
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        connection.execute(text('PRAGMA defer_foreign_keys = ON'))
+    elif dialect == 'postgresql':
+        connection.execute(text('SET CONSTRAINTS ALL DEFERRED'))
+
+
+def reset_sequences(connection, tables):
+    """Move Postgres id sequences past the restored primary keys"""
+    if connection.dialect.name != 'postgresql':
+        return
+    for table in tables:
+        if 'id' not in table.columns or not table.columns['id'].primary_key:
+            continue
+        connection.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('\"{table.name}\"', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM \"{table.name}\"), 0) + 1, false)"
+        ))
+
+
+def restore_backup_archive(db, fileobj, replace=False):
+    """Restore a backup archive into the database.
+
+    The target tables must be empty unless ``replace`` is set, in which case
+    their current contents are deleted first. Everything runs in a single
+    transaction with foreign key checks deferred, and rows are bulk inserted
+    in batches. Returns a dict of table name -> restored row count.
+    """
+    with zipfile.ZipFile(fileobj) as archive:
+        manifest = read_manifest(archive)
+        entries = {entry['name']: entry for entry in manifest['tables']}
+        tables = [table for table in _backup_tables(db) if table.name in entries]
+
+        connection = db.session.connection()
+        try:
+            _defer_constraints(connection)
+
+            if replace:
+                for table in reversed(tables):
+                    connection.execute(table.delete())
+            else:
+                for table in tables:
+                    if connection.execute(select(func.count()).select_from(table)).scalar():
+                        raise BackupError(f'الجدول {table.name} يحتوي على بيانات - يجب تفريغ قاعدة البيانات أولاً')
+
+            restored = {}
+            for table in tables:
+                entry = entries[table.name]
+                count = 0
+                batch = []
+                for record in _iter_rows(archive, entry['file'], table):
+                    batch.append(record)
+                    if len(batch) >= RESTORE_BATCH_SIZE:
+                        connection.execute(table.insert(), batch)
+                        count += len(batch)
+                        batch = []
+                if batch:
+                    connection.execute(table.insert(), batch)
+                    count += len(batch)
+
+                if count != entry['rows']:
+                    raise BackupError(f'عدد صفوف الجدول {table.name} ({count}) لا يطابق manifest ({entry["rows"]})')
+                restored[table.name] = count
+
+            reset_sequences(connection, tables)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    return restored
+
+
+def _sqlite_snapshot(db, path):
+    """Copy the live SQLite database into ``path`` with the online backup API"""
+    target = sqlite3.connect(path)
+    source = db.engine.raw_connection()
+    try:
+        source.driver_connection.backup(
+            target, pages=SNAPSHOT_PAGES_PER_STEP, sleep=SNAPSHOT_STEP_SLEEP
+        )
+    except sqlite3.Error as e:
+        raise BackupError(f'فشل أخذ لقطة من قاعدة البيانات: {e}')
+    finally:
+        source.close()
+        target.close()
+
+
+def _iter_file(path, compress=False, remove=True):
+    """Stream a file, gzip-compressed if asked, optionally deleting it afterwards"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    try:
+        with open(path, 'rb') as source:
+            while True:
+                chunk = source.read(SNAPSHOT_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if compressor is None:
+                    yield chunk
+                    continue
+                data = compressor.compress(chunk)
+                if data:
+                    yield data
+        if compressor is not None:
+            yield compressor.flush()
+    finally:
+        if remove:
+            os.remove(path)
+
+
+def _pg_dump(db, path):
+    """Dump the Postgres database into ``path``; raises BackupError if pg_dump fails"""
+    pg_dump = shutil.which('pg_dump')
+    if not pg_dump:
+        raise BackupError('أداة pg_dump غير متوفرة على الخادم - استخدم النسخة الاحتياطية (ZIP)')
+    url = db.engine.url.set(drivername='postgresql')
+    # The password goes in the child's environment: argv is visible to every user in ps
+    env = dict(os.environ)
+    if url.password is not None:
+        env['PGPASSWORD'] = url.password
+    # URL.set() treats password=None as "unchanged"; _replace() really drops it
+    dbname = url._replace(password=None).render_as_string(hide_password=False)
+    # Custom format is already compressed and is what pg_restore expects. run() reads
+    # stderr while pg_dump works, so warnings can't fill the pipe and stall it
+    result = subprocess.run(
+        [pg_dump, '--format=custom', '--no-owner', '--file', path, '--dbname', dbname],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, env=env
+    )
+    if result.returncode != 0:
+        error = result.stderr.decode('utf-8', 'replace').strip()
+        raise BackupError(f'pg_dump فشل: {error}')
+
+
+def open_database_snapshot(db):
+    """Take a consistent hot copy of the database.
+
+    Returns ``(chunks, filename)`` where ``chunks`` is an iterator of
+    compressed bytes. The copy is written to a temporary file before
+    returning, so errors (pg_dump's exit status included) surface here
+    rather than halfway through a download.
+    """
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    dialect = db.engine.dialect.name
+
+    if dialect == 'sqlite':
+        take, suffix, compress = _sqlite_snapshot, '.db', True
+    elif dialect == 'postgresql':
+        take, suffix, compress = _pg_dump, '.dump', False
+    else:
+        raise BackupError(f'اللقطة غير مدعومة لقاعدة بيانات {dialect}')
+
+    handle, path = tempfile.mkstemp(suffix=suffix)
+    os.close(handle)
+    try:
+        take(db, path)
+    except Exception:
+        os.remove(path)
+        raise
+    filename = f'tafra_snapshot_{timestamp}{suffix}' + ('.gz' if compress else '')
+    return _iter_file(path, compress=compress), filename
@@ -0,0 +1,120 @@
+"""
+Caches for generated content.
+
+``ArtifactCache`` keeps generated report files on disk. Artifacts are
+stored under a cache key (normally a data version ETag from
+``versioning``) and evicted least-recently-used once the directory grows
+past its byte budget. A hit refreshes the file's mtime, which is what the
+LRU order is based on, so it works across worker processes without any
+shared in-memory state.
+
+``MemoryCache`` is a small in-process LRU for rendered template fragments
+(see ``fragments``). Its keys already contain the data versions, so each
+worker having its own copy never serves stale HTML.
+"""
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+class ArtifactCache:
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, f'{key}{suffix}')
+
+    def get(self, key, suffix=''):
+        """Path of a cached artifact, or None"""
+        path = self._path(key, suffix)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key, data, suffix=''):
+        """Store ``data`` (bytes or a readable file object) atomically; returns its path"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key, suffix)
+        handle, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as output:
+                if isinstance(data, bytes):
+                    output.write(data)
+                else:
+                    for chunk in iter(lambda: data.read(1024 * 1024), b''):
+                        output.write(chunk)
+            os.replace(temp_path, path)
+        except Exception:
+            os.remove(temp_path)
+            raise
+        self.evict()
+        return path
+
+    def evict(self):
+        """Delete least recently used artifacts until the cache fits its budget"""
+        entries = []
+        total = 0
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            # Temp files of writers that died are swept after an hour
+            if name.endswith('.tmp'):
+                if stat.st_mtime < time.time() - 3600:
+                    self._remove(path)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        # The newest artifact is always kept, even if it alone exceeds the budget
+        for mtime, size, path in entries[:-1]:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class MemoryCache:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Cached value, or None"""
+        with self._lock:
+            try:
+                self._entries.move_to_end(key)
+            except KeyError:
+                return None
+            return self._entries[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,184 @@
+"""
+Incremental change feed ("what changed since X") for backups and sync.
+
+Tracked tables carry an ``updated_at`` column maintained by the ORM, and
+deletions leave a tombstone row in ``deleted_record``. A feed page lists
+upserts and deletes after a watermark token as NDJSON lines and ends with
+a checkpoint line carrying the token for the next page.
+
+The token is an opaque url-safe string encoding, per table, the
+``(updated_at, id)`` position of the last row returned, so pages never
+skip or repeat rows that share a timestamp.
+
+Limit: ``updated_at`` is set when a row is flushed, not when its
+transaction commits. Pages stop ``settle_delay`` (``SETTLE_DELAY``, or
+``CHANGEFEED_SETTLE_SECONDS`` in config.py) before the current time, so a
+transaction that commits up to that long after its flush is still
+picked up. A row whose transaction took longer to commit can be stamped
+before a watermark that a reader has already moved past, and that reader
+never sees it; the next full backup does. Raise the delay when writes
+can take longer (large imports), at the cost of a feed that lags by as
+much.
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import and_, or_, select
+
+# Tables exposed by the feed, in the order they are paged
+TRACKED_TABLES = [
+    'instructor', 'group', 'schedule', 'student', 'attendance', 'payment',
+    'expense', 'task', 'note', 'instructor_note', 'instructor_todo'
+]
+
+TOMBSTONE_TABLE = 'deleted_record'
+TOKEN_VERSION = 1
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 10000
+
+# Rows newer than this are held back until the next page, so a write
+# transaction that commits up to this long after its flush cannot land
+# behind the watermark (see the module docstring for longer ones)
+SETTLE_DELAY = timedelta(seconds=5)
+
+
+class ChangeTokenError(ValueError):
+    """Raised for malformed or unsupported watermark tokens"""
+
+
+def encode_token(cursors):
+    payload = {
+        'v': TOKEN_VERSION,
+        'c': {name: [stamp.isoformat(), row_id] for name, (stamp, row_id) in cursors.items()}
+    }
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_token(token):
+    """Token -> {table: (datetime, id)}. An empty token starts from the beginning"""
+    if not token:
+        return {}
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+        version = payload.get('v')
+        cursors = {
+            name: (datetime.fromisoformat(stamp), int(row_id))
+            for name, (stamp, row_id) in payload['c'].items()
+        }
+    except (binascii.Error, ValueError, KeyError, TypeError, AttributeError):
+        raise ChangeTokenError('malformed change token')
+
+    if version != TOKEN_VERSION:
+        raise ChangeTokenError('unsupported change token version')
+    return cursors
+
+
+def _serialize(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _row_dict(row):
+    return {key: _serialize(value) for key, value in row._mapping.items()}
+
+
+def _after_cursor(stamp_column, id_column, cursor):
+    stamp, row_id = cursor
+    return or_(stamp_column > stamp, and_(stamp_column == stamp, id_column > row_id))
+
+
+def _student_group_ids(db, student_ids):
+    if not student_ids:
+        return {}
+    memberships = db.metadata.tables['student_groups']
+    rows = db.session.execute(
+        select(memberships.c.student_id, memberships.c.group_id)
+        .where(memberships.c.student_id.in_(student_ids))
+    ).all()
+    groups = {}
+    for student_id, group_id in rows:
+        groups.setdefault(student_id, []).append(group_id)
+    return groups
+
+
+def read_changes(db, token=None, limit=DEFAULT_PAGE_SIZE, now=None, settle_delay=SETTLE_DELAY):
+    """Return (events, next_token, has_more) for changes after ``token``"""
+    cursors = decode_token(token)
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    upper = (now or datetime.utcnow()) - settle_delay
+    events = []
+    has_more = False
+
+    for name in TRACKED_TABLES + [TOMBSTONE_TABLE]:
+        remaining = limit - len(events)
+        if remaining <= 0:
+            has_more = True
+            break
+
+        table = db.metadata.tables[name]
+        stamp_column = table.c.deleted_at if name == TOMBSTONE_TABLE else table.c.updated_at
+        query = select(table).where(stamp_column.isnot(None), stamp_column <= upper)
+        if name in cursors:
+            query = query.where(_after_cursor(stamp_column, table.c.id, cursors[name]))
+        rows = db.session.execute(
+            query.order_by(stamp_column, table.c.id).limit(remaining + 1)
+        ).all()
+
+        if len(rows) > remaining:
+            rows = rows[:remaining]
+            has_more = True
+        if not rows:
+            continue
+
+        if name == TOMBSTONE_TABLE:
+            for row in rows:
+                events.append({
+                    'op': 'delete',
+                    'table': row.table_name,
+                    'id': row.record_id,
+                    'deleted_at': row.deleted_at.isoformat()
+                })
+        else:
+            group_ids = _student_group_ids(db, [row.id for row in rows]) if name == 'student' else None
+            for row in rows:
+                data = _row_dict(row)
+                if group_ids is not None:
+                    data['group_ids'] = sorted(group_ids.get(row.id, []))
+                events.append({
+                    'op': 'upsert',
+                    'table': name,
+                    'id': row.id,
+                    'updated_at': row.updated_at.isoformat(),
+                    'data': data
+                })
+
+        last = rows[-1]
+        cursors[name] = (getattr(last, stamp_column.name), last.id)
+
+    return events, encode_token(cursors), has_more
+
+
+def iter_ndjson(events, next_token, has_more):
+    """NDJSON lines for a feed page, ending with the checkpoint line"""
+    for event in events:
+        yield json.dumps(event, ensure_ascii=False) + '\n'
+    yield json.dumps({'op': 'checkpoint', 'token': next_token, 'has_more': has_more}) + '\n'
+
+
+def record_deletions(session, table_name, record_ids, tombstone_model):
+    """Add tombstones for deleted rows of a tracked table to the session"""
+    if table_name not in TRACKED_TABLES:
+        return
+    now = datetime.utcnow()
+    session.add_all([
+        tombstone_model(table_name=table_name, record_id=record_id, deleted_at=now)
+        for record_id in record_ids
+    ])
@@ -0,0 +1,133 @@
+"""
+Response compression for HTML, JSON and other text responses.
+
+Registered with ``init_app(app)`` as an ``after_request`` hook, so it works
+on hosts without a compressing proxy in front (PythonAnywhere, Railway).
+Brotli is used when the ``brotli`` package is installed and the client
+accepts it, gzip otherwise. Settings come from ``COMPRESS_*`` in config.py.
+
+Buffered responses below ``COMPRESS_MIN_SIZE`` are left alone. Streamed
+responses (generators, ``send_file``) are compressed chunk by chunk with a
+flush after each chunk, so NDJSON feeds still reach the client
+incrementally. Files that are already compressed (xlsx, zip, images,
+precompressed static assets) are skipped by the content-type allowlist or
+because they already carry a ``Content-Encoding``.
+"""
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+
+DEFAULT_MIMETYPES = [
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript',
+    'application/javascript', 'application/json', 'application/x-ndjson',
+    'application/xml', 'image/svg+xml'
+]
+
+
+class _GzipStream:
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, level):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def _compress(data, encoding, config):
+    if encoding == 'br':
+        return brotli.compress(data, quality=config['COMPRESS_BR_LEVEL'])
+    return zlib.compress(data, config['COMPRESS_LEVEL'], wbits=31)
+
+
+def _stream(chunks, encoding, config):
+    compressor = (_BrotliStream(config['COMPRESS_BR_LEVEL']) if encoding == 'br'
+                  else _GzipStream(config['COMPRESS_LEVEL']))
+    for chunk in chunks:
+        if chunk:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+    yield compressor.finish()
+
+
+def choose_encoding(config):
+    """Best content coding the client accepts, or None"""
+    accepted = request.accept_encodings
+    if brotli is not None and config['COMPRESS_BR'] and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_response(response, config):
+    if (response.status_code != 200
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in config['COMPRESS_MIMETYPES']
+            or 'no-transform' in response.headers.get('Cache-Control', '')):
+        return response
+
+    # The representation depends on Accept-Encoding even when we end up not compressing
+    response.vary.add('Accept-Encoding')
+
+    streamed = response.is_streamed or response.direct_passthrough
+    if streamed and not config['COMPRESS_STREAMS']:
+        return response
+    if not streamed and response.content_length is not None and response.content_length < config['COMPRESS_MIN_SIZE']:
+        return response
+
+    encoding = choose_encoding(config)
+    if encoding is None:
+        return response
+
+    if streamed:
+        original = response.response
+        chunks = response.iter_encoded()
+        response.direct_passthrough = False
+        response.response = _stream(chunks, encoding, config)
+        if hasattr(original, 'close'):
+            response.call_on_close(original.close)
+        response.headers.pop('Content-Length', None)
+    else:
+        response.set_data(_compress(response.get_data(), encoding, config))
+
+    response.headers['Content-Encoding'] = encoding
+    # The compressed bytes differ from the identity representation
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_app(app):
+    app.config.setdefault('COMPRESS_ENABLED', True)
+    app.config.setdefault('COMPRESS_BR', True)
+    app.config.setdefault('COMPRESS_LEVEL', 6)
+    app.config.setdefault('COMPRESS_BR_LEVEL', 4)
+    app.config.setdefault('COMPRESS_MIN_SIZE', 500)
+    app.config.setdefault('COMPRESS_STREAMS', True)
+    app.config.setdefault('COMPRESS_MIMETYPES', DEFAULT_MIMETYPES)
+
+    @app.after_request
+    def compress(response):
+        if not app.config['COMPRESS_ENABLED']:
+            return response
+        return compress_response(response, app.config)
@@ -0,0 +1,58 @@
+"""
+Conditional GET (ETag / Last-Modified) for read-only JSON endpoints.
+
+``@conditional_response(db, tables)`` computes an ETag from the data
+versions of the tables the view reads (see ``versioning``), the request
+URL and the logged-in user. When the client already holds that version
+the view is not run at all and a bodyless 304 is returned; otherwise the
+view's response is sent with ``ETag``/``Last-Modified`` so the next fetch
+can be conditional.
+"""
+from functools import wraps
+
+from flask import current_app, make_response, request, session
+
+from versioning import get_versions, last_modified, versions_etag
+
+
+def _not_modified(etag, modified):
+    if request.if_none_match:
+        # Weak comparison: compression turns the ETag into W/"..."
+        return request.if_none_match.contains_weak(etag)
+    # If-Modified-Since only counts when no ETag was sent; HTTP dates have second precision
+    if modified and request.if_modified_since:
+        return modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)
+    return False
+
+
+def _add_validators(response, etag, modified):
+    response.set_etag(etag)
+    if modified:
+        response.last_modified = modified
+    # Always revalidate, and never share between users
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def conditional_response(db, tables):
+    """Answer GET requests with 304 while none of ``tables`` changed"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if request.method != 'GET':
+                return f(*args, **kwargs)
+
+            versions = get_versions(db, tables)
+            etag = versions_etag(f.__name__, versions, request.full_path, session.get('user_id'))
+            modified = last_modified(versions)
+
+            if _not_modified(etag, modified):
+                return _add_validators(current_app.response_class(status=304), etag, modified)
+
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                _add_validators(response, etag, modified)
+            return response
+        return decorated_function
+    return decorator
@@ -20,26 +20,110 @@ class Config:
         # Fallback to SQLite for development
         SQLALCHEMY_DATABASE_URI = 'sqlite:///students.db'
     
+    # Create tables and the default admin when app.py is imported. Set to false
+    # when `flask init-db` runs as a release step (see Procfile, gunicorn.conf.py)
+    AUTO_INIT_DB = os.environ.get('AUTO_INIT_DB', 'true').lower() in ('1', 'true', 'yes')
+    
+    # Read-only connection for reports and exports (replica.py), e.g. a Postgres
+    # replica or sqlite:///file:/path/to/students.db?mode=ro&uri=true
+    READ_REPLICA_URL = os.environ.get('READ_REPLICA_URL')
+    
     # Application settings
     APP_NAME = os.environ.get('APP_NAME', 'نظام إدارة طفرة')
     APP_VERSION = os.environ.get('APP_VERSION', '1.0.0')
     
+    # Only "remember me" logins get a permanent session; the others end with the browser
+    PERMANENT_SESSION_LIFETIME = 30 * 86400  # 30 days
+    
     # Upload settings
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     
+    # Generated report files, reused until the underlying data changes
+    REPORT_CACHE_DIR = os.environ.get('REPORT_CACHE_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'report_cache')
+    REPORT_CACHE_MAX_BYTES = int(os.environ.get('REPORT_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+    
+    # The change feed holds back rows this recent; a write transaction that takes longer
+    # to commit after its flush can be missed by a reader (see changefeed.py)
+    CHANGEFEED_SETTLE_SECONDS = float(os.environ.get('CHANGEFEED_SETTLE_SECONDS', 5))
+    
+    # Rendered template fragments ({% cache %} in fragments.py), per worker process
+    FRAGMENT_CACHE_ENABLED = os.environ.get('FRAGMENT_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    FRAGMENT_CACHE_MAX_ENTRIES = int(os.environ.get('FRAGMENT_CACHE_MAX_ENTRIES', 256))
+    
+    # Load Bootstrap, Font Awesome, Cairo etc. from public CDNs instead of static/vendor
+    USE_CDN_ASSETS = os.environ.get('USE_CDN_ASSETS', 'false').lower() in ('1', 'true', 'yes')
+    
+    # Response compression (compression.py); brotli is used when the package is installed
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    COMPRESS_BR = True
+    COMPRESS_LEVEL = 6  # gzip 1-9
+    COMPRESS_BR_LEVEL = 4  # brotli 0-11; higher levels cost too much CPU per request
+    COMPRESS_MIN_SIZE = 500  # bytes
+    COMPRESS_STREAMS = True  # compress generators and send_file responses chunk by chunk
+    COMPRESS_MIMETYPES = [
+        'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript',
+        'application/javascript', 'application/json', 'application/x-ndjson',
+        'application/xml', 'image/svg+xml'
+    ]
+    
+    # Request metrics (metrics.py): one file per worker process in METRICS_DIR,
+    # merged by /metrics. Scrapers authenticate with "Authorization: Bearer <METRICS_TOKEN>"
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    METRICS_DIR = os.environ.get('METRICS_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'metrics')
+    METRICS_FLUSH_INTERVAL = 1.0  # seconds between writes of a worker's file
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    
+    # Slow query and N+1 detection (querywatch.py), reported on /query_report
+    QUERYWATCH_ENABLED = os.environ.get('QUERYWATCH_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    SLOW_QUERY_MS = int(os.environ.get('SLOW_QUERY_MS', 200))
+    N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD', 10))  # same statement shape per request
+    QUERYWATCH_MAX_FINDINGS = 200
+    
+    # On-demand profiling of one request (profiler.py): admins add ?_profile=1 to a
+    # URL; artifacts are listed on /profiles, the oldest deleted beyond the limit
+    PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    PROFILE_DIR = os.environ.get('PROFILE_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'profiles')
+    PROFILE_MAX_ARTIFACTS = int(os.environ.get('PROFILE_MAX_ARTIFACTS', 20))
+    PROFILE_SAMPLE_INTERVAL_MS = 5
+    
+    # Readiness probe (health.py): the database check runs at most once per
+    # HEALTH_CACHE_SECONDS per worker, other probes get the cached result
+    HEALTH_CACHE_SECONDS = float(os.environ.get('HEALTH_CACHE_SECONDS', 5))
+    
+    # Connection pool per worker (pool_sizing.py): sized from the profile
+    # (railway, pythonanywhere, local; default from the database URL) and
+    # WEB_CONCURRENCY x GUNICORN_THREADS. "flask pool-plan" shows the result
+    DB_POOL_PROFILE = os.environ.get('DB_POOL_PROFILE')
+    WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', 4))
+    # sync, gthread or gevent (gunicorn.conf.py); with gevent GUNICORN_THREADS is
+    # how many greenlets of a worker may hold a database connection at once
+    GUNICORN_WORKER_CLASS = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+    GUNICORN_THREADS = int(os.environ.get('GUNICORN_THREADS', 1))
+    DB_MAX_CONNECTIONS = int(os.environ.get('DB_MAX_CONNECTIONS', 100))  # Postgres max_connections
+    DB_RESERVED_CONNECTIONS = int(os.environ.get('DB_RESERVED_CONNECTIONS', 5))  # release step, psql
+    DB_POOL_SIZE = int(os.environ['DB_POOL_SIZE']) if os.environ.get('DB_POOL_SIZE') else None
+    DB_MAX_OVERFLOW = int(os.environ['DB_MAX_OVERFLOW']) if os.environ.get('DB_MAX_OVERFLOW') else None
+    DB_POOL_TIMEOUT = int(os.environ['DB_POOL_TIMEOUT']) if os.environ.get('DB_POOL_TIMEOUT') else None
+    
+    # SQLite tuning (sqlite_tuning.py): SQLITE_PRAGMAS overrides single pragmas of
+    # the default profile
+    SQLITE_PRAGMAS = {}
+    SQLITE_LOCK_RETRIES = 3  # re-runs of a write request that hit 'database is locked'
+    SQLITE_LOCK_RETRY_DELAY = 0.05  # seconds, doubled per retry
+    
     # Production optimizations
-    SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_pre_ping': True,
-        'pool_recycle': 300,
-        'pool_timeout': 20,
-        'max_overflow': 0
-    }
+    # Pool size, overflow, timeout and pre-ping come from the pool profile
+    SQLALCHEMY_ENGINE_OPTIONS = {}
 
 class DevelopmentConfig(Config):
     """Development configuration"""
     FLASK_ENV = 'development'
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///students.db'
+    DB_POOL_PROFILE = os.environ.get('DB_POOL_PROFILE', 'local')
+    
+    # Keep responses readable in the browser dev tools
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'false').lower() in ('1', 'true', 'yes')
 
 class ProductionConfig(Config):
     """Production configuration for PythonAnywhere"""
@@ -55,15 +139,7 @@ class ProductionConfig(Config):
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Lax'
     
-    # Additional production settings
-    PERMANENT_SESSION_LIFETIME = 86400  # 24 hours
-    
-    # SQLite optimizations for production
     SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_pre_ping': True,
-        'pool_recycle': 300,
-        'pool_timeout': 20,
-        'max_overflow': 0,
         'echo': False
     }
 
@@ -80,20 +156,18 @@ class PythonAnywhereConfig(Config):
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Lax'
     
-    # Performance settings for shared hosting
+    # Pool sizing for shared hosting comes from the pythonanywhere pool profile
     SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_pre_ping': True,
-        'pool_recycle': 300,
-        'pool_timeout': 20,
-        'max_overflow': 0,
-        'echo': False,
-        'pool_size': 10
+        'echo': False
     }
     
     # Additional settings
-    PERMANENT_SESSION_LIFETIME = 86400  # 24 hours
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     
+    # Shared hosting CPU is scarce: cheaper compression levels
+    COMPRESS_LEVEL = 5
+    COMPRESS_BR_LEVEL = 3
+    
     # Static files configuration
     STATIC_FOLDER = '/home/tafrasystem/mysite/static'
     TEMPLATES_FOLDER = '/home/tafrasystem/mysite/templates'
@@ -101,8 +175,11 @@ class PythonAnywhereConfig(Config):
 class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    # route_benchmark.py points this at a seeded database file
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    # route_benchmark.py turns it on to measure the bytes a browser receives
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'false').lower() in ('1', 'true', 'yes')
 
 # Configuration dictionary
 config = {
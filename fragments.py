@@ -0,0 +1,69 @@
+"""
+Fragment caching for expensive template sections.
+
+    {% cache 'payments_dues', data_versions('student', 'group', 'payment') %}
+        ... rendered once per combination of dependencies ...
+    {% endcache %}
+
+The first argument names the fragment, the rest are the values its output
+depends on: normally ``data_versions(...)`` of the tables the block reads,
+plus anything else it varies on (the current day, a filter value). The
+rendered HTML is kept in the app's fragment cache under a hash of the
+template, the name and the dependencies, so while nothing changed the
+block costs one lookup instead of its queries and rendering. Nothing is
+invalidated explicitly; entries for old versions stop being asked for and
+fall out of the LRU.
+"""
+import hashlib
+
+from flask import current_app
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+from caching import MemoryCache
+from versioning import get_versions, versions_etag
+
+
+def fragment_key(template_name, name, dependencies):
+    parts = [template_name or '', str(name)] + [repr(value) for value in dependencies]
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+class FragmentCacheExtension(Extension):
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        call = self.call_method('_render', [nodes.Const(parser.name), nodes.List(args)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render(self, template_name, args, caller):
+        cache = current_app.extensions.get('fragment_cache')
+        if cache is None or not current_app.config['FRAGMENT_CACHE_ENABLED']:
+            return caller()
+
+        key = fragment_key(template_name, args[0], args[1:])
+        html = cache.get(key)
+        if html is None:
+            html = str(caller())
+            cache.set(key, html)
+        return Markup(html)
+
+
+def init_app(app, db):
+    """Register the {% cache %} tag, its backend and the data_versions() helper"""
+    app.config.setdefault('FRAGMENT_CACHE_ENABLED', True)
+    app.config.setdefault('FRAGMENT_CACHE_MAX_ENTRIES', 256)
+
+    app.extensions['fragment_cache'] = MemoryCache(app.config['FRAGMENT_CACHE_MAX_ENTRIES'])
+    app.jinja_env.add_extension(FragmentCacheExtension)
+
+    @app.template_global()
+    def data_versions(*tables):
+        """Version stamp of ``tables`` for use as a fragment cache dependency"""
+        return versions_etag('fragment', get_versions(db, tables))
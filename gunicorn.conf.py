@@ -0,0 +1,109 @@
+"""
+Gunicorn settings (picked up automatically from the working directory).
+
+The app is imported once in the master (``preload_app``) and workers are
+forked from it, so a worker recycled by ``max_requests`` starts serving
+immediately instead of re-importing Flask, SQLAlchemy and the templates.
+Schema creation and the default admin are a release step
+(``flask --app wsgi init-db``), not something every worker does on import.
+
+Following the ``gc.freeze()`` recipe from the Python docs, garbage
+collection is off in the master while the app loads and everything it
+allocated is frozen right before each fork. Collections in the workers
+then never write to those objects, so their memory pages stay shared
+copy-on-write between workers.
+
+``GUNICORN_WORKER_CLASS`` picks sync (default), gthread or gevent workers
+and ``GUNICORN_THREADS`` the threads per worker (with gevent: greenlets that
+may use the database at once; ``GUNICORN_WORKER_CONNECTIONS`` caps clients).
+The database pool of each worker is sized from the same variables
+(pool_sizing.py). gevent patches the standard library here, before the app
+is preloaded, so locks, sockets and sleeps taken at import are cooperative;
+without gevent installed the workers fall back to gthread with at least
+two threads. Keep SQLite on
+sync or gthread workers: its calls block the whole gevent loop.
+
+Each worker writes its request metrics (metrics.py) and query findings
+(querywatch.py) to its own files; the hooks below write the last numbers
+on exit and fold the files of an exited worker into the archives, so
+/metrics and /query_report survive worker restarts.
+"""
+import gc
+import os
+import sys
+
+# Workers boot against a database that the release step already initialized
+os.environ.setdefault('AUTO_INIT_DB', 'false')
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 100))
+timeout = 120
+keepalive = 2
+max_requests = 1000
+max_requests_jitter = 100
+preload_app = True
+
+if worker_class == 'gevent':
+    try:
+        from gevent import monkey
+    except ImportError:
+        # At least two threads, or the fallback is a sync worker with no concurrency at all
+        threads = max(threads, 2)
+        print(f'⚠️ gevent is not installed; using gthread workers with {threads} threads', file=sys.stderr)
+        worker_class = 'gthread'
+    else:
+        monkey.patch_all()
+        try:
+            # psycopg2 waits on the server without yielding unless patched
+            from psycogreen.gevent import patch_psycopg
+            patch_psycopg()
+        except ImportError:
+            pass
+# The preloaded app sizes its pool and reports from the class and threads that actually run
+os.environ['GUNICORN_WORKER_CLASS'] = worker_class
+os.environ['GUNICORN_THREADS'] = str(threads)
+
+gc.disable()
+
+
+def on_starting(server):
+    # Numbers of a previous run would mix with workers that reuse its pids
+    import metrics
+    from config import config
+    settings = config[os.environ.get('FLASK_CONFIG', 'development')]
+    metrics.reset_directory(settings.METRICS_DIR)
+
+
+def pre_fork(server, worker):
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    gc.enable()
+
+    # Connections opened in the master must not be shared between processes
+    from app import app, db
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def worker_exit(server, worker):
+    from app import app
+    for name in ('metrics', 'querywatch'):
+        store = app.extensions.get(name)
+        if store is not None:
+            store.flush(force=True)
+
+
+def child_exit(server, worker):
+    import metrics
+    import querywatch
+    from app import app
+    if app.config.get('METRICS_ENABLED'):
+        metrics.mark_process_dead(app.config['METRICS_DIR'], worker.pid)
+    if app.config.get('QUERYWATCH_ENABLED'):
+        querywatch.mark_process_dead(app.config['METRICS_DIR'], worker.pid, app.config['QUERYWATCH_MAX_FINDINGS'])
@@ -1,34 +1,137 @@
 """
-Health check endpoint for monitoring
+Liveness and readiness probes for the platform health checks.
+
+- ``/health/live`` (and ``/ping``) answer from the process alone and never
+  touch the database: a worker that can run a view is alive.
+- ``/health/ready`` (and ``/health``, which railway.json and older monitors
+  call) runs ``SELECT 1`` and reads the schema version, but at most once per
+  ``HEALTH_CACHE_SECONDS`` per worker; probes in between get the cached
+  result. It also reports the connection pool usage of every engine and
+  the SQLite lock retries of this worker (``sqlite_tuning.lock_stats``),
+  which cost no queries. Returns 503 when the database is unreachable or
+  its schema is behind ``migrations.latest_version()``.
+- ``/status`` is the application summary with the same cached check.
 """
-from flask import Blueprint, jsonify
-from datetime import datetime
 import os
+import threading
+import time
+from datetime import datetime
+
+from flask import Blueprint, current_app, jsonify
+from sqlalchemy import text
+
+import migrations
+from sqlite_tuning import lock_stats
+
+APP_NAME = 'Tafra Student Management System'
+VERSION = '1.0.0'
 
 health_bp = Blueprint('health', __name__)
 
-@health_bp.route('/health')
-def health_check():
-    """Basic health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
+
+class DatabaseCheck:
+    """``SELECT 1`` and the schema version, re-run at most every ``ttl`` seconds"""
+
+    def __init__(self, db, ttl):
+        self.db = db
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._result = None
+        self._expires = 0.0
+
+    def _run(self):
+        started = time.perf_counter()
+        try:
+            with self.db.engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+                schema_version = migrations.get_schema_version(connection)
+        except Exception as e:
+            current_app.logger.warning('Readiness check failed: %s', e)
+            return {'status': 'unhealthy', 'error': e.__class__.__name__,
+                    'checked_at': datetime.utcnow().isoformat()}
+        latest = migrations.latest_version()
+        return {
+            'status': 'healthy' if schema_version >= latest else 'outdated_schema',
+            'latency_ms': round((time.perf_counter() - started) * 1000, 1),
+            'schema_version': schema_version,
+            'latest_schema_version': latest,
+            'checked_at': datetime.utcnow().isoformat(),
+        }
+
+    def result(self):
+        # One probe runs the check; probes arriving meanwhile wait for its result
+        with self._lock:
+            if time.monotonic() >= self._expires:
+                self._result = self._run()
+                self._expires = time.monotonic() + self.ttl
+            return self._result
+
+
+def pool_usage(engine):
+    """Connections in use and idle, from the pool's own counters (no query)"""
+    pool = engine.pool
+    usage = {'class': type(pool).__name__}
+    for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+        counter = getattr(pool, name, None)
+        if counter is not None:
+            usage[name] = counter()
+    if 'size' in usage:
+        usage['max_overflow'] = pool._max_overflow
+        usage['timeout'] = pool.timeout()
+    return usage
+
+
+def readiness():
+    db = current_app.extensions['sqlalchemy']
+    database = current_app.extensions['health'].result()
+    return {
+        'status': 'healthy' if database['status'] == 'healthy' else 'unhealthy',
+        'database': database,
+        'pools': {bind or 'default': pool_usage(engine) for bind, engine in db.engines.items()},
+        'sqlite_locks': lock_stats(current_app),
+        'pid': os.getpid(),
         'timestamp': datetime.utcnow().isoformat(),
-        'version': '1.0.0'
-    }), 200
+        'version': VERSION,
+    }
+
+
+@health_bp.route('/health/live')
+def live():
+    """Liveness: the worker answers; the database is not checked"""
+    return jsonify({'status': 'alive', 'pid': os.getpid(), 'timestamp': datetime.utcnow().isoformat()}), 200
+
 
 @health_bp.route('/ping')
 def ping():
     """Simple ping endpoint"""
     return 'pong', 200
 
+
+@health_bp.route('/health')
+@health_bp.route('/health/ready')
+def ready():
+    """Readiness: database reachable and migrated (cached per worker)"""
+    report = readiness()
+    return jsonify(report), 200 if report['status'] == 'healthy' else 503
+
+
 @health_bp.route('/status')
 def status():
     """Detailed status information"""
+    report = readiness()
     return jsonify({
-        'app_name': 'Tafra Student Management System',
-        'version': '1.0.0',
+        'app_name': APP_NAME,
+        'version': VERSION,
         'status': 'running',
         'environment': os.environ.get('FLASK_ENV', 'development'),
-        'timestamp': datetime.utcnow().isoformat(),
-        'uptime': 'healthy'
-    }), 200 
\ No newline at end of file
+        'database': report['database'],
+        'pools': report['pools'],
+        'sqlite_locks': report['sqlite_locks'],
+        'timestamp': report['timestamp'],
+    }), 200
+
+
+def init_app(app, db):
+    app.config.setdefault('HEALTH_CACHE_SECONDS', 5)
+    app.extensions['health'] = DatabaseCheck(db, app.config['HEALTH_CACHE_SECONDS'])
+    app.register_blueprint(health_bp)
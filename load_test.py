@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+"""
+Multi-user load test against a local gunicorn, standard library only.
+
+Seeds a ``seed_data`` profile into a fresh SQLite file (or an empty
+``--database-url``), starts ``gunicorn -c gunicorn.conf.py wsgi:application``
+as the Procfile does (workers from ``--workers``, default 4) and replays a
+day-start mix with one thread per virtual user:
+
+- every seeded instructor logs in at once and takes attendance for each of
+  their groups (dashboard, attendance page, form post), the morning burst;
+- ``--cashiers`` admins open /payments and post payments;
+- ``--admins`` admins open /reports and download report and backup exports.
+
+Users wait a random think time between steps (seeded, so runs are
+repeatable). At the end it prints throughput, latency percentiles and
+error rates per step, from the server log the SQLite lock retries and
+failures, pool checkout timeouts and gunicorn worker timeouts, from
+/metrics how long requests waited for a pooled connection, and the peak
+memory of the gunicorn processes (PSS, so pages shared copy-on-write are
+not counted once per worker; Linux only):
+
+    python load_test.py                                  # 60 s, 4 workers
+    python load_test.py --workers 8 --duration 120 --profile x10
+    python load_test.py --workers 2 --worker-class gthread --threads 4
+    python load_test.py --database-url postgresql://localhost/tafra_load
+    python load_test.py --output load-sqlite-4w.json
+
+Run it with the same numbers against SQLite and Postgres, or with
+different worker counts, to size the deployment with data;
+worker_benchmark.py compares worker classes with it.
+"""
+import argparse
+import http.client
+import importlib.util
+import json
+import os
+import random
+import re
+import secrets
+import shutil
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode
+
+import seed_data
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+ADMIN_USERNAME = 'araby'
+ADMIN_PASSWORD = '92321066'
+
+# Server log lines that explain errors the client only sees as a 500 or a slow response
+SERVER_LOG_PATTERNS = {
+    'lock_retries': re.compile(r'database is locked on \S+ \S+, retry'),
+    'lock_failures': re.compile(r'OperationalError\) database is locked'),
+    'pool_timeouts': re.compile(r'QueuePool limit of size \d+ overflow \d+ reached'),
+    'worker_timeouts': re.compile(r'WORKER TIMEOUT'),
+}
+
+METRIC_LINE = re.compile(r'^(\w+)\{([^}]*)\} (\S+)$')
+# Checkouts that waited longer than this queued behind busy connections
+POOL_WAIT_SECONDS = 0.01
+
+
+class Session:
+    """One browser: keeps the session cookie, one connection per request like a sync worker"""
+
+    def __init__(self, port, results):
+        self.port = port
+        self.results = results
+        self.cookies = {}
+
+    def request(self, step, method, path, form=None, expect=(200,)):
+        headers = {'Accept-Encoding': 'gzip, br'}
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{name}={value}' for name, value in self.cookies.items())
+        body = None
+        if form is not None:
+            body = urlencode(form)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        started = time.perf_counter()
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=180)
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+            finally:
+                connection.close()
+        except (OSError, http.client.HTTPException) as e:
+            self.results.record(step, time.perf_counter() - started, f'connection: {type(e).__name__}')
+            return None
+        for header in response.headers.get_all('Set-Cookie') or []:
+            for name, morsel in SimpleCookie(header).items():
+                self.cookies[name] = morsel.value
+        error = None
+        if response.status not in expect:
+            location = response.headers.get('Location', '')
+            error = 'logged out' if '/login' in location else f'status {response.status}'
+        self.results.record(step, time.perf_counter() - started, error)
+        return response.status
+
+    def login(self, username, password):
+        return self.request('login', 'POST', '/login', {'username': username, 'password': password},
+                            expect=(302,))
+
+
+class Results:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timings = {}
+        self.errors = {}
+
+    def record(self, step, seconds, error=None):
+        with self._lock:
+            self.timings.setdefault(step, []).append(seconds * 1000)
+            if error:
+                errors = self.errors.setdefault(step, {})
+                errors[error] = errors.get(error, 0) + 1
+
+
+def think(rng, stop, low, high):
+    stop.wait(rng.uniform(low, high))
+
+
+def instructor_user(session, rng, stop, username, groups):
+    """Morning burst: take attendance for every group, then keep checking the dashboard"""
+    session.login(username, seed_data.INSTRUCTOR_PASSWORD)
+    while not stop.is_set():
+        session.request('instructor_dashboard', 'GET', '/instructor_dashboard')
+        for group_id, student_ids in groups:
+            if stop.is_set():
+                return
+            session.request('instructor_attendance', 'GET', '/instructor_attendance')
+            think(rng, stop, 0.5, 2)
+            form = {'group_id': group_id, 'date': date.today().isoformat()}
+            form.update({f'attendance_{student_id}': rng.choice(seed_data.ATTENDANCE_STATUSES)
+                         for student_id in student_ids})
+            session.request('instructor_mark_attendance', 'POST', '/instructor_mark_attendance', form,
+                            expect=(302,))
+        think(rng, stop, 2, 5)
+
+
+def cashier_user(session, rng, stop, student_ids):
+    session.login(ADMIN_USERNAME, ADMIN_PASSWORD)
+    while not stop.is_set():
+        session.request('payments', 'GET', '/payments')
+        think(rng, stop, 1, 3)
+        form = {'student_id': rng.choice(student_ids), 'amount': rng.choice([50, 100, 150, 200]),
+                'month': rng.choice(seed_data.MONTHS), 'notes': ''}
+        session.request('add_payment', 'POST', '/add_payment', form, expect=(302,))
+        think(rng, stop, 1, 3)
+
+
+def admin_user(session, rng, stop):
+    session.login(ADMIN_USERNAME, ADMIN_PASSWORD)
+    iteration = 0
+    while not stop.is_set():
+        session.request('reports', 'GET', '/reports')
+        think(rng, stop, 2, 5)
+        session.request('export_reports', 'GET', '/export_reports')
+        if iteration % 5 == 4:
+            think(rng, stop, 2, 5)
+            session.request('export_full_backup', 'GET', '/export_full_backup')
+        iteration += 1
+        think(rng, stop, 3, 6)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def flask_command(env, *args):
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'wsgi', *args], cwd=BASE_DIR, env=env,
+                   check=True, capture_output=True, text=True)
+
+
+def load_users(database_url):
+    """(username, [(group_id, [student ids])]) per instructor and all student ids, read from the seeded database"""
+    from sqlalchemy import create_engine, text
+    engine = create_engine(database_url)
+    with engine.connect() as connection:
+        memberships = connection.execute(text(
+            'SELECT u.username, g.id, sg.student_id FROM "user" u '
+            'JOIN "group" g ON g.instructor_id = u.instructor_id '
+            'JOIN student_groups sg ON sg.group_id = g.id '
+            "WHERE u.role = 'instructor' ORDER BY u.id, g.id, sg.student_id"
+        )).all()
+        student_ids = [row[0] for row in connection.execute(text('SELECT id FROM student ORDER BY id'))]
+    engine.dispose()
+    instructors = {}
+    for username, group_id, student_id in memberships:
+        groups = instructors.setdefault(username, {})
+        groups.setdefault(group_id, []).append(student_id)
+    return [(username, list(groups.items())) for username, groups in instructors.items()], student_ids
+
+
+def wait_until_up(port, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('gunicorn exited during startup')
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            connection.request('GET', '/ping')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'gunicorn did not answer on port {port} within {timeout}s')
+
+
+def scrape_pool_metrics(port, token):
+    """Checkout waits and timeouts of the default pool, added up over all workers"""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    connection.request('GET', '/metrics', headers={'Authorization': f'Bearer {token}'})
+    response = connection.getresponse()
+    body = response.read().decode()
+    connection.close()
+    if response.status != 200:
+        return None
+    buckets, totals = {}, {}
+    for line in body.splitlines():
+        match = METRIC_LINE.match(line)
+        if match is None or 'pool="default"' not in match.group(2):
+            continue
+        name, labels, value = match.group(1), match.group(2), float(match.group(3))
+        if name == 'db_pool_checkout_seconds_bucket':
+            le = re.search(r'le="([^"]+)"', labels).group(1)
+            buckets[float(le)] = value
+        else:
+            totals[name] = value
+    checkouts = totals.get('db_pool_checkout_seconds_count', 0)
+    if not checkouts:
+        return None
+    # Histograms only give upper bounds: the p95 is "at most this bucket"
+    p95 = next(le for le, count in sorted(buckets.items()) if count >= checkouts * 0.95)
+    waited = next(count for le, count in sorted(buckets.items()) if le >= POOL_WAIT_SECONDS)
+    return {
+        'checkouts': int(checkouts),
+        'waited': int(checkouts - waited),
+        'p95_wait_ms_at_most': p95 * 1000 if p95 != float('inf') else None,
+        'mean_wait_ms': round(totals['db_pool_checkout_seconds_sum'] / checkouts * 1000, 2),
+        'timeouts': int(totals.get('db_pool_timeouts_total', 0)),
+        'capacity': int(totals.get('db_pool_capacity', 0)),
+    }
+
+
+def worker_pids(master_pid):
+    try:
+        with open(f'/proc/{master_pid}/task/{master_pid}/children') as f:
+            return [int(pid) for pid in f.read().split()]
+    except OSError:
+        return []
+
+
+def process_memory_kib(pid):
+    """Proportional set size of a process, or its RSS where the kernel has no smaps_rollup"""
+    for path, key in ((f'/proc/{pid}/smaps_rollup', 'Pss:'), (f'/proc/{pid}/status', 'VmRSS:')):
+        try:
+            with open(path) as f:
+                for line in f:
+                    if line.startswith(key):
+                        return int(line.split()[1])
+        except OSError:
+            continue
+    return None
+
+
+class MemorySampler:
+    """Peak memory of the gunicorn master and its workers, sampled every second"""
+
+    def __init__(self, master_pid):
+        self.master_pid = master_pid
+        self.peak_total_kib = 0
+        self.peak_worker_kib = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(1):
+            workers = [process_memory_kib(pid) for pid in worker_pids(self.master_pid)]
+            workers = [kib for kib in workers if kib is not None]
+            master = process_memory_kib(self.master_pid)
+            if not workers or master is None:
+                continue
+            self.peak_total_kib = max(self.peak_total_kib, master + sum(workers))
+            self.peak_worker_kib = max(self.peak_worker_kib, max(workers))
+
+    def summary(self):
+        if not self.peak_total_kib:
+            return None
+        return {'peak_total_mib': round(self.peak_total_kib / 1024, 1),
+                'peak_worker_mib': round(self.peak_worker_kib / 1024, 1)}
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def summarize(results, elapsed, server_log, pool, memory):
+    steps = {}
+    for step, timings in sorted(results.timings.items()):
+        timings = sorted(timings)
+        errors = results.errors.get(step, {})
+        steps[step] = {
+            'requests': len(timings),
+            'errors': sum(errors.values()),
+            'error_kinds': errors,
+            'p50_ms': round(statistics.median(timings), 1),
+            'p95_ms': round(percentile(timings, 0.95), 1),
+            'p99_ms': round(percentile(timings, 0.99), 1),
+            'max_ms': round(timings[-1], 1),
+        }
+    total = sum(step['requests'] for step in steps.values())
+    timings = sorted(timing for step_timings in results.timings.values() for timing in step_timings)
+    server = {name: len(pattern.findall(server_log)) for name, pattern in SERVER_LOG_PATTERNS.items()}
+    return {
+        'duration_s': round(elapsed, 1),
+        'requests': total,
+        'throughput_rps': round(total / elapsed, 1),
+        'error_rate': round(sum(step['errors'] for step in steps.values()) / total, 4) if total else 0,
+        'p50_ms': round(statistics.median(timings), 1) if timings else None,
+        'p95_ms': round(percentile(timings, 0.95), 1) if timings else None,
+        'steps': steps,
+        'server': server,
+        'pool': pool,
+        'memory': memory,
+    }
+
+
+def print_summary(summary, settings):
+    print(f"\n📊 {settings['database']}, {settings['workers']} {settings['worker_class']} workers "
+          f"x {settings['threads']} threads, profile '{settings['profile']}', "
+          f"{settings['instructors']} instructors + {settings['cashiers']} cashiers + {settings['admins']} admins")
+    print(f"{'step':<28}{'requests':>9}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for name, step in summary['steps'].items():
+        print(f"{name:<28}{step['requests']:>9}{step['errors']:>8}{step['p50_ms']:>9.0f}"
+              f"{step['p95_ms']:>9.0f}{step['p99_ms']:>9.0f}{step['max_ms']:>9.0f}")
+        for kind, count in step['error_kinds'].items():
+            print(f"    ⚠️ {count} x {kind}")
+    print(f"⏱️ {summary['requests']} requests in {summary['duration_s']}s = {summary['throughput_rps']} req/s, "
+          f"{summary['error_rate']:.2%} errors")
+    server = summary['server']
+    print(f"🗄️ SQLite lock retries {server['lock_retries']}, lock failures {server['lock_failures']}, "
+          f"pool checkout timeouts {server['pool_timeouts']}, worker timeouts {server['worker_timeouts']}")
+    pool = summary['pool']
+    if pool:
+        p95 = f"≤ {pool['p95_wait_ms_at_most']:g} ms" if pool['p95_wait_ms_at_most'] is not None else 'over 30 s'
+        print(f"🔌 Pool checkouts {pool['checkouts']} (capacity {pool['capacity']} over all workers): "
+              f"mean wait {pool['mean_wait_ms']} ms, p95 {p95}, {pool['waited']} waited over "
+              f"{POOL_WAIT_SECONDS * 1000:g} ms, {pool['timeouts']} timed out")
+    memory = summary['memory']
+    if memory:
+        print(f"🧠 Peak memory (PSS) {memory['peak_total_mib']} MiB for master and workers, "
+              f"{memory['peak_worker_mib']} MiB for the largest worker")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Load test a local gunicorn with a realistic user mix')
+    parser.add_argument('--profile', choices=sorted(seed_data.PROFILES), default='center',
+                        help='seed_data profile (default: center)')
+    parser.add_argument('--seed', type=int, default=1, help='Data and think-time seed')
+    parser.add_argument('--duration', type=float, default=60, help='Seconds of load')
+    parser.add_argument('--workers', type=int, default=4, help='Gunicorn workers (Procfile default: 4)')
+    parser.add_argument('--worker-class', choices=('sync', 'gthread', 'gevent'), default='sync',
+                        help='Gunicorn worker class (default: sync)')
+    parser.add_argument('--threads', type=int, default=1,
+                        help='Threads per worker; greenlets that may use the database at once for gevent')
+    parser.add_argument('--instructors', type=int, default=0,
+                        help='Concurrent instructors (default: every seeded instructor)')
+    parser.add_argument('--cashiers', type=int, default=3, help='Concurrent cashiers posting payments')
+    parser.add_argument('--admins', type=int, default=2, help='Concurrent admins opening reports and exports')
+    parser.add_argument('--database-url', help='Empty database to seed instead of a temporary SQLite file')
+    parser.add_argument('--output', help='Write the summary as JSON')
+    parser.add_argument('--keep', action='store_true', help='Keep the temporary directory (database, server log)')
+    return parser
+
+
+def run(args):
+    """Seed, start gunicorn, replay the user mix; returns the summary with its settings"""
+    worker_class = args.worker_class
+    if worker_class == 'gevent' and importlib.util.find_spec('gevent') is None:
+        # gunicorn.conf.py falls back the same way
+        print('⚠️ gevent is not installed; gunicorn will run gthread workers')
+        worker_class = 'gthread'
+    work_dir = tempfile.mkdtemp(prefix='load-test-')
+    database_url = args.database_url or f"sqlite:///{os.path.join(work_dir, 'load.db')}"
+    port = free_port()
+    env = dict(
+        os.environ,
+        DATABASE_URL=database_url,
+        PORT=str(port),
+        WEB_CONCURRENCY=str(args.workers),
+        GUNICORN_WORKER_CLASS=args.worker_class,
+        GUNICORN_THREADS=str(args.threads),
+        AUTO_INIT_DB='false',
+        METRICS_DIR=os.path.join(work_dir, 'metrics'),
+        REPORT_CACHE_DIR=os.path.join(work_dir, 'report_cache'),
+        METRICS_TOKEN=secrets.token_hex(16),
+        METRICS_ENABLED='true',
+    )
+    log_path = os.path.join(work_dir, 'gunicorn.log')
+    process = memory = None
+    try:
+        print(f"🌱 Seeding profile '{args.profile}' into {database_url}")
+        flask_command(env, 'init-db')
+        flask_command(env, 'seed-data', '--profile', args.profile, '--seed', str(args.seed))
+        instructors, student_ids = load_users(database_url)
+        if args.instructors:
+            instructors = instructors[:args.instructors]
+
+        with open(log_path, 'w') as log:
+            process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:application'],
+                                       cwd=BASE_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+        wait_until_up(port, process)
+        memory = MemorySampler(process.pid)
+        memory.start()
+        print(f"🚀 gunicorn up on port {port} with {args.workers} {worker_class} workers "
+              f"x {args.threads} threads; "
+              f"{len(instructors)} instructors, {args.cashiers} cashiers, {args.admins} admins for {args.duration:.0f}s")
+
+        results = Results()
+        stop = threading.Event()
+        users = [(instructor_user, (username, groups)) for username, groups in instructors]
+        users += [(cashier_user, (student_ids,))] * args.cashiers
+        users += [(admin_user, ())] * args.admins
+        threads = []
+        for number, (target, target_args) in enumerate(users):
+            rng = random.Random(args.seed * 1000 + number)
+            thread = threading.Thread(target=target, args=(Session(port, results), rng, stop, *target_args),
+                                      daemon=True)
+            threads.append(thread)
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        stop.wait(args.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        # Let every worker write its latest numbers (METRICS_FLUSH_INTERVAL)
+        time.sleep(1.5)
+        pool = scrape_pool_metrics(port, env['METRICS_TOKEN'])
+    finally:
+        if memory is not None:
+            memory.stop()
+        if process is not None and process.poll() is None:
+            process.send_signal(signal.SIGTERM)
+            process.wait(timeout=60)
+
+    with open(log_path) as log:
+        server_log = log.read()
+    summary = summarize(results, elapsed, server_log, pool, memory.summary())
+    settings = {'profile': args.profile, 'seed': args.seed, 'workers': args.workers,
+                'worker_class': worker_class, 'threads': args.threads,
+                'database': database_url.split(':', 1)[0], 'instructors': len(instructors),
+                'cashiers': args.cashiers, 'admins': args.admins}
+    print_summary(summary, settings)
+    if args.keep:
+        print(f"📁 Database and server log kept in {work_dir}")
+    else:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return {'settings': settings, **summary}
+
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+    print(f"✅ Summary written to {path}")
+
+
+def main():
+    args = build_parser().parse_args()
+    report = run(args)
+    if args.output:
+        write_json(args.output, report)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
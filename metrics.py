@@ -0,0 +1,366 @@
+"""
+Per-request performance metrics in Prometheus text format.
+
+``init_app(app, db)`` records, for every request, labelled by the matched
+route (``/group_details/<int:group_id>``, not the raw URL) and method:
+
+- ``http_requests_total`` by status code
+- ``http_request_duration_seconds`` wall time from first hook to response
+- ``http_response_size_bytes`` bytes sent (after compression)
+- ``db_queries_per_request`` and ``db_query_seconds_per_request`` from the
+  ``before_cursor_execute``/``after_cursor_execute`` events of every engine
+- ``template_render_seconds`` time spent in ``render_template``
+
+and for every pool of the engines (``TimedQueuePool`` from pool_sizing.py),
+labelled by bind (``default``, ``replica``):
+
+- ``db_pool_checkout_seconds`` how long a checkout waited for a connection
+- ``db_pool_timeouts_total`` checkouts that gave up after ``pool_timeout``
+- ``db_pool_connections_in_use``, ``db_pool_overflow_connections`` and
+  ``db_pool_capacity`` gauges, read from the pool when the file is written
+
+Each worker process keeps its numbers in memory and a background thread
+writes them to the worker's own file in ``METRICS_DIR`` every
+``METRICS_FLUSH_INTERVAL`` seconds when they changed (to a temp file, then
+renamed, so readers never see half a file).
+``/metrics`` merges the files of all gunicorn workers. When a worker exits,
+the master folds its file into ``metrics-archive.json``
+(``mark_process_dead`` from gunicorn.conf.py) so counters never go
+backwards after a ``max_requests`` restart. Gauges of all workers are
+added up, and those of an exited worker are dropped.
+"""
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from flask import g, has_request_context, request, template_rendered, before_render_template
+from sqlalchemy import event
+
+from pool_sizing import TimedQueuePool
+
+ARCHIVE_FILE = 'metrics-archive.json'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+CHECKOUT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30)
+
+HELP = {
+    'http_requests_total': ('counter', 'Requests handled, by route, method and status'),
+    'http_request_duration_seconds': ('histogram', 'Request latency in seconds'),
+    'http_response_size_bytes': ('histogram', 'Response body size in bytes as sent'),
+    'db_queries_per_request': ('histogram', 'SQL statements executed per request'),
+    'db_query_seconds_per_request': ('histogram', 'Total SQL execution time per request in seconds'),
+    'template_render_seconds': ('histogram', 'Template render time per request in seconds'),
+    'db_pool_checkout_seconds': ('histogram', 'Wait for a pooled database connection in seconds'),
+    'db_pool_timeouts_total': ('counter', 'Connection checkouts that timed out waiting for the pool'),
+    'db_pool_connections_in_use': ('gauge', 'Pooled connections checked out'),
+    'db_pool_overflow_connections': ('gauge', 'Connections open beyond pool_size'),
+    'db_pool_capacity': ('gauge', 'pool_size plus max_overflow'),
+}
+
+BUCKETS = {
+    'http_request_duration_seconds': LATENCY_BUCKETS,
+    'http_response_size_bytes': SIZE_BUCKETS,
+    'db_queries_per_request': QUERY_COUNT_BUCKETS,
+    'db_query_seconds_per_request': LATENCY_BUCKETS,
+    'template_render_seconds': LATENCY_BUCKETS,
+    'db_pool_checkout_seconds': CHECKOUT_BUCKETS,
+}
+
+
+class MetricsStore:
+    """Counters and histograms of one worker process, flushed to its own file"""
+
+    def __init__(self, directory, flush_interval=1.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # Callbacks, not values, so they survive the reset after fork
+        self._gauges = {}
+        self._written_gauges = None
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._counters = {}
+        self._histograms = {}
+        self._dirty = False
+        self._flusher = None
+
+    def _check_fork(self):
+        # A worker forked from the preloaded master starts with empty numbers
+        if self._pid != os.getpid():
+            self._reset()
+        if self._flusher is None:
+            # Threads don't survive fork, so each worker starts its own on first use
+            self._flusher = threading.Thread(target=self._flush_periodically, name='metrics-flush', daemon=True)
+            self._flusher.start()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self.flush_interval)
+            if self._pid != os.getpid():
+                return
+            self.flush()
+
+    def inc(self, name, labels, amount=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._check_fork()
+            self._counters[key] = self._counters.get(key, 0) + amount
+            self._dirty = True
+
+    def observe(self, name, labels, value):
+        key = (name, tuple(sorted(labels.items())))
+        buckets = BUCKETS[name]
+        with self._lock:
+            self._check_fork()
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {'buckets': [0] * (len(buckets) + 1), 'sum': 0.0, 'count': 0}
+            # Last slot is +Inf; buckets are made cumulative when rendered
+            histogram['buckets'][bisect_left(buckets, value)] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+            self._dirty = True
+
+    def gauge(self, name, labels, read):
+        """Report ``read()`` as the current value whenever the file is written"""
+        self._gauges[(name, tuple(sorted(labels.items())))] = read
+
+    def _read_gauges(self):
+        return [[name, list(labels), read()] for (name, labels), read in self._gauges.items()]
+
+    def snapshot(self, gauges=None):
+        with self._lock:
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                'histograms': [[name, list(labels), h['buckets'], h['sum'], h['count']]
+                               for (name, labels), h in self._histograms.items()],
+                'gauges': self._read_gauges() if gauges is None else gauges,
+            }
+
+    def flush(self, force=False):
+        """Write this process's numbers if anything changed since the last write"""
+        with self._flush_lock:
+            gauges = self._read_gauges()
+            with self._lock:
+                if self._pid != os.getpid() or not (self._dirty or force or gauges != self._written_gauges):
+                    return
+                self._dirty = False
+            self._written_gauges = gauges
+            write_json(os.path.join(self.directory, f'metrics-{os.getpid()}.json'), self.snapshot(gauges))
+
+
+def write_json(path, data):
+    """Replace ``path`` atomically, so readers in other processes never see half a file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+
+def read_json(path):
+    """Contents of a file written by write_json, or None if it is gone"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # Removed by mark_process_dead between glob and open
+        return None
+
+
+def merge(snapshots):
+    """Add up snapshots of several processes"""
+    counters, histograms, gauges = {}, {}, {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot.get('counters', []):
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, value in snapshot.get('gauges', []):
+            key = (name, tuple(map(tuple, labels)))
+            gauges[key] = gauges.get(key, 0) + value
+        for name, labels, buckets, total, count in snapshot.get('histograms', []):
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.get(key)
+            if merged is None:
+                histograms[key] = {'buckets': list(buckets), 'sum': total, 'count': count}
+            else:
+                merged['buckets'] = [a + b for a, b in zip(merged['buckets'], buckets)]
+                merged['sum'] += total
+                merged['count'] += count
+    return {
+        'counters': [[name, list(labels), value] for (name, labels), value in counters.items()],
+        'histograms': [[name, list(labels), h['buckets'], h['sum'], h['count']]
+                       for (name, labels), h in histograms.items()],
+        'gauges': [[name, list(labels), value] for (name, labels), value in gauges.items()],
+    }
+
+
+def collect(directory):
+    """Merged numbers of every live worker plus the archive of exited ones"""
+    paths = glob.glob(os.path.join(directory, 'metrics-*.json'))
+    return merge(filter(None, (read_json(path) for path in paths)))
+
+
+def mark_process_dead(directory, pid):
+    """Fold an exited worker's file into the archive; run only in the gunicorn master"""
+    path = os.path.join(directory, f'metrics-{pid}.json')
+    snapshot = read_json(path)
+    if snapshot is None:
+        return
+    # Its connections closed with it
+    snapshot['gauges'] = []
+    archive_path = os.path.join(directory, ARCHIVE_FILE)
+    write_json(archive_path, merge([read_json(archive_path) or {}, snapshot]))
+    os.remove(path)
+
+
+def reset_directory(directory):
+    """Remove the files of a previous server run; call before workers start"""
+    for path in glob.glob(os.path.join(directory, '*.json')):
+        os.remove(path)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def render(snapshot):
+    """Prometheus text exposition format (version 0.0.4)"""
+    series = {}
+    for name, labels, value in snapshot['counters'] + snapshot.get('gauges', []):
+        series.setdefault(name, []).append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+    for name, labels, buckets, total, count in snapshot['histograms']:
+        lines = series.setdefault(name, [])
+        labels = [tuple(label) for label in labels]
+        cumulative = 0
+        for bound, bucket_count in zip(list(BUCKETS[name]) + ['+Inf'], buckets):
+            cumulative += bucket_count
+            le = bound if bound == '+Inf' else _format_value(float(bound))
+            lines.append(f'{name}_bucket{_format_labels(labels + [("le", le)])} {cumulative}')
+        lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(float(total))}')
+        lines.append(f'{name}_count{_format_labels(labels)} {count}')
+
+    output = []
+    for name in sorted(series):
+        metric_type, help_text = HELP[name]
+        output.append(f'# HELP {name} {help_text}')
+        output.append(f'# TYPE {name} {metric_type}')
+        output.extend(sorted(series[name]))
+    return '\n'.join(output) + '\n'
+
+
+def _route_labels():
+    # The URL rule, not the path, so /group_details/1 and /group_details/2 share a series
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    return {'route': route, 'method': request.method}
+
+
+def _sql_listeners():
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_metrics_query_start', []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['_metrics_query_start'].pop()
+        if has_request_context() and '_metrics_started' in g:
+            g._metrics_queries += 1
+            g._metrics_query_time += time.perf_counter() - started
+
+    return before_cursor_execute, after_cursor_execute
+
+
+def _instrument_pool(store, bind, engine):
+    labels = {'pool': bind or 'default'}
+
+    def observe_checkout(pool, waited):
+        if waited is None:
+            store.inc('db_pool_timeouts_total', labels)
+        else:
+            store.observe('db_pool_checkout_seconds', labels, waited)
+
+    engine.pool.observer = observe_checkout
+    # engine.pool, not the pool of now: engine.dispose() replaces it after fork
+    store.gauge('db_pool_connections_in_use', labels, lambda: engine.pool.checkedout())
+    store.gauge('db_pool_overflow_connections', labels, lambda: max(0, engine.pool.overflow()))
+    store.gauge('db_pool_capacity', labels, lambda: engine.pool.size() + engine.pool._max_overflow)
+
+
+def init_app(app, db):
+    """Instrument every request; register before compression so sizes are as sent"""
+    app.config.setdefault('METRICS_ENABLED', True)
+    if not app.config['METRICS_ENABLED']:
+        return
+    store = MetricsStore(app.config['METRICS_DIR'], app.config.get('METRICS_FLUSH_INTERVAL', 1.0))
+    app.extensions['metrics'] = store
+
+    before_cursor_execute, after_cursor_execute = _sql_listeners()
+    with app.app_context():
+        engines = dict(db.engines)
+    for bind, engine in engines.items():
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+        if isinstance(engine.pool, TimedQueuePool):
+            _instrument_pool(store, bind, engine)
+
+    @app.before_request
+    def start_request_metrics():
+        g._metrics_started = time.perf_counter()
+        g._metrics_queries = 0
+        g._metrics_query_time = 0.0
+        g._metrics_template_time = 0.0
+
+    def template_started(sender, template, context, **extra):
+        if has_request_context():
+            g._metrics_template_started = time.perf_counter()
+
+    def template_finished(sender, template, context, **extra):
+        if has_request_context() and '_metrics_template_started' in g:
+            g._metrics_template_time += time.perf_counter() - g.pop('_metrics_template_started')
+
+    before_render_template.connect(template_started, app, weak=False)
+    template_rendered.connect(template_finished, app, weak=False)
+
+    @app.after_request
+    def record_request_metrics(response):
+        if '_metrics_started' not in g:
+            return response
+        labels = _route_labels()
+        store.inc('http_requests_total', dict(labels, status=str(response.status_code)))
+        store.observe('http_request_duration_seconds', labels, time.perf_counter() - g._metrics_started)
+        store.observe('db_queries_per_request', labels, g._metrics_queries)
+        store.observe('db_query_seconds_per_request', labels, g._metrics_query_time)
+        if g._metrics_template_time:
+            store.observe('template_render_seconds', labels, g._metrics_template_time)
+        # Streamed responses have no length up front
+        if response.content_length is not None:
+            store.observe('http_response_size_bytes', labels, response.content_length)
+        return response
+
+
+def metrics_text(app):
+    """Current numbers of all workers, rendered for Prometheus"""
+    store = app.extensions.get('metrics')
+    if store is None:
+        return render({'counters': [], 'histograms': [], 'gauges': []})
+    # This worker's latest requests are included even between flushes
+    store.flush(force=True)
+    return render(collect(store.directory))
@@ -0,0 +1,158 @@
+"""
+Versioned schema migrations for the Tafra system.
+
+``db.create_all()`` only creates missing tables; it never alters existing
+ones. Schema changes to existing tables are registered here with the
+``@migration`` decorator and applied in order by ``upgrade()``, which
+records each applied version in the ``schema_migrations`` table. Every
+migration must be idempotent because a fresh database created by
+``create_all()`` already has the final schema.
+"""
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select
+
+# Kept out of db.metadata so the bookkeeping table is not part of backups
+migration_metadata = MetaData()
+
+schema_migrations = Table(
+    'schema_migrations', migration_metadata,
+    Column('version', Integer, primary_key=True),
+    Column('description', String(200)),
+    Column('applied_at', DateTime, default=datetime.utcnow)
+)
+
+MIGRATIONS = []
+
+
+def migration(version, description):
+    """Register a migration function taking (connection, db)"""
+    def decorator(func):
+        MIGRATIONS.append((version, description, func))
+        MIGRATIONS.sort(key=lambda item: item[0])
+        return func
+    return decorator
+
+
+def quote(connection, name):
+    return connection.dialect.identifier_preparer.quote(name)
+
+
+def add_missing_column(connection, table, column):
+    """ALTER TABLE ... ADD COLUMN for a model column the table lacks. Returns True if added"""
+    existing = {col['name'] for col in inspect(connection).get_columns(table.name)}
+    if column.name in existing:
+        return False
+    column_type = column.type.compile(dialect=connection.dialect)
+    connection.exec_driver_sql(
+        f'ALTER TABLE {quote(connection, table.name)} ADD COLUMN {quote(connection, column.name)} {column_type}'
+    )
+    return True
+
+
+def create_missing_indexes(connection, table):
+    for index in table.indexes:
+        index.create(connection, checkfirst=True)
+
+
+def get_schema_version(connection):
+    """Highest applied migration version, or 0 for an unversioned database"""
+    if not inspect(connection).has_table(schema_migrations.name):
+        return 0
+    versions = connection.execute(select(schema_migrations.c.version)).scalars().all()
+    return max(versions, default=0)
+
+
+def latest_version():
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def upgrade(db):
+    """Apply all pending migrations, each in its own transaction. Returns applied versions"""
+    applied = []
+    with db.engine.begin() as connection:
+        migration_metadata.create_all(connection)
+        current = get_schema_version(connection)
+
+    for version, description, func in MIGRATIONS:
+        if version <= current:
+            continue
+        with db.engine.begin() as connection:
+            func(connection, db)
+            connection.execute(schema_migrations.insert().values(
+                version=version, description=description, applied_at=datetime.utcnow()
+            ))
+        applied.append(version)
+        print(f"✅ Applied migration {version}: {description}")
+
+    return applied
+
+
+@migration(1, 'change tracking: updated_at columns and deleted_record tombstones')
+def add_change_tracking(connection, db):
+    from changefeed import TRACKED_TABLES
+
+    for name in TRACKED_TABLES:
+        table = db.metadata.tables[name]
+        add_missing_column(connection, table, table.c.updated_at)
+        # Existing rows enter the feed on the first sync
+        connection.execute(
+            table.update().where(table.c.updated_at.is_(None)).values(updated_at=datetime.utcnow())
+        )
+        create_missing_indexes(connection, table)
+
+    db.metadata.tables['deleted_record'].create(connection, checkfirst=True)
+
+
+@migration(2, 'table_versions counters for data version caching')
+def add_table_versions(connection, db):
+    from versioning import VERSIONED_TABLES, table_versions
+
+    table_versions.create(connection, checkfirst=True)
+    existing = set(connection.execute(select(table_versions.c.table_name)).scalars())
+    now = datetime.utcnow()
+    missing = [name for name in VERSIONED_TABLES if name not in existing]
+    if missing:
+        connection.execute(table_versions.insert(), [
+            {'table_name': name, 'version': 0, 'changed_at': now} for name in missing
+        ])
+
+
+@migration(3, 'indexes for the filtered and joined columns of the main tables')
+def add_query_indexes(connection, db):
+    # Creates whatever the models declare and the table lacks (checkfirst), so
+    # it is safe on databases that create_all() already built with the indexes
+    for table in db.metadata.sorted_tables:
+        create_missing_indexes(connection, table)
+
+
+@migration(4, 'money columns as integer piastres')
+def convert_money_to_minor_units(connection, db):
+    from money import MINOR_UNITS, Money
+
+    for table in db.metadata.sorted_tables:
+        money_columns = [column for column in table.columns if isinstance(column.type, Money)]
+        if not money_columns:
+            continue
+        existing = {col['name']: col['type'] for col in inspect(connection).get_columns(table.name)}
+        for column in money_columns:
+            # create_all() already made it an integer column: nothing to convert
+            if column.name not in existing or isinstance(existing[column.name], Integer):
+                continue
+            table_name, column_name = quote(connection, table.name), quote(connection, column.name)
+            if connection.dialect.name == 'postgresql':
+                connection.exec_driver_sql(
+                    f'ALTER TABLE {table_name} ALTER COLUMN {column_name} TYPE BIGINT '
+                    f'USING ROUND({column_name} * {MINOR_UNITS})'
+                )
+            else:
+                # SQLite can't change a column type in place; the values become
+                # whole piastres and Money reads them back as integers
+                connection.exec_driver_sql(
+                    f'UPDATE {table_name} SET {column_name} = CAST(ROUND({column_name} * {MINOR_UNITS}) AS INTEGER)'
+                )
+
+
+@migration(5, 'index for the student age filter')
+def add_student_age_index(connection, db):
+    create_missing_indexes(connection, db.metadata.tables['student'])
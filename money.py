@@ -0,0 +1,93 @@
+"""
+Exact money amounts for the Tafra system.
+
+Amounts are stored as whole piastres (``BigInteger``, 1 ج.م = 100 piastres)
+through the ``Money`` column type and come back as ``Decimal`` rounded to
+two places. Sums and comparisons in SQL are integer arithmetic, so totals
+over any number of payments are exact and ``remaining_balance`` checks need
+no float tolerance.
+
+The models register ``to_money`` as a ``set`` listener on these columns,
+so a float, int or string assigned to them is converted to ``Decimal``
+straight away and Python-side arithmetic such as
+``student.total_paid += amount`` never mixes floats and decimals.
+
+Templates format amounts with the ``money`` filter: ``{{ payment.amount|money }}``.
+"""
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import BigInteger
+from sqlalchemy.types import TypeDecorator
+
+MINOR_UNITS = 100
+CENT = Decimal('0.01')
+ZERO = Decimal('0.00')
+
+
+def to_money(value):
+    """``value`` as a Decimal rounded half-up to piastres; None stays None"""
+    if value is None:
+        return None
+    if isinstance(value, float):
+        # str() first so 0.1 becomes Decimal('0.1'), not its binary expansion
+        value = str(value)
+    try:
+        amount = Decimal(value)
+    except (InvalidOperation, TypeError):
+        raise ValueError(f'Invalid money amount: {value!r}')
+    if not amount.is_finite():
+        raise ValueError(f'Invalid money amount: {value!r}')
+    return amount.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def parse_money(text):
+    """Parse a form field like float() would, raising ValueError on bad input"""
+    return to_money(str(text).strip().replace(',', ''))
+
+
+def split_money(amount, parts):
+    """Split ``amount`` into ``parts`` shares that add up to it exactly"""
+    minor = int(to_money(amount) * MINOR_UNITS)
+    share, remainder = divmod(minor, parts)
+    return [Decimal(share + (1 if i < remainder else 0)) / MINOR_UNITS for i in range(parts)]
+
+
+def format_money(value):
+    """Jinja filter: 1234.5 -> '1,234.50'"""
+    if value is None or value == '':
+        value = 0
+    return f'{to_money(value):,.2f}'
+
+
+class Money(TypeDecorator):
+    """Money column stored as integer piastres, loaded as Decimal"""
+
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return int(to_money(value) * MINOR_UNITS)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        # SQLite returns REAL for columns created as FLOAT before migration 4
+        return (Decimal(int(round(value))) / MINOR_UNITS).quantize(CENT)
+
+
+class MoneyJSONProvider(DefaultJSONProvider):
+    """Keep amounts numeric in JSON responses (Flask writes Decimal as a string)"""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, Decimal):
+            return float(o)
+        return DefaultJSONProvider.default(o)
+
+
+def init_app(app):
+    app.json = MoneyJSONProvider(app)
+    app.add_template_filter(format_money, 'money')
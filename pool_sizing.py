@@ -0,0 +1,137 @@
+"""
+Connection pool size per worker process, from the deployment target.
+
+A request holds one connection for its session and at times a second,
+short-lived one (readiness probe, backup snapshot, version bump after a
+restore), so each process needs one to two connections per gunicorn thread
+(``GUNICORN_THREADS``; with gevent, the greenlets allowed a connection at
+once) and the deployment ``WEB_CONCURRENCY`` times that.
+``DB_POOL_PROFILE`` picks how to size it:
+
+- ``railway``: a Postgres server shared by every worker and the release
+  step. Each worker keeps ``threads`` connections and may open ``threads``
+  more, cut down so that workers x (size + overflow) stays within
+  ``DB_MAX_CONNECTIONS`` minus ``DB_RESERVED_CONNECTIONS``.
+- ``pythonanywhere``: a SQLite file. Connections are local and cheap, but
+  there is one writer at a time, so a bigger pool only queues more writers
+  on the lock: ``threads`` + ``threads``.
+- ``local``: the threaded development server, SQLAlchemy's defaults (5 + 10).
+
+Without ``DB_POOL_PROFILE`` a server database gets ``railway`` and SQLite
+``pythonanywhere`` (DevelopmentConfig defaults to ``local``).
+``DB_POOL_SIZE``, ``DB_MAX_OVERFLOW`` and ``DB_POOL_TIMEOUT`` override single
+numbers, and ``flask pool-plan`` prints the result with warnings when it
+does not fit.
+
+Pools are ``TimedQueuePool``, which report how long each checkout waited
+and which ones timed out to ``observer`` (set by metrics.py for /metrics).
+"""
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+PROFILES = {
+    'railway': {'server': True, 'pool_timeout': 10, 'pool_pre_ping': True, 'pool_recycle': 300},
+    'pythonanywhere': {'server': False, 'pool_timeout': 10},
+    'local': {'server': False, 'pool_size': 5, 'max_overflow': 10, 'pool_timeout': 30},
+}
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports each checkout's wait, or its timeout (None), to ``observer``"""
+
+    observer = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            if self.observer is not None:
+                self.observer(self, None)
+            raise
+        if self.observer is not None:
+            self.observer(self, time.perf_counter() - started)
+        return record
+
+    def recreate(self):
+        # engine.dispose() in post_fork replaces the pool; the new one keeps reporting
+        pool = super().recreate()
+        pool.observer = self.observer
+        return pool
+
+
+def profile_name(config):
+    name = config.get('DB_POOL_PROFILE')
+    if not name:
+        name = 'pythonanywhere' if config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite') else 'railway'
+    if name not in PROFILES:
+        raise ValueError(f"Unknown DB_POOL_PROFILE '{name}', expected one of: {', '.join(sorted(PROFILES))}")
+    return name
+
+
+def pool_plan(config):
+    """Pool settings of one worker and the connections all workers add up to"""
+    name = profile_name(config)
+    profile = PROFILES[name]
+    workers = config.get('WEB_CONCURRENCY', 1)
+    threads = config.get('GUNICORN_THREADS', 1)
+    worker_class = config.get('GUNICORN_WORKER_CLASS', 'sync')
+    if worker_class == 'sync' and threads > 1:
+        # gunicorn does the same
+        worker_class = 'gthread'
+    pool_size = profile.get('pool_size', threads)
+    max_overflow = profile.get('max_overflow', threads)
+
+    limit = None
+    if profile['server']:
+        limit = config.get('DB_MAX_CONNECTIONS', 100) - config.get('DB_RESERVED_CONNECTIONS', 5)
+        per_worker = max(1, limit // workers)
+        pool_size = min(pool_size, per_worker)
+        max_overflow = max(0, min(max_overflow, per_worker - pool_size))
+
+    if config.get('DB_POOL_SIZE') is not None:
+        pool_size = config['DB_POOL_SIZE']
+    if config.get('DB_MAX_OVERFLOW') is not None:
+        max_overflow = config['DB_MAX_OVERFLOW']
+    pool_timeout = config.get('DB_POOL_TIMEOUT') or profile['pool_timeout']
+
+    total = workers * (pool_size + max_overflow)
+    warnings = []
+    if pool_size < threads:
+        warnings.append(f'pool_size {pool_size} is below {threads} threads per worker: '
+                        f'busy threads will wait up to {pool_timeout}s for a connection')
+    if limit is not None and total > limit:
+        warnings.append(f'{workers} workers x {pool_size + max_overflow} connections = {total}, '
+                        f'more than the {limit} the server allows; lower WEB_CONCURRENCY or GUNICORN_THREADS')
+    if worker_class == 'gevent' and config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        warnings.append('SQLite calls, busy_timeout waits for the write lock included, block every greenlet '
+                        'of a gevent worker; use gthread workers with SQLite')
+    return {
+        'profile': name,
+        'worker_class': worker_class,
+        'workers': workers,
+        'threads': threads,
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': pool_timeout,
+        'total_connections': total,
+        'connection_limit': limit,
+        'warnings': warnings,
+    }
+
+
+def apply(config):
+    """Put the planned pool settings into SQLALCHEMY_ENGINE_OPTIONS"""
+    plan = pool_plan(config)
+    profile = PROFILES[plan['profile']]
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    for key in ('pool_pre_ping', 'pool_recycle'):
+        options.pop(key, None)
+        if key in profile:
+            options[key] = profile[key]
+    options.update(poolclass=TimedQueuePool, pool_size=plan['pool_size'],
+                   max_overflow=plan['max_overflow'], pool_timeout=plan['pool_timeout'])
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+    return plan
@@ -0,0 +1,259 @@
+"""
+On-demand profiling of a single request, for admins on the live data.
+
+An admin adds ``?_profile=1`` to a URL (or sends ``X-Profile-Request: 1``,
+e.g. for a form POST) and ``init_app(app, db)`` runs just that request
+with:
+
+- a sampling profiler: a thread that records the request thread's stack
+  every ``PROFILE_SAMPLE_INTERVAL_MS``, merged into a call tree;
+- ``tracemalloc``: peak traced memory and the lines that allocated most;
+- a SQL timeline: every statement's start offset, duration and the line
+  in our code that ran it (statements only, never parameter values).
+
+The result is written as a JSON artifact to ``PROFILE_DIR`` (the oldest
+are deleted beyond ``PROFILE_MAX_ARTIFACTS``), its id is returned in the
+``X-Profile-Id`` header, and ``/profiles`` lists the artifacts for viewing
+and download. Other requests pay nothing but a dictionary lookup, and
+only one request per worker is profiled at a time. The body of a streamed
+response is produced after the profile ends.
+"""
+import glob
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+from flask import g, has_request_context, request, session
+from sqlalchemy import event
+
+from metrics import read_json, write_json
+from querywatch import caller_location
+
+ARTIFACT_NAME = re.compile(r'^[0-9]{8}-[0-9]{6}-[0-9]+-[0-9a-f]{6}$')
+
+# Call tree nodes with fewer samples than this share of the total are dropped
+MIN_NODE_SHARE = 0.005
+TOP_ALLOCATIONS = 30
+
+
+def _frame_label(frame, root):
+    code = frame.f_code
+    filename = os.path.abspath(code.co_filename)
+    template = frame.f_globals.get('__jinja_template__')
+    if template is not None:
+        return f'{template.name or filename} (template)'
+    if filename.startswith(root) and 'site-packages' not in filename:
+        location = os.path.relpath(filename, root)
+    elif 'site-packages' in filename:
+        location = filename.split('site-packages' + os.sep, 1)[1]
+    else:
+        location = os.path.basename(filename)
+    return f'{code.co_name} ({location}:{code.co_firstlineno})'
+
+
+class StackSampler:
+    """Samples one thread's stack from a background thread"""
+
+    def __init__(self, thread_id, interval, root):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.root = root
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame, self.root))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def call_tree(self):
+        """Nested {name, samples, children} sorted by samples, small branches pruned"""
+        total = sum(self.stacks.values())
+        tree = {'name': 'request', 'samples': total, 'children': {}}
+        for stack, count in self.stacks.items():
+            node = tree
+            for label in stack:
+                child = node['children'].get(label)
+                if child is None:
+                    child = node['children'][label] = {'name': label, 'samples': 0, 'children': {}}
+                child['samples'] += count
+                node = child
+        minimum = max(1, total * MIN_NODE_SHARE)
+
+        def finish(node):
+            children = [finish(child) for child in node['children'].values() if child['samples'] >= minimum]
+            return {'name': node['name'], 'samples': node['samples'],
+                    'children': sorted(children, key=lambda child: child['samples'], reverse=True)}
+        return finish(tree)
+
+
+def top_allocations(snapshot, root, limit=TOP_ALLOCATIONS):
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+    ])
+    allocations = []
+    for stat in snapshot.statistics('lineno')[:limit]:
+        frame = stat.traceback[0]
+        filename = os.path.abspath(frame.filename)
+        location = os.path.relpath(filename, root) if filename.startswith(root) else frame.filename
+        allocations.append({'location': f'{location}:{frame.lineno}', 'size_kib': round(stat.size / 1024, 1),
+                            'count': stat.count})
+    return allocations
+
+
+def list_artifacts(directory):
+    """Summaries of the stored profiles, newest first"""
+    summaries = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.json')), reverse=True):
+        artifact = read_json(path)
+        if artifact is not None:
+            summaries.append({key: value for key, value in artifact.items()
+                              if key not in ('call_tree', 'allocations', 'sql')})
+    return summaries
+
+
+def artifact_path(directory, name):
+    """Path of a stored profile, or None for a name that isn't one"""
+    if not ARTIFACT_NAME.match(name):
+        return None
+    path = os.path.join(directory, f'{name}.json')
+    return path if os.path.exists(path) else None
+
+
+def _prune(directory, keep):
+    paths = sorted(glob.glob(os.path.join(directory, '*.json')))
+    for path in paths[:max(0, len(paths) - keep)]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _requested():
+    return request.args.get('_profile') == '1' or request.headers.get('X-Profile-Request') == '1'
+
+
+def init_app(app, db):
+    app.config.setdefault('PROFILER_ENABLED', True)
+    if not app.config['PROFILER_ENABLED']:
+        return
+    if app.config.get('GUNICORN_WORKER_CLASS') == 'gevent':
+        # The sampler reads OS thread stacks, and all greenlets of a worker share one thread
+        app.logger.warning('Request profiler disabled: it does not support gevent workers')
+        return
+    directory = app.config['PROFILE_DIR']
+    keep = app.config.get('PROFILE_MAX_ARTIFACTS', 20)
+    interval = app.config.get('PROFILE_SAMPLE_INTERVAL_MS', 5) / 1000
+    root = os.path.abspath(app.root_path)
+    # tracemalloc is process-wide, so one profiled request at a time
+    busy = threading.Lock()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and '_profile' in g:
+            conn.info.setdefault('_profile_start', []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not (has_request_context() and '_profile' in g and conn.info.get('_profile_start')):
+            return
+        started = conn.info['_profile_start'].pop()
+        profile = g._profile
+        profile['sql'].append({
+            'start_ms': round((started - profile['started']) * 1000, 2),
+            'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+            'statement': statement[:2000],
+            'executemany': executemany,
+            'location': caller_location(root),
+        })
+
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+
+    @app.before_request
+    def start_profile():
+        if not _requested() or session.get('user_role') != 'admin':
+            return
+        if not busy.acquire(blocking=False):
+            app.logger.warning('Profile of %s %s skipped: another request is being profiled',
+                               request.method, request.path)
+            return
+        now = datetime.now()
+        profile = {
+            'id': f"{now:%Y%m%d-%H%M%S}-{os.getpid()}-{os.urandom(3).hex()}",
+            'sampler': StackSampler(threading.get_ident(), interval, root),
+            'tracing': not tracemalloc.is_tracing(),
+            'sql': [],
+            'created_at': now.isoformat(timespec='seconds'),
+        }
+        if profile['tracing']:
+            tracemalloc.start()
+        profile['started'] = time.perf_counter()
+        profile['sampler'].start()
+        g._profile = profile
+
+    @app.after_request
+    def add_profile_header(response):
+        if '_profile' in g:
+            response.headers['X-Profile-Id'] = g._profile['id']
+            g._profile['status'] = response.status_code
+        return response
+
+    @app.teardown_request
+    def finish_profile(error=None):
+        profile = g.pop('_profile', None)
+        if profile is None:
+            return
+        try:
+            duration = time.perf_counter() - profile['started']
+            sampler = profile['sampler']
+            sampler.stop()
+            allocations, peak = [], None
+            if profile['tracing']:
+                peak = tracemalloc.get_traced_memory()[1]
+                allocations = top_allocations(tracemalloc.take_snapshot(), root)
+                tracemalloc.stop()
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            artifact = {
+                'id': profile['id'],
+                'created_at': profile['created_at'],
+                'method': request.method,
+                'path': request.path,
+                'route': route,
+                'status': profile.get('status', 500),
+                'user': session.get('username'),
+                'pid': os.getpid(),
+                'duration_ms': round(duration * 1000, 1),
+                'interval_ms': round(interval * 1000, 1),
+                'samples': sum(sampler.stacks.values()),
+                'peak_kib': round(peak / 1024) if peak is not None else None,
+                'sql_count': len(profile['sql']),
+                'sql_ms': round(sum(entry['duration_ms'] for entry in profile['sql']), 1),
+                'call_tree': sampler.call_tree(),
+                'allocations': allocations,
+                'sql': profile['sql'],
+            }
+            write_json(os.path.join(directory, f"{profile['id']}.json"), artifact)
+            _prune(directory, keep)
+        finally:
+            busy.release()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Check every page against a budget of SQL statements and time.
+
+Seeds the demo dataset (seed_data.py) into an in-memory database
+(TestingConfig), logs in as the admin and as an instructor, requests every
+GET route of app.py and compares the number of SQL statements and the
+median time of each against ``query_budgets.json``:
+
+    python query_budgets.py               # exit code 1 on any regression
+    python query_budgets.py --update      # accept the current numbers
+    python query_budgets.py --time-factor 3   # slower CI machine
+
+Statement counts must not grow at all: a per-row lazy load (a query per
+student in /students, per payment in /payments) adds dozens of statements
+on the seeded data and fails the check. Time budgets are the measured time
+with headroom, scaled by ``--time-factor``. Routes without a budget fail
+too, so new pages get one with ``--update``.
+
+``python -m pytest`` runs the statement counts (not the times, which depend
+on the machine) as tests/test_query_budgets.py, one test per budget, on the
+same seeded app (tests/conftest.py).
+"""
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BUDGETS_FILE = os.path.join(BASE_DIR, 'query_budgets.json')
+
+# Routes that change data or end the session, and pages without a template
+SKIP_ENDPOINTS = {'static', 'dist_asset', 'logout', 'add_sample_attendance', 'debug_prices'}
+
+# Time budget = measured median * TIME_HEADROOM + TIME_SLACK_MS
+TIME_HEADROOM = 2.0
+TIME_SLACK_MS = 50
+
+
+def load_app():
+    # In-memory database, no cache or instrumentation that would hide or add queries
+    os.environ['FLASK_CONFIG'] = 'testing'
+    os.environ['AUTO_INIT_DB'] = 'true'
+    os.environ['FRAGMENT_CACHE_ENABLED'] = 'false'
+    os.environ['METRICS_ENABLED'] = 'false'
+    os.environ['QUERYWATCH_ENABLED'] = 'false'
+    # A report cached by an earlier run would skip the report's queries
+    os.environ['REPORT_CACHE_DIR'] = tempfile.mkdtemp(prefix='query-budgets-')
+    sys.path.insert(0, BASE_DIR)
+    from app import app, db
+    return app, db
+
+
+def url_arguments(db, role_user):
+    """Values for the <int:...> parts of routes, owned by the instructor where it matters"""
+    from app import Group, InstructorTodo, Payment, Student, Task, User
+    instructor_group = Group.query.filter_by(instructor_id=role_user.instructor_id).order_by(Group.id).first()
+    return {
+        'group_id': instructor_group.id,
+        'student_id': instructor_group.students.order_by(Student.id).first().id,
+        'payment_id': db.session.query(db.func.min(Payment.id)).scalar(),
+        'task_id': db.session.query(db.func.min(Task.id)).scalar(),
+        'todo_id': InstructorTodo.query.filter_by(created_by=role_user.id).order_by(InstructorTodo.id).first().id,
+        'user_id': role_user.id,
+    }
+
+
+def get_routes(app, arguments):
+    routes = []
+    for rule in sorted(app.url_map.iter_rules(), key=lambda rule: rule.rule):
+        if 'GET' not in rule.methods or rule.endpoint in SKIP_ENDPOINTS:
+            continue
+        missing = [name for name in rule.arguments if name not in arguments]
+        if missing:
+            print(f"⚠️ Skipping {rule.rule}: no value for {', '.join(missing)}")
+            continue
+        with app.test_request_context():
+            from flask import url_for
+            url = url_for(rule.endpoint, **{name: arguments[name] for name in rule.arguments})
+        routes.append((rule.rule, url))
+    return routes
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+def measure(client, counter, url, repeat):
+    queries, timings, status = 0, [], None
+    for _ in range(repeat):
+        counter.count = 0
+        started = time.perf_counter()
+        response = client.get(url)
+        response.get_data()
+        timings.append((time.perf_counter() - started) * 1000)
+        queries = max(queries, counter.count)
+        status = response.status_code
+    return status, queries, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check SQL statement and time budgets of every route')
+    parser.add_argument('--update', action='store_true', help=f'Write the current numbers to {os.path.basename(BUDGETS_FILE)}')
+    parser.add_argument('--repeat', type=int, default=3, help='Requests per route; the median time is used')
+    parser.add_argument('--time-factor', type=float, default=1.0, help='Multiply the time budgets (slow machines)')
+    args = parser.parse_args()
+
+    app, db = load_app()
+    import seed_data
+    from app import User
+
+    measurements = {}
+    with app.app_context():
+        counts = seed_data.seed(db)
+        print(f"🌱 Seeded {sum(counts.values())} rows ({counts['student']} students, {counts['payment']} payments)")
+        counter = StatementCounter(db.engine)
+        instructor = User.query.filter_by(role='instructor').order_by(User.id).first()
+        logins = [('admin', 'araby', '92321066'), ('instructor', instructor.username, seed_data.INSTRUCTOR_PASSWORD)]
+        arguments = url_arguments(db, instructor)
+
+    for role, username, password in logins:
+        client = app.test_client()
+        client.post('/login', data={'username': username, 'password': password})
+        for rule, url in get_routes(app, arguments):
+            status, queries, elapsed = measure(client, counter, url, args.repeat)
+            measurements[f'{role} {rule}'] = {'status': status, 'queries': queries, 'ms': elapsed}
+
+    if args.update:
+        budgets = {
+            key: {'queries': value['queries'], 'ms': math.ceil(value['ms'] * TIME_HEADROOM + TIME_SLACK_MS)}
+            for key, value in sorted(measurements.items())
+        }
+        with open(BUDGETS_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'dataset': counts, 'routes': budgets}, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"✅ Wrote budgets for {len(budgets)} routes to {os.path.basename(BUDGETS_FILE)}")
+        return 0
+
+    with open(BUDGETS_FILE, encoding='utf-8') as f:
+        budgets = json.load(f)['routes']
+
+    failures = 0
+    for key, value in sorted(measurements.items()):
+        budget = budgets.get(key)
+        problems = []
+        if value['status'] >= 500:
+            problems.append(f"status {value['status']}")
+        if budget is None:
+            problems.append('no budget (run with --update)')
+        else:
+            if value['queries'] > budget['queries']:
+                problems.append(f"{value['queries']} queries > {budget['queries']}")
+            if value['ms'] > budget['ms'] * args.time_factor:
+                problems.append(f"{value['ms']:.0f} ms > {budget['ms'] * args.time_factor:.0f} ms")
+        if problems:
+            failures += 1
+            print(f"❌ {key}: {'; '.join(problems)}")
+        else:
+            print(f"✅ {key}: {value['queries']} queries, {value['ms']:.0f} ms")
+
+    if failures:
+        print(f"❌ {failures} of {len(measurements)} routes over budget")
+        return 1
+    print(f"✅ All {len(measurements)} routes within budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+Query plan checks for the indexed query predicates.
+
+``find_full_scans(connection, statement, tables)`` runs ``EXPLAIN`` on a
+query (a SQLAlchemy statement, or SQL text with its ``parameters``) and
+returns the tables from ``tables`` that the plan reads with a
+full table scan instead of an index. SQLite plans come from
+``EXPLAIN QUERY PLAN``. On Postgres, sequential scans are disabled for the
+check, because the planner prefers them on small tables even when an index
+exists; a ``Seq Scan`` left in the plan then means no usable index.
+
+tests/test_query_plans.py records the statements the main routes really
+run and fails when a filtered one regresses to a scan.
+"""
+import re
+
+from sqlalchemy import text
+
+
+def _sql(connection, statement):
+    if isinstance(statement, str):
+        return statement
+    # Legacy Model.query objects expose their SELECT as .statement
+    statement = getattr(statement, 'statement', statement)
+    return str(statement.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True}))
+
+
+def explain(connection, statement, parameters=None):
+    """Plan lines for ``statement`` on this connection's database"""
+    sql = _sql(connection, statement)
+    if connection.dialect.name == 'sqlite':
+        return [row.detail for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}', parameters)]
+
+    transaction = connection.begin_nested() if connection.in_transaction() else connection.begin()
+    try:
+        connection.execute(text('SET LOCAL enable_seqscan = off'))
+        return [row[0] for row in connection.exec_driver_sql(f'EXPLAIN {sql}', parameters)]
+    finally:
+        transaction.rollback()
+
+
+def find_full_scans(connection, statement, tables, parameters=None):
+    """Tables among ``tables`` that ``statement`` reads without an index"""
+    if connection.dialect.name == 'sqlite':
+        # "SCAN payment" is a full scan; "SCAN payment USING INDEX ..." and "SEARCH" are not
+        pattern = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$')
+    else:
+        pattern = re.compile(r'Seq Scan on (\w+)')
+
+    scanned = set()
+    for line in explain(connection, statement, parameters):
+        match = pattern.search(line.strip())
+        if match and match.group(1) in tables:
+            scanned.add(match.group(1))
+    return sorted(scanned)
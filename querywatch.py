@@ -0,0 +1,215 @@
+"""
+Slow query and N+1 detection, attributed to the request that caused it.
+
+``init_app(app, db)`` fingerprints every SQL statement a request runs
+(literals and bound parameters become ``?``, ``IN (?, ?, ?)`` becomes
+``IN (...)``) and counts the fingerprints per request:
+
+- a statement slower than ``SLOW_QUERY_MS`` is logged at once with the
+  route, its parameter count and the line in our code that ran it;
+- a fingerprint repeated ``N_PLUS_ONE_THRESHOLD`` times or more in one
+  request is logged as N+1 when the request ends, e.g. ``Group.query.get``
+  inside a schedule loop.
+
+Findings are also kept per route and fingerprint (how many requests hit
+it, the worst repeat count and duration) in a file per worker next to the
+metrics files, and ``/query_report`` shows them merged for admins. Only the
+first occurrence of a fingerprint in a request and slow statements pay for
+the stack walk, so it is cheap enough to leave on in production.
+"""
+import glob
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from metrics import read_json, write_json
+
+ARCHIVE_FILE = 'querywatch-archive.json'
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PARAMETER = re.compile(r'%\(\w+\)s|%s|\$\d+|(?<![:\w]):\w+')
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+# Frames in these files are the instrumentation, not the caller
+_OWN_FILES = tuple(os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+                   for name in ('querywatch.py', 'metrics.py', 'profiler.py'))
+
+
+def fingerprint(statement):
+    """The statement with every literal and parameter replaced by ?"""
+    sql = _STRING.sub('?', statement)
+    sql = _PARAMETER.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def _parameter_count(parameters, executemany):
+    if executemany and parameters:
+        parameters = parameters[0]
+    return len(parameters) if parameters else 0
+
+
+def caller_location(root):
+    """file:line of the innermost frame under ``root`` outside site-packages"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if (filename.startswith(root) and 'site-packages' not in filename
+                and filename not in _OWN_FILES):
+            lineno = frame.f_lineno
+            template = frame.f_globals.get('__jinja_template__')
+            if template is not None:
+                # Compiled template code: report the line of the .html file
+                lineno = template.get_corresponding_lineno(lineno)
+            return f'{os.path.relpath(filename, root)}:{lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return 'unknown'
+
+
+class FindingLog:
+    """Findings of one worker, by (kind, route, fingerprint), newest kept"""
+
+    def __init__(self, directory, max_entries=200):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._pid = os.getpid()
+        self._dirty = False
+        self._last_write = 0.0
+
+    def record(self, kind, route, sql, location, count=1, duration_ms=0.0, parameters=0):
+        key = f'{kind}|{route}|{hashlib.sha1(sql.encode()).hexdigest()[:16]}'
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked from the preloaded master
+                self._entries, self._pid = {}, os.getpid()
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {
+                    'kind': kind, 'route': route, 'sql': sql[:1000], 'requests': 0,
+                    'max_count': 0, 'max_ms': 0.0, 'parameters': parameters
+                }
+            entry['requests'] += 1
+            entry['max_count'] = max(entry['max_count'], count)
+            entry['max_ms'] = max(entry['max_ms'], round(duration_ms, 1))
+            entry['location'] = location
+            entry['last_seen'] = time.time()
+            if len(self._entries) > self.max_entries:
+                oldest = min(self._entries, key=lambda k: self._entries[k]['last_seen'])
+                del self._entries[oldest]
+            self._dirty = True
+        self.flush()
+
+    def flush(self, force=False):
+        """Write this worker's file, at most once a second unless forced"""
+        with self._lock:
+            now = time.monotonic()
+            if not self._dirty or (not force and now - self._last_write < 1.0):
+                return
+            self._dirty, self._last_write = False, now
+            entries = {key: dict(entry) for key, entry in self._entries.items()}
+        write_json(os.path.join(self.directory, f'querywatch-{os.getpid()}.json'), entries)
+
+
+def merge(snapshots, max_entries=None):
+    merged = {}
+    for entries in snapshots:
+        for key, entry in entries.items():
+            current = merged.get(key)
+            if current is None:
+                merged[key] = dict(entry)
+                continue
+            current['requests'] += entry['requests']
+            current['max_count'] = max(current['max_count'], entry['max_count'])
+            current['max_ms'] = max(current['max_ms'], entry['max_ms'])
+            if entry['last_seen'] > current['last_seen']:
+                current['last_seen'] = entry['last_seen']
+                current['location'] = entry['location']
+    if max_entries is not None and len(merged) > max_entries:
+        newest = sorted(merged, key=lambda k: merged[k]['last_seen'], reverse=True)[:max_entries]
+        merged = {key: merged[key] for key in newest}
+    return merged
+
+
+def report(directory):
+    """Findings of all workers, most recent first"""
+    paths = glob.glob(os.path.join(directory, 'querywatch-*.json'))
+    entries = merge(filter(None, (read_json(path) for path in paths)))
+    return sorted(entries.values(), key=lambda entry: entry['last_seen'], reverse=True)
+
+
+def mark_process_dead(directory, pid, max_entries=200):
+    """Fold an exited worker's findings into the archive; run only in the gunicorn master"""
+    path = os.path.join(directory, f'querywatch-{pid}.json')
+    entries = read_json(path)
+    if entries is None:
+        return
+    archive_path = os.path.join(directory, ARCHIVE_FILE)
+    write_json(archive_path, merge([read_json(archive_path) or {}, entries], max_entries))
+    os.remove(path)
+
+
+def _route():
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+def init_app(app, db):
+    app.config.setdefault('QUERYWATCH_ENABLED', True)
+    if not app.config['QUERYWATCH_ENABLED']:
+        return
+    slow_ms = app.config.get('SLOW_QUERY_MS', 200)
+    threshold = app.config.get('N_PLUS_ONE_THRESHOLD', 10)
+    root = os.path.abspath(app.root_path)
+    log = FindingLog(app.config['METRICS_DIR'], app.config.get('QUERYWATCH_MAX_FINDINGS', 200))
+    app.extensions['querywatch'] = log
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_querywatch_start', []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration_ms = (time.perf_counter() - conn.info['_querywatch_start'].pop()) * 1000
+        if not (has_request_context() and '_querywatch' in g):
+            return
+        sql = fingerprint(statement)
+        seen = g._querywatch.get(sql)
+        if seen is None:
+            seen = g._querywatch[sql] = [0, caller_location(root)]
+        seen[0] += 1
+
+        if duration_ms >= slow_ms:
+            location = caller_location(root)
+            count = _parameter_count(parameters, executemany)
+            app.logger.warning('Slow query %.0f ms on %s %s at %s (%d parameters): %s',
+                               duration_ms, request.method, _route(), location, count, sql)
+            log.record('slow', _route(), sql, location, duration_ms=duration_ms, parameters=count)
+
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+
+    @app.before_request
+    def start_query_watch():
+        g._querywatch = {}
+
+    @app.after_request
+    def report_repeated_queries(response):
+        for sql, (count, location) in g.pop('_querywatch', {}).items():
+            if count >= threshold:
+                app.logger.warning('N+1: %d x the same query on %s %s at %s: %s',
+                                   count, request.method, _route(), location, sql)
+                log.record('n+1', _route(), sql, location, count=count)
+        # Findings recorded within the last second are written by a later request
+        log.flush()
+        return response
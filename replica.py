@@ -0,0 +1,66 @@
+"""
+Route read-only views to a secondary database connection.
+
+Set ``READ_REPLICA_URL`` to a Postgres streaming replica, or to a read-only
+connection of the SQLite file (``sqlite:///file:/path/to/db.db?mode=ro&uri=true``),
+and views decorated with ``@read_replica`` run their queries there:
+
+    @app.route('/reports')
+    @login_required
+    @read_replica
+    def reports():
+        ...
+
+``with use_read_replica():`` does the same for part of a view. Report
+scans then use their own engine and pool and do not hold connections that
+payment inserts are waiting for. Flushes and insert()/update()/delete()
+statements always go to the primary; raw ``text()`` writes do not belong
+in these views. Without ``READ_REPLICA_URL`` every query uses the primary
+as before.
+"""
+from contextlib import contextmanager
+from functools import wraps
+
+import sqlalchemy as sa
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+
+READ_BIND = 'replica'
+
+
+def configure(config, engine_options):
+    """Add READ_REPLICA_URL to SQLALCHEMY_BINDS; call before creating the SQLAlchemy extension"""
+    binds = dict(config.get('SQLALCHEMY_BINDS') or {})
+    binds[READ_BIND] = dict(engine_options, url=config['READ_REPLICA_URL'])
+    config['SQLALCHEMY_BINDS'] = binds
+
+
+class RoutingSession(Session):
+    """Session that reads from the replica bind inside ``use_read_replica``"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing and not isinstance(clause, sa.UpdateBase)
+                and has_app_context() and g.get('_read_replica')):
+            engine = self._db.engines.get(READ_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@contextmanager
+def use_read_replica():
+    previous = g.get('_read_replica', False)
+    g._read_replica = True
+    try:
+        yield
+    finally:
+        g._read_replica = previous
+
+
+def read_replica(f):
+    """Run a read-only view against the replica bind, if one is configured"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        with use_read_replica():
+            return f(*args, **kwargs)
+    return decorated_function
@@ -0,0 +1,268 @@
+"""
+Fast Excel report writer.
+
+Reports are built as plain rows and written straight to SpreadsheetML in a
+single pass, without creating a cell object per value. The few styles a
+report uses are declared once as named styles in ``styles.xml`` and cells
+refer to them by index. Column widths are tracked as rows are added, so
+nothing has to walk the finished sheet again to autosize it.
+
+The output opens in Excel, LibreOffice and openpyxl like any other
+workbook; openpyxl is still used for imports and the styled backups.
+"""
+import io
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape, quoteattr
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+MAX_COLUMN_WIDTH = 50
+COLUMN_PADDING = 2
+
+# Style ids are indexes into cellXfs in STYLES_XML
+DEFAULT_STYLE = 0
+TITLE_STYLE = 1
+SECTION_STYLE = 2
+HEADER_STYLE = 3
+CELL_STYLE = 4
+
+# Characters XML 1.0 does not allow, even escaped
+_ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+CONTENT_TYPES_XML = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>
+{sheets}
+</Types>'''
+
+ROOT_RELS_XML = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>'''
+
+WORKBOOK_XML = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets>{sheets}</sheets>
+</workbook>'''
+
+WORKBOOK_RELS_XML = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+{sheets}
+<Relationship Id="rIdStyles" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+</Relationships>'''
+
+STYLES_XML = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<fonts count="4">
+<font><sz val="11"/><name val="Calibri"/><family val="2"/></font>
+<font><b/><sz val="16"/><color rgb="FF2F5F8F"/><name val="Calibri"/><family val="2"/></font>
+<font><b/><sz val="12"/><color rgb="FF2F5F8F"/><name val="Calibri"/><family val="2"/></font>
+<font><b/><sz val="14"/><color rgb="FFFFFFFF"/><name val="Calibri"/><family val="2"/></font>
+</fonts>
+<fills count="3">
+<fill><patternFill patternType="none"/></fill>
+<fill><patternFill patternType="gray125"/></fill>
+<fill><patternFill patternType="solid"><fgColor rgb="FF4472C4"/><bgColor rgb="FF4472C4"/></patternFill></fill>
+</fills>
+<borders count="2">
+<border><left/><right/><top/><bottom/><diagonal/></border>
+<border><left style="thin"/><right style="thin"/><top style="thin"/><bottom style="thin"/><diagonal/></border>
+</borders>
+<cellStyleXfs count="5">
+<xf numFmtId="0" fontId="0" fillId="0" borderId="0"/>
+<xf numFmtId="0" fontId="1" fillId="0" borderId="0" applyFont="1" applyAlignment="1"><alignment horizontal="center" vertical="center"/></xf>
+<xf numFmtId="0" fontId="2" fillId="0" borderId="0" applyFont="1"/>
+<xf numFmtId="0" fontId="3" fillId="2" borderId="1" applyFont="1" applyFill="1" applyBorder="1" applyAlignment="1"><alignment horizontal="center" vertical="center"/></xf>
+<xf numFmtId="0" fontId="0" fillId="0" borderId="1" applyBorder="1" applyAlignment="1"><alignment horizontal="center" vertical="center"/></xf>
+</cellStyleXfs>
+<cellXfs count="5">
+<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>
+<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="1" applyFont="1" applyAlignment="1"><alignment horizontal="center" vertical="center"/></xf>
+<xf numFmtId="0" fontId="2" fillId="0" borderId="0" xfId="2" applyFont="1"/>
+<xf numFmtId="0" fontId="3" fillId="2" borderId="1" xfId="3" applyFont="1" applyFill="1" applyBorder="1" applyAlignment="1"><alignment horizontal="center" vertical="center"/></xf>
+<xf numFmtId="0" fontId="0" fillId="0" borderId="1" xfId="4" applyBorder="1" applyAlignment="1"><alignment horizontal="center" vertical="center"/></xf>
+</cellXfs>
+<cellStyles count="5">
+<cellStyle name="Normal" xfId="0" builtinId="0"/>
+<cellStyle name="report_title" xfId="1"/>
+<cellStyle name="report_section" xfId="2"/>
+<cellStyle name="report_header" xfId="3"/>
+<cellStyle name="report_cell" xfId="4"/>
+</cellStyles>
+</styleSheet>'''
+
+
+def get_column_letter(index):
+    """Excel column name of a 1-based column index (1 -> A, 27 -> AA)"""
+    letters = ''
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _text(value):
+    if _ILLEGAL_XML_CHARS.search(value):
+        value = _ILLEGAL_XML_CHARS.sub('', value)
+    return escape(value)
+
+
+def _cell_xml(ref, value, style):
+    """SpreadsheetML for one cell; None values produce no cell"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return f'<c r="{ref}" s="{style}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f'<c r="{ref}" s="{style}"><v>{value}</v></c>'
+    if isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    elif not isinstance(value, str):
+        value = str(value)
+    return f'<c r="{ref}" s="{style}" t="inlineStr"><is><t xml:space="preserve">{_text(value)}</t></is></c>'
+
+
+class ReportSheet:
+    """Buffered rows of one worksheet with running column widths"""
+
+    def __init__(self, title, right_to_left=True):
+        self.title = title
+        self.right_to_left = right_to_left
+        self.rows = []
+        self.merges = []
+        self.widths = {}
+
+    def _track(self, values):
+        widths = self.widths
+        for col, value in enumerate(values, 1):
+            if value is None:
+                continue
+            length = len(value) if isinstance(value, str) else len(str(value))
+            if length > widths.get(col, 0):
+                widths[col] = length
+
+    def add_row(self, values, style=CELL_STYLE):
+        self.rows.append((style, values))
+        self._track(values)
+
+    def add_title(self, text, span):
+        """Title merged across ``span`` columns; not counted for column widths"""
+        self.rows.append((TITLE_STYLE, [text]))
+        row = len(self.rows)
+        self.merges.append(f'A{row}:{get_column_letter(span)}{row}')
+
+    def add_section(self, text):
+        self.rows.append((SECTION_STYLE, [text]))
+        self._track([text])
+
+    def add_table(self, headers, rows):
+        self.add_row(headers, HEADER_STYLE)
+        for values in rows:
+            self.add_row(values)
+
+    def add_blank(self, count=1):
+        for _ in range(count):
+            self.rows.append((DEFAULT_STYLE, []))
+
+    def column_widths(self):
+        return {
+            col: min(length + COLUMN_PADDING, MAX_COLUMN_WIDTH)
+            for col, length in sorted(self.widths.items())
+        }
+
+    def to_xml(self):
+        width = max(self.widths, default=1)
+        letters = [get_column_letter(col) for col in range(1, width + 1)]
+        direction = ' rightToLeft="1"' if self.right_to_left else ''
+        parts = [
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">',
+            f'<sheetViews><sheetView workbookViewId="0"{direction}/></sheetViews>',
+        ]
+
+        cols = self.column_widths()
+        if cols:
+            parts.append('<cols>')
+            parts.extend(
+                f'<col min="{col}" max="{col}" width="{size}" customWidth="1"/>'
+                for col, size in cols.items()
+            )
+            parts.append('</cols>')
+
+        parts.append('<sheetData>')
+        for number, (style, values) in enumerate(self.rows, 1):
+            if not values:
+                continue
+            while len(values) > len(letters):
+                letters.append(get_column_letter(len(letters) + 1))
+            cells = []
+            for index, value in enumerate(values):
+                # Plain strings and ints dominate reports, so they skip _cell_xml
+                kind = type(value)
+                if kind is str:
+                    cells.append(
+                        f'<c r="{letters[index]}{number}" s="{style}" t="inlineStr">'
+                        f'<is><t xml:space="preserve">{_text(value)}</t></is></c>'
+                    )
+                elif kind is int:
+                    cells.append(f'<c r="{letters[index]}{number}" s="{style}"><v>{value}</v></c>')
+                else:
+                    cells.append(_cell_xml(f'{letters[index]}{number}', value, style))
+            parts.append(f'<row r="{number}">{"".join(cells)}</row>')
+        parts.append('</sheetData>')
+
+        if self.merges:
+            parts.append(f'<mergeCells count="{len(self.merges)}">')
+            parts.extend(f'<mergeCell ref="{merge}"/>' for merge in self.merges)
+            parts.append('</mergeCells>')
+
+        parts.append('</worksheet>')
+        return ''.join(parts)
+
+
+class ReportWriter:
+    """Collects report sheets and saves them as a single .xlsx workbook"""
+
+    def __init__(self):
+        self.sheets = []
+
+    def add_sheet(self, title, right_to_left=True):
+        sheet = ReportSheet(title, right_to_left)
+        self.sheets.append(sheet)
+        return sheet
+
+    def save(self, fileobj):
+        numbers = range(1, len(self.sheets) + 1)
+        with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=6) as archive:
+            archive.writestr('[Content_Types].xml', CONTENT_TYPES_XML.format(sheets=''.join(
+                f'<Override PartName="/xl/worksheets/sheet{n}.xml" '
+                f'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                for n in numbers
+            )))
+            archive.writestr('_rels/.rels', ROOT_RELS_XML)
+            archive.writestr('xl/workbook.xml', WORKBOOK_XML.format(sheets=''.join(
+                f'<sheet name={quoteattr(sheet.title[:31])} sheetId="{n}" r:id="rId{n}"/>'
+                for n, sheet in zip(numbers, self.sheets)
+            )))
+            archive.writestr('xl/_rels/workbook.xml.rels', WORKBOOK_RELS_XML.format(sheets=''.join(
+                f'<Relationship Id="rId{n}" '
+                f'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+                f'Target="worksheets/sheet{n}.xml"/>'
+                for n in numbers
+            )))
+            archive.writestr('xl/styles.xml', STYLES_XML)
+            for n, sheet in zip(numbers, self.sheets):
+                archive.writestr(f'xl/worksheets/sheet{n}.xml', sheet.to_xml().encode('utf-8'))
+
+    def to_bytes(self):
+        """Saved workbook in a rewound BytesIO buffer"""
+        output = io.BytesIO()
+        self.save(output)
+        output.seek(0)
+        return output
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Latency and memory of the hot routes on a seeded dataset.
+
+Seeds a ``seed_data`` profile into a fresh SQLite file (or an empty
+database given with ``--database-url``), then requests each route through
+the test client as a browser would (gzip/br accepted, and compressed as
+in production, so ``bytes`` is the size on the wire): ``--warmup``
+untimed requests, ``--runs`` timed ones for p50/p95, and a few more under
+``tracemalloc`` for the peak Python memory a request allocates. Report
+files are generated anew every time (the report cache is emptied before
+each request) and fragment caching is off, so the numbers are the cost of
+the work and not of a cache hit.
+
+    python route_benchmark.py run --output benchmarks/before.json
+    # ... change the code ...
+    python route_benchmark.py run --compare benchmarks/before.json
+    python route_benchmark.py compare benchmarks/before.json benchmarks/after.json --threshold 0.2
+
+``compare`` (and ``run --compare``) exits with 1 when a route's p50, p95
+or peak memory grew by more than ``--threshold`` and by more than the
+noise floor (MIN_MS_DELTA, MIN_KIB_DELTA). The default threshold is 20%
+because p95 over 20 runs moves 10-15% between identical runs. Baselines
+are only comparable for the same profile, seed and machine.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime
+
+import seed_data
+from query_budgets import StatementCounter
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCHMARKS_DIR = os.path.join(BASE_DIR, 'benchmarks')
+
+# Differences smaller than these are noise, whatever the percentage
+MIN_MS_DELTA = 2.0
+MIN_KIB_DELTA = 256
+
+MEMORY_RUNS = 3
+HEADERS = {'Accept-Encoding': 'gzip, br'}
+
+
+def load_app(database_url, report_cache_dir):
+    os.environ['FLASK_CONFIG'] = 'testing'
+    os.environ['TEST_DATABASE_URL'] = database_url
+    os.environ['AUTO_INIT_DB'] = 'true'
+    os.environ['FRAGMENT_CACHE_ENABLED'] = 'false'
+    os.environ['METRICS_ENABLED'] = 'false'
+    os.environ['QUERYWATCH_ENABLED'] = 'false'
+    # Responses compressed as in production, so 'bytes' is what goes over the wire
+    os.environ['COMPRESS_ENABLED'] = 'true'
+    os.environ['REPORT_CACHE_DIR'] = report_cache_dir
+    sys.path.insert(0, BASE_DIR)
+    from app import app, db
+    return app, db
+
+
+def get_routes(db, instructor):
+    """(name, role, method, url, json body) of the benchmarked routes"""
+    from app import Group, Student
+    group = Group.query.filter_by(instructor_id=instructor.instructor_id).order_by(Group.id).first()
+    student_ids = [student.id for student in group.students.order_by(Student.id)]
+    attendance = {
+        'date': date.today().isoformat(),
+        'group_id': group.id,
+        'students': [{'student_id': student_id, 'status': 'حاضر'} for student_id in student_ids],
+    }
+    return [
+        ('/', 'admin', 'GET', '/', None),
+        ('/students', 'admin', 'GET', '/students', None),
+        ('/payments', 'admin', 'GET', '/payments', None),
+        ('/reports', 'admin', 'GET', '/reports', None),
+        ('/group_details/<id>', 'admin', 'GET', f'/group_details/{group.id}', None),
+        ('/instructor_dashboard', 'instructor', 'GET', '/instructor_dashboard', None),
+        ('/mark_attendance', 'admin', 'POST', '/mark_attendance', attendance),
+        ('/export_reports', 'admin', 'GET', '/export_reports', None),
+        ('/export_full_backup', 'admin', 'GET', '/export_full_backup', None),
+    ]
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def clear_directory(directory):
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+
+
+def request_once(client, method, url, body, report_cache_dir):
+    clear_directory(report_cache_dir)
+    response = client.open(url, method=method, json=body, headers=HEADERS)
+    size = len(response.get_data())
+    encoding = response.headers.get('Content-Encoding')
+    response.close()
+    return response.status_code, size, encoding
+
+
+def measure(client, counter, route, args, report_cache_dir):
+    name, role, method, url, body = route
+    for _ in range(args.warmup):
+        request_once(client, method, url, body, report_cache_dir)
+
+    timings = []
+    for _ in range(args.runs):
+        counter.count = 0
+        started = time.perf_counter()
+        status, size, encoding = request_once(client, method, url, body, report_cache_dir)
+        timings.append((time.perf_counter() - started) * 1000)
+    queries = counter.count
+
+    peak = 0
+    for _ in range(MEMORY_RUNS):
+        tracemalloc.start()
+        request_once(client, method, url, body, report_cache_dir)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    timings.sort()
+    return {
+        'role': role,
+        'status': status,
+        'p50_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(percentile(timings, 0.95), 2),
+        'max_ms': round(timings[-1], 2),
+        'peak_kib': round(peak / 1024),
+        'queries': queries,
+        'bytes': size,
+        'encoding': encoding,
+    }
+
+
+def run(args):
+    work_dir = tempfile.mkdtemp(prefix='route-benchmark-')
+    report_cache_dir = os.path.join(work_dir, 'report_cache')
+    os.makedirs(report_cache_dir)
+    database_url = args.database_url or f"sqlite:///{os.path.join(work_dir, 'benchmark.db')}"
+    try:
+        app, db = load_app(database_url, report_cache_dir)
+        from app import Student, User
+
+        with app.app_context():
+            if Student.query.first() is not None:
+                print('❌ The database already has students; benchmarks need an empty database to seed')
+                return 2
+            started = time.perf_counter()
+            counts = seed_data.seed(db, seed=args.seed, **seed_data.PROFILES[args.profile])
+            print(f"🌱 Seeded profile '{args.profile}' ({sum(counts.values())} rows) "
+                  f"in {time.perf_counter() - started:.1f}s")
+            instructor = User.query.filter_by(role='instructor').order_by(User.id).first()
+            routes = [route for route in get_routes(db, instructor) if not args.route or route[0] in args.route]
+            counter = StatementCounter(db.engine)
+            database = db.engine.dialect.name
+
+        clients = {'admin': app.test_client(), 'instructor': app.test_client()}
+        clients['admin'].post('/login', data={'username': 'araby', 'password': '92321066'})
+        clients['instructor'].post('/login', data={'username': instructor.username,
+                                                   'password': seed_data.INSTRUCTOR_PASSWORD})
+
+        results = {}
+        print(f"{'route':<24}{'p50 ms':>10}{'p95 ms':>10}{'peak KiB':>10}{'queries':>9}")
+        for route in routes:
+            result = measure(clients[route[1]], counter, route, args, report_cache_dir)
+            results[route[0]] = result
+            flag = '' if result['status'] < 400 else f"  ⚠️ status {result['status']}"
+            print(f"{route[0]:<24}{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}"
+                  f"{result['peak_kib']:>10}{result['queries']:>9}{flag}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        'profile': args.profile,
+        'seed': args.seed,
+        'runs': args.runs,
+        'database': database,
+        'dataset': counts,
+        'python': platform.python_version(),
+        'machine': platform.node(),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'routes': results,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"✅ Results written to {args.output}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            return compare_reports(json.load(f), report, args.threshold)
+    return 0
+
+
+def regression(old, new, threshold, floor):
+    return new > old * (1 + threshold) and new - old > floor
+
+
+def compare_reports(baseline, current, threshold):
+    """Print both runs side by side; returns 1 if any route regressed"""
+    if (baseline['profile'], baseline['seed']) != (current['profile'], current['seed']):
+        print(f"❌ Different datasets: baseline is profile '{baseline['profile']}' seed {baseline['seed']}, "
+              f"current is profile '{current['profile']}' seed {current['seed']}")
+        return 2
+    if baseline.get('machine') != current.get('machine'):
+        print(f"⚠️ Baseline was measured on {baseline.get('machine')}, this run on {current.get('machine')}")
+
+    regressions = 0
+    print(f"{'route':<24}{'p50 ms':>18}{'p95 ms':>18}{'peak KiB':>18}")
+    for name, new in current['routes'].items():
+        old = baseline['routes'].get(name)
+        if old is None:
+            print(f"➕ {name:<22} not in the baseline")
+            continue
+        problems = [
+            regression(old['p50_ms'], new['p50_ms'], threshold, MIN_MS_DELTA),
+            regression(old['p95_ms'], new['p95_ms'], threshold, MIN_MS_DELTA),
+            regression(old['peak_kib'], new['peak_kib'], threshold, MIN_KIB_DELTA),
+        ]
+        regressions += any(problems)
+        cells = ''.join(f"{f'{old[key]:.0f} → {new[key]:.0f}':>18}" for key in ('p50_ms', 'p95_ms', 'peak_kib'))
+        print(f"{'❌' if any(problems) else '✅'} {name:<22}{cells}")
+
+    if regressions:
+        print(f"❌ {regressions} routes regressed by more than {threshold:.0%}")
+        return 1
+    print(f"✅ No route regressed by more than {threshold:.0%}")
+    return 0
+
+
+def compare(args):
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, encoding='utf-8') as f:
+        current = json.load(f)
+    return compare_reports(baseline, current, args.threshold)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark latency and memory of the hot routes')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Seed a dataset and measure every route')
+    run_parser.add_argument('--profile', choices=sorted(seed_data.PROFILES), default='center',
+                            help='seed_data profile (default: center)')
+    run_parser.add_argument('--seed', type=int, default=1, help='Data generator seed')
+    run_parser.add_argument('--runs', type=int, default=20, help='Timed requests per route')
+    run_parser.add_argument('--warmup', type=int, default=2, help='Untimed requests per route first')
+    run_parser.add_argument('--route', action='append', help='Only this route (repeatable), e.g. /payments')
+    run_parser.add_argument('--database-url', help='Empty database to seed instead of a temporary SQLite file')
+    run_parser.add_argument('--output', help=f'Write the results as JSON, e.g. {os.path.relpath(BENCHMARKS_DIR)}/before.json')
+    run_parser.add_argument('--compare', help='Baseline JSON to compare the results with')
+    run_parser.add_argument('--threshold', type=float, default=0.20, help='Allowed growth (0.20 = 20%%)')
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser('compare', help='Compare two result files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.20, help='Allowed growth (0.20 = 20%%)')
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
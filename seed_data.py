@@ -0,0 +1,295 @@
+"""
+Deterministic demo data for benchmarks and the query budget check.
+
+``seed(db, seed=1, **sizes)`` fills an empty database with instructors
+(each with an instructor login), groups with weekly schedules, students
+enrolled in one to three groups, payments that match ``total_paid``,
+expenses, attendance on the scheduled days, tasks and notes. The same seed
+always produces the same rows (dates are relative to today), so query
+counts and timings measured on it can be compared between runs.
+
+``PROFILES`` names the sizes used for benchmarks (``flask seed-data
+--profile center``): a small center, one our size with a year of
+attendance, and ten times our size with two years (about a million
+attendance rows). Sizes not given fall back to ``DEFAULT_SIZES``, the
+dataset of query_budgets.py.
+
+Rows are written with bulk ``insert()`` statements and explicit ids rather
+than one ORM object at a time. Attendance, the only table that reaches a
+million rows, is generated lazily and loaded ``BATCH_SIZE`` rows at a time
+by ``_bulk_load``.
+"""
+import random
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+from werkzeug.security import generate_password_hash
+
+from backup import reset_sequences
+
+FIRST_NAMES = [
+    'محمد', 'أحمد', 'محمود', 'مصطفى', 'عمر', 'علي', 'يوسف', 'كريم', 'خالد', 'إبراهيم',
+    'حسن', 'حسين', 'طارق', 'ياسين', 'آدم', 'مريم', 'فاطمة', 'نور', 'سلمى', 'هبة',
+    'آية', 'رحمة', 'منة', 'ملك', 'جنى', 'سارة', 'ندى', 'دينا', 'ريم', 'شهد'
+]
+LAST_NAMES = [
+    'العربي', 'السيد', 'عبد الله', 'حسن', 'إبراهيم', 'الشافعي', 'منصور', 'عبد الرحمن', 'سالم',
+    'فؤاد', 'الجمال', 'النجار', 'الحداد', 'عثمان', 'رمضان', 'شحاتة', 'عبد العزيز', 'زكي'
+]
+LOCATIONS = ['المنصورة', 'طلخا', 'ميت غمر', 'السنبلاوين', 'دكرنس', 'شربين', 'بلقاس', 'أجا']
+SPECIALIZATIONS = ['لغة إنجليزية', 'رياضيات', 'فيزياء', 'كيمياء', 'برمجة', 'لغة عربية']
+LEVELS = ['مبتدئ', 'متوسط', 'متقدم']
+GROUP_PRICES = [250, 300, 350, 400, 450, 500]
+# Arabic day names as stored in Schedule.day_of_week, by date.weekday()
+WEEKDAYS = ['الاثنين', 'الثلاثاء', 'الأربعاء', 'الخميس', 'الجمعة', 'السبت', 'الأحد']
+TEACHING_DAYS = ['السبت', 'الأحد', 'الاثنين', 'الثلاثاء', 'الأربعاء', 'الخميس']
+START_TIMES = ['10:00', '12:00', '14:00', '16:00', '18:00', '20:00']
+EXPENSE_CATEGORIES = ['رواتب', 'إيجار', 'مرافق', 'مستلزمات', 'أخرى']
+ATTENDANCE_STATUSES = ['حاضر'] * 7 + ['غائب'] * 2 + ['متأخر']
+MONTHS = ['يناير', 'فبراير', 'مارس', 'أبريل', 'مايو', 'يونيو', 'يوليو',
+          'أغسطس', 'سبتمبر', 'أكتوبر', 'نوفمبر', 'ديسمبر']
+
+DEFAULT_SIZES = {
+    'instructors': 6,
+    'groups': 24,
+    'students': 200,
+    'payments_per_student': 3,
+    'expenses': 60,
+    'attendance_days': 30,
+    'tasks': 20,
+    'notes': 20,
+}
+
+PROFILES = {
+    'small': {'instructors': 3, 'groups': 10, 'students': 80, 'expenses': 30,
+              'attendance_days': 90, 'tasks': 10, 'notes': 10},
+    'center': {'instructors': 10, 'groups': 30, 'students': 300, 'expenses': 200,
+               'attendance_days': 365, 'tasks': 40, 'notes': 40},
+    'x10': {'instructors': 100, 'groups': 300, 'students': 3000, 'expenses': 2000,
+            'attendance_days': 730, 'tasks': 400, 'notes': 400},
+}
+
+BATCH_SIZE = 50000
+
+# Every seeded instructor login uses this password
+INSTRUCTOR_PASSWORD = 'instructor123'
+
+
+def _person_name(rng):
+    return f'{rng.choice(FIRST_NAMES)} {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+
+
+def _phone(rng):
+    return '01' + rng.choice('0125') + ''.join(rng.choice('0123456789') for _ in range(8))
+
+
+def _insert(db, model, rows):
+    if rows:
+        db.session.execute(model.__table__.insert(), rows)
+
+
+def _batches(rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _cached(processor):
+    if processor is None:
+        return lambda value: value
+    # Dates and timestamps repeat on every row of a day
+    return lru_cache(maxsize=4096)(processor)
+
+
+def _bulk_load(db, model, columns, rows):
+    """Insert an iterable of value tuples straight through the DBAPI cursor.
+
+    For the million-row tables: SQLAlchemy's per-row parameter handling is
+    skipped (values still go through the column types' bind processors,
+    cached per distinct value) and the table's indexes are dropped during
+    the load and built once afterwards. Returns the row count.
+    """
+    table = model.__table__
+    connection = db.session.connection()
+    dialect = connection.dialect
+    compiled = table.insert().compile(dialect=dialect, column_keys=list(columns))
+    processors = [_cached(table.c[name].type.dialect_impl(dialect).bind_processor(dialect))
+                  for name in columns]
+    if compiled.positional:
+        order = [columns.index(name) for name in compiled.positiontup]
+
+        def parameters(row):
+            return tuple(processors[i](row[i]) for i in order)
+    else:
+        def parameters(row):
+            return {name: processors[i](row[i]) for i, name in enumerate(columns)}
+
+    indexes = sorted(table.indexes, key=lambda index: index.name)
+    for index in indexes:
+        index.drop(connection, checkfirst=True)
+    total = 0
+    cursor = connection.connection.cursor()
+    try:
+        for batch in _batches(rows):
+            cursor.executemany(compiled.string, [parameters(row) for row in batch])
+            total += len(batch)
+    finally:
+        cursor.close()
+    for index in indexes:
+        index.create(connection, checkfirst=True)
+    return total
+
+
+def _next_id(db, model):
+    return (db.session.query(db.func.max(model.id)).scalar() or 0) + 1
+
+
+def seed(db, seed=1, **sizes):
+    """Add a demo dataset; returns the number of rows written per table"""
+    from app import (Attendance, Expense, Group, Instructor, InstructorNote, InstructorTodo,
+                     Note, Payment, Schedule, Student, Task, User, student_groups)
+    from versioning import bump_all_versions
+
+    sizes = {**DEFAULT_SIZES, **sizes}
+    rng = random.Random(seed)
+    today = date.today()
+    now = datetime.now().replace(microsecond=0)
+    # Students registered and paid over the same span the attendance covers
+    history_days = max(365, sizes['attendance_days'])
+    # updated_at feeds the change feed watermark, which is in UTC
+    updated_at = datetime.utcnow().replace(microsecond=0)
+    counts = {}
+
+    # Instructors and their logins
+    first_instructor = _next_id(db, Instructor)
+    first_user = _next_id(db, User)
+    password_hash = generate_password_hash(INSTRUCTOR_PASSWORD)
+    instructors, users = [], []
+    for i in range(sizes['instructors']):
+        instructor_id = first_instructor + i
+        instructors.append({'id': instructor_id, 'name': _person_name(rng), 'phone': _phone(rng),
+                            'specialization': SPECIALIZATIONS[i % len(SPECIALIZATIONS)]})
+        users.append({'id': first_user + i, 'username': f'instructor{instructor_id}',
+                      'password_hash': password_hash, 'full_name': instructors[-1]['name'],
+                      'role': 'instructor', 'instructor_id': instructor_id, 'created_at': now})
+    _insert(db, Instructor, instructors)
+    _insert(db, User, users)
+    instructor_ids = [row['id'] for row in instructors]
+    user_ids = [row['id'] for row in users]
+
+    # Groups with one to three weekly lessons
+    first_group = _next_id(db, Group)
+    groups, schedules, group_days = [], [], {}
+    for i in range(sizes['groups']):
+        group_id = first_group + i
+        specialization = SPECIALIZATIONS[i % len(SPECIALIZATIONS)]
+        groups.append({'id': group_id, 'name': f'{specialization} {i + 1}', 'level': rng.choice(LEVELS),
+                       'instructor_id': instructor_ids[i % len(instructor_ids)],
+                       'max_students': rng.choice([10, 15, 20]), 'price': rng.choice(GROUP_PRICES),
+                       'status': 'active'})
+        days = rng.sample(TEACHING_DAYS, rng.randint(1, 3))
+        group_days[group_id] = set(days)
+        start = rng.choice(START_TIMES)
+        end = f'{int(start[:2]) + 2:02d}:00'
+        for day in days:
+            schedules.append({'group_id': group_id, 'day_of_week': day, 'start_time': start, 'end_time': end})
+    _insert(db, Group, groups)
+    _insert(db, Schedule, schedules)
+    prices = {row['id']: row['price'] for row in groups}
+    group_ids = list(prices)
+
+    # Students in one to three groups, with payments adding up to total_paid
+    first_student = _next_id(db, Student)
+    students, memberships, payments = [], [], []
+    members = {group_id: [] for group_id in group_ids}
+    for i in range(sizes['students']):
+        student_id = first_student + i
+        enrolled = rng.sample(group_ids, min(len(group_ids), rng.choice([1, 1, 1, 2, 2, 3])))
+        course_price = sum(prices[group_id] for group_id in enrolled)
+        discount = rng.choice([0, 0, 0, 25, 50])
+        registered = now - timedelta(days=rng.randint(0, history_days))
+        paid = 0
+        for _ in range(rng.randint(0, sizes['payments_per_student'] * 2)):
+            remaining = course_price - discount - paid
+            if remaining <= 0:
+                break
+            amount = min(remaining, rng.choice([50, 100, 150, 200, 250]))
+            paid_at = registered + timedelta(days=rng.randint(0, max(1, (now - registered).days)))
+            payments.append({'student_id': student_id, 'amount': amount, 'date': paid_at,
+                             'month': MONTHS[paid_at.month - 1], 'notes': None})
+            paid += amount
+        students.append({'id': student_id, 'name': _person_name(rng), 'phone': _phone(rng),
+                         'age': rng.randint(8, 30), 'location': rng.choice(LOCATIONS),
+                         'instructor_id': instructor_ids[i % len(instructor_ids)],
+                         'total_paid': paid, 'discount': discount, 'registration_date': registered})
+        for group_id in enrolled:
+            memberships.append({'student_id': student_id, 'group_id': group_id})
+            members[group_id].append(student_id)
+    _insert(db, Student, students)
+    db.session.execute(student_groups.insert(), memberships)
+    _insert(db, Payment, payments)
+
+    expenses = [{'description': f'{rng.choice(EXPENSE_CATEGORIES)} {i + 1}',
+                 'amount': rng.choice([100, 250, 500, 1000, 2500]),
+                 'category': rng.choice(EXPENSE_CATEGORIES),
+                 'date': now - timedelta(days=rng.randint(0, history_days)), 'notes': None}
+                for i in range(sizes['expenses'])]
+    _insert(db, Expense, expenses)
+
+    # Attendance for every lesson day of the last attendance_days days
+    def attendance_rows():
+        for offset in range(sizes['attendance_days']):
+            day = today - timedelta(days=offset)
+            day_name = WEEKDAYS[day.weekday()]
+            for group_id, days in group_days.items():
+                if day_name in days:
+                    for student_id in members[group_id]:
+                        yield student_id, group_id, day, rng.choice(ATTENDANCE_STATUSES), updated_at
+    attendance_count = _bulk_load(db, Attendance, ('student_id', 'group_id', 'date', 'status', 'updated_at'),
+                                  attendance_rows())
+
+    admin_id = db.session.query(User.id).filter_by(role='admin').order_by(User.id).scalar()
+    tasks = [{'title': f'مهمة {i + 1}', 'description': None,
+              'priority': rng.choice(['عالي', 'متوسط', 'منخفض']),
+              'status': rng.choice(['قيد التنفيذ', 'مكتمل']), 'due_date': today + timedelta(days=rng.randint(-10, 30)),
+              'created_at': now, 'created_by': admin_id, 'assigned_to': rng.choice(user_ids)}
+             for i in range(sizes['tasks'])]
+    _insert(db, Task, tasks)
+
+    notes = [{'title': f'ملاحظة {i + 1}', 'content': 'ملاحظة تجريبية', 'created_at': now, 'created_by': admin_id}
+             for i in range(sizes['notes'])]
+    _insert(db, Note, notes)
+    instructor_notes, todos = [], []
+    for i in range(sizes['notes']):
+        user_id = user_ids[i % len(user_ids)]
+        instructor_notes.append({'title': f'ملاحظة مدرس {i + 1}', 'content': 'ملاحظة من المدرس',
+                                 'student_id': first_student + rng.randrange(len(students)) if students else None,
+                                 'priority': 'متوسط', 'status': rng.choice(['جديد', 'مكتمل']),
+                                 'created_at': now, 'created_by': user_id})
+        todos.append({'title': f'مهمة مدرس {i + 1}', 'status': rng.choice(['مفتوح', 'مكتمل']),
+                      'priority': 'متوسط', 'category': 'عام', 'group_id': rng.choice(group_ids) if group_ids else None,
+                      'due_date': today + timedelta(days=rng.randint(0, 14)), 'created_at': now,
+                      'created_by': user_id})
+    _insert(db, InstructorNote, instructor_notes)
+    _insert(db, InstructorTodo, todos)
+
+    # Rows were written with explicit ids
+    reset_sequences(db.session.connection(), [model.__table__ for model in (
+        Instructor, User, Group, Schedule, Student, Payment, Expense, Attendance,
+        Task, Note, InstructorNote, InstructorTodo)])
+    db.session.commit()
+    # Bulk inserts skip the ORM flush hooks that bump the cache versions
+    bump_all_versions(db)
+
+    counts.update({
+        'instructor': len(instructors), 'user': len(users), 'group': len(groups), 'schedule': len(schedules),
+        'student': len(students), 'student_groups': len(memberships), 'payment': len(payments),
+        'expense': len(expenses), 'attendance': attendance_count, 'task': len(tasks),
+        'note': len(notes), 'instructor_note': len(instructor_notes), 'instructor_todo': len(todos),
+    })
+    return counts
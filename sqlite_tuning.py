@@ -0,0 +1,210 @@
+"""
+SQLite settings for running under several worker processes.
+
+``engine_options(config)`` adapts the pool settings (pool_sizing.py) to
+SQLite: database files keep their pool but lose pre-ping and recycling,
+there is no server to drop connections, and in-memory databases, which
+only exist inside one connection, get a ``StaticPool``.
+
+``init_app(app, db)`` applies the pragma profile (``DEFAULT_PRAGMAS``
+updated with ``SQLITE_PRAGMAS`` from config.py) to every new connection.
+WAL lets readers run while a worker writes, ``busy_timeout`` makes a
+writer wait for the lock instead of failing at once, and
+``synchronous=NORMAL`` is safe with WAL while avoiding an fsync per commit.
+
+A write that still times out raises ``database is locked``. ``retry_writes``
+wraps the POST/PUT/PATCH/DELETE views so such a request is rolled back and
+run again with exponential backoff, as long as the view has not committed
+yet: replaying a view after its first commit would write that part twice,
+so the error is raised instead. Views that catch the error themselves
+keep their own handling. Each worker counts its retries, the requests that
+failed after the last one and the time spent backing off (``lock_stats``,
+reported by ``/health/ready``).
+"""
+import random
+import sqlite3
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import QueuePool, StaticPool
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,         # ms
+    'cache_size': -20000,         # negative = KiB, so 20 MB per connection
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+    # Off until the delete routes clean up tasks, notes and todos that point
+    # at the deleted user/group; enable with SQLITE_PRAGMAS={'foreign_keys': 'ON'}
+    'foreign_keys': 'OFF'
+}
+
+WRITE_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+# Pool arguments that only make sense for a database server
+_SERVER_POOL_OPTIONS = ('pool_pre_ping', 'pool_recycle')
+# Pool arguments a StaticPool doesn't take
+_QUEUE_POOL_OPTIONS = ('poolclass', 'pool_timeout', 'pool_size', 'max_overflow')
+
+
+def is_sqlite(uri):
+    return uri.startswith('sqlite')
+
+
+def _is_memory(uri):
+    return uri in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in uri
+
+
+def pragma_profile(config):
+    """DEFAULT_PRAGMAS with the SQLITE_PRAGMAS overrides applied"""
+    return {**DEFAULT_PRAGMAS, **config.get('SQLITE_PRAGMAS', {})}
+
+
+def engine_options(config, uri=None):
+    """SQLALCHEMY_ENGINE_OPTIONS adjusted for ``uri`` (default: the primary database)"""
+    uri = uri or config['SQLALCHEMY_DATABASE_URI']
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    if not is_sqlite(uri):
+        return options
+
+    for key in _SERVER_POOL_OPTIONS:
+        options.pop(key, None)
+    connect_args = dict(options.get('connect_args', {}))
+    if _is_memory(uri):
+        # One shared connection, or every checkout would see an empty database
+        for key in _QUEUE_POOL_OPTIONS:
+            options.pop(key, None)
+        options['poolclass'] = StaticPool
+        connect_args['check_same_thread'] = False
+    else:
+        # SQLAlchemy 2 defaults file databases to QueuePool as well
+        options.setdefault('poolclass', QueuePool)
+        # busy_timeout is applied as a pragma; this is the driver-level equivalent
+        connect_args['timeout'] = pragma_profile(config)['busy_timeout'] / 1000
+    options['connect_args'] = connect_args
+    return options
+
+
+def apply_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+
+def _pragma_listener(pragmas):
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        apply_pragmas(dbapi_connection, pragmas)
+    return set_sqlite_pragmas
+
+
+def is_lock_error(error):
+    original = getattr(error, 'orig', error)
+    if not isinstance(original, sqlite3.OperationalError):
+        return False
+    message = str(original).lower()
+    return 'locked' in message or 'busy' in message
+
+
+class LockStats:
+    """Lock retries of one worker process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.failures = 0
+        self.wait_seconds = 0.0
+
+    def record_retry(self, delay):
+        with self._lock:
+            self.retries += 1
+            self.wait_seconds += delay
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {'retries': self.retries, 'failures': self.failures,
+                    'wait_seconds': round(self.wait_seconds, 3)}
+
+
+def lock_stats(app):
+    """This worker's lock retries, or None when no SQLite engine is configured"""
+    stats = app.extensions.get('sqlite_locks')
+    return stats.snapshot() if stats is not None else None
+
+
+def _mark_committed(session):
+    if has_app_context():
+        g._view_committed = True
+
+
+def retry_on_lock(db, attempts=3, base_delay=0.05):
+    """Re-run a view whose write transaction hit ``database is locked``, unless it already committed"""
+    if not event.contains(db.session, 'after_commit', _mark_committed):
+        event.listen(db.session, 'after_commit', _mark_committed)
+
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            # Commits of before_request hooks don't count, only the view's own
+            g._view_committed = False
+            for attempt in range(attempts + 1):
+                try:
+                    return f(*args, **kwargs)
+                except OperationalError as e:
+                    # Uploaded files have been consumed, and a committed part would be written
+                    # twice, so those requests can't be replayed
+                    if (attempt == attempts or not is_lock_error(e) or request.files
+                            or g._view_committed):
+                        if is_lock_error(e) and 'sqlite_locks' in current_app.extensions:
+                            current_app.extensions['sqlite_locks'].record_failure()
+                        raise
+                    db.session.rollback()
+                    # Counted by load_test.py; a failed last attempt is logged as the exception
+                    current_app.logger.warning('database is locked on %s %s, retry %d of %d',
+                                               request.method, request.path, attempt + 1, attempts)
+                    delay = base_delay * 2 ** attempt * (1 + random.random())
+                    if 'sqlite_locks' in current_app.extensions:
+                        current_app.extensions['sqlite_locks'].record_retry(delay)
+                    time.sleep(delay)
+        return decorated_function
+    return decorator
+
+
+def retry_writes(app, db):
+    """Wrap every view that accepts a write method with ``retry_on_lock``"""
+    if not is_sqlite(app.config['SQLALCHEMY_DATABASE_URI']):
+        return
+    decorator = retry_on_lock(db, app.config['SQLITE_LOCK_RETRIES'], app.config['SQLITE_LOCK_RETRY_DELAY'])
+    wrapped = set()
+    for rule in app.url_map.iter_rules():
+        if rule.methods & WRITE_METHODS and rule.endpoint not in wrapped:
+            app.view_functions[rule.endpoint] = decorator(app.view_functions[rule.endpoint])
+            wrapped.add(rule.endpoint)
+
+
+def init_app(app, db):
+    """Apply the pragma profile to each new connection of every SQLite engine"""
+    app.config.setdefault('SQLITE_LOCK_RETRIES', 3)
+    app.config.setdefault('SQLITE_LOCK_RETRY_DELAY', 0.05)
+
+    with app.app_context():
+        engines = [engine for engine in db.engines.values() if engine.dialect.name == 'sqlite']
+    if engines:
+        app.extensions['sqlite_locks'] = LockStats()
+    for engine in engines:
+        pragmas = pragma_profile(app.config)
+        if engine.url.query.get('mode') == 'ro':
+            # Read-only connections can't change the journal mode; the writer set it
+            pragmas.pop('journal_mode')
+        event.listen(engine, 'connect', _pragma_listener(pragmas))
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Measure how long a fresh worker takes to import the application.
+
+Every gunicorn worker recycled by --max-requests (or any worker without
+--preload) pays this cost before it can serve a request. Each run is a new
+interpreter, like a new worker:
+
+    python startup_benchmark.py              # AUTO_INIT_DB on and off
+    python startup_benchmark.py --runs 20 --config pythonanywhere
+
+The database is initialized once beforehand, so the numbers show the cost
+of booting against an existing database, which is what a restart sees.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PROBE = '''
+import sys, time
+started = time.perf_counter()
+import app
+elapsed = time.perf_counter() - started
+print(f"{elapsed:.6f} {int('openpyxl' in sys.modules)}")
+'''
+
+
+def run_probe(env):
+    output = subprocess.run([sys.executable, '-c', PROBE], cwd=BASE_DIR, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    # The app prints status lines while importing; the timing is the last line
+    elapsed, openpyxl_loaded = output.strip().splitlines()[-1].split()
+    return float(elapsed), openpyxl_loaded == '1'
+
+
+def benchmark(label, env, runs):
+    timings = []
+    openpyxl_loaded = False
+    for _ in range(runs):
+        elapsed, loaded = run_probe(env)
+        timings.append(elapsed * 1000)
+        openpyxl_loaded = openpyxl_loaded or loaded
+    timings.sort()
+    p90 = timings[min(len(timings) - 1, int(len(timings) * 0.9))]
+    print(f"{label:<28} median {statistics.median(timings):7.1f} ms   p90 {p90:7.1f} ms   "
+          f"max {timings[-1]:7.1f} ms   openpyxl loaded: {'yes' if openpyxl_loaded else 'no'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark application import (worker boot) time')
+    parser.add_argument('--runs', type=int, default=10, help='Fresh interpreters per mode')
+    parser.add_argument('--config', default=os.environ.get('FLASK_CONFIG', 'development'),
+                        help='FLASK_CONFIG to boot with')
+    args = parser.parse_args()
+
+    env = dict(os.environ, FLASK_CONFIG=args.config)
+    print(f"⏱️ Worker boot time, FLASK_CONFIG={args.config}, {args.runs} runs per mode")
+
+    # Make sure the schema exists so both modes boot against the same database
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'app', 'init-db'], cwd=BASE_DIR,
+                   env=dict(env, AUTO_INIT_DB='false'), capture_output=True, check=True)
+
+    benchmark('AUTO_INIT_DB=true', dict(env, AUTO_INIT_DB='true'), args.runs)
+    benchmark('AUTO_INIT_DB=false', dict(env, AUTO_INIT_DB='false'), args.runs)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
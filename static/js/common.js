@@ -148,6 +148,37 @@ function showError(title, message) {
   }
 }
 
+// JSON fetch with ETag revalidation.
+// The last response of each URL is kept in memory and the request carries
+// If-None-Match, so the server can answer 304 without rebuilding the data.
+const jsonResponseCache = new Map();
+
+function fetchJSON(url, options = {}) {
+  const cached = jsonResponseCache.get(url);
+  const headers = new Headers(options.headers || {});
+  if (cached) {
+    headers.set("If-None-Match", cached.etag);
+  }
+
+  // The browser cache is bypassed so a 304 reaches this code instead of being resolved internally
+  return fetch(url, { ...options, headers: headers, cache: "no-store" }).then(
+    (response) => {
+      if (response.status === 304 && cached) {
+        return cached.data;
+      }
+      return response.json().then((data) => {
+        const etag = response.headers.get("ETag");
+        if (response.ok && etag) {
+          jsonResponseCache.set(url, { etag: etag, data: data });
+        } else {
+          jsonResponseCache.delete(url);
+        }
+        return data;
+      });
+    }
+  );
+}
+
 // Debug function to test if everything is working
 function testDeleteFunctions() {
   console.log("Testing delete functions...");
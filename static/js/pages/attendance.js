@@ -0,0 +1,312 @@
+let currentStudents = [];
+
+// Modern Toast Notification
+const Toast = Swal.mixin({
+    toast: true,
+    position: 'top-end',
+    showConfirmButton: false,
+    timer: 3000,
+    timerProgressBar: true,
+    didOpen: (toast) => {
+        toast.addEventListener('mouseenter', Swal.stopTimer)
+        toast.addEventListener('mouseleave', Swal.resumeTimer)
+    }
+});
+
+function showLoader(elementId, show = true) {
+    const spinner = document.getElementById(elementId);
+    if (spinner) {
+        spinner.style.display = show ? 'inline-block' : 'none';
+    }
+}
+
+function loadStudents() {
+    const groupId = document.getElementById('groupSelect').value;
+    const groupSelect = document.getElementById('groupSelect');
+    const selectedOption = groupSelect.options[groupSelect.selectedIndex];
+
+    if (!groupId) {
+        Swal.fire({
+            icon: 'warning',
+            title: 'تنبيه',
+            text: 'يرجى اختيار المجموعة أولاً',
+            confirmButtonText: 'موافق'
+        });
+        return;
+    }
+
+    showLoader('loadingSpinner', true);
+
+    fetchJSON(`/get_group_students/${groupId}`)
+        .then(students => {
+            showLoader('loadingSpinner', false);
+            currentStudents = students;
+
+            const container = document.getElementById('studentsContainer');
+            const studentsList = document.getElementById('studentsList');
+            const groupInfo = document.getElementById('groupInfo');
+            const saveButtonContainer = document.getElementById('saveButtonContainer');
+
+            // Update group info
+            const groupName = selectedOption.text;
+            groupInfo.textContent = `${groupName} (${students.length} طالب)`;
+
+            if (students.length === 0) {
+                studentsList.innerHTML = `
+                    <div class="empty-state">
+                        <i class="fas fa-user-slash"></i>
+                        <h5>لا توجد طلاب في هذه المجموعة</h5>
+                        <p>يمكنك إضافة طلاب جدد من صفحة إدارة الطلاب</p>
+                    </div>
+                `;
+                saveButtonContainer.style.display = 'none';
+                container.style.display = 'block';
+                return;
+            }
+
+            renderStudentsList(students);
+            updateStats();
+            saveButtonContainer.style.display = 'block';
+            container.style.display = 'block';
+            container.classList.add('fade-in-up');
+
+            Toast.fire({
+                icon: 'success',
+                title: `تم تحميل ${students.length} طالب بنجاح`
+            });
+        })
+        .catch(error => {
+            showLoader('loadingSpinner', false);
+            console.error('Error:', error);
+            Swal.fire({
+                icon: 'error',
+                title: 'خطأ',
+                text: 'حدث خطأ في تحميل الطلاب',
+                confirmButtonText: 'موافق'
+            });
+        });
+}
+
+function renderStudentsList(students) {
+    const studentsList = document.getElementById('studentsList');
+    let html = '';
+
+    students.forEach((student, index) => {
+        const avatar = student.name.charAt(0).toUpperCase();
+        html += `
+            <div class="student-card" data-student-id="${student.id}" style="animation-delay: ${index * 0.1}s">
+                <div class="row align-items-center">
+                    <div class="col-md-6">
+                        <div class="d-flex align-items-center">
+                            <div class="student-avatar">${avatar}</div>
+                            <div>
+                                <h6 class="mb-1 fw-bold">${student.name}</h6>
+                                <small class="text-muted">الطالب #${student.id}</small>
+                            </div>
+                        </div>
+                    </div>
+                    <div class="col-md-6">
+                        <div class="attendance-buttons">
+                            <button class="attendance-btn present active" 
+                                    onclick="markAttendance(${student.id}, 'حاضر', this)"
+                                    data-status="حاضر">
+                                <i class="fas fa-check"></i>
+                                حاضر
+                            </button>
+                            <button class="attendance-btn absent" 
+                                    onclick="markAttendance(${student.id}, 'غائب', this)"
+                                    data-status="غائب">
+                                <i class="fas fa-times"></i>
+                                غائب
+                            </button>
+                            <button class="attendance-btn late" 
+                                    onclick="markAttendance(${student.id}, 'متأخر', this)"
+                                    data-status="متأخر">
+                                <i class="fas fa-clock"></i>
+                                متأخر
+                            </button>
+                        </div>
+                    </div>
+                </div>
+            </div>
+        `;
+    });
+
+    studentsList.innerHTML = html;
+}
+
+function markAttendance(studentId, status, buttonElement) {
+    // Remove active class from all buttons in this student's row
+    const studentCard = buttonElement.closest('.student-card');
+    const allButtons = studentCard.querySelectorAll('.attendance-btn');
+    allButtons.forEach(btn => btn.classList.remove('active'));
+
+    // Add active class to clicked button
+    buttonElement.classList.add('active');
+
+    // Update student card background
+    studentCard.className = 'student-card ' + (status === 'حاضر' ? 'present' : status === 'غائب' ? 'absent' : 'late');
+
+    // Update stats
+    updateStats();
+
+    // Visual feedback
+    buttonElement.style.transform = 'scale(0.95)';
+    setTimeout(() => {
+        buttonElement.style.transform = '';
+    }, 150);
+}
+
+function markAllAs(status) {
+    const buttons = document.querySelectorAll(`[data-status="${status}"]`);
+    buttons.forEach(button => {
+        markAttendance(
+            button.closest('.student-card').dataset.studentId,
+            status,
+            button
+        );
+    });
+
+    Toast.fire({
+        icon: 'success',
+        title: `تم تحديد جميع الطلاب كـ "${status}"`
+    });
+}
+
+function resetAll() {
+    const presentButtons = document.querySelectorAll('[data-status="حاضر"]');
+    presentButtons.forEach(button => {
+        markAttendance(
+            button.closest('.student-card').dataset.studentId,
+            'حاضر',
+            button
+        );
+    });
+
+    Toast.fire({
+        icon: 'info',
+        title: 'تم إعادة تعيين جميع الطلاب كحاضرين'
+    });
+}
+
+function updateStats() {
+    const totalStudents = currentStudents.length;
+    const presentCount = document.querySelectorAll('.attendance-btn.present.active').length;
+    const absentCount = document.querySelectorAll('.attendance-btn.absent.active').length;
+    const lateCount = document.querySelectorAll('.attendance-btn.late.active').length;
+
+    document.getElementById('totalStudents').textContent = totalStudents;
+    document.getElementById('presentCount').textContent = presentCount;
+    document.getElementById('absentCount').textContent = absentCount;
+    document.getElementById('lateCount').textContent = lateCount;
+
+    // Animate the numbers
+    animateNumber('presentCount', presentCount);
+    animateNumber('absentCount', absentCount);
+    animateNumber('lateCount', lateCount);
+}
+
+function animateNumber(elementId, targetValue) {
+    const element = document.getElementById(elementId);
+    const current = parseInt(element.textContent) || 0;
+    const increment = targetValue > current ? 1 : -1;
+
+    if (current !== targetValue) {
+        element.textContent = current + increment;
+        setTimeout(() => animateNumber(elementId, targetValue), 50);
+    }
+}
+
+function saveAttendance() {
+    const date = document.getElementById('attendanceDate').value;
+    const groupId = document.getElementById('groupSelect').value;
+
+    if (!date || !groupId) {
+        Swal.fire({
+            icon: 'warning',
+            title: 'بيانات ناقصة',
+            text: 'يرجى اختيار التاريخ والمجموعة',
+            confirmButtonText: 'موافق'
+        });
+        return;
+    }
+
+    showLoader('saveSpinner', true);
+
+    const students = [];
+    document.querySelectorAll('.student-card').forEach(studentCard => {
+        const studentId = studentCard.dataset.studentId;
+        const activeButton = studentCard.querySelector('.attendance-btn.active');
+        const status = activeButton.dataset.status;
+
+        students.push({
+            student_id: parseInt(studentId),
+            status: status
+        });
+    });
+
+    const data = {
+        date: date,
+        group_id: parseInt(groupId),
+        students: students
+    };
+
+    fetch('/mark_attendance', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(data)
+    })
+        .then(response => response.json())
+        .then(data => {
+            showLoader('saveSpinner', false);
+            if (data.success) {
+                Swal.fire({
+                    icon: 'success',
+                    title: 'تم بنجاح!',
+                    text: 'تم حفظ الحضور بنجاح',
+                    confirmButtonText: 'موافق',
+                    timer: 2000
+                });
+            } else {
+                throw new Error('Save failed');
+            }
+        })
+        .catch(error => {
+            showLoader('saveSpinner', false);
+            console.error('Error:', error);
+            Swal.fire({
+                icon: 'error',
+                title: 'خطأ',
+                text: 'حدث خطأ في حفظ الحضور',
+                confirmButtonText: 'إعادة المحاولة'
+            });
+        });
+}
+
+// Search functionality
+document.getElementById('studentSearch').addEventListener('input', function (e) {
+    const searchTerm = e.target.value.toLowerCase();
+    const studentCards = document.querySelectorAll('.student-card');
+
+    studentCards.forEach(card => {
+        const studentName = card.querySelector('h6').textContent.toLowerCase();
+        if (studentName.includes(searchTerm)) {
+            card.style.display = 'block';
+            card.style.animation = 'fadeInUp 0.3s ease';
+        } else {
+            card.style.display = 'none';
+        }
+    });
+});
+
+// Initialize
+document.addEventListener('DOMContentLoaded', function () {
+    // Set today's date
+    const today = new Date().toISOString().split('T')[0];
+    document.getElementById('attendanceDate').value = today;
+
+    // Initialize stats
+    updateStats();
+});
@@ -0,0 +1,110 @@
+document.addEventListener('DOMContentLoaded', function () {
+    // Mobile dropdown enhancement
+    if (window.innerWidth <= 991.98) {
+        const dropdownToggle = document.getElementById('userDropdown');
+        const dropdownMenu = dropdownToggle.nextElementSibling;
+
+        if (dropdownToggle && dropdownMenu) {
+            let isDropdownOpen = false;
+
+            // Handle dropdown toggle click
+            dropdownToggle.addEventListener('click', function (e) {
+                e.preventDefault();
+                e.stopPropagation();
+
+                if (isDropdownOpen) {
+                    dropdownMenu.classList.remove('show');
+                    isDropdownOpen = false;
+                } else {
+                    dropdownMenu.classList.add('show');
+                    isDropdownOpen = true;
+                }
+            });
+
+            // Prevent dropdown from closing when clicking inside
+            dropdownMenu.addEventListener('click', function (e) {
+                e.stopPropagation();
+            });
+
+            // Close dropdown when clicking outside
+            document.addEventListener('click', function (e) {
+                if (!dropdownToggle.contains(e.target) && !dropdownMenu.contains(e.target)) {
+                    dropdownMenu.classList.remove('show');
+                    isDropdownOpen = false;
+                }
+            });
+
+            // Ensure logout link works properly
+            const logoutLink = dropdownMenu.querySelector('a[href*="logout"]');
+            if (logoutLink) {
+                logoutLink.addEventListener('click', function (e) {
+                    // Allow normal navigation
+                    window.location.href = this.href;
+                });
+            }
+        }
+    }
+
+    // Handle navbar collapse on mobile
+    const navbarToggler = document.querySelector('.navbar-toggler');
+    const navbarCollapse = document.querySelector('.navbar-collapse');
+
+    if (navbarToggler && navbarCollapse) {
+        navbarToggler.addEventListener('click', function () {
+            if (navbarCollapse.classList.contains('show')) {
+                document.body.classList.remove('navbar-open');
+            } else {
+                document.body.classList.add('navbar-open');
+            }
+        });
+
+        // Remove overlay when navbar closes
+        navbarCollapse.addEventListener('hidden.bs.collapse', function () {
+            document.body.classList.remove('navbar-open');
+        });
+
+        navbarCollapse.addEventListener('shown.bs.collapse', function () {
+            document.body.classList.add('navbar-open');
+        });
+
+        // Close navbar when clicking outside on mobile
+        document.addEventListener('click', function (e) {
+            // Check if the click is outside the navbar
+            const navbar = document.querySelector('.navbar');
+            const isClickInsideNavbar = navbar.contains(e.target);
+            const isNavbarOpen = navbarCollapse.classList.contains('show');
+
+            // Only close if navbar is open and click is outside
+            if (isNavbarOpen && !isClickInsideNavbar) {
+                // Use Bootstrap's collapse instance to close the navbar
+                const bsCollapse = bootstrap.Collapse.getInstance(navbarCollapse) ||
+                    new bootstrap.Collapse(navbarCollapse, { toggle: false });
+                bsCollapse.hide();
+            }
+        });
+
+        // Also close when clicking on a nav link (for better UX)
+        const navLinks = navbarCollapse.querySelectorAll('.nav-link');
+        navLinks.forEach(function (link) {
+            link.addEventListener('click', function () {
+                // Small delay to allow navigation to start before closing
+                setTimeout(function () {
+                    const bsCollapse = bootstrap.Collapse.getInstance(navbarCollapse) ||
+                        new bootstrap.Collapse(navbarCollapse, { toggle: false });
+                    bsCollapse.hide();
+                }, 100);
+            });
+        });
+    }
+});
+
+// Handle window resize
+window.addEventListener('resize', function () {
+    if (window.innerWidth > 991.98) {
+        document.body.classList.remove('navbar-open');
+        const dropdownMenu = document.querySelector('.dropdown-menu');
+        if (dropdownMenu) {
+            dropdownMenu.classList.remove('show');
+        }
+    }
+});
@@ -0,0 +1,286 @@
+// Handle form submission with conflict checking
+function handleFormSubmission(formId, isEdit = false) {
+    const form = document.getElementById(formId);
+
+    if (!form) {
+        console.error('Form not found:', formId);
+        return;
+    }
+
+    form.addEventListener('submit', function (e) {
+        e.preventDefault();
+
+        const formData = new FormData(form);
+
+        // Send AJAX request
+        fetch(form.action, {
+            method: 'POST',
+            body: formData,
+            headers: {
+                'X-Requested-With': 'XMLHttpRequest'
+            }
+        })
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error('Network response was not ok');
+                }
+                return response.json();
+            })
+            .then(data => {
+                if (data.has_conflicts) {
+                    // Show conflict warning
+                    showInstructorConflictDialog(data.message, formData, form.action, isEdit ? data.group_id : null);
+                } else if (data.success) {
+                    // Success - redirect
+                    if (data.redirect) {
+                        window.location.href = data.redirect;
+                    } else {
+                        window.location.reload();
+                    }
+                } else {
+                    // Handle other responses
+                    console.error('Unexpected response:', data);
+                    form.submit();
+                }
+            })
+            .catch(error => {
+                console.error('AJAX Error:', error);
+                // Submit form normally if AJAX fails
+                form.submit();
+            });
+    });
+}
+
+function showInstructorConflictDialog(message, formData, actionUrl, groupId = null) {
+    Swal.fire({
+        title: 'تعارض في جدول المدرس!',
+        html: `
+            <div class="text-start">
+                ${message}
+                <br><br>
+                <strong>هل تريد المتابعة رغم وجود التعارض؟</strong>
+                <br><small class="text-muted">المدرس لن يستطيع تدريس مجموعتين في نفس الوقت</small>
+            </div>
+        `,
+        icon: 'warning',
+        showCancelButton: true,
+        confirmButtonColor: '#d33',
+        cancelButtonColor: '#3085d6',
+        confirmButtonText: 'نعم، احفظ رغم التعارض',
+        cancelButtonText: 'إلغاء وتعديل الموعد',
+        reverseButtons: true,
+        width: '600px'
+    }).then((result) => {
+        if (result.isConfirmed) {
+            // Add force_save parameter and submit
+            formData.append('force_save', 'true');
+
+            const form = document.createElement('form');
+            form.method = 'POST';
+            form.action = actionUrl;
+
+            for (let [key, value] of formData.entries()) {
+                const input = document.createElement('input');
+                input.type = 'hidden';
+                input.name = key;
+                input.value = value;
+                form.appendChild(input);
+            }
+
+            document.body.appendChild(form);
+            form.submit();
+        }
+    });
+}
+
+function editGroup(id, name, level, instructorId, price, maxStudents) {
+    document.getElementById('editGroupForm').action = `/edit_group/${id}`;
+    document.getElementById('editName').value = name;
+    document.getElementById('editLevel').value = level;
+    document.getElementById('editInstructor').value = instructorId || '';
+    document.getElementById('editPrice').value = price;
+    document.getElementById('editMaxStudents').value = maxStudents;
+
+    // Clear all schedule fields first
+    clearScheduleFields();
+
+    // Load existing schedules
+    fetchJSON(`/get_group_details/${id}`)
+        .then(data => {
+            loadScheduleData(data.schedules);
+        })
+        .catch(error => {
+            console.error('Error loading group details:', error);
+        });
+
+    new bootstrap.Modal(document.getElementById('editGroupModal')).show();
+}
+
+function clearScheduleFields() {
+    const days = ['sat', 'sun', 'mon', 'tue', 'wed', 'thu', 'fri'];
+
+    days.forEach(day => {
+        // Uncheck day checkbox
+        document.getElementById(`edit_${day}`).checked = false;
+        // Clear time fields
+        document.getElementById(`edit_${day}_hour`).value = '';
+        document.getElementById(`edit_${day}_minute`).value = '00';
+        document.getElementById(`edit_${day}_period`).value = 'AM';
+        document.getElementById(`edit_${day}_duration`).value = '60';
+    });
+}
+
+function loadScheduleData(schedules) {
+    const dayMapping = {
+        'السبت': 'sat',
+        'الأحد': 'sun',
+        'الاثنين': 'mon',
+        'الثلاثاء': 'tue',
+        'الأربعاء': 'wed',
+        'الخميس': 'thu',
+        'الجمعة': 'fri'
+    };
+
+    schedules.forEach(schedule => {
+        const dayPrefix = dayMapping[schedule.day];
+        if (!dayPrefix) return;
+
+        // Check the day checkbox
+        document.getElementById(`edit_${dayPrefix}`).checked = true;
+
+        // Parse start time and convert to 12-hour format
+        const timeData = convertTo12Hour(schedule.start_time, schedule.end_time);
+
+        if (timeData) {
+            document.getElementById(`edit_${dayPrefix}_hour`).value = timeData.hour;
+            document.getElementById(`edit_${dayPrefix}_minute`).value = timeData.minute;
+            document.getElementById(`edit_${dayPrefix}_period`).value = timeData.period;
+            document.getElementById(`edit_${dayPrefix}_duration`).value = timeData.duration;
+        }
+    });
+}
+
+function convertTo12Hour(startTime24, endTime24) {
+    try {
+        // Parse start time
+        const [startHour24, startMinute] = startTime24.split(':').map(Number);
+
+        // Parse end time to calculate duration
+        const [endHour24, endMinute] = endTime24.split(':').map(Number);
+        const startTotalMinutes = startHour24 * 60 + startMinute;
+        const endTotalMinutes = endHour24 * 60 + endMinute;
+        const duration = endTotalMinutes - startTotalMinutes;
+
+        // Convert to 12-hour format
+        let hour12 = startHour24;
+        let period = 'AM';
+
+        if (startHour24 === 0) {
+            hour12 = 12;
+        } else if (startHour24 === 12) {
+            period = 'PM';
+        } else if (startHour24 > 12) {
+            hour12 = startHour24 - 12;
+            period = 'PM';
+        }
+
+        return {
+            hour: hour12.toString(),
+            minute: startMinute.toString().padStart(2, '0'),
+            period: period,
+            duration: duration.toString()
+        };
+    } catch (error) {
+        console.error('Error converting time:', error);
+        return null;
+    }
+}
+
+function deleteGroup(id, name) {
+    Swal.fire({
+        title: 'هل أنت متأكد؟',
+        html: `سيتم حذف المجموعة "<strong>${name}</strong>" نهائياً<br>وجميع البيانات المرتبطة بها`,
+        icon: 'warning',
+        showCancelButton: true,
+        confirmButtonColor: '#d33',
+        cancelButtonColor: '#3085d6',
+        confirmButtonText: 'نعم، احذف',
+        cancelButtonText: 'إلغاء'
+    }).then((result) => {
+        if (result.isConfirmed) {
+            const form = document.createElement('form');
+            form.method = 'POST';
+            form.action = `/delete_group/${id}`;
+            document.body.appendChild(form);
+            form.submit();
+        }
+    });
+}
+
+// Add SweetAlert2 if not already included
+if (typeof Swal === 'undefined') {
+    const script = document.createElement('script');
+    script.src = 'https://cdn.jsdelivr.net/npm/sweetalert2@11';
+    document.head.appendChild(script);
+}
+
+// Initialize tooltips and filters when page loads
+document.addEventListener('DOMContentLoaded', function () {
+    var tooltipTriggerList = [].slice.call(document.querySelectorAll('[data-bs-toggle="tooltip"]'));
+    var tooltipList = tooltipTriggerList.map(function (tooltipTriggerEl) {
+        return new bootstrap.Tooltip(tooltipTriggerEl);
+    });
+
+    // Auto-submit filter form when instructor changes
+    document.getElementById('instructorFilter').addEventListener('change', function () {
+        document.getElementById('filterForm').submit();
+    });
+
+    // Initialize form handlers for conflict checking
+    handleFormSubmission('addGroupForm', false);
+    handleFormSubmission('editGroupForm', true);
+});
+
+// Group completion functions
+function completeGroup(id, name) {
+    document.getElementById('completeGroupForm').action = `/complete_group/${id}`;
+    document.getElementById('completeGroupName').textContent = name;
+    document.getElementById('completionDate').value = new Date().toISOString().split('T')[0];
+    new bootstrap.Modal(document.getElementById('completeGroupModal')).show();
+}
+
+function activateGroup(id, name) {
+    Swal.fire({
+        title: 'تفعيل المجموعة',
+        html: `هل تريد تفعيل المجموعة "<strong>${name}</strong>" مرة أخرى؟<br><small class="text-muted">سيتم إزالة تاريخ الإنهاء والملاحظات</small>`,
+        icon: 'question',
+        showCancelButton: true,
+        confirmButtonColor: '#28a745',
+        cancelButtonColor: '#6c757d',
+        confirmButtonText: 'نعم، فعل المجموعة',
+        cancelButtonText: 'إلغاء'
+    }).then((result) => {
+        if (result.isConfirmed) {
+            const form = document.createElement('form');
+            form.method = 'POST';
+            form.action = `/activate_group/${id}`;
+            document.body.appendChild(form);
+            form.submit();
+        }
+    });
+}
+
+function editCompletion(id, name, completionDate, completionNotes) {
+    document.getElementById('editCompletionForm').action = `/update_group_completion/${id}`;
+    document.getElementById('editCompletionGroupName').textContent = name;
+    document.getElementById('editCompletionDate').value = completionDate;
+    document.getElementById('editCompletionNotes').value = completionNotes;
+    new bootstrap.Modal(document.getElementById('editCompletionModal')).show();
+}
+
+// Add SweetAlert2 if not already included
+if (typeof Swal === 'undefined') {
+    const script = document.createElement('script');
+    script.src = 'https://cdn.jsdelivr.net/npm/sweetalert2@11';
+    document.head.appendChild(script);
+}
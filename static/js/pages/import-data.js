@@ -0,0 +1,44 @@
+const fileInput = document.getElementById('fileInput');
+const fileInfo = document.getElementById('fileInfo');
+const fileName = document.getElementById('fileName');
+const fileSize = document.getElementById('fileSize');
+const importBtn = document.getElementById('importBtn');
+const importForm = document.getElementById('importForm');
+
+fileInput.addEventListener('change', function () {
+    const file = fileInput.files[0];
+    if (file) {
+        if (!file.name.endsWith('.xlsx') && !file.name.endsWith('.xls') && !file.name.endsWith('.zip')) {
+            alert('يرجى اختيار ملف Excel (.xlsx أو .xls) أو نسخة احتياطية (.zip)');
+            fileInput.value = '';
+            return;
+        }
+
+        fileName.textContent = file.name;
+        fileSize.textContent = `الحجم: ${(file.size / 1024 / 1024).toFixed(2)} MB`;
+        fileInfo.style.display = 'block';
+        importBtn.disabled = false;
+    }
+});
+
+importForm.addEventListener('submit', function (e) {
+    const file = fileInput.files[0];
+    if (!file) {
+        e.preventDefault();
+        alert('يرجى اختيار ملف Excel للاستيراد');
+        return;
+    }
+
+    const clearExisting = document.getElementById('clearExisting').checked;
+    const confirmMessage = clearExisting
+        ? 'سيتم حذف جميع البيانات الموجودة واستبدالها بالبيانات من الملف. هل أنت متأكد؟'
+        : 'سيتم إضافة البيانات من الملف إلى البيانات الموجودة. هل تريد المتابعة؟';
+
+    if (!confirm(confirmMessage)) {
+        e.preventDefault();
+        return;
+    }
+
+    importBtn.disabled = true;
+    importBtn.innerHTML = '<i class="fas fa-spinner fa-spin me-2"></i>جاري الاستيراد...';
+});
@@ -0,0 +1,232 @@
+    document.addEventListener('DOMContentLoaded', function () {
+        // Animate numbers in statistics cards
+        function animateNumbers() {
+            const statNumbers = document.querySelectorAll('.stat-number[data-count]');
+
+            statNumbers.forEach(stat => {
+                const target = parseInt(stat.getAttribute('data-count'));
+                const duration = 2000; // 2 seconds
+                const increment = target / (duration / 16); // 60 FPS
+                let current = 0;
+
+                const timer = setInterval(() => {
+                    current += increment;
+                    if (current >= target) {
+                        stat.textContent = target;
+                        clearInterval(timer);
+                    } else {
+                        stat.textContent = Math.floor(current);
+                    }
+                }, 16);
+            });
+        }
+
+        // Trigger number animation when stats section is visible
+        const observer = new IntersectionObserver((entries) => {
+            entries.forEach(entry => {
+                if (entry.isIntersecting) {
+                    animateNumbers();
+                    observer.unobserve(entry.target);
+                }
+            });
+        }, {
+            threshold: 0.5
+        });
+
+        const statsSection = document.querySelector('.stats-section');
+        if (statsSection) {
+            observer.observe(statsSection);
+        }
+
+        // Add parallax effect to floating shapes
+        function updateParallax() {
+            const scrolled = window.pageYOffset;
+            const shapes = document.querySelectorAll('.floating-shape');
+
+            shapes.forEach((shape, index) => {
+                const speed = 0.2 + (index * 0.1);
+                const yPos = scrolled * speed;
+                shape.style.transform = `translateY(${yPos}px) rotate(${scrolled * 0.1}deg)`;
+            });
+        }
+
+        window.addEventListener('scroll', updateParallax);
+
+        // Add hover effects to cards
+        const cards = document.querySelectorAll('.modern-stat-card, .action-card, .schedule-day-card');
+
+        cards.forEach(card => {
+            card.addEventListener('mouseenter', function () {
+                this.style.transform = this.style.transform.replace(/scale\([^)]*\)/, '') + ' scale(1.02)';
+            });
+
+            card.addEventListener('mouseleave', function () {
+                this.style.transform = this.style.transform.replace(/scale\([^)]*\)/, '');
+            });
+        });
+
+        // Add smooth scrolling to action cards
+        const actionCards = document.querySelectorAll('.action-card');
+        actionCards.forEach(card => {
+            card.addEventListener('click', function (e) {
+                // Add ripple effect
+                const ripple = document.createElement('span');
+                ripple.classList.add('ripple-effect');
+
+                const rect = this.getBoundingClientRect();
+                const size = Math.max(rect.width, rect.height);
+                const x = e.clientX - rect.left - size / 2;
+                const y = e.clientY - rect.top - size / 2;
+
+                ripple.style.width = ripple.style.height = size + 'px';
+                ripple.style.left = x + 'px';
+                ripple.style.top = y + 'px';
+
+                this.appendChild(ripple);
+
+                setTimeout(() => {
+                    ripple.remove();
+                }, 600);
+            });
+        });
+
+        // Enhanced time display with real-time updates
+        function updateTime() {
+            const now = new Date();
+            const timeString = now.toLocaleTimeString('ar-SA', {
+                hour: '2-digit',
+                minute: '2-digit'
+            });
+
+            const timeIndicator = document.querySelector('.today-indicator');
+            if (timeIndicator) {
+                const originalText = timeIndicator.textContent;
+                if (!originalText.includes('الساعة')) {
+                    timeIndicator.innerHTML = `
+                    <i class="fas fa-circle text-primary me-1"></i>
+                    ${originalText} • الساعة ${timeString}
+                `;
+                }
+            }
+        }
+
+        updateTime();
+        setInterval(updateTime, 60000); // Update every minute
+
+        // Add typing effect to hero title
+        const heroTitle = document.querySelector('.gradient-text');
+        if (heroTitle) {
+            const text = heroTitle.textContent;
+            heroTitle.textContent = '';
+
+            let i = 0;
+            const typeWriter = () => {
+                if (i < text.length) {
+                    heroTitle.textContent += text.charAt(i);
+                    i++;
+                    setTimeout(typeWriter, 100);
+                }
+            };
+
+            setTimeout(typeWriter, 500);
+        }
+
+        // Add progress bars to lesson cards for student capacity
+        const lessonCards = document.querySelectorAll('.lesson-card');
+        lessonCards.forEach(card => {
+            const studentCount = card.querySelector('.students-count');
+            const maxStudents = parseInt(card.dataset.maxStudents) || 15; // Get from data attribute or default to 15
+
+            if (studentCount) {
+                // Extract just the first number from "X/Y" format
+                const studentText = studentCount.textContent.trim();
+                const count = parseInt(studentText.split('/')[0]) || 0;
+                const percentage = Math.min((count / maxStudents) * 100, 100);
+
+                const progressBar = document.createElement('div');
+                progressBar.className = 'lesson-progress';
+                progressBar.innerHTML = `
+                <div class="progress-bar-container">
+                    <div class="progress-bar-fill" style="width: ${percentage}%"></div>
+                </div>
+            `;
+
+                card.appendChild(progressBar);
+            }
+        });
+    });
+
+    // Add CSS for ripple effect and progress bars
+    const additionalStyles = `
+    .ripple-effect {
+        position: absolute;
+        border-radius: 50%;
+        background: rgba(255, 255, 255, 0.3);
+        pointer-events: none;
+        animation: ripple 0.6s ease-out;
+    }
+
+    @keyframes ripple {
+        to {
+            transform: scale(2);
+            opacity: 0;
+        }
+    }
+
+    .lesson-progress {
+        margin-top: 10px;
+    }
+
+    .progress-bar-container {
+        background: rgba(0, 123, 255, 0.1);
+        border-radius: 10px;
+        height: 4px;
+        overflow: hidden;
+    }
+
+    .progress-bar-fill {
+        height: 100%;
+        background: linear-gradient(90deg, #4facfe 0%, #00f2fe 100%);
+        border-radius: 10px;
+        transition: width 1s ease-out;
+    }
+
+    .action-card {
+        position: relative;
+        overflow: hidden;
+    }
+
+    /* Enhanced scrollbar styles */
+    ::-webkit-scrollbar {
+        width: 8px;
+    }
+
+    ::-webkit-scrollbar-track {
+        background: #f1f1f1;
+        border-radius: 10px;
+    }
+
+    ::-webkit-scrollbar-thumb {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        border-radius: 10px;
+    }
+
+    ::-webkit-scrollbar-thumb:hover {
+        background: linear-gradient(135deg, #764ba2 0%, #667eea 100%);
+    }
+
+    /* Loading animation for statistics */
+    @keyframes pulse {
+        0%, 100% { opacity: 1; }
+        50% { opacity: 0.7; }
+    }
+
+    .stat-number[data-count="0"] {
+        animation: pulse 1s infinite;
+    }
+`;
+
+    // Inject additional styles
+    const styleSheet = document.createElement('style');
+    styleSheet.textContent = additionalStyles;
+    document.head.appendChild(styleSheet);
@@ -0,0 +1,23 @@
+function setAttendance(studentId, status, button) {
+    // Remove active class from all buttons in this group
+    const group = button.closest('[data-student="' + studentId + '"]');
+    group.querySelectorAll('.attendance-btn').forEach(btn => {
+        btn.classList.remove('active');
+    });
+
+    // Add active class to clicked button
+    button.classList.add('active');
+
+    // Set the hidden input value
+    document.getElementById('attendance_' + studentId).value = status;
+}
+
+// Auto-submit form when group or date changes
+document.addEventListener('DOMContentLoaded', function () {
+    // Add smooth animations
+    const studentCards = document.querySelectorAll('.student-card');
+    studentCards.forEach((card, index) => {
+        card.style.animationDelay = (index * 0.1) + 's';
+        card.classList.add('fade-in');
+    });
+});
@@ -0,0 +1,95 @@
+let currentGroupFilter = 'all';
+let currentAgeFilter = 'all';
+
+function filterStudents(filterType, filterValue) {
+    const rows = document.querySelectorAll('.student-row');
+    const visibleCountElement = document.getElementById('visible-count');
+
+    // Update current filter
+    if (filterType === 'group') {
+        currentGroupFilter = filterValue;
+        // Remove active class from all group buttons
+        document.querySelectorAll('.filter-btn:not(.age-filter)').forEach(btn => {
+            btn.classList.remove('active');
+        });
+        // Add active class to clicked group button
+        const activeButton = document.querySelector(`[data-group="${filterValue}"]`);
+        if (activeButton) {
+            activeButton.classList.add('active');
+        }
+    } else if (filterType === 'age') {
+        currentAgeFilter = filterValue;
+        // Remove active class from all age buttons
+        document.querySelectorAll('.age-filter').forEach(btn => {
+            btn.classList.remove('active');
+        });
+        // Add active class to clicked age button
+        const activeButton = document.querySelector(`[data-age="${filterValue}"]`);
+        if (activeButton) {
+            activeButton.classList.add('active');
+        }
+    }
+
+    let visibleCount = 0;
+
+    // Apply both filters
+    rows.forEach(row => {
+        const studentGroups = JSON.parse(row.dataset.groups || '[]');
+        const studentAge = row.dataset.age;
+
+        // Check group filter
+        const groupMatch = currentGroupFilter === 'all' || studentGroups.includes(parseInt(currentGroupFilter));
+
+        // Check age filter
+        const ageMatch = currentAgeFilter === 'all' || studentAge === currentAgeFilter;
+
+        if (groupMatch && ageMatch) {
+            row.classList.remove('hidden');
+            visibleCount++;
+        } else {
+            row.classList.add('hidden');
+        }
+    });
+
+    // Update visible count
+    if (visibleCountElement) {
+        visibleCountElement.textContent = `(${visibleCount})`;
+    }
+}
+
+// Function to highlight today's column
+function highlightToday() {
+    const days = ['الأحد', 'الاثنين', 'الثلاثاء', 'الأربعاء', 'الخميس', 'الجمعة', 'السبت'];
+    const today = new Date();
+    const currentDay = days[today.getDay()];
+
+    // Desktop version
+    const dayColumns = document.querySelectorAll('.day-column');
+    dayColumns.forEach(column => {
+        const dayName = column.getAttribute('data-day');
+        if (dayName === currentDay) {
+            column.classList.add('today');
+        }
+    });
+
+    // Mobile version
+    const mobileDayCards = document.querySelectorAll('.mobile-day-card');
+    mobileDayCards.forEach(card => {
+        const dayName = card.getAttribute('data-day');
+        if (dayName === currentDay) {
+            card.classList.add('today');
+            const todayBadge = card.querySelector('.today-badge');
+            if (todayBadge) {
+                todayBadge.style.display = 'block';
+            }
+        }
+    });
+}
+
+// Initialize on page load
+document.addEventListener('DOMContentLoaded', function () {
+    // Highlight today's column
+    highlightToday();
+
+    console.log('Instructor dashboard loaded successfully');
+});
@@ -0,0 +1,146 @@
+// Filter functionality
+function updateFilter(type, value) {
+    const url = new URL(window.location);
+
+    if (value === 'all') {
+        url.searchParams.delete(type);
+    } else {
+        url.searchParams.set(type, value);
+    }
+
+    window.location.href = url.toString();
+}
+
+// Edit todo function
+function editTodo(todoId) {
+    // This would typically make an AJAX call to get todo details
+    // For now, we'll use a simple form redirect
+    fetchJSON(`/get_instructor_todo/${todoId}`)
+        .then(data => {
+            document.getElementById('editTodoForm').action = `/edit_instructor_todo/${todoId}`;
+            document.getElementById('editTitle').value = data.title;
+            document.getElementById('editDescription').value = data.description || '';
+            document.getElementById('editPriority').value = data.priority;
+            document.getElementById('editCategory').value = data.category;
+            document.getElementById('editDueDate').value = data.due_date || '';
+            document.getElementById('editGroupId').value = data.group_id || '';
+            document.getElementById('editStudentId').value = data.student_id || '';
+
+            new bootstrap.Modal(document.getElementById('editTodoModal')).show();
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            // Fallback: redirect to a simple edit page
+            window.location.href = `/edit_instructor_todo/${todoId}`;
+        });
+}
+
+// Toggle todo status
+function toggleTodoStatus(todoId, newStatus) {
+    const form = document.createElement('form');
+    form.method = 'POST';
+    form.action = `/update_instructor_todo_status/${todoId}`;
+
+    const statusInput = document.createElement('input');
+    statusInput.type = 'hidden';
+    statusInput.name = 'status';
+    statusInput.value = newStatus;
+
+    form.appendChild(statusInput);
+    document.body.appendChild(form);
+    form.submit();
+}
+
+// Delete todo with confirmation
+function deleteTodo(todoId, todoTitle) {
+    if (typeof Swal !== 'undefined') {
+        Swal.fire({
+            title: 'هل أنت متأكد؟',
+            html: `سيتم حذف المهمة "<strong>${todoTitle}</strong>" نهائياً`,
+            icon: 'warning',
+            showCancelButton: true,
+            confirmButtonColor: '#d33',
+            cancelButtonColor: '#3085d6',
+            confirmButtonText: 'نعم، احذف',
+            cancelButtonText: 'إلغاء'
+        }).then((result) => {
+            if (result.isConfirmed) {
+                const form = document.createElement('form');
+                form.method = 'POST';
+                form.action = `/delete_instructor_todo/${todoId}`;
+                document.body.appendChild(form);
+                form.submit();
+            }
+        });
+    } else {
+        if (confirm(`هل أنت متأكد من حذف المهمة "${todoTitle}"؟`)) {
+            const form = document.createElement('form');
+            form.method = 'POST';
+            form.action = `/delete_instructor_todo/${todoId}`;
+            document.body.appendChild(form);
+            form.submit();
+        }
+    }
+}
+
+// Load SweetAlert2 if not available
+if (typeof Swal === 'undefined') {
+    const script = document.createElement('script');
+    script.src = 'https://cdn.jsdelivr.net/npm/sweetalert2@11';
+    document.head.appendChild(script);
+}
+
+// Mobile dropdown fix
+document.addEventListener('DOMContentLoaded', function () {
+    // Force hide all dropdowns initially
+    document.querySelectorAll('.dropdown-menu').forEach(menu => {
+        menu.classList.remove('show');
+    });
+
+    // Check if device is mobile
+    function isMobile() {
+        return window.innerWidth <= 768;
+    }
+
+    // Mobile-specific dropdown handling
+    if (isMobile()) {
+        document.querySelectorAll('[data-bs-toggle="dropdown"]').forEach(button => {
+            button.addEventListener('click', function (e) {
+                e.preventDefault();
+                e.stopPropagation();
+
+                const dropdown = this.closest('.dropdown');
+                const menu = dropdown.querySelector('.dropdown-menu');
+
+                // Close all other dropdowns
+                document.querySelectorAll('.dropdown-menu.show').forEach(otherMenu => {
+                    if (otherMenu !== menu) {
+                        otherMenu.classList.remove('show');
+                    }
+                });
+
+                // Toggle current dropdown
+                menu.classList.toggle('show');
+            });
+        });
+
+        // Close dropdown when clicking outside
+        document.addEventListener('click', function (e) {
+            if (!e.target.closest('.dropdown')) {
+                document.querySelectorAll('.dropdown-menu.show').forEach(menu => {
+                    menu.classList.remove('show');
+                });
+            }
+        });
+    }
+
+    // Handle window resize
+    window.addEventListener('resize', function () {
+        if (window.innerWidth > 768) {
+            // Remove all show classes when switching to desktop
+            document.querySelectorAll('.dropdown-menu.show').forEach(menu => {
+                menu.classList.remove('show');
+            });
+        }
+    });
+});
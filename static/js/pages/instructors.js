@@ -0,0 +1,23 @@
+function editInstructor(id, name, phone, specialization) {
+    document.getElementById('editInstructorForm').action = `/edit_instructor/${id}`;
+    document.getElementById('editInstructorName').value = name;
+    document.getElementById('editInstructorPhone').value = phone;
+    document.getElementById('editInstructorSpecialization').value = specialization;
+
+    new bootstrap.Modal(document.getElementById('editInstructorModal')).show();
+}
+
+function deleteInstructor(id, name, studentsCount, groupsCount) {
+    if (studentsCount > 0 || groupsCount > 0) {
+        alert(`لا يمكن حذف المدرس "${name}" لأنه مرتبط بـ ${studentsCount} طالب و ${groupsCount} مجموعة.\nيجب نقل الطلاب والمجموعات إلى مدرس آخر أولاً.`);
+        return;
+    }
+
+    if (confirm(`هل أنت متأكد من حذف المدرس "${name}"؟`)) {
+        const form = document.createElement('form');
+        form.method = 'POST';
+        form.action = `/delete_instructor/${id}`;
+        document.body.appendChild(form);
+        form.submit();
+    }
+}
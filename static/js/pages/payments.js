@@ -0,0 +1,537 @@
+const studentSearch = document.getElementById('student_search');
+const studentDropdown = document.getElementById('student_dropdown');
+const studentIdInput = document.getElementById('student_id');
+const amountInput = document.getElementById('amount');
+let selectedStudentId = null;
+
+// Show dropdown when search input is focused
+studentSearch.addEventListener('focus', function () {
+    studentDropdown.style.display = 'block';
+    filterStudents();
+});
+
+// Filter students based on search input
+studentSearch.addEventListener('input', function () {
+    filterStudents();
+    // Clear selection if user types after selecting
+    if (selectedStudentId) {
+        selectedStudentId = null;
+        studentIdInput.value = '';
+        studentSearch.classList.remove('student-search-selected');
+        amountInput.value = '';
+    }
+});
+
+// Hide dropdown when clicking outside
+document.addEventListener('click', function (e) {
+    if (!e.target.closest('.position-relative')) {
+        studentDropdown.style.display = 'none';
+    }
+});
+
+// Handle student selection
+document.getElementById('student_list').addEventListener('click', function (e) {
+    const studentOption = e.target.closest('.student-option');
+    if (studentOption) {
+        const studentId = studentOption.getAttribute('data-id');
+        const studentName = studentOption.getAttribute('data-name');
+        const remaining = studentOption.getAttribute('data-remaining');
+
+        // Set values
+        selectedStudentId = studentId;
+        studentIdInput.value = studentId;
+        studentSearch.value = studentName;
+        studentSearch.classList.add('student-search-selected');
+
+        // Auto-fill amount with remaining balance
+        if (remaining && remaining > 0) {
+            amountInput.value = remaining;
+            amountInput.max = remaining;
+        }
+
+        // Hide dropdown
+        studentDropdown.style.display = 'none';
+
+        // Remove previous selections
+        document.querySelectorAll('.student-option').forEach(opt => {
+            opt.classList.remove('selected');
+        });
+
+        // Mark as selected
+        studentOption.classList.add('selected');
+    }
+});
+
+// Filter function
+function filterStudents() {
+    const searchValue = studentSearch.value.toLowerCase();
+    const students = document.querySelectorAll('.student-option');
+    let hasVisibleStudents = false;
+
+    students.forEach(student => {
+        const name = student.getAttribute('data-name').toLowerCase();
+        if (name.includes(searchValue)) {
+            student.style.display = 'block';
+            hasVisibleStudents = true;
+        } else {
+            student.style.display = 'none';
+        }
+    });
+
+    // Show/hide dropdown based on whether there are visible students
+    if (hasVisibleStudents && studentSearch.value.length > 0) {
+        studentDropdown.style.display = 'block';
+    } else if (studentSearch.value.length === 0) {
+        studentDropdown.style.display = 'block';
+    } else {
+        studentDropdown.style.display = 'none';
+    }
+}
+
+// Reset form when modal is hidden
+document.getElementById('addPaymentModal').addEventListener('hidden.bs.modal', function () {
+    studentSearch.value = '';
+    studentIdInput.value = '';
+    selectedStudentId = null;
+    studentSearch.classList.remove('student-search-selected');
+    amountInput.value = '';
+    amountInput.removeAttribute('max');
+    document.querySelectorAll('.student-option').forEach(opt => {
+        opt.classList.remove('selected');
+        opt.style.display = 'block';
+    });
+});
+
+// Quick payment function (updated)
+function quickPayment(studentId, studentName, amount) {
+    // Set values
+    selectedStudentId = studentId;
+    studentIdInput.value = studentId;
+    studentSearch.value = studentName;
+    studentSearch.classList.add('student-search-selected');
+    amountInput.value = amount;
+
+    // Mark student as selected in dropdown
+    document.querySelectorAll('.student-option').forEach(opt => {
+        opt.classList.remove('selected');
+        if (opt.getAttribute('data-id') === studentId.toString()) {
+            opt.classList.add('selected');
+        }
+    });
+
+    // Show payment modal
+    new bootstrap.Modal(document.getElementById('addPaymentModal')).show();
+}
+
+// Form validation
+document.querySelector('#addPaymentModal form').addEventListener('submit', function (e) {
+    if (!studentIdInput.value) {
+        e.preventDefault();
+        studentSearch.classList.add('is-invalid');
+        studentSearch.focus();
+    } else {
+        studentSearch.classList.remove('is-invalid');
+    }
+});
+
+// Edit Payment Function
+function editPayment(paymentId, studentId, studentName, amount, month, notes) {
+    // Set form action
+    document.getElementById('editPaymentForm').action = `/edit_payment/${paymentId}`;
+
+    // Set form values
+    document.getElementById('edit_student_search').value = studentName;
+    document.getElementById('edit_student_id').value = studentId;
+    document.getElementById('edit_amount').value = amount;
+    document.getElementById('edit_month').value = month;
+    document.getElementById('edit_notes').value = notes;
+
+    // Mark student as selected
+    document.getElementById('edit_student_search').classList.add('student-search-selected');
+
+    // Show modal
+    new bootstrap.Modal(document.getElementById('editPaymentModal')).show();
+}
+
+// Edit Expense Function
+function editExpense(expenseId, description, category, amount, notes) {
+    // Set form action
+    document.getElementById('editExpenseForm').action = `/edit_expense/${expenseId}`;
+
+    // Set form values
+    document.getElementById('edit_description').value = description;
+    document.getElementById('edit_category').value = category;
+    document.getElementById('edit_expense_amount').value = amount;
+    document.getElementById('edit_expense_notes').value = notes;
+
+    // Show modal
+    new bootstrap.Modal(document.getElementById('editExpenseModal')).show();
+}
+
+// Delete Payment Function
+function deletePayment(paymentId, studentName, amount) {
+    document.getElementById('deleteMessage').innerHTML = `
+        هل أنت متأكد من حذف دفعة الطالب <strong>${studentName}</strong> بقيمة <strong>${amount} ج.م</strong>؟
+    `;
+    document.getElementById('deleteForm').action = `/delete_payment/${paymentId}`;
+    new bootstrap.Modal(document.getElementById('deleteConfirmModal')).show();
+}
+
+// Delete Expense Function
+function deleteExpense(expenseId, description, amount) {
+    document.getElementById('deleteMessage').innerHTML = `
+        هل أنت متأكد من حذف المصروف <strong>${description}</strong> بقيمة <strong>${amount} ج.م</strong>؟
+    `;
+    document.getElementById('deleteForm').action = `/delete_expense/${expenseId}`;
+    new bootstrap.Modal(document.getElementById('deleteConfirmModal')).show();
+}
+
+// Initialize edit modal student search functionality
+const editStudentSearch = document.getElementById('edit_student_search');
+const editStudentDropdown = document.getElementById('edit_student_dropdown');
+const editStudentIdInput = document.getElementById('edit_student_id');
+let editSelectedStudentId = null;
+
+// Show dropdown when edit search input is focused
+editStudentSearch.addEventListener('focus', function () {
+    editStudentDropdown.style.display = 'block';
+    filterEditStudents();
+});
+
+// Filter students based on edit search input
+editStudentSearch.addEventListener('input', function () {
+    filterEditStudents();
+    // Clear selection if user types after selecting
+    if (editSelectedStudentId) {
+        editSelectedStudentId = null;
+        editStudentIdInput.value = '';
+        editStudentSearch.classList.remove('student-search-selected');
+    }
+});
+
+// Handle edit student selection
+document.getElementById('edit_student_list').addEventListener('click', function (e) {
+    const studentOption = e.target.closest('.student-option');
+    if (studentOption) {
+        const studentId = studentOption.getAttribute('data-id');
+        const studentName = studentOption.getAttribute('data-name');
+
+        // Set values
+        editSelectedStudentId = studentId;
+        editStudentIdInput.value = studentId;
+        editStudentSearch.value = studentName;
+        editStudentSearch.classList.add('student-search-selected');
+
+        // Hide dropdown
+        editStudentDropdown.style.display = 'none';
+
+        // Remove previous selections
+        document.querySelectorAll('#edit_student_list .student-option').forEach(opt => {
+            opt.classList.remove('selected');
+        });
+
+        // Mark as selected
+        studentOption.classList.add('selected');
+    }
+});
+
+// Filter function for edit modal
+function filterEditStudents() {
+    const searchValue = editStudentSearch.value.toLowerCase();
+    const students = document.querySelectorAll('#edit_student_list .student-option');
+    let hasVisibleStudents = false;
+
+    students.forEach(student => {
+        const name = student.getAttribute('data-name').toLowerCase();
+        if (name.includes(searchValue)) {
+            student.style.display = 'block';
+            hasVisibleStudents = true;
+        } else {
+            student.style.display = 'none';
+        }
+    });
+
+    // Show/hide dropdown based on whether there are visible students
+    if (hasVisibleStudents && editStudentSearch.value.length > 0) {
+        editStudentDropdown.style.display = 'block';
+    } else if (editStudentSearch.value.length === 0) {
+        editStudentDropdown.style.display = 'block';
+    } else {
+        editStudentDropdown.style.display = 'none';
+    }
+}
+
+// Reset edit form when modal is hidden
+document.getElementById('editPaymentModal').addEventListener('hidden.bs.modal', function () {
+    editStudentSearch.value = '';
+    editStudentIdInput.value = '';
+    editSelectedStudentId = null;
+    editStudentSearch.classList.remove('student-search-selected');
+    document.getElementById('edit_amount').value = '';
+    document.getElementById('edit_month').value = '';
+    document.getElementById('edit_notes').value = '';
+    document.querySelectorAll('#edit_student_list .student-option').forEach(opt => {
+        opt.classList.remove('selected');
+        opt.style.display = 'block';
+    });
+});
+
+// Reset edit expense form when modal is hidden
+document.getElementById('editExpenseModal').addEventListener('hidden.bs.modal', function () {
+    document.getElementById('edit_description').value = '';
+    document.getElementById('edit_category').value = '';
+    document.getElementById('edit_expense_amount').value = '';
+    document.getElementById('edit_expense_notes').value = '';
+});
+
+// Hide dropdowns when clicking outside
+document.addEventListener('click', function (e) {
+    if (!e.target.closest('#editPaymentModal .position-relative')) {
+        editStudentDropdown.style.display = 'none';
+    }
+});
+
+// Initialize tooltips for action buttons
+document.addEventListener('DOMContentLoaded', function () {
+    var tooltipTriggerList = [].slice.call(document.querySelectorAll('[data-bs-toggle="tooltip"]'));
+    var tooltipList = tooltipTriggerList.map(function (tooltipTriggerEl) {
+        return new bootstrap.Tooltip(tooltipTriggerEl);
+    });
+});
+
+// Search form enhancements
+document.addEventListener('DOMContentLoaded', function () {
+    // Auto-submit search form on Enter key
+    const searchForms = document.querySelectorAll('#paymentSearchForm, #expenseSearchForm');
+
+    searchForms.forEach(form => {
+        form.addEventListener('keydown', function (e) {
+            if (e.key === 'Enter') {
+                e.preventDefault();
+                form.submit();
+            }
+        });
+    });
+
+    // Clear individual search fields
+    const clearButtons = document.querySelectorAll('.clear-search');
+    clearButtons.forEach(button => {
+        button.addEventListener('click', function () {
+            const targetInput = this.getAttribute('data-target');
+            document.getElementById(targetInput).value = '';
+        });
+    });
+
+    // Real-time search indication
+    const searchInputs = document.querySelectorAll('input[name^="search"], select[name^="search"]');
+    searchInputs.forEach(input => {
+        input.addEventListener('input', function () {
+            if (this.value.length > 0) {
+                this.classList.add('has-search');
+            } else {
+                this.classList.remove('has-search');
+            }
+        });
+
+        // Initialize on page load
+        if (input.value.length > 0) {
+            input.classList.add('has-search');
+        }
+    });
+});
+
+// Function to clear all search filters
+function clearAllFilters() {
+    const searchInputs = document.querySelectorAll('input[name^="search"], select[name^="search"]');
+    searchInputs.forEach(input => {
+        input.value = '';
+        input.classList.remove('has-search');
+    });
+}
+
+// Function to get search parameters as string
+function getSearchParameters() {
+    const params = new URLSearchParams(window.location.search);
+    const searchParams = [];
+
+    for (const [key, value] of params.entries()) {
+        if (key.startsWith('search_') && value) {
+            searchParams.push(`${key}=${value}`);
+        }
+    }
+
+    return searchParams.length > 0 ? '?' + searchParams.join('&') : '';
+}
+
+// Update pagination links to include search parameters
+document.addEventListener('DOMContentLoaded', function () {
+    const searchParams = getSearchParameters();
+    if (searchParams) {
+        const paginationLinks = document.querySelectorAll('.pagination a');
+        paginationLinks.forEach(link => {
+            const href = link.getAttribute('href');
+            if (href && href.includes('payments')) {
+                // Add search parameters to pagination links
+                const separator = href.includes('?') ? '&' : '?';
+                link.setAttribute('href', href + separator + searchParams.substring(1));
+            }
+        });
+    }
+});
+
+// Bulk Selection Functions for Payments
+document.addEventListener('DOMContentLoaded', function () {
+    const selectAllPayments = document.getElementById('selectAllPayments');
+    const paymentCheckboxes = document.querySelectorAll('.payment-checkbox');
+    const paymentsBulkActions = document.getElementById('paymentsBulkActions');
+    const selectedPaymentsCount = document.getElementById('selectedPaymentsCount');
+
+    // Select All Payments
+    if (selectAllPayments) {
+        selectAllPayments.addEventListener('change', function () {
+            paymentCheckboxes.forEach(checkbox => {
+                checkbox.checked = this.checked;
+            });
+            updatePaymentsBulkActions();
+        });
+    }
+
+    // Individual Payment Checkbox
+    paymentCheckboxes.forEach(checkbox => {
+        checkbox.addEventListener('change', function () {
+            updatePaymentsBulkActions();
+        });
+    });
+
+    function updatePaymentsBulkActions() {
+        const checkedPayments = document.querySelectorAll('.payment-checkbox:checked');
+        const count = checkedPayments.length;
+
+        if (count > 0) {
+            paymentsBulkActions.style.display = 'block';
+            selectedPaymentsCount.textContent = count;
+            selectAllPayments.indeterminate = count > 0 && count < paymentCheckboxes.length;
+            selectAllPayments.checked = count === paymentCheckboxes.length;
+        } else {
+            paymentsBulkActions.style.display = 'none';
+            selectAllPayments.indeterminate = false;
+            selectAllPayments.checked = false;
+        }
+    }
+
+    // Bulk Selection Functions for Expenses
+    const selectAllExpenses = document.getElementById('selectAllExpenses');
+    const expenseCheckboxes = document.querySelectorAll('.expense-checkbox');
+    const expensesBulkActions = document.getElementById('expensesBulkActions');
+    const selectedExpensesCount = document.getElementById('selectedExpensesCount');
+
+    // Select All Expenses
+    if (selectAllExpenses) {
+        selectAllExpenses.addEventListener('change', function () {
+            expenseCheckboxes.forEach(checkbox => {
+                checkbox.checked = this.checked;
+            });
+            updateExpensesBulkActions();
+        });
+    }
+
+    // Individual Expense Checkbox
+    expenseCheckboxes.forEach(checkbox => {
+        checkbox.addEventListener('change', function () {
+            updateExpensesBulkActions();
+        });
+    });
+
+    function updateExpensesBulkActions() {
+        const checkedExpenses = document.querySelectorAll('.expense-checkbox:checked');
+        const count = checkedExpenses.length;
+
+        if (count > 0) {
+            expensesBulkActions.style.display = 'block';
+            selectedExpensesCount.textContent = count;
+            selectAllExpenses.indeterminate = count > 0 && count < expenseCheckboxes.length;
+            selectAllExpenses.checked = count === expenseCheckboxes.length;
+        } else {
+            expensesBulkActions.style.display = 'none';
+            selectAllExpenses.indeterminate = false;
+            selectAllExpenses.checked = false;
+        }
+    }
+});
+
+// Bulk Delete Functions
+function bulkDeletePayments() {
+    const selectedPayments = document.querySelectorAll('.payment-checkbox:checked');
+    if (selectedPayments.length === 0) {
+        alert('يرجى تحديد مدفوعات للحذف');
+        return;
+    }
+
+    const ids = Array.from(selectedPayments).map(checkbox => checkbox.value);
+    document.getElementById('bulkDeleteIds').value = ids.join(',');
+    document.getElementById('bulkDeleteForm').action = '/bulk_delete_payments';
+
+    // Build list of payments to delete
+    let listHtml = '<ul class="list-group">';
+    selectedPayments.forEach(checkbox => {
+        const studentName = checkbox.getAttribute('data-student-name');
+        const amount = checkbox.getAttribute('data-amount');
+        listHtml += `<li class="list-group-item d-flex justify-content-between">
+            <span>${studentName}</span>
+            <span class="badge bg-success">${amount} ج.م</span>
+        </li>`;
+    });
+    listHtml += '</ul>';
+
+    document.getElementById('bulkDeleteList').innerHTML = listHtml;
+    document.getElementById('bulkDeleteMessage').innerHTML = `هل أنت متأكد من حذف <strong>${selectedPayments.length}</strong> مدفوعة؟`;
+
+    new bootstrap.Modal(document.getElementById('bulkDeleteConfirmModal')).show();
+}
+
+function bulkDeleteExpenses() {
+    const selectedExpenses = document.querySelectorAll('.expense-checkbox:checked');
+    if (selectedExpenses.length === 0) {
+        alert('يرجى تحديد مصروفات للحذف');
+        return;
+    }
+
+    const ids = Array.from(selectedExpenses).map(checkbox => checkbox.value);
+    document.getElementById('bulkDeleteIds').value = ids.join(',');
+    document.getElementById('bulkDeleteForm').action = '/bulk_delete_expenses';
+
+    // Build list of expenses to delete
+    let listHtml = '<ul class="list-group">';
+    selectedExpenses.forEach(checkbox => {
+        const description = checkbox.getAttribute('data-description');
+        const amount = checkbox.getAttribute('data-amount');
+        listHtml += `<li class="list-group-item d-flex justify-content-between">
+            <span>${description}</span>
+            <span class="badge bg-danger">${amount} ج.م</span>
+        </li>`;
+    });
+    listHtml += '</ul>';
+
+    document.getElementById('bulkDeleteList').innerHTML = listHtml;
+    document.getElementById('bulkDeleteMessage').innerHTML = `هل أنت متأكد من حذف <strong>${selectedExpenses.length}</strong> مصروف؟`;
+
+    new bootstrap.Modal(document.getElementById('bulkDeleteConfirmModal')).show();
+}
+
+function clearPaymentSelection() {
+    document.querySelectorAll('.payment-checkbox').forEach(checkbox => {
+        checkbox.checked = false;
+    });
+    document.getElementById('selectAllPayments').checked = false;
+    document.getElementById('selectAllPayments').indeterminate = false;
+    document.getElementById('paymentsBulkActions').style.display = 'none';
+}
+
+function clearExpenseSelection() {
+    document.querySelectorAll('.expense-checkbox').forEach(checkbox => {
+        checkbox.checked = false;
+    });
+    document.getElementById('selectAllExpenses').checked = false;
+    document.getElementById('selectAllExpenses').indeterminate = false;
+    document.getElementById('expensesBulkActions').style.display = 'none';
+}
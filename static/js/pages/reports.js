@@ -0,0 +1,651 @@
+// Enhanced export report functionality
+function exportReport() {
+    const btn = event.target.closest('.modern-btn');
+    const originalText = btn.innerHTML;
+
+    // Add loading state
+    btn.classList.add('loading');
+    btn.innerHTML = '<i class="fas fa-spinner"></i> جاري التصدير...';
+
+    // Show loading message
+    if (window.Toast) {
+        Toast.fire({
+            icon: 'info',
+            title: 'جاري إنشاء ملف Excel...'
+        });
+    }
+
+    // Create a hidden form to download the file
+    const downloadForm = document.createElement('form');
+    downloadForm.method = 'GET';
+    downloadForm.action = '/export_reports';
+    downloadForm.style.display = 'none';
+    document.body.appendChild(downloadForm);
+
+    // Submit form to trigger download
+    downloadForm.submit();
+
+    // Remove form after submission
+    setTimeout(() => {
+        document.body.removeChild(downloadForm);
+    }, 1000);
+
+    // Show success message and restore button after delay
+    setTimeout(() => {
+        if (window.Swal) {
+            Swal.fire({
+                icon: 'success',
+                title: 'تم التصدير بنجاح!',
+                text: 'تم تحميل ملف Excel بنجاح',
+                timer: 3000,
+                showConfirmButton: false,
+                background: '#fff',
+                color: '#333'
+            });
+        } else if (window.Toast) {
+            Toast.fire({
+                icon: 'success',
+                title: 'تم تحميل ملف Excel بنجاح!'
+            });
+        }
+
+        // Restore button state
+        btn.classList.remove('loading');
+        btn.innerHTML = originalText;
+    }, 2000);
+}
+
+// Enhanced refresh functionality
+function refreshReport() {
+    const btn = event.target.closest('.modern-btn');
+    const originalText = btn.innerHTML;
+
+    // Add loading state
+    btn.classList.add('loading');
+    btn.innerHTML = '<i class="fas fa-sync-alt"></i> جاري التحديث...';
+
+    // Show loading message
+    if (window.Toast) {
+        Toast.fire({
+            icon: 'info',
+            title: 'جاري تحديث التقرير...'
+        });
+    }
+
+    // Reload page after a short delay
+    setTimeout(() => {
+        location.reload();
+    }, 1000);
+}
+
+// Function to diagnose imported data
+function diagnoseImportData() {
+    // Show loading state
+    const btn = event.target;
+    const originalText = btn.innerHTML;
+    btn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> جاري التشخيص...';
+    btn.disabled = true;
+
+    fetchJSON('/diagnose_import_data')
+        .then(data => {
+            if (data.success) {
+                // Create and show diagnosis modal
+                showDiagnosisModal(data.diagnosis);
+            } else {
+                alert('خطأ في التشخيص: ' + data.message);
+            }
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            alert('خطأ في الشبكة أثناء التشخيص');
+        })
+        .finally(() => {
+            // Restore button state
+            btn.innerHTML = originalText;
+            btn.disabled = false;
+        });
+}
+
+function showDiagnosisModal(diagnosis) {
+    let modalHtml = `
+        <div class="modal fade" id="diagnosisModal" tabindex="-1">
+            <div class="modal-dialog modal-lg">
+                <div class="modal-content">
+                    <div class="modal-header">
+                        <h5 class="modal-title">
+                            <i class="fas fa-search-plus me-2"></i>
+                            تشخيص البيانات المستوردة
+                        </h5>
+                        <button type="button" class="btn-close" data-bs-dismiss="modal"></button>
+                    </div>
+                    <div class="modal-body">
+    `;
+
+    // Groups with issues
+    if (diagnosis.groups_with_issues.length > 0) {
+        modalHtml += `
+            <div class="alert alert-warning">
+                <h6><i class="fas fa-users me-2"></i>مجموعات بها مشاكل (${diagnosis.groups_with_issues.length})</h6>
+                <div class="table-responsive">
+                    <table class="table table-sm">
+                        <thead>
+                            <tr>
+                                <th>اسم المجموعة</th>
+                                <th>السعر الحالي</th>
+                                <th>المشكلة</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+        `;
+        diagnosis.groups_with_issues.forEach(group => {
+            modalHtml += `
+                <tr>
+                    <td>${group.name}</td>
+                    <td>${group.price} ج.م</td>
+                    <td><span class="badge bg-danger">${group.issue}</span></td>
+                </tr>
+            `;
+        });
+        modalHtml += `
+                        </tbody>
+                    </table>
+                </div>
+            </div>
+        `;
+    }
+
+    // Students with issues
+    if (diagnosis.students_with_issues.length > 0) {
+        modalHtml += `
+            <div class="alert alert-info">
+                <h6><i class="fas fa-user-graduate me-2"></i>طلاب بهم مشاكل (${diagnosis.students_with_issues.length})</h6>
+                <div class="table-responsive">
+                    <table class="table table-sm">
+                        <thead>
+                            <tr>
+                                <th>اسم الطالب</th>
+                                <th>الخصم</th>
+                                <th>المبلغ المدفوع</th>
+                                <th>المشاكل</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+        `;
+        diagnosis.students_with_issues.slice(0, 10).forEach(student => {
+            modalHtml += `
+                <tr>
+                    <td>${student.name}</td>
+                    <td>${student.discount} ج.م</td>
+                    <td>${student.total_paid} ج.م</td>
+                    <td><span class="badge bg-warning">${student.issues}</span></td>
+                </tr>
+            `;
+        });
+        if (diagnosis.students_with_issues.length > 10) {
+            modalHtml += `
+                <tr>
+                    <td colspan="4" class="text-center text-muted">
+                        و ${diagnosis.students_with_issues.length - 10} طلاب آخرين...
+                    </td>
+                </tr>
+            `;
+        }
+        modalHtml += `
+                        </tbody>
+                    </table>
+                </div>
+            </div>
+        `;
+    }
+
+    // Summary
+    if (diagnosis.groups_with_issues.length === 0 &&
+        diagnosis.students_with_issues.length === 0 &&
+        diagnosis.payments_with_issues.length === 0 &&
+        diagnosis.expenses_with_issues.length === 0) {
+        modalHtml += `
+            <div class="alert alert-success">
+                <h6><i class="fas fa-check-circle me-2"></i>البيانات سليمة</h6>
+                <p class="mb-0">لم يتم العثور على أي مشاكل في البيانات المستوردة.</p>
+            </div>
+        `;
+    } else {
+        modalHtml += `
+            <div class="alert alert-primary">
+                <h6><i class="fas fa-info-circle me-2"></i>ملخص التشخيص</h6>
+                <ul class="mb-0">
+                    <li>مجموعات بها مشاكل: ${diagnosis.groups_with_issues.length}</li>
+                    <li>طلاب بهم مشاكل: ${diagnosis.students_with_issues.length}</li>
+                    <li>مدفوعات بها مشاكل: ${diagnosis.payments_with_issues.length}</li>
+                    <li>مصروفات بها مشاكل: ${diagnosis.expenses_with_issues.length}</li>
+                </ul>
+            </div>
+        `;
+    }
+
+    modalHtml += `
+                    </div>
+                    <div class="modal-footer">
+                        <button type="button" class="btn btn-secondary" data-bs-dismiss="modal">إغلاق</button>
+                        ${diagnosis.groups_with_issues.length > 0 || diagnosis.students_with_issues.length > 0 ?
+            '<button type="button" class="btn btn-warning" onclick="runFixImportData()">إصلاح المشاكل</button>' : ''}
+                    </div>
+                </div>
+            </div>
+        </div>
+    `;
+
+    // Remove existing modal if any
+    const existingModal = document.getElementById('diagnosisModal');
+    if (existingModal) {
+        existingModal.remove();
+    }
+
+    // Add modal to body and show
+    document.body.insertAdjacentHTML('beforeend', modalHtml);
+    const modal = new bootstrap.Modal(document.getElementById('diagnosisModal'));
+    modal.show();
+}
+
+function runFixImportData() {
+    if (confirm('هل أنت متأكد من إصلاح البيانات؟ سيتم تصحيح الأسعار والقيم غير الطبيعية.')) {
+        // Submit the fix form
+        const form = document.querySelector('form[action*="fix_import_data"]');
+        if (form) {
+            form.submit();
+        }
+    }
+}
+
+// Function to diagnose financial calculations
+function diagnoseFinancialCalculations() {
+    // Show loading state
+    const btn = event.target;
+    const originalText = btn.innerHTML;
+    btn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> جاري التشخيص المالي...';
+    btn.disabled = true;
+
+    fetchJSON('/diagnose_financial_calculations')
+        .then(data => {
+            if (data.success) {
+                // Create and show financial diagnosis modal
+                showFinancialDiagnosisModal(data.diagnosis);
+            } else {
+                alert('خطأ في التشخيص المالي: ' + data.message);
+            }
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            alert('خطأ في الشبكة أثناء التشخيص المالي');
+        })
+        .finally(() => {
+            // Restore button state
+            btn.innerHTML = originalText;
+            btn.disabled = false;
+        });
+}
+
+function showFinancialDiagnosisModal(diagnosis) {
+    let modalHtml = `
+        <div class="modal fade" id="financialDiagnosisModal" tabindex="-1">
+            <div class="modal-dialog modal-xl">
+                <div class="modal-content">
+                    <div class="modal-header">
+                        <h5 class="modal-title">
+                            <i class="fas fa-calculator me-2"></i>
+                            تشخيص الحسابات المالية
+                        </h5>
+                        <button type="button" class="btn-close" data-bs-dismiss="modal"></button>
+                    </div>
+                    <div class="modal-body">
+    `;
+
+    // Summary section
+    modalHtml += `
+        <div class="row mb-4">
+            <div class="col-md-4">
+                <div class="card text-center">
+                    <div class="card-body">
+                        <h5 class="text-success">${diagnosis.total_revenue.toFixed(2)}</h5>
+                        <small>إجمالي الإيرادات (فعلي)</small>
+                    </div>
+                </div>
+            </div>
+            <div class="col-md-4">
+                <div class="card text-center">
+                    <div class="card-body">
+                        <h5 class="text-warning">${diagnosis.pending_payments.toFixed(2)}</h5>
+                        <small>مدفوعات معلقة</small>
+                    </div>
+                </div>
+            </div>
+            <div class="col-md-4">
+                <div class="card text-center">
+                    <div class="card-body">
+                        <h5 class="text-primary">${diagnosis.total_groups_revenue.toFixed(2)}</h5>
+                        <small>إيرادات متوقعة</small>
+                    </div>
+                </div>
+            </div>
+        </div>
+    `;
+
+    // Logical consistency check
+    modalHtml += `
+        <div class="alert ${diagnosis.logical_consistency_check ? 'alert-success' : 'alert-danger'}">
+            <h6>
+                <i class="fas ${diagnosis.logical_consistency_check ? 'fa-check-circle' : 'fa-exclamation-triangle'} me-2"></i>
+                فحص التناسق المنطقي
+            </h6>
+            <p class="mb-2">
+                <strong>المعادلة:</strong> إجمالي الإيرادات + مدفوعات معلقة = إيرادات متوقعة
+            </p>
+            <p class="mb-2">
+                <strong>الحساب:</strong> ${diagnosis.total_revenue.toFixed(2)} + ${diagnosis.pending_payments.toFixed(2)} = ${diagnosis.calculated_total_should_equal_expected.toFixed(2)}
+            </p>
+            <p class="mb-1">
+                <strong>النتيجة المتوقعة:</strong> ${diagnosis.total_groups_revenue.toFixed(2)}
+            </p>
+            <p class="mb-0">
+                <strong>الفرق:</strong> ${diagnosis.difference.toFixed(2)}
+                ${diagnosis.logical_consistency_check ? ' ✅ صحيح' : ' ❌ يوجد خلل'}
+            </p>
+        </div>
+    `;
+
+    // Issues detected
+    if (diagnosis.groups_with_zero_price.length > 0) {
+        modalHtml += `
+            <div class="alert alert-warning">
+                <h6><i class="fas fa-exclamation-triangle me-2"></i>مجموعات بسعر صفر (${diagnosis.groups_with_zero_price.length})</h6>
+                <p class="mb-0">${diagnosis.groups_with_zero_price.join(', ')}</p>
+            </div>
+        `;
+    }
+
+    if (diagnosis.students_with_negative_balance.length > 0) {
+        modalHtml += `
+            <div class="alert alert-info">
+                <h6><i class="fas fa-minus-circle me-2"></i>طلاب برصيد سالب (${diagnosis.students_with_negative_balance.length})</h6>
+                <p class="mb-0">${diagnosis.students_with_negative_balance.join(', ')}</p>
+            </div>
+        `;
+    }
+
+    if (diagnosis.students_with_issues.length > 0) {
+        modalHtml += `
+            <div class="alert alert-danger">
+                <h6><i class="fas fa-bug me-2"></i>طلاب بأخطاء في الحساب (${diagnosis.students_with_issues.length})</h6>
+                <p class="mb-0">${diagnosis.students_with_issues.join(', ')}</p>
+            </div>
+        `;
+    }
+
+    // Student details table
+    if (diagnosis.student_details.length > 0) {
+        modalHtml += `
+            <div class="mt-4">
+                <h6>تفاصيل عينة من الطلاب (أول 10 طلاب):</h6>
+                <div class="table-responsive">
+                    <table class="table table-sm table-striped">
+                        <thead>
+                            <tr>
+                                <th>الطالب</th>
+                                <th>المجموعات</th>
+                                <th>إجمالي السعر</th>
+                                <th>الخصم</th>
+                                <th>بعد الخصم</th>
+                                <th>المدفوع</th>
+                                <th>المتبقي (فعلي)</th>
+                                <th>المتبقي (متوقع)</th>
+                                <th>صحة الحساب</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+        `;
+
+        diagnosis.student_details.forEach(student => {
+            const isCorrect = Math.abs(student.remaining_balance - student.expected_remaining) < 0.01;
+            modalHtml += `
+                <tr class="${isCorrect ? '' : 'table-danger'}">
+                    <td>${student.name}</td>
+                    <td><small>${student.groups.join(', ')}</small></td>
+                    <td>${student.total_group_price.toFixed(2)}</td>
+                    <td>${student.discount.toFixed(2)}</td>
+                    <td>${student.calculated_price_after_discount.toFixed(2)}</td>
+                    <td>${student.total_paid.toFixed(2)}</td>
+                    <td>${student.remaining_balance.toFixed(2)}</td>
+                    <td>${student.expected_remaining.toFixed(2)}</td>
+                    <td>${isCorrect ? '✅' : '❌'}</td>
+                </tr>
+            `;
+        });
+
+        modalHtml += `
+                        </tbody>
+                    </table>
+                </div>
+            </div>
+        `;
+    }
+
+    modalHtml += `
+                    </div>
+                    <div class="modal-footer">
+                        <button type="button" class="btn btn-secondary" data-bs-dismiss="modal">إغلاق</button>
+                        <button type="button" class="btn btn-info" onclick="location.reload()">تحديث الصفحة</button>
+                    </div>
+                </div>
+            </div>
+        </div>
+    `;
+
+    // Remove existing modal if any
+    const existingModal = document.getElementById('financialDiagnosisModal');
+    if (existingModal) {
+        existingModal.remove();
+    }
+
+    // Add modal to body and show
+    document.body.insertAdjacentHTML('beforeend', modalHtml);
+    const modal = new bootstrap.Modal(document.getElementById('financialDiagnosisModal'));
+    modal.show();
+}
+
+// Add smooth scroll to top when page loads
+function scrollToTop() {
+    window.scrollTo({
+        top: 0,
+        behavior: 'smooth'
+    });
+}
+
+// Enhanced number animation with counter effect
+function animateNumbers() {
+    const numbers = document.querySelectorAll('.stat-number');
+
+    numbers.forEach((number, index) => {
+        const finalValue = parseInt(number.textContent);
+        let currentValue = 0;
+        const increment = Math.ceil(finalValue / 30); // Animation steps
+
+        // Reset to 0 first
+        number.textContent = '0';
+
+        // Animate with delay
+        setTimeout(() => {
+            const timer = setInterval(() => {
+                currentValue += increment;
+                if (currentValue >= finalValue) {
+                    currentValue = finalValue;
+                    clearInterval(timer);
+                }
+                number.textContent = currentValue;
+            }, 50);
+        }, index * 200);
+    });
+}
+
+// Enhanced page initialization
+document.addEventListener('DOMContentLoaded', function () {
+    // Animate statistics numbers
+    animateNumbers();
+
+    // Add fade-in animation to cards
+    const cards = document.querySelectorAll('.modern-card, .chart-container, .financial-card');
+    cards.forEach((card, index) => {
+        card.style.opacity = '0';
+        card.style.transform = 'translateY(30px)';
+
+        setTimeout(() => {
+            card.style.transition = 'all 0.6s ease';
+            card.style.opacity = '1';
+            card.style.transform = 'translateY(0)';
+        }, index * 100);
+    });
+
+    // Add pulse animation to percentage
+    const percentage = document.querySelector('.percentage-number');
+    if (percentage) {
+        setInterval(() => {
+            percentage.style.transform = 'scale(1.1)';
+            setTimeout(() => {
+                percentage.style.transform = 'scale(1)';
+            }, 200);
+        }, 3000);
+    }
+
+    console.log('📊 تم تحميل صفحة التقارير بنجاح');
+});
+
+// Add ripple effect to buttons
+document.addEventListener('click', function (e) {
+    if (e.target.closest('.modern-btn')) {
+        const button = e.target.closest('.modern-btn');
+        const ripple = document.createElement('span');
+        const rect = button.getBoundingClientRect();
+        const size = Math.max(rect.width, rect.height);
+        const x = e.clientX - rect.left - size / 2;
+        const y = e.clientY - rect.top - size / 2;
+
+        ripple.style.cssText = `
+            position: absolute;
+            border-radius: 50%;
+            background: rgba(255,255,255,0.3);
+            width: ${size}px;
+            height: ${size}px;
+            left: ${x}px;
+            top: ${y}px;
+            animation: ripple 0.6s linear;
+            pointer-events: none;
+        `;
+
+        button.appendChild(ripple);
+
+        setTimeout(() => {
+            ripple.remove();
+        }, 600);
+    }
+});
+
+// Handle backup button click
+function handleBackupClick(event) {
+    const backupBtn = event.target.closest('.modern-btn.backup');
+    if (backupBtn) {
+        // Add loading state
+        backupBtn.classList.add('loading');
+        const icon = backupBtn.querySelector('i');
+        const originalIcon = icon.className;
+        icon.className = 'fas fa-spinner';
+
+        // Change text
+        const originalText = backupBtn.innerHTML;
+        backupBtn.innerHTML = '<i class="fas fa-spinner"></i> جاري إنشاء النسخة الاحتياطية...';
+
+        // Show loading message
+        showLoadingToast();
+
+        // Reset after 30 seconds (in case something goes wrong)
+        setTimeout(() => {
+            backupBtn.classList.remove('loading');
+            backupBtn.innerHTML = originalText;
+        }, 30000);
+    }
+}
+
+function showLoadingToast() {
+    // Create toast notification
+    const toast = document.createElement('div');
+    toast.style.cssText = `
+        position: fixed;
+        top: 20px;
+        right: 20px;
+        background: linear-gradient(135deg, #fc4a1a, #f7b733);
+        color: white;
+        padding: 15px 25px;
+        border-radius: 12px;
+        box-shadow: 0 8px 25px rgba(252, 74, 26, 0.3);
+        z-index: 9999;
+        font-weight: 600;
+        animation: slideInRight 0.3s ease;
+    `;
+    toast.innerHTML = `
+        <i class="fas fa-database me-2"></i>
+        جاري تحضير النسخة الاحتياطية الشاملة... قد يستغرق الأمر دقيقة أو أكثر
+    `;
+
+    document.body.appendChild(toast);
+
+    // Remove toast after 5 seconds
+    setTimeout(() => {
+        toast.style.animation = 'slideOutRight 0.3s ease';
+        setTimeout(() => {
+            document.body.removeChild(toast);
+        }, 300);
+    }, 5000);
+}
+
+// Add keyframes for toast animations
+const style = document.createElement('style');
+style.textContent = `
+    @keyframes slideInRight {
+        from {
+            transform: translateX(100%);
+            opacity: 0;
+        }
+        to {
+            transform: translateX(0);
+            opacity: 1;
+        }
+    }
+    
+    @keyframes slideOutRight {
+        from {
+            transform: translateX(0);
+            opacity: 1;
+        }
+        to {
+            transform: translateX(100%);
+            opacity: 0;
+        }
+    }
+`;
+document.head.appendChild(style);
+
+// Add event listener to backup button
+document.addEventListener('click', handleBackupClick);
+
+// Add loading animation for backup button
+const backupBtnStyle = document.createElement('style');
+backupBtnStyle.textContent = `
+    .modern-btn.backup.loading {
+        pointer-events: none;
+        opacity: 0.8;
+        transform: scale(0.98);
+    }
+    
+    .modern-btn.backup.loading i {
+        animation: spin 1s linear infinite;
+    }
+`;
+document.head.appendChild(backupBtnStyle);
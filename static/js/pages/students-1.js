@@ -0,0 +1,769 @@
+function editStudentFromData(button) {
+    const id = button.getAttribute('data-student-id');
+    const name = button.getAttribute('data-student-name');
+    const phone = button.getAttribute('data-student-phone');
+    const age = button.getAttribute('data-student-age');
+    const location = button.getAttribute('data-student-location');
+    const groupIds = JSON.parse(button.getAttribute('data-student-groups'));
+    const registrationDate = button.getAttribute('data-student-date');
+    const discount = button.getAttribute('data-student-discount');
+
+    editStudent(id, name, phone, age, location, groupIds, registrationDate, discount);
+}
+
+function editStudent(id, name, phone, age, location, groupIds, registrationDate, discount = 0) {
+    document.getElementById('editStudentForm').action = `/edit_student/${id}`;
+    document.getElementById('editName').value = name;
+    document.getElementById('editPhone').value = phone;
+    document.getElementById('editAge').value = age;
+    document.getElementById('editLocation').value = location;
+    document.getElementById('editDiscount').value = discount;
+
+    // Set date value directly (HTML5 date input expects YYYY-MM-DD format)
+    document.getElementById('editRegistrationDate').value = registrationDate;
+
+    // Clear all group checkboxes first
+    const groupCheckboxes = document.querySelectorAll('input[name="group_ids"]');
+    groupCheckboxes.forEach(checkbox => {
+        checkbox.checked = false;
+    });
+
+    // Check the groups that the student is currently in
+    if (Array.isArray(groupIds) && groupIds.length > 0) {
+        groupIds.forEach(groupId => {
+            const checkbox = document.getElementById(`edit_group_${groupId}`);
+            if (checkbox) {
+                checkbox.checked = true;
+            }
+        });
+    }
+
+    // Calculate and display total price for selected groups
+    calculateEditTotalPrice();
+
+    new bootstrap.Modal(document.getElementById('editStudentModal')).show();
+}
+
+function setTodayDate(inputId) {
+    const today = new Date();
+    const year = today.getFullYear();
+    const month = String(today.getMonth() + 1).padStart(2, '0');
+    const day = String(today.getDate()).padStart(2, '0');
+    const formattedDate = `${year}-${month}-${day}`;
+
+    document.getElementById(inputId).value = formattedDate;
+}
+
+
+
+// deleteStudent function is now in common.js
+
+// Add JavaScript to handle "No Group" checkbox behavior
+document.addEventListener('DOMContentLoaded', function () {
+    // Handle "No Group" checkbox in add modal
+    const noGroupAdd = document.getElementById('no_group');
+    const groupCheckboxesAdd = document.querySelectorAll('#addStudentModal input[name="group_ids"]');
+
+    if (noGroupAdd) {
+        noGroupAdd.addEventListener('change', function () {
+            if (this.checked) {
+                groupCheckboxesAdd.forEach(cb => cb.checked = false);
+            }
+        });
+    }
+
+    groupCheckboxesAdd.forEach(checkbox => {
+        checkbox.addEventListener('change', function () {
+            if (this.checked && noGroupAdd) {
+                noGroupAdd.checked = false;
+            }
+        });
+    });
+
+    // Handle "No Group" checkbox in edit modal
+    const noGroupEdit = document.getElementById('edit_no_group');
+    const groupCheckboxesEdit = document.querySelectorAll('#editStudentModal input[name="group_ids"]');
+
+    if (noGroupEdit) {
+        noGroupEdit.addEventListener('change', function () {
+            if (this.checked) {
+                groupCheckboxesEdit.forEach(cb => cb.checked = false);
+            }
+        });
+    }
+
+    groupCheckboxesEdit.forEach(checkbox => {
+        checkbox.addEventListener('change', function () {
+            if (this.checked && noGroupEdit) {
+                noGroupEdit.checked = false;
+            }
+        });
+    });
+});
+
+// Filter functions
+function submitFilter() {
+    const form = document.getElementById('filterForm');
+    if (form) {
+        form.submit();
+    }
+}
+
+function clearFilters() {
+    const groupFilter = document.getElementById('group_filter');
+    const ageFilter = document.getElementById('age_filter');
+    const locationFilter = document.getElementById('location_filter');
+
+    if (groupFilter) groupFilter.value = '';
+    if (ageFilter) ageFilter.value = '';
+    if (locationFilter) locationFilter.value = '';
+
+    const form = document.getElementById('filterForm');
+    if (form) {
+        form.submit();
+    }
+}
+
+function exportFiltered() {
+    // Simple CSV export of filtered students
+    const students = [];
+    const table = document.querySelector('table tbody');
+    const rows = table.querySelectorAll('tr:not([style*="display: none"])'); // Only visible rows
+
+    // Add header
+    students.push(['#', 'الاسم', 'الهاتف', 'العمر', 'المنطقة', 'المجموعات', 'سعر الكورس', 'المبلغ المدفوع', 'المتبقي', 'تاريخ التسجيل']);
+
+    rows.forEach((row, index) => {
+        if (row.cells.length > 1) { // Skip empty state row
+            const cells = Array.from(row.cells).slice(0, -1); // Exclude actions column
+            const rowData = cells.map(cell => cell.textContent.trim());
+            students.push(rowData);
+        }
+    });
+
+    if (students.length > 1) {
+        const csvContent = students.map(row => row.join(',')).join('\n');
+        const blob = new Blob([csvContent], { type: 'text/csv;charset=utf-8;' });
+        const link = document.createElement('a');
+        const url = URL.createObjectURL(blob);
+        link.setAttribute('href', url);
+        link.setAttribute('download', 'students_filtered.csv');
+        link.style.visibility = 'hidden';
+        document.body.appendChild(link);
+        link.click();
+        document.body.removeChild(link);
+
+        showSuccess('تم التصدير بنجاح', 'تم تحميل ملف البيانات بنجاح');
+    } else {
+        showError('لا توجد بيانات', 'لا توجد بيانات للتصدير');
+    }
+}
+
+
+
+// Function to open WhatsApp with formatted phone number
+function openWhatsApp(phoneNumber) {
+    // Remove all non-digit characters except + at the beginning
+    let cleanPhone = phoneNumber.replace(/[^\d+]/g, '');
+
+    // If phone doesn't start with +, assume it's an Egyptian number and add +20
+    if (!cleanPhone.startsWith('+')) {
+        // Remove leading zero if present for Egyptian numbers
+        if (cleanPhone.startsWith('0')) {
+            cleanPhone = cleanPhone.substring(1);
+        }
+        cleanPhone = '+20' + cleanPhone;
+    }
+
+    // Open WhatsApp
+    const whatsappUrl = `https://wa.me/${cleanPhone}`;
+    window.open(whatsappUrl, '_blank');
+}
+
+// Function to calculate total price for add form
+function calculateTotalPrice() {
+    let totalPrice = 0;
+    const checkboxes = document.querySelectorAll('.group-checkbox:checked');
+    const countElement = document.getElementById('selected_groups_count');
+
+    console.log('Calculating total price...', checkboxes.length, 'groups selected');
+
+    checkboxes.forEach(checkbox => {
+        const price = parseFloat(checkbox.getAttribute('data-price')) || 0;
+        console.log('Group price:', price);
+        totalPrice += price;
+    });
+
+    console.log('Total price:', totalPrice);
+    const displayElement = document.getElementById('total_price_display');
+    if (displayElement) {
+        displayElement.textContent = totalPrice.toFixed(2) + ' ج.م';
+    }
+
+    // Update selected groups count
+    if (countElement) {
+        if (checkboxes.length === 0) {
+            countElement.textContent = 'لم يتم اختيار مجموعات';
+            countElement.className = 'text-muted';
+        } else if (checkboxes.length === 1) {
+            countElement.textContent = 'مجموعة واحدة مختارة';
+            countElement.className = 'text-success';
+        } else {
+            countElement.textContent = `${checkboxes.length} مجموعات مختارة`;
+            countElement.className = 'text-success';
+        }
+    }
+
+    // Update price breakdown with discount
+    updateTotalWithDiscount();
+}
+
+// Function to update price display with discount
+function updateTotalWithDiscount() {
+    let totalPrice = 0;
+    const checkboxes = document.querySelectorAll('.group-checkbox:checked');
+
+    checkboxes.forEach(checkbox => {
+        const price = parseFloat(checkbox.getAttribute('data-price')) || 0;
+        totalPrice += price;
+    });
+
+    const discount = parseFloat(document.getElementById('discount').value) || 0;
+    const finalPrice = Math.max(0, totalPrice - discount);
+
+    // Update display elements
+    document.getElementById('original_price_display').textContent = totalPrice.toFixed(2) + ' ج.م';
+    document.getElementById('discount_display').textContent = discount.toFixed(2) + ' ج.م';
+    document.getElementById('final_price_display').textContent = finalPrice.toFixed(2) + ' ج.م';
+}
+
+// Function to calculate total price for edit form
+function calculateEditTotalPrice() {
+    let totalPrice = 0;
+    const checkboxes = document.querySelectorAll('.edit-group-checkbox:checked');
+
+    checkboxes.forEach(checkbox => {
+        const price = parseFloat(checkbox.getAttribute('data-price')) || 0;
+        totalPrice += price;
+    });
+
+    const displayElement = document.getElementById('edit_total_price_display');
+    if (displayElement) {
+        displayElement.textContent = totalPrice.toFixed(2) + ' ج.م';
+    }
+
+    // Update price breakdown with discount for edit form
+    updateEditTotalWithDiscount();
+}
+
+// Function to update edit price display with discount
+function updateEditTotalWithDiscount() {
+    let totalPrice = 0;
+    const checkboxes = document.querySelectorAll('.edit-group-checkbox:checked');
+
+    checkboxes.forEach(checkbox => {
+        const price = parseFloat(checkbox.getAttribute('data-price')) || 0;
+        totalPrice += price;
+    });
+
+    const discount = parseFloat(document.getElementById('editDiscount').value) || 0;
+    const finalPrice = Math.max(0, totalPrice - discount);
+
+    // Update display elements for edit form
+    document.getElementById('edit_original_price_display').textContent = totalPrice.toFixed(2) + ' ج.م';
+    document.getElementById('edit_discount_display').textContent = discount.toFixed(2) + ' ج.م';
+    document.getElementById('edit_final_price_display').textContent = finalPrice.toFixed(2) + ' ج.م';
+}
+
+// Bulk operations functions
+let selectedStudents = [];
+
+function updateBulkActions() {
+    const bulkActions = document.getElementById('bulk-actions');
+    const selectedCount = document.getElementById('selected-count');
+
+    if (selectedStudents.length > 0) {
+        bulkActions.classList.remove('d-none');
+        selectedCount.textContent = `${selectedStudents.length} محدد`;
+    } else {
+        bulkActions.classList.add('d-none');
+    }
+}
+
+function toggleStudentSelection(studentId, isChecked) {
+    if (isChecked) {
+        if (!selectedStudents.includes(studentId)) {
+            selectedStudents.push(studentId);
+        }
+    } else {
+        selectedStudents = selectedStudents.filter(id => id !== studentId);
+    }
+
+    // Add/remove visual highlighting
+    const row = document.querySelector(`tr[data-student-id="${studentId}"]`);
+    if (row) {
+        if (isChecked) {
+            row.classList.add('selected');
+        } else {
+            row.classList.remove('selected');
+        }
+    }
+
+    updateBulkActions();
+    updateSelectAllCheckbox();
+}
+
+function updateSelectAllCheckbox() {
+    const selectAllCheckbox = document.getElementById('select-all');
+    const studentCheckboxes = document.querySelectorAll('.student-checkbox');
+    const checkedBoxes = document.querySelectorAll('.student-checkbox:checked');
+
+    if (checkedBoxes.length === 0) {
+        selectAllCheckbox.indeterminate = false;
+        selectAllCheckbox.checked = false;
+    } else if (checkedBoxes.length === studentCheckboxes.length) {
+        selectAllCheckbox.indeterminate = false;
+        selectAllCheckbox.checked = true;
+    } else {
+        selectAllCheckbox.indeterminate = true;
+    }
+}
+
+function clearSelection() {
+    selectedStudents = [];
+    document.querySelectorAll('.student-checkbox').forEach(cb => cb.checked = false);
+    document.querySelectorAll('tr.selected').forEach(row => row.classList.remove('selected'));
+    document.getElementById('select-all').checked = false;
+    document.getElementById('select-all').indeterminate = false;
+    updateBulkActions();
+}
+
+function showBulkEditGroupModal() {
+    document.getElementById('bulk-selected-count').textContent = selectedStudents.length;
+    document.getElementById('bulk_student_ids').value = selectedStudents.join(',');
+    new bootstrap.Modal(document.getElementById('bulkEditGroupModal')).show();
+}
+
+function confirmBulkDelete() {
+    const studentNames = [];
+    selectedStudents.forEach(studentId => {
+        const row = document.querySelector(`tr[data-student-id="${studentId}"]`);
+        if (row) {
+            const nameCell = row.querySelector('td:nth-child(3)'); // الاسم في العمود الثالث
+            if (nameCell) {
+                studentNames.push(nameCell.textContent.trim());
+            }
+        }
+    });
+
+    document.getElementById('delete-selected-count').textContent = selectedStudents.length;
+
+    const listContainer = document.getElementById('students-to-delete-list');
+    listContainer.innerHTML = studentNames.map(name =>
+        `<div class="text-danger mb-1"><i class="fas fa-user me-1"></i>${name}</div>`
+    ).join('');
+
+    new bootstrap.Modal(document.getElementById('bulkDeleteModal')).show();
+}
+
+function executeBulkDelete() {
+    if (selectedStudents.length === 0) return;
+
+    // إرسال طلب الحذف
+    fetch('/bulk_delete_students', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+            student_ids: selectedStudents
+        })
+    })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                // إغلاق النافذة المنبثقة
+                bootstrap.Modal.getInstance(document.getElementById('bulkDeleteModal')).hide();
+
+                // إظهار رسالة النجاح
+                showSuccess('تم الحذف بنجاح', `تم حذف ${selectedStudents.length} طالب بنجاح`);
+
+                // إعادة تحميل الصفحة
+                setTimeout(() => {
+                    window.location.reload();
+                }, 1500);
+            } else {
+                showError('خطأ في الحذف', data.message || 'حدث خطأ أثناء محاولة الحذف');
+            }
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            showError('خطأ في الحذف', 'حدث خطأ في الشبكة');
+        });
+}
+
+// Enhanced table scrolling and column management
+function initializeEnhancedTable() {
+    const topScrollBar = document.getElementById('topScrollBar');
+    const tableContainer = document.getElementById('tableContainer');
+    const scrollContent = topScrollBar.querySelector('.scroll-content');
+    const table = document.getElementById('studentsTable');
+
+    // Set up top scroll bar width to match table width
+    function updateScrollContent() {
+        if (table && scrollContent) {
+            scrollContent.style.width = table.scrollWidth + 'px';
+        }
+    }
+
+    // Synchronize scrolling between top bar and table
+    function syncScroll(source, target) {
+        if (source && target) {
+            target.scrollLeft = source.scrollLeft;
+        }
+    }
+
+    // Initialize scroll synchronization
+    if (topScrollBar && tableContainer) {
+        updateScrollContent();
+
+        topScrollBar.addEventListener('scroll', function () {
+            syncScroll(this, tableContainer);
+        });
+
+        tableContainer.addEventListener('scroll', function () {
+            syncScroll(this, topScrollBar);
+        });
+    }
+
+    // Column toggle functionality
+    const columnToggles = {
+        'toggle-phone': '.col-phone',
+        'toggle-age': '.col-age',
+        'toggle-location': '.col-location',
+        'toggle-price': '.col-price',
+        'toggle-discount': '.col-discount',
+        'toggle-final-price': '.col-final-price',
+        'toggle-paid': '.col-paid',
+        'toggle-remaining': '.col-remaining',
+        'toggle-date': '.col-date'
+    };
+
+    // Set up column toggles
+    Object.keys(columnToggles).forEach(toggleId => {
+        const toggle = document.getElementById(toggleId);
+        if (toggle) {
+            toggle.addEventListener('change', function () {
+                const columns = document.querySelectorAll(columnToggles[toggleId]);
+                columns.forEach(col => {
+                    if (this.checked) {
+                        col.classList.remove('hidden');
+                    } else {
+                        col.classList.add('hidden');
+                    }
+                });
+
+                // Update scroll content width after column visibility change
+                setTimeout(updateScrollContent, 100);
+            });
+        }
+    });
+
+    // Update scroll content on window resize
+    window.addEventListener('resize', function () {
+        setTimeout(updateScrollContent, 100);
+    });
+
+    // Initial update
+    setTimeout(updateScrollContent, 500);
+}
+
+// Add event listeners for group selection changes
+document.addEventListener('DOMContentLoaded', function () {
+    console.log('DOM loaded, setting up event listeners...');
+
+    // Initialize enhanced table features
+    initializeEnhancedTable();
+
+    // Add form listeners
+    const groupCheckboxes = document.querySelectorAll('.group-checkbox');
+    console.log('Found', groupCheckboxes.length, 'group checkboxes for add form');
+
+    groupCheckboxes.forEach(checkbox => {
+        checkbox.addEventListener('change', function () {
+            console.log('Group checkbox changed:', this.value, this.checked);
+            calculateTotalPrice();
+        });
+    });
+
+    // Edit form listeners
+    const editGroupCheckboxes = document.querySelectorAll('.edit-group-checkbox');
+    console.log('Found', editGroupCheckboxes.length, 'group checkboxes for edit form');
+
+    editGroupCheckboxes.forEach(checkbox => {
+        checkbox.addEventListener('change', function () {
+            console.log('Edit group checkbox changed:', this.value, this.checked);
+            calculateEditTotalPrice();
+        });
+    });
+
+    // Handle "No Group" checkbox in add modal
+    const noGroupAdd = document.getElementById('no_group');
+    const groupCheckboxesAdd = document.querySelectorAll('#addStudentModal input[name="group_ids"]');
+
+    if (noGroupAdd) {
+        noGroupAdd.addEventListener('change', function () {
+            if (this.checked) {
+                groupCheckboxesAdd.forEach(cb => {
+                    cb.checked = false;
+                });
+                calculateTotalPrice();
+            }
+        });
+    }
+
+    groupCheckboxesAdd.forEach(checkbox => {
+        checkbox.addEventListener('change', function () {
+            if (this.checked && noGroupAdd) {
+                noGroupAdd.checked = false;
+            }
+            calculateTotalPrice();
+        });
+    });
+
+    // Handle "No Group" checkbox in edit modal
+    const noGroupEdit = document.getElementById('edit_no_group');
+    const groupCheckboxesEdit = document.querySelectorAll('#editStudentModal input[name="group_ids"]');
+
+    if (noGroupEdit) {
+        noGroupEdit.addEventListener('change', function () {
+            if (this.checked) {
+                groupCheckboxesEdit.forEach(cb => {
+                    cb.checked = false;
+                });
+                calculateEditTotalPrice();
+            }
+        });
+    }
+
+    groupCheckboxesEdit.forEach(checkbox => {
+        checkbox.addEventListener('change', function () {
+            if (this.checked && noGroupEdit) {
+                noGroupEdit.checked = false;
+            }
+            calculateEditTotalPrice();
+        });
+    });
+
+    // Reset price display when modals are opened
+    document.getElementById('addStudentModal').addEventListener('show.bs.modal', function () {
+        console.log('Add student modal opened, resetting price');
+        document.getElementById('total_price_display').textContent = '0.00 ج.م';
+    });
+
+    document.getElementById('editStudentModal').addEventListener('show.bs.modal', function () {
+        console.log('Edit student modal opened');
+        calculateEditTotalPrice();
+    });
+
+    // Add event listeners for bulk selection
+    const selectAllCheckbox = document.getElementById('select-all');
+    if (selectAllCheckbox) {
+        selectAllCheckbox.addEventListener('change', function () {
+            const studentCheckboxes = document.querySelectorAll('.student-checkbox');
+            const isChecked = this.checked;
+
+            studentCheckboxes.forEach(checkbox => {
+                checkbox.checked = isChecked;
+                const studentId = parseInt(checkbox.value);
+                toggleStudentSelection(studentId, isChecked);
+            });
+        });
+    }
+
+    // Add event listeners for individual student checkboxes
+    document.querySelectorAll('.student-checkbox').forEach(checkbox => {
+        checkbox.addEventListener('change', function () {
+            const studentId = parseInt(this.value);
+            toggleStudentSelection(studentId, this.checked);
+        });
+    });
+
+    // Handle bulk edit group form submission
+    document.getElementById('bulkEditGroupForm').addEventListener('submit', function (e) {
+        e.preventDefault();
+
+        const formData = new FormData(this);
+
+        fetch('/bulk_edit_group', {
+            method: 'POST',
+            body: formData
+        })
+            .then(response => response.json())
+            .then(data => {
+                if (data.success) {
+                    bootstrap.Modal.getInstance(document.getElementById('bulkEditGroupModal')).hide();
+                    showSuccess('تم التحديث بنجاح', data.message);
+                    setTimeout(() => {
+                        window.location.reload();
+                    }, 1500);
+                } else {
+                    showError('خطأ في التحديث', data.message || 'حدث خطأ أثناء التحديث');
+                }
+            })
+            .catch(error => {
+                console.error('Error:', error);
+                showError('خطأ في التحديث', 'حدث خطأ في الشبكة');
+            });
+    });
+
+    // Initialize enhanced table features
+    initializeEnhancedTableScroll();
+
+    // Add event listeners for filter form
+    const groupFilter = document.getElementById('group_filter');
+    const ageFilter = document.getElementById('age_filter');
+    const locationFilter = document.getElementById('location_filter');
+
+    if (groupFilter) {
+        groupFilter.addEventListener('change', submitFilter);
+    }
+    if (ageFilter) {
+        ageFilter.addEventListener('change', submitFilter);
+    }
+    if (locationFilter) {
+        locationFilter.addEventListener('change', submitFilter);
+    }
+
+    // تأكد من ربط دالة البحث بحقل النص
+    const searchInput = document.getElementById('search_text');
+    if (searchInput) {
+        // إزالة أي event listeners قديمة وإضافة جديدة
+        searchInput.addEventListener('keyup', quickSearch);
+        searchInput.addEventListener('input', quickSearch);
+        searchInput.addEventListener('paste', function () {
+            // تأخير قصير للسماح بمعالجة اللصق
+            setTimeout(quickSearch, 10);
+        });
+    }
+
+    console.log('All enhanced features initialized successfully');
+});
+
+// Enhanced table scrolling and column management
+function initializeEnhancedTable() {
+    console.log('Starting enhanced table initialization...');
+
+    const topScrollBar = document.getElementById('topScrollBar');
+    const tableContainer = document.getElementById('tableContainer');
+    const scrollContent = topScrollBar ? topScrollBar.querySelector('.scroll-content') : null;
+    const table = document.getElementById('studentsTable');
+
+    console.log('Enhanced table elements found:', {
+        topScrollBar: !!topScrollBar,
+        tableContainer: !!tableContainer,
+        scrollContent: !!scrollContent,
+        table: !!table
+    });
+
+    if (!topScrollBar || !tableContainer || !scrollContent || !table) {
+        console.error('Missing required elements for enhanced table');
+        return;
+    }
+
+    // Set up top scroll bar width to match table width
+    function updateScrollContent() {
+        if (table && scrollContent && topScrollBar) {
+            const tableWidth = table.scrollWidth;
+            const containerWidth = tableContainer.clientWidth;
+
+            console.log('Updating scroll content:', {
+                tableWidth,
+                containerWidth,
+                needsScroll: tableWidth > containerWidth
+            });
+
+            scrollContent.style.width = tableWidth + 'px';
+
+            // Show/hide top scroll bar based on whether horizontal scrolling is needed
+            if (tableWidth > containerWidth) {
+                topScrollBar.style.display = 'block';
+            } else {
+                topScrollBar.style.display = 'none';
+            }
+        }
+    }
+
+    // Synchronize scrolling between top bar and table
+    function syncScroll(source, target, preventLoop = false) {
+        if (source && target && !preventLoop) {
+            target.scrollLeft = source.scrollLeft;
+        }
+    }
+
+    // Initialize scroll synchronization
+    if (topScrollBar && tableContainer) {
+        let isTopScrolling = false;
+        let isTableScrolling = false;
+
+        topScrollBar.addEventListener('scroll', function () {
+            if (!isTableScrolling) {
+                isTopScrolling = true;
+                tableContainer.scrollLeft = this.scrollLeft;
+                setTimeout(() => { isTopScrolling = false; }, 50);
+            }
+        });
+
+        tableContainer.addEventListener('scroll', function () {
+            if (!isTopScrolling) {
+                isTableScrolling = true;
+                topScrollBar.scrollLeft = this.scrollLeft;
+                setTimeout(() => { isTableScrolling = false; }, 50);
+            }
+        });
+
+        // Initial setup
+        updateScrollContent();
+    }
+
+    // Column toggle functionality
+    const columnToggles = {
+        'toggle-phone': '.col-phone',
+        'toggle-age': '.col-age',
+        'toggle-location': '.col-location',
+        'toggle-price': '.col-price',
+        'toggle-discount': '.col-discount',
+        'toggle-final-price': '.col-final-price',
+        'toggle-paid': '.col-paid',
+        'toggle-remaining': '.col-remaining',
+        'toggle-date': '.col-date'
+    };
+
+    // Set up column toggles
+    Object.keys(columnToggles).forEach(toggleId => {
+        const toggle = document.getElementById(toggleId);
+        if (toggle) {
+            toggle.addEventListener('change', function () {
+                const columns = document.querySelectorAll(columnToggles[toggleId]);
+                columns.forEach(col => {
+                    if (this.checked) {
+                        col.classList.remove('hidden');
+                    } else {
+                        col.classList.add('hidden');
+                    }
+                });
+
+                // Update scroll content width after column visibility change
+                setTimeout(updateScrollContent, 100);
+            });
+        }
+    });
+
+    // Update scroll content on window resize
+    window.addEventListener('resize', function () {
+        setTimeout(updateScrollContent, 100);
+    });
+
+    // Initial update
+    setTimeout(updateScrollContent, 500);
+}
@@ -0,0 +1,254 @@
+// Enhanced Students Table JavaScript Functions - تحسينات جدول الطلاب
+
+// Filter Functions - دوال الفلترة
+function submitFilter() {
+    console.log('Submitting filter...');
+    const form = document.getElementById('filterForm');
+    if (form) {
+        form.submit();
+    } else {
+        console.error('Filter form not found');
+    }
+}
+
+function clearFilters() {
+    console.log('Clearing filters...');
+    const groupFilter = document.getElementById('group_filter');
+    const ageFilter = document.getElementById('age_filter');
+    const locationFilter = document.getElementById('location_filter');
+
+    if (groupFilter) groupFilter.value = '';
+    if (ageFilter) ageFilter.value = '';
+    if (locationFilter) locationFilter.value = '';
+
+    const form = document.getElementById('filterForm');
+    if (form) {
+        form.submit();
+    }
+}
+
+// Quick Search Function - دالة البحث السريع المحسنة
+function quickSearch() {
+    const searchText = document.getElementById('search_text').value.toLowerCase().trim();
+    const table = document.querySelector('#studentsTable tbody');
+    const searchInput = document.getElementById('search_text');
+
+    if (!table) {
+        console.error('Table not found!');
+        return;
+    }
+
+    // إضافة مؤشر بصري للبحث
+    if (searchInput) {
+        searchInput.style.borderColor = '#ffc107';
+        searchInput.style.boxShadow = '0 0 0 0.2rem rgba(255, 193, 7, 0.25)';
+    }
+
+    const rows = table.querySelectorAll('tr');
+    let visibleCount = 0;
+
+    // إزالة أي رسائل بحث فارغة سابقة
+    const existingEmptyRows = table.querySelectorAll('tr.search-empty-state');
+    existingEmptyRows.forEach(row => row.remove());
+
+    rows.forEach((row, index) => {
+        // تخطي الصفوف الفارغة أو التي تحتوي على colspan
+        if (row.cells.length > 1 && !row.querySelector('td[colspan]') && !row.classList.contains('search-empty-state')) {
+            const studentName = row.cells[2] ? row.cells[2].textContent.toLowerCase().trim() : '';
+            const studentPhone = row.cells[3] ? row.cells[3].textContent.toLowerCase().trim() : '';
+
+            // البحث في الاسم والهاتف معاً
+            const matchesName = studentName.includes(searchText);
+            const matchesPhone = studentPhone.includes(searchText);
+
+            if (searchText === '' || matchesName || matchesPhone) {
+                row.style.display = '';
+                visibleCount++;
+            } else {
+                row.style.display = 'none';
+            }
+        }
+    });
+
+    // تحديث شارة العدد
+    const badge = document.querySelector('.badge.bg-info');
+    if (badge) {
+        badge.innerHTML = `<i class="fas fa-list-ol me-1"></i>عدد النتائج: ${visibleCount}`;
+    }
+
+    // إظهار رسالة البحث الفارغ إذا لم توجد نتائج
+    showSearchEmptyState(visibleCount, searchText);
+
+    // إزالة المؤشر البصري للبحث
+    if (searchInput) {
+        setTimeout(() => {
+            searchInput.style.borderColor = '';
+            searchInput.style.boxShadow = '';
+        }, 300);
+    }
+}
+
+function showSearchEmptyState(visibleCount, searchText) {
+    const table = document.querySelector('table tbody');
+    let emptyRow = table.querySelector('tr.search-empty-state');
+
+    // Remove existing empty state if any
+    if (emptyRow) {
+        emptyRow.remove();
+    }
+
+    if (visibleCount === 0 && searchText.length > 0) {
+        const emptyStateRow = document.createElement('tr');
+        emptyStateRow.className = 'search-empty-state';
+        emptyStateRow.innerHTML = `
+            <td colspan="14" class="text-center text-muted py-4">
+                <i class="fas fa-search fa-3x mb-3 text-info"></i>
+                <h5>لا توجد نتائج للبحث</h5>
+                <p>لا توجد نتائج للبحث عن: "<strong>${searchText}</strong>"</p>
+                <button class="btn btn-outline-primary btn-sm" onclick="clearSearch()">
+                    <i class="fas fa-times me-1"></i>
+                    مسح البحث
+                </button>
+            </td>
+        `;
+        table.appendChild(emptyStateRow);
+    }
+}
+
+function clearSearch() {
+    const searchInput = document.getElementById('search_text');
+    if (searchInput) {
+        searchInput.value = '';
+        // استدعاء دالة البحث لإعادة إظهار جميع النتائج
+        quickSearch();
+    }
+}
+
+// Export Function - دالة التصدير
+function exportFiltered() {
+    const students = [];
+    const table = document.querySelector('table tbody');
+    const rows = table.querySelectorAll('tr:not([style*="display: none"])');
+
+    students.push(['#', 'الاسم', 'الهاتف', 'العمر', 'المنطقة', 'المجموعات', 'سعر الكورس', 'المبلغ المدفوع', 'المتبقي', 'تاريخ التسجيل']);
+
+    rows.forEach((row, index) => {
+        if (row.cells.length > 1) {
+            const cells = Array.from(row.cells).slice(1, -1);
+            const rowData = cells.map(cell => cell.textContent.trim());
+            students.push(rowData);
+        }
+    });
+
+    if (students.length > 1) {
+        const csvContent = students.map(row => row.join(',')).join('\n');
+        const blob = new Blob([csvContent], { type: 'text/csv;charset=utf-8;' });
+        const link = document.createElement('a');
+        const url = URL.createObjectURL(blob);
+        link.setAttribute('href', url);
+        link.setAttribute('download', 'students_filtered.csv');
+        link.style.visibility = 'hidden';
+        document.body.appendChild(link);
+        link.click();
+        document.body.removeChild(link);
+
+        if (typeof showSuccess === 'function') {
+            showSuccess('تم التصدير بنجاح', 'تم تحميل ملف البيانات بنجاح');
+        }
+    } else {
+        if (typeof showError === 'function') {
+            showError('لا توجد بيانات', 'لا توجد بيانات للتصدير');
+        }
+    }
+}
+
+// WhatsApp Function - دالة واتساب
+function openWhatsApp(phoneNumber) {
+    let cleanPhone = phoneNumber.replace(/[^\d+]/g, '');
+    if (!cleanPhone.startsWith('+')) {
+        if (cleanPhone.startsWith('0')) {
+            cleanPhone = cleanPhone.substring(1);
+        }
+        cleanPhone = '+20' + cleanPhone;
+    }
+    const whatsappUrl = `https://wa.me/${cleanPhone}`;
+    window.open(whatsappUrl, '_blank');
+}
+
+// Enhanced Table Scroll Function - دالة الـ scroll المحسنة
+function initializeEnhancedTableScroll() {
+    console.log('Initializing enhanced table scroll...');
+
+    const topScrollBar = document.getElementById('topScrollBar');
+    const tableContainer = document.getElementById('tableContainer');
+    const scrollContent = topScrollBar ? topScrollBar.querySelector('.scroll-content') : null;
+    const table = document.getElementById('studentsTable');
+
+    if (!topScrollBar || !tableContainer || !scrollContent || !table) {
+        console.log('Missing scroll elements, skipping scroll setup');
+        return;
+    }
+
+    function updateScrollContent() {
+        // تم تعطيل شريط التمرير العلوي
+        if (topScrollBar) {
+            topScrollBar.style.display = 'none';
+        }
+    }
+
+    let isTopScrolling = false;
+    let isTableScrolling = false;
+
+    topScrollBar.addEventListener('scroll', function () {
+        if (!isTableScrolling) {
+            isTopScrolling = true;
+            tableContainer.scrollLeft = this.scrollLeft;
+            setTimeout(() => { isTopScrolling = false; }, 50);
+        }
+    });
+
+    tableContainer.addEventListener('scroll', function () {
+        if (!isTopScrolling) {
+            isTableScrolling = true;
+            topScrollBar.scrollLeft = this.scrollLeft;
+            setTimeout(() => { isTableScrolling = false; }, 50);
+        }
+    });
+
+    // Column toggles
+    const columnToggles = {
+        'toggle-phone': '.col-phone',
+        'toggle-age': '.col-age',
+        'toggle-location': '.col-location',
+        'toggle-price': '.col-price',
+        'toggle-discount': '.col-discount',
+        'toggle-final-price': '.col-final-price',
+        'toggle-paid': '.col-paid',
+        'toggle-remaining': '.col-remaining',
+        'toggle-date': '.col-date'
+    };
+
+    Object.keys(columnToggles).forEach(toggleId => {
+        const toggle = document.getElementById(toggleId);
+        if (toggle) {
+            toggle.addEventListener('change', function () {
+                const columns = document.querySelectorAll(columnToggles[toggleId]);
+                columns.forEach(col => {
+                    if (this.checked) {
+                        col.classList.remove('hidden');
+                    } else {
+                        col.classList.add('hidden');
+                    }
+                });
+                setTimeout(updateScrollContent, 100);
+            });
+        }
+    });
+
+    window.addEventListener('resize', () => setTimeout(updateScrollContent, 100));
+
+    setTimeout(() => {
+        updateScrollContent();
+        console.log('Enhanced table scroll initialized successfully');
+    }, 500);
+}
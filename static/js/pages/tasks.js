@@ -0,0 +1,263 @@
+// Initialize modals manually if Bootstrap is available
+let addTaskModal, addNoteModal;
+
+// Debug function to check Bootstrap Modal availability
+function checkBootstrap() {
+    console.log('Checking Bootstrap availability...');
+    console.log('window.bootstrap:', window.bootstrap);
+    console.log('typeof bootstrap:', typeof bootstrap);
+
+    if (typeof bootstrap !== 'undefined' && bootstrap.Modal) {
+        console.log('Bootstrap 5 Modal is available');
+
+        // Initialize modals
+        const taskModalElement = document.getElementById('addTaskModal');
+        const noteModalElement = document.getElementById('addNoteModal');
+
+        if (taskModalElement) {
+            addTaskModal = new bootstrap.Modal(taskModalElement);
+            console.log('Task modal initialized');
+        }
+
+        if (noteModalElement) {
+            addNoteModal = new bootstrap.Modal(noteModalElement);
+            console.log('Note modal initialized');
+        }
+
+        return true;
+    }
+    console.error('Bootstrap 5 Modal is not available');
+    return false;
+}
+
+// Manual modal opening function
+function openModal(modalId) {
+    console.log('Attempting to open modal:', modalId);
+
+    // Try Bootstrap first
+    if (modalId === 'addTaskModal' && addTaskModal) {
+        addTaskModal.show();
+        return;
+    }
+
+    if (modalId === 'addNoteModal' && addNoteModal) {
+        addNoteModal.show();
+        return;
+    }
+
+    // Enhanced fallback method
+    const modal = document.getElementById(modalId);
+    if (modal) {
+        // Create backdrop if it doesn't exist
+        let backdrop = document.querySelector('.modal-backdrop');
+        if (!backdrop) {
+            backdrop = document.createElement('div');
+            backdrop.className = 'modal-backdrop fade show';
+            backdrop.style.cssText = `
+                position: fixed;
+                top: 0;
+                left: 0;
+                z-index: 1050;
+                width: 100vw;
+                height: 100vh;
+                background-color: rgba(0, 0, 0, 0.5);
+            `;
+            document.body.appendChild(backdrop);
+            modal._backdrop = backdrop;
+        }
+
+        // Show modal with animation
+        modal.style.display = 'block';
+        modal.classList.add('show');
+        modal.style.zIndex = '1055';
+        modal.setAttribute('aria-modal', 'true');
+        modal.setAttribute('role', 'dialog');
+
+        // Focus on modal
+        modal.focus();
+
+        console.log('Modal opened with enhanced fallback method');
+    }
+}
+
+// Enhanced close modal function
+function closeModal(modalElement) {
+    if (modalElement) {
+        modalElement.style.display = 'none';
+        modalElement.classList.remove('show');
+        modalElement.removeAttribute('aria-modal');
+        modalElement.removeAttribute('role');
+
+        // Remove backdrop
+        if (modalElement._backdrop) {
+            modalElement._backdrop.remove();
+            delete modalElement._backdrop;
+        } else {
+            const backdrop = document.querySelector('.modal-backdrop');
+            if (backdrop) {
+                backdrop.remove();
+            }
+        }
+    }
+}
+
+// Event listeners for modal buttons
+function setupModalButtons() {
+    // Add Task button - using ID selector
+    const addTaskBtn = document.getElementById('addTaskBtn');
+    if (addTaskBtn) {
+        addTaskBtn.addEventListener('click', function (e) {
+            e.preventDefault();
+            console.log('Add task button clicked (ID)');
+            openModal('addTaskModal');
+        });
+    }
+
+    // Add Note button - using ID selector  
+    const addNoteBtn = document.getElementById('addNoteBtn');
+    if (addNoteBtn) {
+        addNoteBtn.addEventListener('click', function (e) {
+            e.preventDefault();
+            console.log('Add note button clicked (ID)');
+            openModal('addNoteModal');
+        });
+    }
+
+    // Fallback for any remaining data-bs-target buttons
+    const addTaskBtns = document.querySelectorAll('[data-bs-target="#addTaskModal"]');
+    addTaskBtns.forEach(btn => {
+        btn.addEventListener('click', function (e) {
+            e.preventDefault();
+            console.log('Add task button clicked (data-attr)');
+            openModal('addTaskModal');
+        });
+    });
+
+    const addNoteBtns = document.querySelectorAll('[data-bs-target="#addNoteModal"]');
+    addNoteBtns.forEach(btn => {
+        btn.addEventListener('click', function (e) {
+            e.preventDefault();
+            console.log('Add note button clicked (data-attr)');
+            openModal('addNoteModal');
+        });
+    });
+
+    // Modal close buttons
+    document.querySelectorAll('[data-bs-dismiss="modal"]').forEach(btn => {
+        btn.addEventListener('click', function (e) {
+            const modal = this.closest('.modal');
+            if (modal) {
+                closeModal(modal);
+            }
+        });
+    });
+
+    // Background click to close modal
+    document.querySelectorAll('.modal').forEach(modal => {
+        modal.addEventListener('click', function (e) {
+            if (e.target === this) {
+                closeModal(this);
+            }
+        });
+    });
+}
+
+// Animate cards on load
+document.addEventListener('DOMContentLoaded', function () {
+    console.log('DOM Content Loaded');
+
+    // Check if Bootstrap is loaded with delay
+    setTimeout(() => {
+        const bootstrapAvailable = checkBootstrap();
+        setupModalButtons();
+
+        if (!bootstrapAvailable) {
+            console.log('Setting up fallback modal system');
+        }
+    }, 500);
+
+    // Animate cards
+    const cards = document.querySelectorAll('.task-card, .stat-card');
+    cards.forEach((card, index) => {
+        card.style.animationDelay = `${index * 0.1}s`;
+    });
+});
+
+// Auto-submit status changes with confirmation
+document.querySelectorAll('.task-status-select').forEach(select => {
+    select.addEventListener('change', function (e) {
+        const newStatus = this.value;
+        const taskTitle = this.closest('.task-card').querySelector('.task-title').textContent;
+
+        if (newStatus === 'مكتمل') {
+            if (confirm(`هل أنت متأكد من تحديد المهمة "${taskTitle}" كمكتملة؟`)) {
+                this.form.submit();
+            } else {
+                // Reset to previous value if cancelled
+                this.selectedIndex = [...this.options].findIndex(option => option.selected && option.value !== newStatus);
+            }
+        } else {
+            this.form.submit();
+        }
+    });
+});
+
+// Handle URL hash for direct navigation to tabs
+if (window.location.hash === '#notes') {
+    const notesTab = document.getElementById('notes-tab');
+    const notesContent = document.getElementById('notes-content');
+    const tasksTab = document.getElementById('tasks-tab');
+    const tasksContent = document.getElementById('tasks-content');
+    const instructorNotesTab = document.getElementById('instructor-notes-tab');
+    const instructorNotesContent = document.getElementById('instructor-notes-content');
+
+    if (notesTab && notesContent && tasksTab && tasksContent) {
+        // Remove active from tasks
+        tasksTab.classList.remove('active');
+        tasksContent.classList.remove('show', 'active');
+        // Remove active from instructor notes if exists
+        if (instructorNotesTab && instructorNotesContent) {
+            instructorNotesTab.classList.remove('active');
+            instructorNotesContent.classList.remove('show', 'active');
+        }
+
+        // Add active to notes
+        notesTab.classList.add('active');
+        notesContent.classList.add('show', 'active');
+    }
+} else if (window.location.hash === '#instructor-notes') {
+    const notesTab = document.getElementById('notes-tab');
+    const notesContent = document.getElementById('notes-content');
+    const tasksTab = document.getElementById('tasks-tab');
+    const tasksContent = document.getElementById('tasks-content');
+    const instructorNotesTab = document.getElementById('instructor-notes-tab');
+    const instructorNotesContent = document.getElementById('instructor-notes-content');
+
+    if (instructorNotesTab && instructorNotesContent && tasksTab && tasksContent) {
+        // Remove active from tasks
+        tasksTab.classList.remove('active');
+        tasksContent.classList.remove('show', 'active');
+        // Remove active from notes if exists
+        if (notesTab && notesContent) {
+            notesTab.classList.remove('active');
+            notesContent.classList.remove('show', 'active');
+        }
+
+        // Add active to instructor notes
+        instructorNotesTab.classList.add('active');
+        instructorNotesContent.classList.add('show', 'active');
+    }
+}
+
+// Add click handlers for tab switching
+document.getElementById('notes-tab')?.addEventListener('click', function () {
+    window.location.hash = '#notes';
+});
+
+document.getElementById('tasks-tab')?.addEventListener('click', function () {
+    window.location.hash = '#tasks';
+});
+
+document.getElementById('instructor-notes-tab')?.addEventListener('click', function () {
+    window.location.hash = '#instructor-notes';
+});
@@ -0,0 +1,116 @@
+// فلترة المستخدمين حسب الصلاحية
+function filterUsers(role) {
+    const rows = document.querySelectorAll('.user-row');
+    const filterButtons = document.querySelectorAll('.filter-tabs .btn');
+    const visibleCountElement = document.getElementById('visible-count');
+
+    let visibleCount = 0;
+
+    // إزالة الـ active class من جميع الأزرار
+    filterButtons.forEach(btn => {
+        btn.classList.remove('active');
+    });
+
+    // إضافة active class للزر المحدد
+    const activeButton = document.querySelector(`[data-filter="${role}"]`);
+    if (activeButton) {
+        activeButton.classList.add('active');
+    }
+
+    // فلترة الصفوف
+    rows.forEach(row => {
+        const userRole = row.dataset.role;
+
+        if (role === 'all' || userRole === role) {
+            row.classList.remove('hidden');
+            row.classList.add('fade-in');
+            visibleCount++;
+        } else {
+            row.classList.add('hidden');
+            row.classList.remove('fade-in');
+        }
+    });
+
+    // تحديث عداد المستخدمين المرئيين
+    if (visibleCountElement) {
+        visibleCountElement.textContent = visibleCount;
+    }
+
+    // إظهار/إخفاء رسالة عدم وجود مستخدمين
+    const noUsersRow = document.querySelector('td[colspan="6"]');
+    if (noUsersRow) {
+        const parentRow = noUsersRow.parentElement;
+        if (visibleCount === 0 && role !== 'all') {
+            parentRow.style.display = '';
+            noUsersRow.innerHTML = `
+                <div class="text-center text-muted py-5">
+                    <i class="fas fa-users-slash fa-5x mb-3 text-muted opacity-50"></i>
+                    <h4>لا يوجد مستخدمين من نوع "${getRoleDisplayName(role)}"</h4>
+                    <p>جرب فلتر آخر أو أضف مستخدمين جدد</p>
+                    <button class="btn btn-outline-primary btn-sm" onclick="filterUsers('all')">
+                        <i class="fas fa-users me-1"></i>
+                        عرض جميع المستخدمين
+                    </button>
+                </div>
+            `;
+        } else if (visibleCount === 0 && role === 'all') {
+            parentRow.style.display = '';
+            noUsersRow.innerHTML = `
+                <div class="text-center text-muted py-5">
+                    <i class="fas fa-users fa-5x mb-3 text-muted opacity-50"></i>
+                    <h4>لا يوجد مستخدمين</h4>
+                    <p>ابدأ بإضافة مستخدم جديد</p>
+                    <button class="btn btn-gradient" data-bs-toggle="modal" data-bs-target="#addUserModal">
+                        <i class="fas fa-user-plus me-2"></i>
+                        إضافة أول مستخدم
+                    </button>
+                </div>
+            `;
+        } else {
+            parentRow.style.display = 'none';
+        }
+    }
+}
+
+// الحصول على اسم الصلاحية للعرض
+function getRoleDisplayName(role) {
+    const roleNames = {
+        'admin': 'المديرين',
+        'instructor': 'المدرسين'
+    };
+    return roleNames[role] || role;
+}
+
+// تشغيل الفلتر عند تحميل الصفحة
+document.addEventListener('DOMContentLoaded', function () {
+    // إخفاء صف "لا يوجد مستخدمين" إذا كان هناك مستخدمين
+    const userRows = document.querySelectorAll('.user-row');
+    const noUsersRow = document.querySelector('td[colspan="6"]');
+
+    if (userRows.length > 0 && noUsersRow) {
+        noUsersRow.parentElement.style.display = 'none';
+    }
+});
+
+function editUser(id, username, fullName, role) {
+    document.getElementById('editUserForm').action = `/edit_user/${id}`;
+    document.getElementById('editUsername').value = username;
+    document.getElementById('editFullName').value = fullName;
+    document.getElementById('editRole').value = role;
+
+    new bootstrap.Modal(document.getElementById('editUserModal')).show();
+}
+
+// deleteUser function is now in common.js
+
+function toggleInstructorField() {
+    const instructorField = document.getElementById('instructorField');
+    const addRole = document.getElementById('addRole');
+    if (addRole.value === 'instructor') {
+        instructorField.style.display = 'block';
+    } else {
+        instructorField.style.display = 'none';
+    }
+}
+
+// SweetAlert2 and common functions are loaded in base.html
@@ -0,0 +1,64 @@
+"""
+Shared fixtures: the app on TestingConfig with the seed_data demo dataset in
+its in-memory database (the same setup as query_budgets.py), and logged-in
+clients for the admin and an instructor.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import query_budgets  # noqa: E402
+import seed_data  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def app():
+    app, db = query_budgets.load_app()
+    with app.app_context():
+        seed_data.seed(db)
+    return app
+
+
+@pytest.fixture(scope='session')
+def db(app):
+    return app.extensions['sqlalchemy']
+
+
+@pytest.fixture(scope='session')
+def instructor(app):
+    from app import User
+    with app.app_context():
+        user = User.query.filter_by(role='instructor').order_by(User.id).first()
+        return {'id': user.id, 'instructor_id': user.instructor_id, 'username': user.username}
+
+
+@pytest.fixture(scope='session')
+def clients(app, instructor):
+    """Logged-in test clients by role"""
+    logins = {'admin': ('araby', '92321066'),
+              'instructor': (instructor['username'], seed_data.INSTRUCTOR_PASSWORD)}
+    clients = {}
+    for role, (username, password) in logins.items():
+        client = app.test_client()
+        client.post('/login', data={'username': username, 'password': password})
+        clients[role] = client
+    return clients
+
+
+@pytest.fixture(scope='session')
+def route_urls(app, db):
+    """URL of every GET route, by rule, with the instructor's own ids filled in"""
+    from app import User
+    with app.app_context():
+        user = User.query.filter_by(role='instructor').order_by(User.id).first()
+        arguments = query_budgets.url_arguments(db, user)
+    return dict(query_budgets.get_routes(app, arguments))
+
+
+@pytest.fixture(scope='session')
+def statement_counter(app, db):
+    with app.app_context():
+        return query_budgets.StatementCounter(db.engine)
@@ -0,0 +1,42 @@
+"""vendor_url() falls back to the CDN and says so once; every deploy build vendors the files"""
+import json
+import logging
+import os
+
+import assets
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_cdn_fallback_logged_once(app, monkeypatch, caplog):
+    monkeypatch.setattr(assets, '_cdn_fallback_logged', False)
+    monkeypatch.setitem(app.config, 'USE_CDN_ASSETS', False)
+    with app.test_request_context(), caplog.at_level(logging.WARNING, logger=app.logger.name):
+        monkeypatch.setitem(app.extensions, 'assets', {})
+        urls = [assets.vendor_url(name) for name in assets.VENDOR_ASSETS for _ in range(2)]
+
+    assert urls == [cdn_url for cdn_url, _ in assets.VENDOR_ASSETS.values() for _ in range(2)]
+    assert len([record for record in caplog.records if 'vendor_assets.py' in record.getMessage()]) == 1
+
+
+def test_vendored_copy_preferred(app, monkeypatch):
+    _, local_path = assets.VENDOR_ASSETS['bootstrap.js']
+    monkeypatch.setitem(app.config, 'USE_CDN_ASSETS', False)
+    monkeypatch.setitem(app.extensions, 'assets', {local_path: 'vendor/bootstrap/bootstrap.bundle.min.0123abcd.js'})
+    with app.test_request_context():
+        assert assets.vendor_url('bootstrap.js').endswith('bootstrap.bundle.min.0123abcd.js')
+
+
+
+def read(*parts):
+    with open(os.path.join(BASE_DIR, *parts), encoding='utf-8') as f:
+        return f.read()
+
+
+def test_deploy_builds_vendor_assets():
+    nixpacks = read('nixpacks.toml')
+    # A buildCommand in railway.json replaces the nixpacks.toml build phase on Railway
+    railway = json.loads(read('railway.json'))['build'].get('buildCommand') or nixpacks
+    for name, build in [('nixpacks.toml', nixpacks), ('railway.json', railway),
+                        ('bin/post_compile', read('bin', 'post_compile'))]:
+        assert 'python vendor_assets.py' in build, name
@@ -0,0 +1,96 @@
+"""Change feed tokens, paging and tombstones"""
+import base64
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from changefeed import (TOMBSTONE_TABLE, TRACKED_TABLES, ChangeTokenError, decode_token, encode_token,
+                        read_changes)
+
+# Past every seeded row, so a token positioned here only sees the test's own rows
+FUTURE = datetime(2100, 1, 1)
+
+
+def test_token_round_trip():
+    cursors = {'payment': (datetime(2026, 10, 19, 17, 4, 52, 123456), 42), 'student': (datetime(2026, 1, 1), 7)}
+    token = encode_token(cursors)
+    assert '=' not in token and '+' not in token and '/' not in token
+    assert decode_token(token) == cursors
+    assert decode_token('') == {} and decode_token(None) == {}
+
+
+def raw_token(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+
+@pytest.mark.parametrize('token', [
+    'not a token!',
+    raw_token(['v', 1]),
+    raw_token({'v': 1}),
+    raw_token({'v': 1, 'c': {'payment': ['yesterday', 1]}}),
+    raw_token({'v': 1, 'c': {'payment': ['2026-01-01T00:00:00', 'one']}}),
+    raw_token({'v': 2, 'c': {}}),
+])
+def test_bad_token_rejected(token, app, db):
+    with pytest.raises(ChangeTokenError):
+        decode_token(token)
+    with app.app_context(), pytest.raises(ChangeTokenError):
+        read_changes(db, token)
+
+
+@pytest.fixture
+def future_expenses(app, db):
+    """Five expenses sharing one updated_at, after every other row"""
+    from app import Expense
+    with app.app_context():
+        stamp = FUTURE + timedelta(seconds=1)
+        expenses = [Expense(description=f'feed test {n}', amount=n, updated_at=stamp) for n in range(5)]
+        db.session.add_all(expenses)
+        db.session.commit()
+        ids = [expense.id for expense in expenses]
+    yield ids
+    with app.app_context():
+        Expense.query.filter(Expense.id.in_(ids)).delete()
+        db.session.commit()
+
+
+def test_pages_split_rows_with_equal_timestamps(app, db, future_expenses):
+    token = encode_token({name: (FUTURE, 0) for name in TRACKED_TABLES + [TOMBSTONE_TABLE]})
+    seen, pages = [], 0
+    with app.app_context():
+        while True:
+            events, token, has_more = read_changes(db, token, limit=2, now=FUTURE + timedelta(days=1))
+            seen.extend((event['table'], event['id']) for event in events)
+            pages += 1
+            if not has_more:
+                break
+    assert seen == [('expense', expense_id) for expense_id in future_expenses]
+    assert pages == 3
+
+
+def test_settle_delay_holds_back_recent_rows(app, db, future_expenses):
+    token = encode_token({name: (FUTURE, 0) for name in TRACKED_TABLES + [TOMBSTONE_TABLE]})
+    with app.app_context():
+        events, _, _ = read_changes(db, token, now=FUTURE + timedelta(seconds=3))
+        assert events == []
+        events, _, _ = read_changes(db, token, now=FUTURE + timedelta(seconds=3), settle_delay=timedelta(0))
+        assert len(events) == 5
+
+
+def test_tombstones_for_orm_and_bulk_deletes(app, db, future_expenses):
+    from app import DeletedRecord, Expense
+    with app.app_context():
+        # Start after the tombstones earlier tests left behind
+        last = DeletedRecord.query.order_by(DeletedRecord.deleted_at.desc(), DeletedRecord.id.desc()).first()
+        started = (last.deleted_at, last.id) if last else (datetime(2000, 1, 1), 0)
+        db.session.delete(db.session.get(Expense, future_expenses[0]))
+        db.session.commit()
+        Expense.query.filter(Expense.id.in_(future_expenses[1:3])).delete()
+        db.session.commit()
+
+        token = encode_token({**{name: (FUTURE, 0) for name in TRACKED_TABLES}, TOMBSTONE_TABLE: started})
+        events, _, _ = read_changes(db, token, now=datetime.utcnow() + timedelta(minutes=1))
+
+    deletes = [(event['op'], event['table'], event['id']) for event in events]
+    assert deletes == [('delete', 'expense', expense_id) for expense_id in future_expenses[:3]]
@@ -0,0 +1,24 @@
+"""gunicorn.conf.py falls back from gevent to threaded gthread workers"""
+import gc
+import importlib.util
+import os
+import runpy
+
+import pytest
+
+CONF = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gunicorn.conf.py')
+
+
+@pytest.mark.skipif(importlib.util.find_spec('gevent') is not None, reason='gevent is installed')
+def test_gevent_fallback_is_threaded(monkeypatch):
+    monkeypatch.setenv('AUTO_INIT_DB', 'false')
+    monkeypatch.setenv('GUNICORN_WORKER_CLASS', 'gevent')
+    monkeypatch.setenv('GUNICORN_THREADS', '1')
+    try:
+        settings = runpy.run_path(CONF)
+    finally:
+        gc.enable()
+
+    assert (settings['worker_class'], settings['threads']) == ('gthread', 2)
+    # The preloaded app sizes its pool from these
+    assert (os.environ['GUNICORN_WORKER_CLASS'], os.environ['GUNICORN_THREADS']) == ('gthread', '2')
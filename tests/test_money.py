@@ -0,0 +1,111 @@
+"""Exact money amounts: parsing, splitting, the Money column and migration 4"""
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import Float, MetaData, create_engine, func, select
+
+import migrations
+from money import Money, format_money, parse_money, split_money, to_money
+
+
+@pytest.mark.parametrize('value,expected', [
+    (0.1, '0.10'), (33.33, '33.33'), (1e6, '1000000.00'), (2.675, '2.68'), (0.005, '0.01'),
+    (10, '10.00'), ('99.999', '100.00'), (Decimal('-1.005'), '-1.01'), ('0', '0.00'),
+])
+def test_to_money_rounds_half_up_to_piastres(value, expected):
+    assert to_money(value) == Decimal(expected)
+    assert str(to_money(value)) == expected
+
+
+@pytest.mark.parametrize('value', ['abc', '', 'nan', 'inf', float('nan'), object()])
+def test_to_money_rejects_bad_values(value):
+    with pytest.raises(ValueError):
+        to_money(value)
+
+
+def test_to_money_keeps_none():
+    assert to_money(None) is None
+
+
+def test_parse_money_reads_form_fields():
+    assert parse_money(' 1,250.5 ') == Decimal('1250.50')
+    assert parse_money(0) == Decimal('0.00')
+    with pytest.raises(ValueError):
+        parse_money('خمسون')
+
+
+@pytest.mark.parametrize('amount,parts', [
+    ('100', 3), ('0.01', 3), ('1000000', 7), ('33.33', 4), ('0', 2), ('-10', 3), ('99.99', 1),
+])
+def test_split_money_shares_add_up(amount, parts):
+    shares = split_money(amount, parts)
+    assert len(shares) == parts
+    assert sum(shares) == to_money(amount)
+    assert max(shares) - min(shares) <= Decimal('0.01')
+    assert all(share == to_money(share) for share in shares)
+
+
+def test_format_money():
+    assert format_money(1234.5) == '1,234.50'
+    assert format_money(None) == '0.00'
+    assert format_money('') == '0.00'
+    assert format_money(Decimal('1000000')) == '1,000,000.00'
+
+
+def test_money_column_round_trip():
+    column = Money()
+    for value in (0.1, 33.33, 1e6, '12.345', Decimal('0.07')):
+        stored = column.process_bind_param(value, None)
+        assert isinstance(stored, int)
+        assert column.process_result_value(stored, None) == to_money(value)
+    assert column.process_bind_param(None, None) is None
+    assert column.process_result_value(None, None) is None
+    # A REAL read back from a column that kept its FLOAT affinity
+    assert column.process_result_value(3333.0, None) == Decimal('33.33')
+
+
+def test_json_keeps_amounts_numeric(app):
+    with app.app_context():
+        assert app.json.loads(app.json.dumps({'amount': Decimal('33.33')})) == {'amount': 33.33}
+
+
+@pytest.fixture
+def float_schema_db(db, tmp_path):
+    """A SQLite file with today's tables, but money columns still FLOAT as before migration 4"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'before.db'}")
+    metadata = MetaData()
+    for table in db.metadata.sorted_tables:
+        copy = table.to_metadata(metadata)
+        for column in copy.columns:
+            if isinstance(column.type, Money):
+                column.type = Float()
+    metadata.create_all(engine)
+    yield SimpleNamespace(engine=engine, metadata=db.metadata, float_metadata=metadata)
+    engine.dispose()
+
+
+AMOUNTS = [0.1, 33.33, 1e6, 19.99, 0.2]
+
+
+def test_migration_converts_floats_to_exact_piastres(float_schema_db):
+    old_payment = float_schema_db.float_metadata.tables['payment']
+    with float_schema_db.engine.begin() as connection:
+        connection.execute(old_payment.insert(), [{'student_id': 1, 'amount': amount} for amount in AMOUNTS])
+
+    assert 4 in migrations.upgrade(float_schema_db)
+
+    payment = float_schema_db.metadata.tables['payment']
+    with float_schema_db.engine.connect() as connection:
+        amounts = connection.execute(select(payment.c.amount).order_by(payment.c.id)).scalars().all()
+        total = connection.execute(select(func.sum(payment.c.amount))).scalar()
+        raw_total = connection.exec_driver_sql('SELECT SUM(amount) FROM payment').scalar()
+        # Running it again must not multiply the amounts a second time
+        assert migrations.upgrade(float_schema_db) == []
+        again = connection.execute(select(payment.c.amount).order_by(payment.c.id)).scalars().all()
+
+    assert amounts == [to_money(amount) for amount in AMOUNTS]
+    assert all(isinstance(amount, Decimal) for amount in amounts)
+    assert total == Decimal('1000053.62')
+    assert raw_total == 100005362
+    assert again == amounts
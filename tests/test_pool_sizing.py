@@ -0,0 +1,29 @@
+"""TimedQueuePool reports checkout waits and timeouts to its observer"""
+import pytest
+from sqlalchemy import create_engine, exc
+
+from pool_sizing import TimedQueuePool
+
+
+def test_checkout_wait_and_timeout_reported(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=TimedQueuePool,
+                           pool_size=1, max_overflow=0, pool_timeout=0.05)
+    observed = []
+
+    def observer(pool, waited):
+        observed.append((pool, waited))
+
+    engine.pool.observer = observer
+
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    (first_pool, waited), (timeout_pool, timed_out) = observed
+    assert first_pool is timeout_pool is engine.pool
+    assert waited >= 0
+    assert timed_out is None
+
+    # engine.dispose() (post_fork) replaces the pool; the observer moves with it
+    engine.dispose()
+    assert engine.pool.observer is observer
@@ -0,0 +1,18 @@
+"""Every route in query_budgets.json stays within its SQL statement budget"""
+import json
+
+import pytest
+
+import query_budgets
+
+with open(query_budgets.BUDGETS_FILE, encoding='utf-8') as f:
+    BUDGETS = json.load(f)['routes']
+
+
+@pytest.mark.parametrize('key', sorted(BUDGETS))
+def test_statement_budget(key, clients, route_urls, statement_counter):
+    role, rule = key.split(' ', 1)
+    assert rule in route_urls, f'{rule} is no longer a GET route; remove its budget'
+    status, queries, _ = query_budgets.measure(clients[role], statement_counter, route_urls[rule], repeat=2)
+    assert status < 500
+    assert queries <= BUDGETS[key]['queries'], f"{queries} statements, budget {BUDGETS[key]['queries']}"
@@ -0,0 +1,54 @@
+"""The filtered statements of the main routes use an index on the big tables"""
+import re
+
+import pytest
+from sqlalchemy import event
+
+from query_plans import find_full_scans
+
+# Tables big enough that a full scan on a hot path is a regression
+INDEXED_TABLES = ['student', 'student_groups', 'attendance', 'payment', 'expense',
+                  'schedule', 'instructor_note', 'instructor_todo']
+
+HOT_ROUTES = [
+    ('admin', '/'),
+    ('admin', '/students'),
+    ('admin', '/groups'),
+    ('admin', '/group_details/<int:group_id>'),
+    ('admin', '/payments'),
+    ('admin', '/attendance'),
+    ('admin', '/reports'),
+    ('admin', '/instructor_notes'),
+    ('admin', '/instructor_todos'),
+    ('instructor', '/instructor_dashboard'),
+    ('instructor', '/instructor_attendance'),
+    ('instructor', '/instructor_todos'),
+]
+
+# Listing every row or summing a whole table scans it by design; only
+# statements that filter are expected to find their rows through an index
+FILTERED = re.compile(r'\bWHERE\b')
+
+
+@pytest.mark.parametrize('role,rule', HOT_ROUTES, ids=[f'{role} {rule}' for role, rule in HOT_ROUTES])
+def test_no_full_scans(role, rule, app, db, clients, route_urls):
+    with app.app_context():
+        engine = db.engine
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and FILTERED.search(statement):
+            statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = clients[role].get(route_urls[rule])
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    assert response.status_code == 200
+    assert statements
+
+    with app.app_context(), engine.connect() as connection:
+        scans = {statement: find_full_scans(connection, statement, INDEXED_TABLES, parameters)
+                 for statement, parameters in statements}
+    assert {statement: tables for statement, tables in scans.items() if tables} == {}
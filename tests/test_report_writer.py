@@ -0,0 +1,60 @@
+"""Workbooks written by report_writer read back in openpyxl with the same values and styles"""
+import io
+from datetime import date
+from decimal import Decimal
+
+from openpyxl import load_workbook
+
+from report_writer import MAX_COLUMN_WIDTH, ReportWriter
+
+
+def build_workbook():
+    report = ReportWriter()
+    ws = report.add_sheet('تقرير شامل')
+    ws.add_title('تقرير - مركز تفرا', span=4)
+    ws.add_blank()
+    ws.add_section('المدفوعات')
+    ws.add_table(['الطالب', 'المبلغ', 'عدد الحصص', 'التاريخ'], [
+        ['أحمد & <محمد>', Decimal('150.50'), 12, date(2026, 10, 1)],
+        ['سارة\x07', 99.5, True, None],
+        ['x' * 80, 0, -3, 'نص'],
+    ])
+    return load_workbook(io.BytesIO(report.to_bytes().getvalue()))
+
+
+def test_values_read_back():
+    ws = build_workbook()['تقرير شامل']
+
+    assert [[cell.value for cell in row] for row in ws.iter_rows(min_row=4, max_row=7)] == [
+        ['الطالب', 'المبلغ', 'عدد الحصص', 'التاريخ'],
+        ['أحمد & <محمد>', 150.5, 12, '2026-10-01'],
+        ['سارة', 99.5, True, None],
+        ['x' * 80, 0, -3, 'نص'],
+    ]
+    assert ws['A1'].value == 'تقرير - مركز تفرا'
+    assert ws['A3'].value == 'المدفوعات'
+    assert ws['A2'].value is None
+    assert ws['B5'].data_type == 'n' and ws['C6'].data_type == 'b' and ws['D5'].data_type == 's'
+
+
+def test_styles_and_layout():
+    ws = build_workbook()['تقرير شامل']
+
+    # Numbers and dates are written with the General format; dates as ISO text
+    assert {cell.number_format for row in ws.iter_rows(min_row=4, max_row=7) for cell in row} == {'General'}
+    assert ws['A1'].font.b and ws['A1'].font.sz == 16
+    assert ws['A4'].font.b and ws['A4'].fill.fgColor.rgb == 'FF4472C4'
+    assert ws['A5'].border.left.style == 'thin' and not ws['A5'].font.b
+    assert [str(merged) for merged in ws.merged_cells.ranges] == ['A1:D1']
+    assert ws.sheet_view.rightToLeft
+    assert ws.column_dimensions['A'].width == MAX_COLUMN_WIDTH
+    assert ws.column_dimensions['C'].width == len('عدد الحصص') + 2
+
+
+def test_exported_report_opens(clients):
+    response = clients['admin'].get('/export_reports')
+    assert response.status_code == 200
+    workbook = load_workbook(io.BytesIO(response.get_data()))
+    ws = workbook['تقرير شامل']
+    assert ws['A1'].value.startswith('تقرير شامل')
+    assert any(isinstance(cell.value, (int, float)) for row in ws.iter_rows() for cell in row)
@@ -0,0 +1,68 @@
+"""retry_on_lock re-runs a view that hit a lock, but never one that already committed"""
+import sqlite3
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from sqlite_tuning import retry_on_lock
+
+
+def lock_on_commit(db, number):
+    """Make the ``number``-th commit from now fail once with ``database is locked``"""
+    commits = []
+
+    def before_commit(session):
+        commits.append(session)
+        if len(commits) == number:
+            raise OperationalError('COMMIT', None, sqlite3.OperationalError('database is locked'))
+
+    event.listen(db.session, 'before_commit', before_commit)
+    return lambda: event.remove(db.session, 'before_commit', before_commit)
+
+
+def add_student_view(db, name):
+    """Two commits, like add_student: the student, then its changes"""
+    from app import Student
+
+    def view():
+        student = Student(name=name, age=12, registration_date=datetime(2026, 1, 1))
+        db.session.add(student)
+        db.session.commit()
+        student.location = 'طنطا'
+        db.session.commit()
+        return 'ok'
+    return retry_on_lock(db, attempts=3, base_delay=0)(view)
+
+
+def students_named(db, name):
+    from app import Student
+    count = Student.query.filter_by(name=name).count()
+    Student.query.filter_by(name=name).delete()
+    db.session.commit()
+    return count
+
+
+def test_lock_after_first_commit_is_not_replayed(app, db):
+    name = 'retry test committed'
+    with app.test_request_context('/add_student', method='POST'):
+        remove = lock_on_commit(db, 2)
+        try:
+            with pytest.raises(OperationalError):
+                add_student_view(db, name)()
+        finally:
+            remove()
+        db.session.rollback()
+        assert students_named(db, name) == 1
+
+
+def test_lock_before_any_commit_is_retried(app, db):
+    name = 'retry test uncommitted'
+    with app.test_request_context('/add_student', method='POST'):
+        remove = lock_on_commit(db, 1)
+        try:
+            assert add_student_view(db, name)() == 'ok'
+        finally:
+            remove()
+        assert students_named(db, name) == 1
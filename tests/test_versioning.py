@@ -0,0 +1,52 @@
+"""Table versions are bumped once per commit, and not at all on rollback"""
+from sqlalchemy import event
+
+from versioning import get_versions
+
+
+def version(db, name):
+    return get_versions(db, [name])[name][0]
+
+
+def test_bumped_once_per_commit_in_name_order(app, db):
+    from app import Expense, Task
+    with app.app_context():
+        before = {name: version(db, name) for name in ('expense', 'task')}
+        statements = []
+
+        def listener(conn, cursor, statement, parameters, *args):
+            statements.append((statement, parameters))
+
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            expense = Expense(description='versioning test', amount=10)
+            db.session.add(expense)
+            db.session.flush()
+            expense.amount = 20
+            db.session.flush()
+            task = Task(title='versioning test')
+            db.session.add(task)
+            db.session.commit()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+        assert {name: version(db, name) for name in ('expense', 'task')} == \
+            {name: number + 1 for name, number in before.items()}
+        # table_name is the last parameter, in the WHERE clause
+        bumped = [parameters[-1] for statement, parameters in statements
+                  if statement.startswith('UPDATE table_versions')]
+        assert bumped == ['expense', 'task']
+        db.session.delete(expense)
+        db.session.delete(task)
+        db.session.commit()
+
+
+def test_rollback_does_not_bump(app, db):
+    from app import Expense
+    with app.app_context():
+        before = version(db, 'expense')
+        db.session.add(Expense(description='versioning test', amount=10))
+        db.session.flush()
+        db.session.rollback()
+        db.session.commit()
+        assert version(db, 'expense') == before
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Download the third-party frontend files used by the templates into
+static/vendor/ so pages work without internet access.
+
+The deployment build runs it (the buildCommand in railway.json on
+Railway, which replaces the build phase of nixpacks.toml; nixpacks.toml
+for other nixpacks builds; bin/post_compile on Heroku) and fails when a
+download fails; on PythonAnywhere or locally,
+run it once after checking out:
+
+    python vendor_assets.py
+
+static/vendor/ is a build output and is not committed. The CDN URLs pin
+the versions, and static/vendor/vendor.json records the sha256 of every
+file written.
+
+Font Awesome is subset to the icons the templates and scripts use. The
+stylesheet keeps only those icon rules, and the webfonts are cut down to
+the matching glyphs when fontTools is installed (pip install fonttools
+brotli). Cairo is fetched as woff2 for the weights listed in
+assets.VENDOR_ASSETS. The asset pipeline then fingerprints the files like
+any other static file. Set USE_CDN_ASSETS=true to keep using the CDNs.
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import posixpath
+import re
+import sys
+import urllib.request
+from datetime import datetime
+from urllib.parse import urljoin, urlparse
+
+from assets import VENDOR_ASSETS
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+VENDOR_MANIFEST = os.path.join(STATIC_DIR, 'vendor', 'vendor.json')
+
+# Google Fonts only serves woff2 to browsers it recognizes
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/120.0 Safari/537.36')
+
+# Icons built dynamically in JavaScript that a plain text scan cannot see
+EXTRA_ICONS = set()
+
+CSS_URL = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+ICON_CLASS = re.compile(r'\bfa-([a-z0-9]+(?:-[a-z0-9]+)*)')
+ICON_SELECTOR = re.compile(r'^\.fa-([a-z0-9-]+)::?before$')
+
+
+def fetch(url):
+    request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+    with urllib.request.urlopen(request, timeout=60) as response:
+        return response.read()
+
+
+def save(local_path, data):
+    path = os.path.join(STATIC_DIR, local_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as output:
+        output.write(data)
+    return path
+
+
+def vendor_css_resources(css_url, local_path, css):
+    """Download files referenced by url() in a stylesheet and point the stylesheet at the copies"""
+    local_dir = posixpath.dirname(local_path)
+
+    def replace(match):
+        quote, ref = match.groups()
+        if ref.startswith(('data:', '#')):
+            return match.group(0)
+        path_part = re.split(r'[?#]', ref, maxsplit=1)[0]
+        suffix = ref[len(path_part):]
+        absolute = urljoin(css_url, path_part)
+        if ref.startswith(('http:', 'https:', '//')):
+            # Absolute font URLs (fonts.gstatic.com) go next to the stylesheet
+            relative, suffix = 'fonts/' + posixpath.basename(urlparse(absolute).path), ''
+        else:
+            relative = path_part
+        target = posixpath.normpath(posixpath.join(local_dir, relative))
+        if not os.path.exists(os.path.join(STATIC_DIR, target)):
+            save(target, fetch(absolute))
+        return f'url({quote}{relative}{suffix}{quote})'
+
+    return CSS_URL.sub(replace, css)
+
+
+def used_icons():
+    """Font Awesome icon names referenced by templates and page scripts"""
+    names = set(EXTRA_ICONS)
+    files = glob.glob(os.path.join(BASE_DIR, 'templates', '*.html'))
+    files += [path for path in glob.glob(os.path.join(STATIC_DIR, '**', '*.js'), recursive=True)
+              if os.sep + 'vendor' + os.sep not in path and os.sep + 'dist' + os.sep not in path]
+    files += glob.glob(os.path.join(BASE_DIR, '*.py'))
+    for path in files:
+        with open(path, encoding='utf-8', errors='ignore') as source:
+            names.update(ICON_CLASS.findall(source.read()))
+    return names
+
+
+def split_rules(css):
+    """Top-level CSS blocks as (prelude, body) pairs; nested blocks stay in the body"""
+    rules = []
+    depth = 0
+    start = 0
+    prelude = ''
+    for index, char in enumerate(css):
+        if char == '{':
+            if depth == 0:
+                prelude = css[start:index]
+                start = index + 1
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                rules.append((prelude, css[start:index]))
+                start = index + 1
+    return rules
+
+
+def subset_fontawesome_css(css, icons):
+    """Drop icon rules for unused icons. Returns (css, codepoints of kept icons)"""
+    kept = []
+    codepoints = set()
+    for prelude, body in split_rules(css):
+        selectors = [selector.strip() for selector in prelude.split(',')]
+        matches = [ICON_SELECTOR.match(selector) for selector in selectors]
+        if selectors and all(matches):
+            names = {match.group(1) for match in matches}
+            if not names & icons:
+                continue
+            content = re.search(r'content:\s*"\\([0-9a-fA-F]+)"', body)
+            if content:
+                codepoints.add(int(content.group(1), 16))
+        kept.append(f'{prelude.strip()}{{{body}}}')
+    return '\n'.join(kept), codepoints
+
+
+def subset_fonts(font_dir, codepoints):
+    try:
+        from fontTools import subset
+    except ImportError:
+        print("⚠️ fontTools not installed - keeping full Font Awesome webfonts")
+        return
+
+    for path in glob.glob(os.path.join(font_dir, '*.woff2')) + glob.glob(os.path.join(font_dir, '*.ttf')):
+        options = subset.Options()
+        options.flavor = 'woff2' if path.endswith('.woff2') else None
+        options.layout_features = ['*']
+        before = os.path.getsize(path)
+        try:
+            font = subset.load_font(path, options)
+            subsetter = subset.Subsetter(options)
+            subsetter.populate(unicodes=codepoints)
+            subsetter.subset(font)
+            subset.save_font(font, path, options)
+        except Exception as e:
+            print(f"⚠️ Could not subset {os.path.basename(path)}, keeping the full font: {e}")
+            continue
+        print(f"   ✂️ {os.path.basename(path)}: {before // 1024} KB -> {os.path.getsize(path) // 1024} KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Vendor frontend dependencies into static/vendor/')
+    parser.add_argument('--all-icons', action='store_true', help='Keep every Font Awesome icon')
+    args = parser.parse_args()
+
+    manifest = {'fetched_at': datetime.utcnow().isoformat(), 'files': {}}
+    for name, (url, local_path) in VENDOR_ASSETS.items():
+        print(f"⬇️ {name}: {url}")
+        try:
+            data = fetch(url)
+        except OSError as e:
+            print(f"❌ Failed to download {url}: {e}")
+            return 1
+
+        if local_path.endswith('.css'):
+            css = vendor_css_resources(url, local_path, data.decode('utf-8'))
+            if name == 'fontawesome.css' and not args.all_icons:
+                icons = used_icons()
+                css, codepoints = subset_fontawesome_css(css, icons)
+                print(f"   🎯 kept {len(icons)} icon names, {len(codepoints)} glyphs")
+                subset_fonts(os.path.join(STATIC_DIR, posixpath.dirname(posixpath.dirname(local_path)), 'webfonts'),
+                             codepoints)
+            data = css.encode('utf-8')
+
+        save(local_path, data)
+        manifest['files'][name] = {
+            'url': url,
+            'path': local_path,
+            'sha256': hashlib.sha256(data).hexdigest(),
+            'bytes': len(data)
+        }
+
+    with open(VENDOR_MANIFEST, 'w', encoding='utf-8') as output:
+        json.dump(manifest, output, indent=2)
+    print(f"✅ Vendored {len(manifest['files'])} files into static/vendor/")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Per-table data version stamps.
+
+Every transaction that inserts, updates or deletes rows of a versioned
+table increments that table's counter in ``table_versions`` when it
+commits, inside the same transaction. Each written table is bumped once
+per commit however many flushes wrote it, and in table name order, so
+two requests writing the same tables take the counter row locks in the
+same order instead of deadlocking. Caches (report files, conditional GET, template fragments)
+derive their keys from these counters, so a cached result stays valid
+exactly until one of the tables it was built from is written to, in any
+worker process.
+"""
+import hashlib
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, select
+
+from changefeed import TRACKED_TABLES
+
+# Kept out of db.metadata so backups neither save nor restore the counters
+version_metadata = MetaData()
+
+table_versions = Table(
+    'table_versions', version_metadata,
+    Column('table_name', String(50), primary_key=True),
+    Column('version', Integer, nullable=False, default=0),
+    Column('changed_at', DateTime, nullable=False, default=datetime.utcnow)
+)
+
+# Membership changes bump 'student' through the Student.groups listeners
+VERSIONED_TABLES = list(TRACKED_TABLES)
+
+_PENDING_KEY = 'versioning_pending_tables'
+
+
+def bump_versions(connection, table_names):
+    """Increment the version of each table, creating missing counters"""
+    now = datetime.utcnow()
+    for name in sorted(set(table_names)):
+        result = connection.execute(
+            table_versions.update()
+            .where(table_versions.c.table_name == name)
+            .values(version=table_versions.c.version + 1, changed_at=now)
+        )
+        if result.rowcount == 0:
+            connection.execute(table_versions.insert().values(table_name=name, version=1, changed_at=now))
+
+
+def bump_all_versions(db):
+    """Invalidate everything, e.g. after a restore wrote rows with Core inserts"""
+    with db.engine.begin() as connection:
+        bump_versions(connection, VERSIONED_TABLES)
+
+
+def collect_flush_changes(session):
+    """before_flush hook: remember which versioned tables this transaction writes"""
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        name = getattr(obj, '__tablename__', None)
+        if name not in VERSIONED_TABLES:
+            continue
+        if obj in session.dirty and not session.is_modified(obj, include_collections=False):
+            continue
+        pending.add(name)
+
+
+def mark_changed(session, table_names):
+    """Bump these tables when ``session`` commits (bulk and Core writes skip before_flush)"""
+    session.info.setdefault(_PENDING_KEY, set()).update(table_names)
+
+
+def apply_pending_versions(session):
+    """before_commit hook: bump every table written since the last commit"""
+    # Commit flushes after before_commit runs; flush here so those writes are counted
+    session.flush()
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        bump_versions(session.connection(), pending)
+
+
+def discard_pending_versions(session):
+    """after_rollback hook: the collected writes were rolled back"""
+    session.info.pop(_PENDING_KEY, None)
+
+
+def get_versions(db, table_names):
+    """{table: (version, changed_at)} for the given tables; unknown tables are (0, None)"""
+    rows = db.session.execute(
+        select(table_versions.c.table_name, table_versions.c.version, table_versions.c.changed_at)
+        .where(table_versions.c.table_name.in_(table_names))
+    ).all()
+    versions = {name: (0, None) for name in table_names}
+    versions.update({row.table_name: (row.version, row.changed_at) for row in rows})
+    return versions
+
+
+def versions_etag(namespace, versions, *extra):
+    """Stable strong ETag value for a resource built from ``versions``"""
+    parts = [namespace]
+    for name in sorted(versions):
+        version, changed_at = versions[name]
+        parts.append(f'{name}:{version}:{changed_at.isoformat() if changed_at else ""}')
+    parts.extend(str(value) for value in extra)
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def last_modified(versions):
+    """Latest change time among ``versions``, or None if nothing was recorded"""
+    stamps = [changed_at for _, changed_at in versions.values() if changed_at]
+    return max(stamps, default=None)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Compare gunicorn worker classes under the load_test.py user mix.
+
+Each ``--mode`` is ``class:WORKERSxTHREADS`` and gets its own load_test
+run (fresh database, same seed and user mix), then the runs are printed
+side by side: throughput, overall p50/p95, errors, pool checkout waits and
+peak memory. The question it answers is how much concurrency a given
+amount of memory buys, e.g. 4 sync workers against 2 workers with 4
+threads each:
+
+    python worker_benchmark.py                           # sync:4x1 gthread:2x4 gevent:2x4
+    python worker_benchmark.py --mode sync:4x1 --mode gthread:4x4 --duration 120
+    python worker_benchmark.py --database-url postgresql://localhost/load_{mode} --output benchmarks/workers.json
+
+Every mode seeds its own empty database: ``--database-url`` must contain
+``{mode}`` (replaced with e.g. ``gthread_2x4``) when more than one mode
+runs. gevent modes are skipped when gevent is not installed. With SQLite
+they also measure the cost of blocking the event loop on every query;
+compare gevent on Postgres, with psycogreen installed.
+"""
+import argparse
+import importlib.util
+import re
+import sys
+from datetime import datetime
+
+import load_test
+
+DEFAULT_MODES = ['sync:4x1', 'gthread:2x4', 'gevent:2x4']
+MODE = re.compile(r'^(sync|gthread|gevent):(\d+)x(\d+)$')
+
+
+def parse_mode(text):
+    match = MODE.match(text)
+    if match is None:
+        raise argparse.ArgumentTypeError(f"'{text}' is not class:WORKERSxTHREADS, e.g. gthread:2x4")
+    return match.group(1), int(match.group(2)), int(match.group(3))
+
+
+def print_comparison(reports):
+    print(f"\n{'mode':<16}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'errors':>9}{'pool wait':>11}"
+          f"{'timeouts':>10}{'peak MiB':>10}{'req/s/GiB':>11}")
+    for name, report in reports.items():
+        pool = report['pool'] or {}
+        memory = report['memory'] or {}
+        peak = memory.get('peak_total_mib')
+        per_gib = f"{report['throughput_rps'] / peak * 1024:.1f}" if peak else '-'
+        wait = f"{pool['mean_wait_ms']:.1f} ms" if pool else '-'
+        print(f"{name:<16}{report['throughput_rps']:>8.1f}{report['p50_ms'] or 0:>9.0f}{report['p95_ms'] or 0:>9.0f}"
+              f"{report['error_rate']:>9.2%}{wait:>11}{pool.get('timeouts', '-'):>10}{peak or '-':>10}{per_gib:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare gunicorn worker classes with the load test mix')
+    parser.add_argument('--mode', type=parse_mode, action='append',
+                        help=f"class:WORKERSxTHREADS, repeatable (default: {' '.join(DEFAULT_MODES)})")
+    parser.add_argument('--profile', choices=sorted(load_test.seed_data.PROFILES), default='center',
+                        help='seed_data profile (default: center)')
+    parser.add_argument('--seed', type=int, default=1, help='Data and think-time seed')
+    parser.add_argument('--duration', type=float, default=60, help='Seconds of load per mode')
+    parser.add_argument('--cashiers', type=int, default=3, help='Concurrent cashiers posting payments')
+    parser.add_argument('--admins', type=int, default=2, help='Concurrent admins opening reports and exports')
+    parser.add_argument('--database-url',
+                        help='Empty database per mode instead of a temporary SQLite file, with {mode} in it')
+    parser.add_argument('--output', help='Write all runs as JSON')
+    args = parser.parse_args()
+    modes = args.mode or [parse_mode(mode) for mode in DEFAULT_MODES]
+    if args.database_url and '{mode}' not in args.database_url and len(modes) > 1:
+        parser.error('--database-url needs {mode} in it, so that every mode seeds its own empty database')
+
+    reports = {}
+    for worker_class, workers, threads in modes:
+        name = f'{worker_class}:{workers}x{threads}'
+        if worker_class == 'gevent' and importlib.util.find_spec('gevent') is None:
+            print(f"⚠️ Skipping {name}: gevent is not installed (pip install gevent)")
+            continue
+        print(f"\n▶️ {name}")
+        database_url = args.database_url and args.database_url.format(mode=f'{worker_class}_{workers}x{threads}')
+        load_args = load_test.build_parser().parse_args([
+            '--profile', args.profile, '--seed', str(args.seed), '--duration', str(args.duration),
+            '--workers', str(workers), '--worker-class', worker_class, '--threads', str(threads),
+            '--cashiers', str(args.cashiers), '--admins', str(args.admins),
+            *(['--database-url', database_url] if database_url else []),
+        ])
+        reports[name] = load_test.run(load_args)
+
+    if not reports:
+        print('❌ No mode could run')
+        return 1
+    print_comparison(reports)
+    if args.output:
+        load_test.write_json(args.output, {'created_at': datetime.now().isoformat(timespec='seconds'),
+                                           'runs': reports})
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())